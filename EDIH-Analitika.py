@@ -5,25 +5,64 @@ import warnings
 import streamlit as st
 import streamlit.components.v1 as components
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut
 from openai import OpenAI
-import numpy as np
 import pydeck as pdk
 from pathlib import Path
 import fitz  # PyMuPDF
-import base64, io, json, os, time, random, glob
+import base64, io, json, os, time, random
 from io import BytesIO
-import plotly.io as pio
 import hmac
+import threading
+
+import settings
+import metrics
+import perf
+from perf import span
+from ingest import DATASETS, file_version, find_files, latest_file, read_datasets
+from snapshots import SnapshotStore
+from dma_progression import build_progression
+from reporting import REPORTING_PERIODS, DateIndex, period_bounds
+from datasets import enable_copy_on_write, session_view, slice_frames
+from aggregates import (
+    RANKING_COLUMNS, bootcamp_summary as bootcamp_summary_table, dap_tables,
+    education_tables, service_overview, state_aid_tables, tbi_funnel, tbi_tables, user_map_bins,
+)
+from report import PAGE_DATASETS as ANALYSIS_PAGES
+from projection import missing_for_page
+from identity import NAME_COLUMNS as CUSTOMER_NAME_COLUMNS, CustomerIndex, with_customer_keys
+from journey import STAGES as JOURNEY_STAGES, build_journey
+from quality import RULES as QUALITY_RULES, issue_count, offending_rows, validate
+from figure_cache import FigureCache, figure_key
+from tables import PAGE_SIZE, arrow_safe, page_count, page_view, row_positions
+from geocoding import (
+    GeocodeCache, GeocodeWorker, address_column, attach_coordinates, coordinate_columns,
+    make_geocoder, missing_addresses,
+)
+from gazetteer import load_gazetteer
+from ranking import DEFAULT_WEIGHTS, country_rankings, peer_set, rank_edihs
+from ai_ledger import AiLedger, BudgetExceeded, ai_context, current_context, document_hash
+from spatial import ZOOM_LEVELS, GridIndex, compact_points, hex_bins
+from heatmaps import MAX_HEATMAP_ROWS, band_matrix, score_band, sorted_rows, window, window_starts
+from figures import (
+    bootcamp_by_year, conversion_funnel, customers_by_technology, journey_funnel, stage_durations,
+    dap_types_by_customer, dap_value_by_customer, dma_radar, education_by_course,
+    education_by_year, esg_heatmap, kpi_gauge, most_improved_bar, OVERVIEW_CHARTS, matrix_heatmap,
+    state_aid_eu, state_aid_public_sector, state_aid_sme, tbi_status_pie, tbi_timeline,
+    tbi_top_organizations, tbi_type_sunburst, tbi_value_by_customer,
+)
+from enrich import enrich_services
+from kpis import KPI_FILE, evaluate_kpis, kpis_for_page, load_definitions
+from esg import PILLARS as ESG_PILLARS, PILLAR_WEIGHTS, composite_score, compute_esg_scores, cohort_scores, esg_matrix
 
-app_folder = str(Path.home() / "EDIH")
+app_folder = settings.APP_FOLDER
 app_folder_path = Path(app_folder)  # Konverzija stringa u Path objekt
-data_folder = os.path.join(app_folder, "Data")
-dma_folder = os.path.join(app_folder, "DMA")
-slike_folder = os.path.join(app_folder, "Slike")
+data_folder = settings.DATA_FOLDER
+dma_folder = settings.DMA_FOLDER
+slike_folder = settings.SLIKE_FOLDER
+snapshot_folder = settings.SNAPSHOT_FOLDER
+
+# Dijeljeni frameovi iz cachea sesije gledaju kroz copy-on-write poglede (session_view)
+enable_copy_on_write()
 
 def check_password():
     """Returns `True` if the user had the correct password."""
@@ -125,6 +164,10 @@ def check_password():
 if not check_password():
     st.stop()
 
+# Mjerenje reruna (perf.py): spanovi ove izvedbe skripte vežu se uz isti rerun
+st.session_state.setdefault("perf_session", os.urandom(4).hex())
+perf.recorder.start_rerun(session=st.session_state["perf_session"])
+
 # ✅ Ako je password točan, nastavi s normalnom aplikacijom
 # Dodaj logout button u sidebar nakon uspješnog logina
 st.sidebar.markdown("---")
@@ -134,33 +177,7 @@ if st.sidebar.button("🚪 Logout", use_container_width=True):
         del st.session_state[key]
     st.rerun()
 
-# 🌈 GLOBALNA PLOTLY TEMA (EDIH vizualni identitet)
-pio.templates["edih_theme"] = pio.templates["plotly_white"]
-
-# Podešavanje boja i fontova
-pio.templates["edih_theme"].layout.update(
-    font=dict(family="Arial, sans-serif", size=14, color="#333333"),
-    title=dict(font=dict(size=20, color="#222222"), x=0.02, xanchor="left"),
-    paper_bgcolor="white",
-    plot_bgcolor="white",
-    margin=dict(l=60, r=40, t=80, b=60),
-    coloraxis_colorbar=dict(title_font=dict(size=14)),
-    legend=dict(
-        orientation="h",
-        yanchor="bottom",
-        y=-0.25,
-        xanchor="center",
-        x=0.5,
-        font=dict(size=13)
-    )
-)
-
-# Zadana kvalitativna (kategorijska) paleta — harmonična i visoko kontrastna
-default_colors = px.colors.qualitative.Vivid  # alternativno: Plotly, Bold, Prism
-EDIH_CONTINUOUS_SCALE = "Tealgrn"  # ili "Agsunset", "Tealgrn", "Blues", "Viridis"
-
-# Aktiviraj EDIH temu globalno
-pio.templates.default = "edih_theme"
+# 🌈 GLOBALNA PLOTLY TEMA (EDIH vizualni identitet) registrira se u figures.py
 
 # --- Automatska provjera preglednika (sažeta sidebar verzija) ---
 with st.sidebar:
@@ -207,132 +224,171 @@ st.set_page_config(
 # client = st.secrets["deepseek"]["api_key"]
 client = OpenAI(api_key=st.secrets["openai"]["api_key"])
 
-# Load the Excel file into a DataFrame
-@st.cache_data(show_spinner=False)
-def load_data(file_path, sheet_name):
-    """Generic loader for standard Excel files (no special date parsing)."""
-    data = pd.read_excel(file_path, sheet_name)
-
-    # Clean column headers to avoid hidden spaces or encodings
-    data.columns = data.columns.str.strip().str.replace('\u00a0', ' ', regex=False)
-
-    # If 'Dates' exists (rarely), just copy it through for reference
-    if 'Dates' in data.columns and 'Start Date' not in data.columns:
-        st.info(f"'{sheet_name}' contains a Dates column but is not parsed (using as text).")
-
-    return data.copy()
-
-# Custom loader just for Services
-@st.cache_data(show_spinner=False)
-def load_uploaded_services(file_path, sheet_name):
-
-    data = pd.read_excel(file_path, sheet_name)
-
-    # 🧹 Clean headers (remove hidden spaces or encodings)
-    data.columns = data.columns.str.strip().str.replace('\u00a0', ' ', regex=False)
-
-    # --- Special handling for text-based "Dates" column ---
-    if 'Dates' in data.columns:
-        # Normalize text and split cleanly
-        data['Dates'] = data['Dates'].astype(str).str.strip()
-        data['Dates'] = data['Dates'].str.replace(r'\s*/\s*', ' / ', regex=True)
-
-        # Split into Start / End date parts
-        date_split = data['Dates'].str.split(' / ', expand=True)
-        date_split = date_split.reindex(columns=[0, 1]).fillna('')
-
-        # Convert to datetime safely
-        data['Start Date'] = pd.to_datetime(
-            date_split[0].str.strip(), errors='coerce', format='%Y-%m-%d'
-        )
-        data['End Date'] = pd.to_datetime(
-            date_split[1].str.strip(), errors='coerce', format='%Y-%m-%d'
-        )
-
-        # 🧩 If End Date missing, fill with Start Date
-        missing_end_mask = data['End Date'].isna() & data['Start Date'].notna()
-        data.loc[missing_end_mask, 'End Date'] = data.loc[missing_end_mask, 'Start Date']
-
-        # Derive years
-        data['Start Year'] = data['Start Date'].dt.year
-        data['End Year'] = data['End Date'].dt.year
-
-        invalid_starts = data[data['Start Date'].isna()]
-        invalid_ends = data[data['End Date'].isna()]
-
-        if not invalid_starts.empty or not invalid_ends.empty:
-            st.warning(
-                f"⚠️ Some invalid dates in {sheet_name}: "
-                f"{len(invalid_starts)} start, {len(invalid_ends)} end"
-            )
-    else:
-        # Fallback in case column missing
-        st.warning("📄 'Dates' column not found in Sheet1. Creating empty date fields.")
-        data['Start Date'] = pd.NaT
-        data['End Date'] = pd.NaT
-        data['Start Year'] = np.nan
-        data['End Year'] = np.nan
-
-    return data.copy()
+# Dijeljeni frameovi (cache_resource): jedan primjerak za sve sesije, bez pickle kopije pri
+# svakom čitanju kao kod cache_data; sesije ga ne mijenjaju nego rade na session_view pogledu.
+@st.cache_resource(show_spinner=False)
+def get_loaded_datasets():
+    """Zadnja učitana verzija svakog skupa podataka: naziv → (verzija, verzija pravila korisnika, frame), uz lock."""
+    return {}, threading.Lock()
 
-# Geocode addresses to get latitude and longitude
-def geocode_addresses(data, file_path):
-    geolocator = Nominatim(user_agent="edih_geocoder")
+@st.cache_resource(show_spinner=False)
+def get_customer_index():
+    return CustomerIndex()
 
-    # Check if Latitude and Longitude exist and are populated
-    if 'latitude' not in data.columns or 'longitude' not in data.columns:
-        data['latitude'] = None
-        data['longitude'] = None
+def load_datasets(paths):
+    """Pogledi sesije na najnovije exporte; promijenjeni se parsiraju paralelno (ingest.read_datasets).
 
-    for index, row in data.iterrows():
-        if pd.isna(row['latitude']) or pd.isna(row['longitude']):
-            try:
-                location = geolocator.geocode(row['Location'], timeout=10) # Address field
-                if location:
-                    data.at[index, 'latitude'] = location.latitude
-                    data.at[index, 'longitude'] = location.longitude
-            except GeocoderTimedOut:
-                time.sleep(1)  # To avoid overloading the geocoding service
-
-    # Save the updated data back to the file
-    data.to_excel(file_path, index=False)
-    return data
+    Skupovi s korisnicima dobivaju 'Customer key' (identity.py); promjena ručnih pravila ponovno
+    dodjeljuje ključeve bez ponovnog čitanja Excela.
+    """
+    loaded, lock = get_loaded_datasets()
+    customers = get_customer_index()
+    customers_version = customers.version()
+    versions = {name: file_version(path) for name, path in paths.items()}
+    with lock:
+        stale = {name: path for name, path in paths.items()
+                 if path and loaded.get(name, (None, None, None))[0] != versions[name]}
+        if stale:
+            perf.miss("load:workbooks")
+            for name, frame in read_datasets(stale).items():
+                loaded[name] = (versions[name], None, frame)
+                # Snapshot iz upravo parsiranog framea - sync_snapshots ga zatim nađe po sadržaju
+                try:
+                    get_snapshot_store().ingest(name, stale[name], frame)
+                except OSError as e:
+                    st.warning(f"⚠️ Snapshot {name} nije spremljen ({e})")
+        for name, path in paths.items():
+            if path and loaded[name][1] != customers_version:
+                with span("load:customer-keys"):
+                    loaded[name] = (versions[name], customers_version,
+                                    with_customer_keys(loaded[name][2], name, customers))
+    frames = {name: session_view(loaded[name][2]) if path else pd.DataFrame() for name, path in paths.items()}
+    for name, frame in frames.items():
+        metrics.telemetry.set("edih_loader_rows", len(frame), loader=f"load:{name}")
+    return frames
+
+# --- Kvaliteta podataka (quality.py): pravila se provjeravaju jednom po verziji skupa podataka ---
+@st.cache_resource(show_spinner=False, max_entries=16)
+def get_dataset_quality(_df, version, dataset):
+    perf.miss("quality:dataset")
+    with span("quality:dataset"):
+        report = validate(_df, dataset)
+    for rule, count in zip(report["rule"], report["count"]):
+        metrics.telemetry.set("edih_data_quality_rows", count, dataset=dataset, rule=rule)
+    return report
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_quality_report(_frames, versions):
+    """Izvještaj svih skupova podataka s pravilima; ključ su njihove verzije."""
+    versions = dict(versions)
+    return pd.concat([get_dataset_quality(_frames[name], versions[name], name) for name in QUALITY_RULES],
+                     ignore_index=True)
+
+@st.dialog("🩺 Data quality", width="large")
+def show_quality_report(report, frames):
+    st.dataframe(report.drop(columns="rows"), hide_index=True, use_container_width=True)
+    failed = report[report["count"] > 0]
+    if failed.empty:
+        return
+    labels = [f"{row.dataset} · {row.rule} ({row.count})" for row in failed.itertuples()]
+    selected = st.selectbox("Rows:", range(len(labels)), format_func=labels.__getitem__, key="quality_rule")
+    row = failed.iloc[selected]
+    show_table(offending_rows(frames[row["dataset"]], row["rows"]), f"quality_{row['dataset']}_{row['rule']}")
+
+# --- Knjiga potrošnje OpenAI poziva (ai_ledger.py): tokeni, cijena, budžeti, cache sažetaka ---
+SUMMARY_MODEL = "gpt-4o-mini"  # Or "deepseek-chat" Or "gpt-3.5-turbo"
+
+@st.cache_resource(show_spinner=False)
+def get_ai_ledger():
+    return AiLedger()
+
+def current_user():
+    """Korisnik za budžet: e-mail iz st.user ako je prijava konfigurirana, inače sesija."""
+    return st.user.get("email") or f"session:{st.session_state.get('perf_session')}"
+
+def budget_message(error):
+    """Poruka za potrošen budžet; uz EDIH_AI_BUDGET_ACTION=queue dokument ide u red za kasnije."""
+    ledger = get_ai_ledger()
+    if ledger.action == "queue":
+        ledger.defer(str(error))
+        return f"⏳ AI budget: {error}. The report is queued and will be summarized when the budget allows."
+    return f"⛔ AI budget: {error}."
 
 #Function to summarize text using AI (latest API syntax for openai>=1.0.0 od DeepSeek)
 def summarize_text(text, max_tokens=1500):
+    ledger = get_ai_ledger()
+    doc_hash = current_context().get("doc_hash") or document_hash(text)
+    cached = ledger.cached_summary(doc_hash, SUMMARY_MODEL)
+    if cached:
+        return cached
     try:
-        response = client.chat.completions.create(
-            model= "gpt-4o-mini",  # Or "deepseek-chat" Or "gpt-3.5-turbo"
-            messages=[
-                {"role": "system", "content": "You are an AI assistant that summarizes long reports into key insights."},
-                {"role": "user", "content": f"Summarize this report:\n{text}"}
-            ],
-            stream=False,
-            max_tokens=max_tokens,
-            temperature=0.3
-        )
+        ledger.check()
+        with span("ai:summary", model=SUMMARY_MODEL, chars=len(text)):
+            start = time.perf_counter()
+            try:
+                response = client.chat.completions.create(
+                    model=SUMMARY_MODEL,
+                    messages=[
+                        {"role": "system", "content": "You are an AI assistant that summarizes long reports into key insights."},
+                        {"role": "user", "content": f"Summarize this report:\n{text}"}
+                    ],
+                    stream=False,
+                    max_tokens=max_tokens,
+                    temperature=0.3
+                )
+            except Exception as e:
+                status = "rate_limited" if is_rate_limit(e) else "error"
+                metrics.record_openai("summary", time.perf_counter() - start, status)
+                ledger.record("summary", SUMMARY_MODEL, latency_ms=(time.perf_counter() - start) * 1000, status=status)
+                raise
+            metrics.record_openai("summary", time.perf_counter() - start, "ok", response)
+            ledger.record("summary", SUMMARY_MODEL, response, latency_ms=(time.perf_counter() - start) * 1000)
         # Extract the summary from the response
-        return response.choices[0].message.content.strip()
+        summary = response.choices[0].message.content.strip()
+        ledger.store_summary(doc_hash, SUMMARY_MODEL, summary)
+        return summary
+    except BudgetExceeded as e:
+        return budget_message(e)
     except Exception as e:
         return f"Error summarizing: {e}"
 
 # PDF OCR and JSON extraction functions
 
-def call_openai_with_retry(payload_func, max_retries=5):
-    """Siguran poziv prema OpenAI API-ju s exponential backoff retry logikom."""
+def is_rate_limit(error):
+    return "rate_limit" in str(error).lower() or "429" in str(error)
+
+def call_openai_with_retry(payload_func, max_retries=5, operation="ocr", model=None, page=None):
+    """Siguran poziv prema OpenAI API-ju s exponential backoff retry logikom.
+
+    Svaki pokušaj ide u metrike, a cijeli poziv (s brojem ponavljanja) jednom u knjigu potrošnje.
+    Prije prvog pokušaja provjerava se budžet (BudgetExceeded ide pozivatelju).
+    """
+    ledger = get_ai_ledger()
+    ledger.check()
     for attempt in range(max_retries):
+        if attempt:
+            metrics.telemetry.inc("edih_openai_retries_total", operation=operation)
+        start = time.perf_counter()
         try:
-            return payload_func()
+            response = payload_func()
         except Exception as e:
-            if "rate_limit" in str(e).lower() or "429" in str(e):
+            status = "rate_limited" if is_rate_limit(e) else "error"
+            metrics.record_openai(operation, time.perf_counter() - start, status)
+            if is_rate_limit(e):
                 wait = (2 ** attempt) + random.uniform(0, 1)
                 st.warning(f"⚠️ Rate limit reached. Retrying in {wait:.1f}s...")
                 time.sleep(wait)
                 continue
             else:
                 # Ako je neki drugi error — odmah prekid
+                ledger.record(operation, model, latency_ms=(time.perf_counter() - start) * 1000,
+                              retries=attempt, status=status, page=page)
                 st.error(f"❌ OpenAI error: {e}")
                 return None
+        metrics.record_openai(operation, time.perf_counter() - start, "ok", response)
+        ledger.record(operation, model, response, latency_ms=(time.perf_counter() - start) * 1000, retries=attempt, page=page)
+        return response
+    ledger.record(operation, model, retries=max_retries - 1, status="rate_limited", page=page)
     st.error("❌ Max retries reached while calling OpenAI API.")
     return None
 
@@ -353,6 +409,7 @@ def extract_text_intelligent(pdf_path, use_ocr_model="gpt-4o-mini", dpi=96, dela
         if text.strip():
             # ✅ Stranica ima tekstualni sloj
             full_text += text + "\n"
+            metrics.telemetry.inc("edih_ocr_pages_total", mode="text")
         else:
             # ⚙️ OCR fallback
             st.info(f"OCR: prepoznajem stranicu {page_index + 1}/{len(doc)} ({pdf_path.split('/')[-1]})")
@@ -360,27 +417,30 @@ def extract_text_intelligent(pdf_path, use_ocr_model="gpt-4o-mini", dpi=96, dela
             img_bytes = io.BytesIO(pix.tobytes("png"))
             base64_img = base64.b64encode(img_bytes.getvalue()).decode("utf-8")
 
-            response = call_openai_with_retry(lambda: client.chat.completions.create(
-                model=use_ocr_model,
-                messages=[
-                    {"role": "system",
-                     "content": "You are an OCR assistant that extracts text from document images accurately."},
-                    {"role": "user",
-                     "content": [
-                         {"type": "text", "text": "Extract readable text from this page:"},
-                         {"type": "image_url",
-                          "image_url": {"url": f"data:image/png;base64,{base64_img}", "detail": "high"}}
-                     ]}
-                ],
-                temperature=0.0,
-                max_tokens=1000,
-            ))
+            with span("ai:ocr_page", model=use_ocr_model, pdf=os.path.basename(pdf_path), page=page_index + 1):
+                response = call_openai_with_retry(lambda: client.chat.completions.create(
+                    model=use_ocr_model,
+                    messages=[
+                        {"role": "system",
+                         "content": "You are an OCR assistant that extracts text from document images accurately."},
+                        {"role": "user",
+                         "content": [
+                             {"type": "text", "text": "Extract readable text from this page:"},
+                             {"type": "image_url",
+                              "image_url": {"url": f"data:image/png;base64,{base64_img}", "detail": "high"}}
+                         ]}
+                    ],
+                    temperature=0.0,
+                    max_tokens=1000,
+                ), model=use_ocr_model, page=page_index + 1)
 
             if response:
                 extracted = response.choices[0].message.content.strip()
                 full_text += f"\n[OCR Page {page_index + 1}]\n" + extracted + "\n"
+                metrics.telemetry.inc("edih_ocr_pages_total", mode="ocr")
             else:
                 st.error(f"⚠️ OCR failed for page {page_index + 1} in {pdf_path}")
+                metrics.telemetry.inc("edih_ocr_pages_total", mode="failed")
             
             # Lag između poziva da se izbjegne rate limit
             time.sleep(delay_between_pages)
@@ -388,6 +448,33 @@ def extract_text_intelligent(pdf_path, use_ocr_model="gpt-4o-mini", dpi=96, dela
     return full_text.strip()
 
 
+def document_text(path):
+    """Tekst dokumenta za sažetak: JSON ekstrakcija ili PDF (tekstualni sloj / OCR)."""
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.dumps(json.load(f))
+    return extract_text_intelligent(path)
+
+
+def summarize_document(path, organization=None, min_chars=0, user=None):
+    """Sažetak dokumenta preko knjige potrošnje: iz cachea sažetaka ili OCR + sažetak unutar budžeta.
+
+    Vraća None ako dokument ima manje od min_chars teksta.
+    """
+    doc_hash = document_hash(path)
+    with ai_context(document=path, doc_hash=doc_hash, organization=organization, user=user or current_user()):
+        cached = get_ai_ledger().cached_summary(doc_hash, SUMMARY_MODEL)
+        if cached:
+            return cached
+        try:
+            text = document_text(path)
+        except BudgetExceeded as e:
+            return budget_message(e)
+        if len(text.strip()) < min_chars:
+            return None
+        return summarize_text(text)
+
+
 def get_summary(organization_name):
     """Vraća sažetak iz JSON-a ili automatski pokreće OCR (s cachingom)."""
     json_file_path = os.path.join(json_folder, f"DMA T0 {organization_name}_extracted.json")
@@ -395,28 +482,17 @@ def get_summary(organization_name):
 
     # Ako JSON već postoji
     if os.path.exists(json_file_path):
-        with open(json_file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return summarize_text(json.dumps(data))
+        return summarize_document(json_file_path, organization_name)
 
     # Ako nema JSON-a, ali postoji PDF — napravi OCR
     elif os.path.exists(pdf_file_path):
         with st.spinner(f"⚙️ Pokrećem OCR i sumiranje teksta za {organization_name}..."):
-            text = extract_text_intelligent(pdf_file_path)
-        return summarize_text(text)
+            return summarize_document(pdf_file_path, organization_name)
 
     else:
         return f"❌ Nema dostupnog PDF-a ni JSON-a za {organization_name}."
 
 
-def safe_df(df):
-    """Ensure dataframe is fully Arrow- and Streamlit-safe."""
-    df = df.copy().reset_index(drop=True)
-    df = df.replace({np.nan: None})
-    for col in df.select_dtypes(include=["object"]).columns:
-        df[col] = df[col].astype(str)
-    return df
-
 def find_best_folder_match(org_name, base_folder):
     """Pronađi najbolje poklapanje foldera za organizaciju."""
     org_clean = org_name.strip().rstrip('.').lower()
@@ -445,41 +521,214 @@ def find_best_folder_match(org_name, base_folder):
 
 # --- Helper funkcija za pronalazak najnovije datoteke po prefiksu ---
 def get_latest_file(folder, prefix, extension="xlsx"):
-    pattern = os.path.join(folder, f"{prefix}*.{extension}")
-    files = glob.glob(pattern)
-    if not files:
+    latest = latest_file(folder, prefix, extension)
+    if not latest:
         st.warning(f"Nije pronađena datoteka za prefiks: {prefix}")
         return None
-    latest_file = max(files, key=os.path.getmtime)
-    # st.info(f"📄 Učitavam najnoviju datoteku: `{os.path.basename(latest_file)}`")
-    return latest_file
+    # st.info(f"📄 Učitavam najnoviju datoteku: `{os.path.basename(latest)}`")
+    return latest
+
+# --- DMA progresija (sve organizacije odjednom), cache po verziji skupa podataka ---
+@st.cache_data(show_spinner=False)
+def get_dma_progression(_df, version, org_column):
+    """Pivot DMA rezultata u (organizacija × faza × dimenzija); _df se ne hashira, ključ je verzija."""
+    return build_progression(_df, org_column)
+
+# --- ESG rezultati kao zasebna izvedena tablica (DMA frameovi iz cachea se ne mijenjaju) ---
+@st.cache_data(show_spinner=False)
+def get_esg_scores(_df, version, dataset):
+    """ESG stupovi po organizaciji i DMA fazi; ključ cachea je verzija DMA skupa podataka."""
+    return compute_esg_scores(_df, dataset)
+
+# --- Skupovi podataka izrezani na izvještajno razdoblje, dijeljeni među sesijama ---
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_period_frames(_frames, versions, start, end):
+    return slice_frames(_frames, dict(versions), start, end, store=get_snapshot_store(), index_for=get_date_index,
+                        customer_index=get_customer_index())
+
+# --- Indeks po datumu za brzo rezanje izvještajnih razdoblja ---
+@st.cache_resource(show_spinner=False)
+def get_date_index(_df, version, date_column):
+    """Pozicije redaka sortirane po datumu (searchsorted); dijeli se između sesija, samo za čitanje."""
+    return DateIndex(_df[date_column])
+
+# --- Izvedene kolone Services exporta (zaseban frame, dijeljeni frame se ne mijenja) ---
+@st.cache_resource(show_spinner=False, max_entries=16)
+def get_service_enrichment(_df, version):
+    with span("enrich:services"):
+        return enrich_services(_df)
+
+# --- Agregati stranice Service Overview (dijeli ih i API) ---
+@st.cache_data(show_spinner=False)
+def get_service_overview(_df, version):
+    return service_overview(_df, get_service_enrichment(_df, version))
+
+# --- Put korisnika DMA → Bootcamp → TBI → DAP/FCO → DMA T1/T2 (journey.py), jednom po verzijama ---
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_journey(_frames, versions, stages):
+    """Put nad neizrezanim skupovima; segment, regija i razdoblje filtriraju se maskom (Journey.mask)."""
+    perf.miss("journey:build")
+    with span("journey:build"):
+        return build_journey(_frames, get_service_enrichment(_frames["services"], dict(versions)["services"]), stages)
+
+# --- KPI engine: svi KPI-jevi u jednom prolazu, cache po verzijama skupova podataka i razdoblju ---
+@st.cache_data(show_spinner=False)
+def get_kpi_results(_frames, versions, period):
+    return evaluate_kpis(_frames, load_definitions(), period)
+
+# --- Cache Plotly grafova (dijeli se među sesijama), ključ: stranica, graf, verzija podataka, filteri ---
+@st.cache_resource(show_spinner=False)
+def get_figure_cache():
+    return FigureCache()
+
+# --- Prometheus /metrics (metrics.py): pozadinski server, jednom po procesu ---
+@st.cache_resource(show_spinner=False)
+def get_metrics_server():
+    metrics.telemetry.add_collector(metrics.figure_cache_collector(get_figure_cache()))
+    return metrics.start_server()
+
+get_metrics_server()
+
+PLOTLY_CONFIG = {'displayModeBar': True, 'displaylogo': False}
+
+def show_chart(chart_id, version, build, filters=None, **kwargs):
+    """st.plotly_chart preko cachea grafova; build() se poziva samo kad graf nije u cacheu."""
+    if st.session_state.get("warmup_skip_figures"):
+        return  # warmup.py: faze bez grafova pune samo podatke i agregate
+    name = f"figure:{chart_id}"
+
+    def timed_build():
+        perf.miss(name)
+        with span(f"build:{chart_id}", page=analysis_type):
+            return build()
+
+    with span(name, page=analysis_type):
+        fig = get_figure_cache().figure(figure_key(analysis_type, chart_id, version, filters), timed_build)
+        st.plotly_chart(fig, config=PLOTLY_CONFIG, **kwargs)
+
+def show_heatmap(chart_id, version, frame, label_column, value_columns, group_columns, title, colorscale="viridis"):
+    """Heatmap s agregiranim trakama po grupi; pojedinačni redovi na zahtjev, samo vidljivi prozor."""
+    controls = st.columns(3)
+    group_column = controls[0].selectbox("Group rows by:", group_columns, key=f"{chart_id}_group")
+    groups = sorted(frame[group_column].dropna().unique().tolist())
+    drill = controls[1].selectbox("Show:", ["All groups (average)"] + [str(g) for g in groups], key=f"{chart_id}_drill")
+
+    if drill == "All groups (average)":
+        matrix = band_matrix(frame, group_column, value_columns)
+        filters = {"group": group_column}
+        chart_title = f"{title} – average by {group_column}"
+    else:
+        sort_by = controls[2].selectbox("Sort by:", ["Total"] + list(value_columns), key=f"{chart_id}_sort")
+        rows = sorted_rows(frame[frame[group_column].astype(str) == drill], label_column, value_columns,
+                           None if sort_by == "Total" else sort_by)
+        starts = window_starts(len(rows))
+        start = st.select_slider(
+            "Rows:", starts, key=f"{chart_id}_window",
+            format_func=lambda i: f"{i + 1}–{min(i + MAX_HEATMAP_ROWS, len(rows))} / {len(rows)}"
+        ) if len(starts) > 1 else 0
+        matrix = window(rows, start)
+        filters = {"group": group_column, "drill": drill, "sort": sort_by, "start": start}
+        chart_title = f"{title} – {drill}"
+
+    show_chart(chart_id, version, lambda: matrix_heatmap(matrix, chart_title, colorscale), filters=filters)
+    return matrix
+
+def show_table(df, key, page_size=PAGE_SIZE):
+    """Tablica kroz st.dataframe (Arrow); filtar, sortiranje i paginacija na serveru - šalje se samo vidljiva stranica."""
+    if len(df) <= page_size:
+        st.dataframe(arrow_safe(df), hide_index=True, use_container_width=True)
+        return
+
+    controls = st.columns([3, 2, 1, 1])
+    query = controls[0].text_input("Filter", key=f"{key}_query", placeholder="🔍 Filter…", label_visibility="collapsed")
+    sort_by = controls[1].selectbox("Sort by", ["—"] + [str(c) for c in df.columns], key=f"{key}_sort", label_visibility="collapsed")
+    ascending = controls[2].toggle("↑", value=True, key=f"{key}_ascending")
+    positions = row_positions(df, query, None if sort_by == "—" else sort_by, ascending)
+    page = controls[3].number_input("Page", min_value=1, max_value=page_count(len(positions), page_size),
+                                    key=f"{key}_page", label_visibility="collapsed")
+
+    st.dataframe(page_view(df, positions, page, page_size), hide_index=True, use_container_width=True)
+    st.caption(f"{len(positions)} / {len(df)} rows · page {page} / {page_count(len(positions), page_size)}")
+
+# --- Geokodiranje: cache adresa (SQLite) + pozadinska dretva, izvorni Excel se ne mijenja ---
+@st.cache_resource(show_spinner=False)
+def get_geocoding():
+    cache = GeocodeCache()
+    geocoder = make_geocoder()
+    return cache, (GeocodeWorker(cache, geocoder) if geocoder else None)
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def get_coordinates(_df, version, geo_version):
+    """Koordinate kao zaseban frame (isti indeks); adrese bez koordinata idu u red za geokodiranje."""
+    lat_column, lon_column = coordinate_columns(_df)
+    column = address_column(_df)
+    if column is None:
+        if lat_column in _df.columns and lon_column in _df.columns:
+            return _df[[lat_column, lon_column]]
+        return None
+    cache, worker = get_geocoding()
+    if worker is not None:
+        worker.submit(missing_addresses(_df, column, lat_column, lon_column))
+    coords = attach_coordinates(_df[[col for col in (column, lat_column, lon_column) if col in _df.columns]],
+                                cache, column, lat_column, lon_column)[[lat_column, lon_column]]
+    # Do rezultata geokodera: središte naselja iz offline gazetteera
+    places = load_gazetteer().resolve(_df[column])
+    return coords.fillna({lat_column: places["lat"], lon_column: places["lon"]})
+
+# --- Rangovi EU EDIH-ova: cache po verziji EU liste i težinama ---
+@st.cache_data(show_spinner=False)
+def get_edih_rankings(_df, version, weights):
+    return rank_edihs(_df, dict(weights))
 
-# --- Cache: učitaj Excel samo jednom ---
 @st.cache_data(show_spinner=False)
-def load_excel_file(path, sheet_name=None):
-    """Učitaj Excel datoteku i očisti nazive kolona."""
-    if not path:
-        return pd.DataFrame()
-
-    # 1️⃣ Učitaj Excel datoteku
-    df = pd.read_excel(path, sheet_name=sheet_name)
-
-    # Ako read_excel vrati dict (više sheetova)
-    if isinstance(df, dict):
-        first_sheet = list(df.keys())[0]
-        # st.warning(f"⚠️ Datoteka {os.path.basename(path)} ima više listova — koristi se '{first_sheet}'")
-        df = df[first_sheet]
-
-    # 2️⃣ Očisti nazive kolona
-    df.columns = (
-        df.columns.astype(str)
-        .str.replace('"', '')
-        .str.replace("'", "")
-        .str.replace(r'\s+', ' ', regex=True)
-        .str.strip()
+def get_country_rankings(_rankings, version):
+    return country_rankings(_rankings)
+
+@st.cache_resource(show_spinner=False)
+def get_edih_index(_coords, version):
+    return GridIndex(_coords["Latitude"], _coords["Longitude"], cell_deg=1.0)
+
+# --- Karte: grupiranje u heksagone na serveru, cache po verziji skupa podataka i razini zuma ---
+@st.cache_data(show_spinner=False)
+def get_user_map_bins(_df, _coords, version, zoom):
+    # _coords su za cijeli export (geokodiranje po verziji), _df je izrezan na razdoblje
+    return user_map_bins(_df, _coords, ZOOM_LEVELS[zoom])
+
+@st.cache_data(show_spinner=False)
+def get_edih_map_data(_df, _coords, version, level):
+    _df = _df.assign(Latitude=_coords["Latitude"], Longitude=_coords["Longitude"])
+    if level == "EDIHs":
+        points = compact_points(_df, ["EDIH Name", "Country", "Latitude", "Longitude", *RANKING_COLUMNS], "Latitude", "Longitude")
+        # Minimalni radijus za točke s EDUC = 0
+        return points.assign(Radius=(pd.to_numeric(points["EDUC"], errors="coerce").fillna(0) * 50).clip(lower=1000))
+    return hex_bins(
+        _df["Latitude"], _df["Longitude"], ZOOM_LEVELS[level],
+        means={col: pd.to_numeric(_df[col], errors="coerce") for col in RANKING_COLUMNS},
     )
 
-    return df
+# --- Povijesni snapshotovi svih exporta (ne samo najnovijeg) ---
+@st.cache_resource(show_spinner=False)
+def get_snapshot_store():
+    return SnapshotStore(snapshot_folder)
+
+@st.cache_data(show_spinner=False)
+def sync_snapshots(folder_versions):
+    """Ingestira nove exporte u snapshot store; ključ cachea su verzije datoteka u data_folderu.
+
+    Najnovije exporte već je spremio load_datasets iz parsiranih frameova, pa se ovdje čitaju samo stariji.
+    """
+    try:
+        return get_snapshot_store().ingest_folder(data_folder)
+    except OSError as e:
+        st.warning(f"⚠️ Snapshotovi nisu ažurirani ({e})")
+        return 0
+
+def data_folder_versions():
+    return tuple(
+        file_version(path)
+        for prefix, _ in DATASETS.values()
+        for path in find_files(data_folder, prefix)
+    )
 
 # PDF & JSON folder location
 pdf_folder = app_folder + "/DMA/SME"
@@ -487,40 +736,74 @@ json_folder = app_folder + "/DMA/SME/JSON"
 
 # --- Automatsko učitavanje najnovijih datoteka iz data_foldera ---
 
-# 1️⃣ EDIH Services (posebna funkcija koja dodaje dodatne kolone)
-file_services = get_latest_file(data_folder, "EDIH_uploaded_services_")
-if file_services:
-    data = load_uploaded_services(file_services, "Sheet1")
-    # st.success("✅ EDIH Services učitani s dodatnim kolumnama (Start/End Year, trajanje, datumi, itd.)")
-else:
-    data = pd.DataFrame()
+# Najnoviji export po prefiksu (Evidencija zahtjeva daje dva skupa podataka iz iste datoteke)
+latest_exports = {prefix: get_latest_file(data_folder, prefix) for prefix in dict.fromkeys(p for p, _ in DATASETS.values())}
+dataset_paths = {name: latest_exports[prefix] for name, (prefix, _) in DATASETS.items()}
+file_services = dataset_paths["services"]
+file_SME, file_PSO = dataset_paths["sme"], dataset_paths["pso"]
+file_SME_Ana, file_PSO_Ana = dataset_paths["sme_dma"], dataset_paths["pso_dma"]
+file_zahtjevi = dataset_paths["zahtjevi_ps"]
+file_edih_list = dataset_paths["edih_list"]
+
+# Svi workbookovi/sheetovi odjednom: jedan proces po sheetu, nepromijenjeni ostaju u cacheu
+with span("load:workbooks"):
+    loaded_frames = load_datasets(dataset_paths)
+
+# 1️⃣ EDIH Services (s izvedenim datumskim kolonama: Start/End Date i Year)
+data = loaded_frames["services"]
+if not file_services:
     st.warning("⚠️ EDIH Services datoteka nije pronađena.")
 
 # 2️⃣ SME i PSO - Reporting
-file_SME = get_latest_file(data_folder, "export-sme-")
-data_sme = load_excel_file(file_SME, sheet_name="Reporting of EDIH services del")
-
-file_PSO = get_latest_file(data_folder, "export-pso-")
-data_pso = load_excel_file(file_PSO, sheet_name="Reporting of EDIH services del")
+data_sme, data_pso = loaded_frames["sme"], loaded_frames["pso"]
 
 # 3️⃣ DMA rezultati
-file_SME_Ana = get_latest_file(data_folder, "my-smes-dma-results-")
-data_smea = load_excel_file(file_SME_Ana, sheet_name="My SMEs DMA Results")
-
-file_PSO_Ana = get_latest_file(data_folder, "my-psos-dma-results-")
-data_psoa = load_excel_file(file_PSO_Ana, sheet_name="My PSOs DMA Results")
+data_smea, data_psoa = loaded_frames["sme_dma"], loaded_frames["pso_dma"]
 
 # 4️⃣ Evidencija zahtjeva
-file_zahtjevi = get_latest_file(data_folder, "evidencija-zahtjeva-")
-ps_data = load_excel_file(file_zahtjevi, sheet_name="Korisnici - javni sektor")
-sme_data = load_excel_file(file_zahtjevi, sheet_name="Skupni podaci Zahtjeva-poduzeća")
+ps_data, sme_data = loaded_frames["zahtjevi_ps"], loaded_frames["zahtjevi_sme"]
 
 # 5️⃣ EDIH EU lista
-file_edih_list = get_latest_file(data_folder, "updated_edih_list_with_columns_")
-edih_data = load_excel_file(file_edih_list)
+edih_data = loaded_frames["edih_list"]
+
+# Verzije skupova podataka - ključ za sve izvedene cacheove
+dataset_versions = {
+    "services": file_version(file_services),
+    "sme": file_version(file_SME),
+    "pso": file_version(file_PSO),
+    "sme_dma": file_version(file_SME_Ana),
+    "pso_dma": file_version(file_PSO_Ana),
+    "zahtjevi_ps": file_version(file_zahtjevi),
+    "zahtjevi_sme": file_version(file_zahtjevi),
+    "edih_list": file_version(file_edih_list),
+}
+# Ručna pravila korisnika mijenjaju 'Customer key', pa su dio verzije skupova s korisnicima
+customers_version = get_customer_index().version()
+dataset_versions.update({name: f"{dataset_versions[name]}:{customers_version}" for name in CUSTOMER_NAME_COLUMNS})
+
+# Kvaliteta podataka: izvještaj se računa samo kad se promijeni verzija exporta
+quality_report = get_quality_report(loaded_frames, tuple((name, dataset_versions[name]) for name in QUALITY_RULES))
+if file_services:
+    date_checks = quality_report[quality_report["rule"].isin(["invalid_start_date", "invalid_end_date"])
+                                 & quality_report["dataset"].eq("services")]
+    if date_checks["status"].str.startswith("column missing").any():
+        st.warning("📄 'Dates' column not found in Sheet1. Creating empty date fields.")
+    elif date_checks["count"].any():
+        invalid_starts, invalid_ends = date_checks["count"]
+        st.warning(
+            "⚠️ Some invalid dates in Sheet1: "
+            f"{invalid_starts} start, {invalid_ends} end"
+        )
 
-# Geocode if needed
-# edih_data = geocode_addresses(edih_data, file_edih_list)
+# 6️⃣ Snapshotovi svih exporta u Data/ (time-travel upiti bez ponovnog čitanja Excela)
+sync_snapshots(data_folder_versions())
+snapshot_store = get_snapshot_store()
+
+# 7️⃣ Koordinate: iz exporta ili cachea adresa; nove adrese geokodira pozadinska dretva
+geocode_cache, geocode_worker = get_geocoding()
+geo_version = geocode_cache.version()
+services_coords = get_coordinates(data, dataset_versions["services"], geo_version)
+edih_coords = get_coordinates(edih_data, dataset_versions["edih_list"], geo_version)
 
 # Main Title
 # st.title("EDIH Services Analysis Dashboard")
@@ -545,27 +828,59 @@ st.logo(slike_folder + "/SyntAgent-lila.png",size="large", link="https://syntage
 st.sidebar.image(slike_folder + "/Edih Adria znak+logotip.jpg", width=300)
 st.sidebar.title("Analysis Options")
 
-# Add toggle for general filter on specific date
-apply_reporting_filter = st.sidebar.checkbox("Midterm Date Filter (30.09.2024)", value=False)
-
-if apply_reporting_filter:
-    reporting_date = pd.to_datetime("2024-09-30")
-    data = data[data['Start Date'] <= reporting_date]
-
-analysis_type = st.sidebar.selectbox(
-        "Select Analysis Type:",
-        [
-            "EDIH ADRIA Service Overview",
-            "EU EDIH Comparison",
-            "DMA - Summary",
-            "Bootcamp - Summary",
-            "TBI - Summary",
-            "DAP&FCO - Summary",             
-            "Education - Summary",
-            "State Aid - Summary",
-            "ESG - Summary",
-        ]
+# Izvještajno razdoblje (imenovano ili proizvoljno) - primjenjuje se na sve skupove podataka
+reporting_period = st.sidebar.selectbox("Reporting period:", list(REPORTING_PERIODS) + ["Custom range"], key="reporting_period")
+
+custom_range = None
+if reporting_period == "Custom range":
+    picked_range = st.sidebar.date_input(
+        "Start / end date:",
+        value=(pd.Timestamp("2023-01-01"), pd.Timestamp.today()),
+        format="DD.MM.YYYY"
     )
+    custom_range = (picked_range[0] if len(picked_range) > 0 else None,
+                    picked_range[1] if len(picked_range) > 1 else None)
+
+period_start, period_end = period_bounds(reporting_period, custom_range)
+
+# Verzije cijelih exporta (put korisnika gradi se nad njima, razdoblje je filter)
+journey_versions = tuple((name, dataset_versions[name]) for name in ("services", "sme_dma", "pso_dma"))
+
+period_frames, dataset_versions, unfiltered_datasets = get_period_frames(
+    {
+        "services": data,
+        "sme_dma": data_smea,
+        "pso_dma": data_psoa,
+        "zahtjevi_ps": ps_data,
+        "zahtjevi_sme": sme_data,
+    },
+    tuple(sorted(dataset_versions.items())), period_start, period_end
+)
+period_frames = {name: session_view(frame) for name, frame in period_frames.items()}
+dataset_versions = dict(dataset_versions)
+if unfiltered_datasets:
+    # Skupovi bez kolone s datumom (reporting.DATE_COLUMNS) prikazuju se u cijelosti
+    st.sidebar.info("ℹ️ Not filtered by period (no date column): " + ", ".join(unfiltered_datasets))
+
+data = period_frames["services"]
+data_smea = period_frames["sme_dma"]
+data_psoa = period_frames["pso_dma"]
+ps_data = period_frames["zahtjevi_ps"]
+sme_data = period_frames["zahtjevi_sme"]
+
+analysis_type = st.sidebar.selectbox("Select Analysis Type:", list(ANALYSIS_PAGES), key="analysis_type")
+
+# Kolone koje stranica deklarira (projection.py): jasna poruka umjesto KeyErrora usred stranice
+missing_columns = missing_for_page({**period_frames, "edih_list": edih_data}, analysis_type)
+if missing_columns:
+    st.error("⚠️ Exportima nedostaju kolone potrebne za ovu stranicu:\n\n" + "\n".join(
+        f"- **{dataset}**: {', '.join(columns)}" for dataset, columns in missing_columns.items()))
+    st.stop()
+
+quality_issues = issue_count(quality_report)
+if st.sidebar.button(f"🩺 Data quality: {quality_issues} issue(s)" if quality_issues else "🩺 Data quality: OK",
+                     use_container_width=True):
+    show_quality_report(quality_report, loaded_frames)
 
 with st.sidebar.expander("📂 Učitane datoteke"):
     for prefix in ["EDIH_uploaded_services_", "export-sme-", "export-pso-", "my-smes-dma-results-", "my-psos-dma-results-", "evidencija-zahtjeva-", "updated_edih_list_with_columns_"]:
@@ -573,8 +888,14 @@ with st.sidebar.expander("📂 Učitane datoteke"):
         if latest:
             st.markdown(f"**{prefix}** → `{os.path.basename(latest)}`")
 
+    st.markdown("**🕰️ Snapshotovi (razdoblja):**")
+    for name in DATASETS:
+        periods = snapshot_store.periods(name)
+        if periods:
+            st.markdown(f"`{name}`: " + ", ".join(str(p) for p in periods))
+
 
-with col1:
+with col1, span(f"page:{analysis_type}"):
 # Analysis Functions
     if analysis_type == "EDIH ADRIA Service Overview":
     # Karta sa prikazom korisnika   
@@ -588,437 +909,162 @@ with col1:
 
             st.write("The activities conducted so far indicate a systematic approach to supporting digitalization, particularly among SMEs and PIs. The European dimension of this project is evident in its alignment with EU goals for digital transformation and innovation, contributing to the broader agenda of enhancing the digital economy across member states. The project adds value by promoting sustainable growth and resilience within SMEs and PIs, ultimately leading to increased competitiveness in the European market.")
         
-        map_data = data.dropna(subset=['latitude', 'longitude'])
-        map_summary = map_data.groupby(['latitude', 'longitude', 'Customer']).agg(
-            total_revenue=('Service price, €', 'sum')
-        ).reset_index()
-           
-        map_summary = map_summary.rename(columns={'latitude': 'lat', 'longitude': 'lon'})
-        
-        # NWE Map Visualization using PyDeck
+        # NWE Map Visualization using PyDeck (heksagoni se računaju na serveru, po razini zuma)
         st.subheader("EDIH Users on Map")
-        
-        view_state = pdk.ViewState(
-            latitude=map_summary["lat"].mean(),
-            longitude=map_summary["lon"].mean(),
-            zoom=5,
-            pitch=50
-        )
-        
-        layer = pdk.Layer(
-                    "HexagonLayer",
-                    data=map_summary,
-                    get_position="[lon, lat]",
-                    auto_highlight=True,
-                    radius=1000,
-                    elevation_scale=10,
-                    elevation_range=[0, 3000],
-                    pickable=True,
-                    extruded=True,
-                    get_elevation="total_revenue",
-                    
-        )
-        # tooltip = {"html": "<b>Customer:</b> {Customer}<br><b>Total Revenue (€):</b> {total_revenue}"}
-        # tooltip = {"html": "<b>Number of Customers:</b> {num_customers}<br><b>Total Revenue (€):</b> {total_revenue}"}
-          
 
-        edih_map = pdk.Deck(
-            # map_style="mapbox://styles/mapbox/light-v9",
-            map_style=None,
-            initial_view_state=view_state,
-            # tooltip=tooltip,
-            layers=[layer]
-        )
-        
-        st.pydeck_chart(edih_map)
-
-        
-        # Delivered Services by Region
-        regional_summary = data.groupby('Customer  region').agg(
-            total_services=('Content ID', 'count'),
-            total_revenue=('Service price, €', 'sum')
-        ).reset_index().sort_values(by='total_revenue', ascending=False)
-        # st.subheader("Regional Summary")
-        
-        fig = px.bar(
-            regional_summary,
-            x='Customer  region',
-            y='total_services',
-            title='Delivered Services by Region',
-            labels={'total_services': 'Number of Services', 'Customer region': 'Region'},
-            text='total_services'
-        )
-        fig.update_traces(textposition='outside')
-        st.plotly_chart(fig, config={'displayModeBar': True, 'displaylogo': False})
-        with st.expander("Tabular data"):    
-            # st.dataframe(regional_summary, width=True)
-            st.table(regional_summary)
-
-        # Delivered Services by Category      
-        service_summary = data.groupby('Service category delivered').agg(
-            total_services=('Content ID', 'count'),
-            total_revenue=('Service price, €', 'sum')
-        ).reset_index().sort_values(by='total_revenue', ascending=False)
-        # st.subheader("EDIH Adria Service Overview")
-        # st.write(service_summary)
-        fig = px.bar(
-            service_summary,
-            x='Service category delivered',
-            y='total_services',
-            color="total_services",
-            color_continuous_scale=EDIH_CONTINUOUS_SCALE,
-            title='Delivered Services by Category',
-            labels={'total_services': 'Number of Services', 'Service category delivered': 'Category'},
-            text='total_services'
-        )
-        fig.update_traces(textposition='outside')
-        st.plotly_chart(fig, config={'displayModeBar': True, 'displaylogo': False})
-        with st.expander("Tabular data"):    
-            # st.dataframe(safe_df(service_summary), width=True)
-            st.table(service_summary)
-
-       # Technology applied in EDIH ADRIA Services
-        # st.subheader("Applied Technologies")
-        # Ensure relevant columns are numeric
-        numeric_cols = ['Content ID', 'Service price, €', 'Number of attendees']
-
-        for col in numeric_cols:
-            if col in data.columns:
-                data[col] = pd.to_numeric(data[col], errors='coerce')  # Convert and coerce errors to NaN
-
-        technology_summary = data.groupby('Technology type used').agg(
-            total_services=('Content ID', 'count'),
-            total_revenue=('Service price, €', 'sum'),
-            total_attendees=('Number of attendees', 'sum')
-        ).reset_index().sort_values(by='total_revenue', ascending=False)
-
-        # Ako ima puno tehnologija, spoji manje u "Other"
-        max_segments = 7  # koliko najvećih zadržati
-        if len(technology_summary) > max_segments:
-            top = technology_summary.nlargest(max_segments, "total_services")
-            others = technology_summary.iloc[max_segments:]
-            other_row = pd.DataFrame({
-                "Technology type used": ["Other"],
-                "total_services": [others["total_services"].sum()],
-                "total_revenue": [others["total_revenue"].sum()],
-                "total_attendees": [others["total_attendees"].sum()]
-            })
-            technology_summary = pd.concat([top, other_row], ignore_index=True)
-
-        # Skrati nazive tehnologija za prikaz na grafu
-        def shorten_label(label, max_length=25):
-            return label if len(label) <= max_length else label[:max_length] + "…"
-
-        technology_summary["Short Label"] = technology_summary["Technology type used"].apply(shorten_label)
-
-        fig = px.pie(
-            technology_summary,
-            names='Short Label',
-            values='total_services',
-            hover_name="Technology type used",  # puni naziv u tooltipu
-            title='Technologies applied in EDIH ADRIA Services',
-            color_discrete_sequence=px.colors.qualitative.Vivid,
-            hole=0.4
-        )
-
-        fig.update_traces(
-            textinfo="label+percent",
-            textposition="outside",
-            showlegend=False,
-            pull=[0.05]*len(technology_summary),  # malo izvuci segmente radi preglednosti
-        )
-
-        fig.update_layout(
-            uniformtext_minsize=10,
-            uniformtext_mode="hide",
-            margin=dict(t=80, b=60, l=40, r=40),
-            height=600
-        )        
-
-        st.plotly_chart(fig, config={'displayModeBar': True, 'displaylogo': False})
+        if services_coords is not None:
+            map_zoom = st.select_slider("Map detail (zoom):", options=list(ZOOM_LEVELS), value=7, key="users_map_zoom")
+            map_bins = get_user_map_bins(data, services_coords, (dataset_versions["services"], geo_version), map_zoom)
+            hex_radius = ZOOM_LEVELS[map_zoom]
+
+            layer = pdk.Layer(
+                "ColumnLayer",
+                data=map_bins,
+                get_position="[lon, lat]",
+                get_elevation="total_revenue",
+                elevation_scale=20 * hex_radius / max(float(map_bins["total_revenue"].max() or 1), 1.0),
+                radius=hex_radius,
+                disk_resolution=6,
+                get_fill_color="[255, 140, 0, 180]",
+                auto_highlight=True,
+                pickable=True,
+                extruded=True,
+            )
+            edih_map = pdk.Deck(
+                map_style=None,
+                initial_view_state=pdk.ViewState(
+                    latitude=float(map_bins["lat"].mean()) if len(map_bins) else 45.3,
+                    longitude=float(map_bins["lon"].mean()) if len(map_bins) else 14.4,
+                    zoom=map_zoom - 2,
+                    pitch=50
+                ),
+                tooltip={"html": "<b>Customers:</b> {customers}<br><b>Services:</b> {count}<br><b>Total Revenue (€):</b> {total_revenue}"},
+                layers=[layer]
+            )
+            st.pydeck_chart(edih_map)
+        else:
+            st.info("Koordinate korisnika još nisu dostupne.")
 
-        with st.expander("Tabular data"):    
-            # st.dataframe(safe_df(technology_summary), width=True)
-            st.table(technology_summary)
         
-        # Delivered Services by Customer Staff Size
-
-        customer_size_analysis = data.groupby('Customer staff size').agg(
-            total_services=('Content ID', 'count'),
-            total_revenue=('Service price, €', 'sum')
-        ).reset_index().sort_values(by='total_revenue', ascending=False)
-        # st.subheader("Customer Staff Size Summary")
-        # st.write(customer_size_analysis)
-        fig = px.bar(
-            customer_size_analysis,
-            x='Customer staff size',
-            y='total_services',
-            color="total_services",
-            color_continuous_scale=EDIH_CONTINUOUS_SCALE,
-            title='Delivered Services by Customer Staff Size',
-            labels={'total_services': 'Number of Services', 'Customer staff size': 'Staff Size'},
-            text='total_services'
-        )
-        fig.update_traces(textposition='outside')
-        st.plotly_chart(fig, config={'displayModeBar': True, 'displaylogo': False})
-        with st.expander("Tabular data"):    
-            # st.dataframe(safe_df(customer_size_analysis), width=True)
-            st.table(customer_size_analysis)
-
-        # Services Delivered by Year 
-        # st.write(list(data.columns))      
-        yearly_summary = data.groupby('Start Year').agg(
-            total_services=('Content ID', 'count'),
-            total_revenue=('Service price, €', 'sum')
-        ).reset_index().sort_values(by='Start Year', ascending=True) #total_revenue
-
-        # st.subheader("Yearly Analysis")
-        # Pretvori godine u string za pravilno etiketiranje osi
-        yearly_summary["Start Year"] = yearly_summary["Start Year"].round().astype(int).astype(str)
-        
-        # st.write(yearly_summary)
-        fig = px.bar(
-            yearly_summary,
-            x='Start Year',
-            y='total_services',
-            title='Delivered Services by Year',
-            color="total_services",
-            color_continuous_scale=EDIH_CONTINUOUS_SCALE,
-            labels={'total_services': 'Number of Services', 'Start Year': 'Year'},
-            text='total_services'
-        )
-        # Ručno postavi da je osa kategorička i da se prikazuje po redu godina
-        fig.update_xaxes(type="category", categoryorder="array",
-                 categoryarray=sorted(yearly_summary["Start Year"].unique()))
+        # Sve tablice stranice iz zajedničkog agregatora (isti kao u API-ju)
+        overview = get_service_overview(data, dataset_versions["services"])
 
-        st.plotly_chart(fig, config={'displayModeBar': True, 'displaylogo': False})
-        
-        with st.expander("Tabular data"):    
-            # st.dataframe(yearly_summary, width=True)
-            st.table(yearly_summary)
+        # Delivered Services by Region, Category, Technology, Customer Staff Size, Year
+        # (ako ima puno tehnologija, manje zastupljene su spojene u "Other")
+        for table_key in ("region", "category", "technology", "staff_size", "yearly"):
+            show_chart(table_key, dataset_versions["services"], lambda key=table_key: OVERVIEW_CHARTS[key](overview[key]))
+            with st.expander("Tabular data"):
+                show_table(overview[table_key], f"overview_{table_key}")
 
     elif analysis_type == "EU EDIH Comparison":
         st.subheader("EU EDIH Comparison")
         with st.expander("Explanation of Results"):
             st.write("Despite administrative difficulties in the first year of the project, EDIH ADRIA managed to implement most of the activities and meet most of the targeted goals. According to all indicators, EDIH ADRIA is among the top ten best EU EDIHs in terms of results, published good examples, and participation in numerous international events.")
+
+        # Fokusni EDIH i težine složenog rezultata (rangovi za cijelu EU listu u jednom prolazu)
+        with st.expander("Composite score weights"):
+            weight_cols = st.columns(len(RANKING_COLUMNS))
+            ranking_weights = tuple(
+                (col, weight_col.number_input(col, 0.0, 5.0, DEFAULT_WEIGHTS[col], step=0.5, key=f"weight_{col}"))
+                for col, weight_col in zip(RANKING_COLUMNS, weight_cols)
+            )
+        edih_rankings = get_edih_rankings(edih_data, dataset_versions["edih_list"], ranking_weights)
+        focus_options = sorted(edih_rankings["EDIH Name"].astype(str).unique())
+        focus_edih = st.selectbox("Focus EDIH:", focus_options,
+                                  index=next((i for i, name in enumerate(focus_options) if "ADRIA" in name.upper()), 0))
         # Aggregate number of EDIHs per country
         country_summary = edih_data.groupby("Country").agg(
             num_edihs=("EDIH Name", "count"),
             url=("URL", "first")  # Using first URL as example
         ).reset_index()
         
-        # Map Visualization using PyDeck
-        # st.subheader("EDIH Locations on Map")
-        edih_data = edih_data.dropna(subset=['Latitude', 'Longitude'])
-        # Set a minimum radius for points with EDUC = 0 (e.g., 100)
-        edih_data["Radius"] = edih_data["EDUC"].apply(lambda x: max(x * 50, 1000))  # Minimum size 100
-        
-        # Define Map View
-        view_state = pdk.ViewState(
-            latitude=edih_data["Latitude"].mean(),
-            longitude=edih_data["Longitude"].mean(),
-            zoom=4,
-            pitch=50
-        )
-
-        # Define Scatterplot Layer
+        # Map Visualization using PyDeck - pojedinačni EDIH-ovi ili ćelije mreže, samo potrebne kolone
+        eu_map_level = st.select_slider("Map detail:", options=[*list(ZOOM_LEVELS)[:4], "EDIHs"], value="EDIHs", key="eu_map_level")
+        eu_map_data = get_edih_map_data(edih_data, edih_coords, (dataset_versions["edih_list"], geo_version), eu_map_level)
+
+        if eu_map_level == "EDIHs":
+            layer = pdk.Layer(
+                "ScatterplotLayer",
+                data=eu_map_data,
+                get_position="[Longitude, Latitude]",
+                get_radius="Radius",
+                get_color="[200, 30, 0, 160]",
+                pickable=True,
+            )
+            tooltip = {"html": "<b>{EDIH Name}</b><br>Country: {Country}<br>EDUC: {EDUC} <br>DMA: {DMA} <br>TBI: {TBI} <br>FCO: {FCO} <br>NETWORK: {NETWORK}"}
+            center = eu_map_data["Latitude"].mean(), eu_map_data["Longitude"].mean()
+        else:
+            layer = pdk.Layer(
+                "ScatterplotLayer",
+                data=eu_map_data,
+                get_position="[lon, lat]",
+                get_radius=f"Math.sqrt(count) * {ZOOM_LEVELS[eu_map_level] / 3}",
+                get_color="[200, 30, 0, 160]",
+                pickable=True,
+            )
+            tooltip = {"html": "<b>{count} EDIHs</b><br>Avg EDUC: {EDUC} <br>Avg DMA: {DMA} <br>Avg TBI: {TBI} <br>Avg FCO: {FCO} <br>Avg NETWORK: {NETWORK}"}
+            center = eu_map_data["lat"].mean(), eu_map_data["lon"].mean()
 
-        layer = pdk.Layer(
-            "ScatterplotLayer",
-            data=edih_data,
-            get_position="[Longitude, Latitude]",
-            get_radius="Radius",
-            get_color="[200, 30, 0, 160]",
-            pickable=True,
-            
-        )
-        # Create Deck Map
         edih_map = pdk.Deck(
-            #map_style="mapbox://styles/mapbox/light-v9",
-            initial_view_state=view_state,
-            tooltip={"html": "<b>{EDIH Name}</b><br>Country: {Country}<br>EDUC: {EDUC} <br>DMA: {DMA} <br>TBI: {TBI} <br>FCO: {FCO} <br>NETWORK: {NETWORK}"},
+            initial_view_state=pdk.ViewState(latitude=float(center[0]), longitude=float(center[1]), zoom=4, pitch=50),
+            tooltip=tooltip,
             layers=[layer]
         )
-        
         st.pydeck_chart(edih_map)
         
-        # Ranking of EDIHs based on DMA, EDUC, TBI, FCO, Network
-        ranking_columns = ["DMA", "EDUC", "TBI", "FCO", "NETWORK"]
-        ranking_summary = edih_data[["EDIH Name", "Country"] + ranking_columns].sort_values(by=ranking_columns, ascending=False)
-        # st.dataframe(ranking_summary, width=True)
-        if ranking_columns:
-            # ranking_summary = edih_data[["EDIH Name", "Country"] + ranking_columns].sort_values(by=ranking_columns, ascending=False)
-            
-            # st.subheader("EDIH Ranking by Key Metrics")
-            # st.dataframe(ranking_summary, width=True)
-            
-            # Heatmap Visualization
-            ranking_summary = ranking_summary.iloc[::-1]  # Flip the DataFrame vertically
-            # Generate Heatmap using go.Heatmap
-            fig_heatmap = go.Figure()
-
-            fig_heatmap.add_trace(go.Heatmap(
-                z=ranking_summary.set_index("EDIH Name")[ranking_columns].values,  
-                x=ranking_columns,  
-                y=ranking_summary["EDIH Name"],  
-                colorscale="viridis",
-                colorbar=dict(title="Score")
-            ))
-
-            # Add top x-axis labels using annotations with 45-degree rotation
-            annotations = []
-            for i, col in enumerate(ranking_columns):
-                annotations.append(
-                    dict(
-                        x=i, 
-                        y=len(ranking_summary["EDIH Name"]) + 0.5,  # Position above heatmap
-                        text=col, 
-                        showarrow=False,
-                        font=dict(size=12, color="lightgray")
-                        # textangle=45  # Rotate text by 45 degrees
-                    )
-                )
-
-            # Configure Layout
-            fig_heatmap.update_layout(
-                title="Heatmap of EDIH Rankings",
-                height=2500,
-                xaxis=dict(
-                    title="Metrics",
-                    side="bottom",
-                    tickmode="array",
-                    tickvals=list(range(len(ranking_columns))),
-                    ticktext=ranking_columns
-                ),
-                yaxis=dict(title="EDIHs"),
-                coloraxis=dict(colorscale=EDIH_CONTINUOUS_SCALE),
-                annotations=annotations  # Add rotated top x-axis labels
-            )          
-
-            st.plotly_chart(fig_heatmap, config={'displayModeBar': True, 'displaylogo': False})
-            with st.expander("Tabular data"):    
-                # st.dataframe(ranking_summary, width=True)
-                st.table(ranking_summary)
+        # Ranking of EDIHs based on DMA, EDUC, TBI, FCO, Network (zadano prosjek po državi)
+        # Isti rangovi kao fokusni EDIH (odabrane težine, svi EDIH-ovi), bez ponovnog rangiranja
+        ranking_summary = edih_rankings[["EDIH Name", "Country", *RANKING_COLUMNS]]
+        ranking_view = show_heatmap("ranking", dataset_versions["edih_list"], ranking_summary, "EDIH Name",
+                                    RANKING_COLUMNS, ["Country"], "EDIH Rankings")
+        with st.expander("Tabular data"):
+            show_table(ranking_view.round(1).reset_index(names="Row"), "ranking")
+
+        # Usporedba sa sličnima: ista država i razred veličine (premalo → isti razred u EU)
+        st.subheader(f"Peers of {focus_edih}")
+        peers = peer_set(edih_rankings, focus_edih)
+        show_table(peers[["EDIH Name", "Country", "Size band", "Composite", "Peer rank", "EU rank", *RANKING_COLUMNS]], "edih_peers")
+        with st.expander("Country comparison"):
+            show_table(get_country_rankings(edih_rankings, (dataset_versions["edih_list"], ranking_weights)), "edih_countries")
+
+        # Najbliži EDIH-ovi i EDIH-ovi u radijusu (prostorni indeks po verziji EU liste)
+        st.subheader("EDIHs Nearby")
+        edih_index = get_edih_index(edih_coords, dataset_versions["edih_list"])
+        edih_names = edih_data["EDIH Name"].astype(str)
+        focus_row = edih_names[edih_names == focus_edih].index[0]
+        radius_km = st.slider("Radius (km):", 25, 1000, 300, step=25)
+        if pd.notna(edih_coords.at[focus_row, "Latitude"]):
+            positions, distances = edih_index.within(edih_coords.at[focus_row, "Latitude"], edih_coords.at[focus_row, "Longitude"],
+                                                     radius_km * 1000)
+            nearby = edih_data.iloc[positions][["EDIH Name", "Country", *RANKING_COLUMNS]].assign(**{"Distance (km)": (distances / 1000).round(0)})
+            nearby = nearby[nearby["EDIH Name"] != focus_edih]
+            st.caption(f"{len(nearby)} EDIHs within {radius_km} km of {focus_edih}")
+            show_table(nearby, "edih_nearby")
         else:
-            st.warning("No valid ranking columns found in the dataset.")
+            st.info(f"{focus_edih} nema koordinate.")
 
 
     elif analysis_type == "Education - Summary":
         st.subheader("Education - Types of trainings")
         with st.expander("Explanation of Results"):
             st.write("Under the leadership of UNIRI, all project partners participated in the development of the annual strategy for digital skills and training (MS4). For development and implementation of the strategy, partners skills were defined and catalogued, an education schedule was created, proposed education sessions were systematically divided according to WP3 tasks and categorized (T3.1, T3.2, T3.3), a thorough analysis of existing education programs in Croatia was conducted to identify gaps and opportunities for all user categories. All the above contributed to shaping the strategic approach for digital skills and training.The indicators used to track and manage performance include feedback scores from training sessions, lectures, and events, which reflect user satisfaction. The average satisfaction score across all WP3 activities is 4.63, with an impressive score of 4.68 for the likelihood of participants recommending the trainings to others.In the current reporting period, the KPI of 2,557 participant/days has been achieved, representing 65% of the total KPI target of 3,950 participant/days. The high demand for Downstream Employee Trainings (T3.1) has led to a significant surplus, with 2,503 participant/days compared to the initial target of 2,000. This success will necessitate a review of the projected indicators for the remaining two categories of WP3 services. Digital Workforce Learning Factory (T3.2) has seen participation from 30 individuals, achieving only 2% of the planned target for the end of Year 2. This low engagement can be attributed to reduced interest and needs of ICT companies for such trainings. The Upstream Expert Training (T3.3), which focuses on knowledge exchange and best practices between experts in ICT domain of work, has seen 24 participant/days, representing 5.3% of the target set for the end of Year 2.")
-        # Filter for Education
-        education_keywords = [
-            "Workforce downstream trainings",
-            "Downstream employee training", 
-            "Digital experts upstream training", 
-            "Digital workforce learning factory"
-        ]
-        education_data = data[data['Short description of the service'].str.contains(
-            '|'.join(education_keywords), case=False, na=False
-        )].copy()
-        education_data['Keyword'] = education_data['Short description of the service'].apply(
-            lambda x: next((keyword for keyword in education_keywords if keyword.lower() in x.lower()), None)
-        )
+        education = education_tables(data, get_service_enrichment(data, dataset_versions["services"]))
 
-        # Ensure relevant columns are numeric
-        numeric_cols = ['Content ID', 'Service price, €', 'Number of attendees']
-
-        for col in numeric_cols:
-            if col in data.columns:
-                education_data[col] = pd.to_numeric(data[col], errors='coerce')  # Convert and coerce errors to NaN
-
-
-        education_summary = education_data.groupby(['Start Year', 'Keyword']).agg(
-            total_attendees=('Number of attendees', 'sum')
-        ).reset_index()
-                
-        # Ensure Year is treated as a string for clean axis labels
-        education_summary['Start Year'] = education_summary['Start Year'].astype(str)
-        # st.write(education_summary)        
-        
-        # Plot for Education
-        # st.write("Education Analysis")
-        fig_education = px.bar(
-            education_summary,
-            x='Start Year',
-            y='total_attendees',
-            color='Keyword',
-            title="Number of attendees by Delivered Education Type",
-            labels={'total_attendees': 'Number of Attendees', 'Start Year': 'Year', 'Keyword': 'Training Type'},
-        )
-        st.plotly_chart(fig_education, config={'displayModeBar': True, 'displaylogo': False})
+        education_summary = education["by_year"]
+        show_chart("by_year", dataset_versions["services"], lambda: education_by_year(education_summary))
         with st.expander("Tabular data"):    
-            # st.dataframe(education_summary, width=True)
-            st.table(education_summary)
-        
-        # st.subheader("Education Analysis")
-
-        # Filter for Training and Skills Development category
-        edu_data = data[data['Service category delivered'] == "Training and skills development"]
-
-        # Define relevant keywords in Short description of the service
-        edu_keywords = [
-            "Downstream employee training", 
-            "Digital workforce learning factory", 
-            "Workforce downstream trainings",
-            "Digital experts upstream training"
-        ]
+            show_table(education_summary, "education_by_year")
 
-        edu_filtered = data[data['Short description of the service'].str.contains(
-            '|'.join(edu_keywords), case=False, na=False
-        )].copy()
-
-        edu_filtered['Education Type'] = edu_filtered['Short description of the service'].apply(
-            lambda x: next((keyword for keyword in edu_keywords if keyword.lower() in x.lower()), None)
-        )
-        
-        # st.dataframe(edu_filtered, width=True)
-        
-        # Ensure relevant columns are numeric
-        numeric_cols = ['Service price, €', 'Number of attendees']
-
-        for col in numeric_cols:
-            if col in edu_filtered.columns:
-                edu_filtered[col] = pd.to_numeric(edu_filtered[col], errors='coerce')  # Convert and coerce errors to NaN
-
-        edu_summary = edu_filtered.groupby(["Education Type","Customer type","Short description of the service"]).agg(
-            num_customers=("Customer", "nunique"),
-            total_attendees=("Number of attendees", "sum"),
-            total_price=("Service price, €", "sum")
-        ).reset_index().sort_values(by="total_attendees", ascending=True)
-
-        # Display Education Summary Table
-        # st.write("Education Summary Table")
-        # st.dataframe(edu_summary, width=True)
-
-        # Display total attendees
-        # total_attendees_edu = edu_summary["total_attendees"].sum()
-        # st.write(f"### Total Attendees for Education: {total_attendees_edu}")
         # SME or PSO filter
         entity_type = st.radio("Select Entity Type:", ("SME", "Public Organization"))
-        
-        if entity_type == "SME":
-            filtered_edu_summary = edu_summary[edu_summary['Customer type'] == "SME"]
-        else:
-            filtered_edu_summary = edu_summary[edu_summary['Customer type'] == "PSO"]
+        edu_summary = education["by_course"]
+        filtered_edu_summary = edu_summary[edu_summary['Customer type'] == ("SME" if entity_type == "SME" else "PSO")]
 
         # Bar Chart for Education Analysis by Service Type (Switched Axes)
-        fig_edu_analysis = px.bar(
-            filtered_edu_summary,
-            x="total_attendees",
-            y="Short description of the service",
-            color="Education Type",
-            title="Delivered Education by Course",
-            labels={"total_attendees": "Total Attendees", "Short description of the service": "Service Type", "Education Type": "Education Type"},
-            barmode="group",
-            orientation='h',
-            height=800
-        )
-        st.plotly_chart(fig_edu_analysis, config={'displayModeBar': True, 'displaylogo': False})
+        show_chart("by_course", dataset_versions["services"], lambda: education_by_course(filtered_edu_summary),
+                   filters={"entity_type": entity_type})
         with st.expander("Tabular data"):    
-            # st.dataframe(edu_summary, width=True)
-            st.table(filtered_edu_summary)
+            show_table(filtered_edu_summary, "education_by_course")
 
     elif analysis_type == "Bootcamp - Summary":
         st.subheader("Bootcamp - Summary")
@@ -1026,146 +1072,43 @@ with col1:
             st.write(" STEP RI and all project partners developed the MS5 – DIT Bootcamp Procedure operational, a bilingual (EN/HR) manual for EDIH Adria DIT Bootcamps. The open call for bootcamps was published and promoted among potential users. To date, 42 users (37 PIs and 5 SMEs) have participated in seven bootcamps, six focused on digital transformation and one on digital innovation. All project partners provided mentoring support to DIT Bootcamps beneficiaries. STEP RI and all partners also prepared the first draft of D4.2 – Digital Innovation and Transformation Bootcamps, detailing the bootcamp information.")
 
         # Filter for Bootcamp
-        bootcamp_data = data[data['Short description of the service'].str.contains("bootcamp", case=False, na=False)].copy()
-        # st.write(bootcamp_data)        
-        bootcamp_summary = bootcamp_data.groupby(['Start Year','Customer']).agg(
-            total_attendees=('Number of attendees', 'sum')
-        ).reset_index()
-    
-        # Ensure Year is treated as a string for clean axis labels
-        bootcamp_summary['Start Year'] = bootcamp_summary['Start Year'].astype(str)
-        #st.write(bootcamp_summary,width=True)
-        #st.dataframe(bootcamp_summary, width=True)
+        bootcamp_summary = bootcamp_summary_table(data, get_service_enrichment(data, dataset_versions["services"]))
 
         # Plot for Bootcamp
-        fig_bootcamp = px.bar(
-            bootcamp_summary,
-            x='Start Year',
-            y='total_attendees',
-            title="Bootcamp Participants by Year",
-            labels={'total_attendees': 'Number of Attendees', 'Start Year': 'Year', 'Customer': 'Organization'},
-        )
-        st.plotly_chart(fig_bootcamp, config={'displayModeBar': True, 'displaylogo': False})
+        show_chart("by_year", dataset_versions["services"], lambda: bootcamp_by_year(bootcamp_summary))
         with st.expander("Tabular data"):    
-            # st.dataframe(bootcamp_summary, width=True)
-            st.table(bootcamp_summary)
+            show_table(bootcamp_summary, "bootcamp")
 
     #--------------------------------------------------------------------------------------------------
     elif analysis_type == "TBI - Summary":
         st.subheader("Test Before Invest Analysis")
         with st.expander("Explanation of Results"):
             st.write("Due to delays in aligning procedures with national rules, particularly with the Ministry of Economy, which co-finances 50% of the project activities, the preparation of the MS3 - EDIH Adria internal procedure for TBI support operations took longer than anticipated. These procedures were essential to ensure alignment with state aid rules and national implementation protocols. As a result, the final version of the EDIH Adria internal procedure for TBI support operations was officially delivered on November 16th, 2023.All project partners were actively involved in the implementation of TBIs, either by providing expert support or participating in the user acquisition and selection process.During this reporting period, EDIH Adria provided TBI support for new digital products and services to one beneficiary (30 TBI days), and TBI support for digital transformation to six beneficiaries (140 TBI days). As of the end of September 2024, a total of 895 TBI days had been contracted with 38 unique users (5 SMEs and 33 PIs).")
-        # Filter for Test Before Invest category
-        tbi_data = data[data['Service category delivered'] == "Test before invest"].copy()
-        # st.write(tbi_data)
-
-        # 1. Make sure your date column is datetime
-        data['Start Date'] = pd.to_datetime(data['Start Date'], dayfirst=True)
-
-        # 2. Filter for Test Before Invest category
-        tbi_data = data.loc[data['Service category delivered'] == "Test before invest"].copy()
-
-        # 3. Define Cuttof € 1250 from Feb 1, 2025 onward
-        cutoff = pd.Timestamp("2025-02-01")
-
-        # 4. Calculate mandays (Service Price / 1000)
-        #    - Before Feb 1: price / 1000
-        #    - On/After Feb 1: price / 1250
-        tbi_data.loc[tbi_data['Start Date'] < cutoff,  'Mandays'] = tbi_data['Service price, €'] / 1000
-        tbi_data.loc[tbi_data['Start Date'] >= cutoff, 'Mandays'] = tbi_data['Service price, €'] / 1250
-
-        # 5. Aggregate by Customer and Status
-        tbi_summary = (
-            tbi_data
-            .groupby(['Customer', 'Status'], as_index=False)
-            .agg(
-                total_price=('Service price, €', 'sum'),
-                total_mandays=('Mandays', 'sum')
-            )
-        )
+        # TBI tablice (čovjek-dani po pravilu 1000 € / 1250 € od 1.2.2025. iz enrich.py)
+        tbi = tbi_tables(data, get_service_enrichment(data, dataset_versions["services"]))
+        tbi_summary = tbi["summary"]
+        services_version = dataset_versions["services"]
 
         # ═══════════════════════════════════════════════════════════════════════════
         # NOVA ANALIZA 1: TBI TIMELINE
         # ═══════════════════════════════════════════════════════════════════════════
         
         st.subheader("📈 TBI Timeline Analysis")
-        
-        # Extract year from Start Date
-        tbi_data['Start Year'] = tbi_data['Start Date'].dt.year
-        
-        tbi_timeline = tbi_data.groupby('Start Year').agg(
-            total_services=('Customer', 'count'),
-            total_mandays=('Mandays', 'sum'),
-            unique_customers=('Customer', 'nunique')
-        ).reset_index()
-        
-        # Ensure Year is string for proper display
-        tbi_timeline['Start Year'] = tbi_timeline['Start Year'].astype(int).astype(str)
-        
-        # Create dual-axis chart
-        fig_timeline = go.Figure()
-        
-        # Add mandays line
-        fig_timeline.add_trace(go.Scatter(
-            x=tbi_timeline['Start Year'],
-            y=tbi_timeline['total_mandays'],
-            name='Total Mandays',
-            mode='lines+markers',
-            line=dict(color='#2E7D32', width=3),
-            marker=dict(size=10)
-        ))
-        
-        # Add services bar
-        fig_timeline.add_trace(go.Bar(
-            x=tbi_timeline['Start Year'],
-            y=tbi_timeline['total_services'],
-            name='Number of Services',
-            yaxis='y2',
-            marker_color='#FFA726',
-            opacity=0.6
-        ))
-        
-        fig_timeline.update_layout(
-            title='TBI Trend Over Time',
-            xaxis=dict(title='Year', type='category'),
-            yaxis=dict(title='Total Mandays', side='left'),
-            yaxis2=dict(title='Number of Services', side='right', overlaying='y'),
-            hovermode='x unified',
-            height=500
-        )
-        
-        st.plotly_chart(fig_timeline, config={'displayModeBar': True, 'displaylogo': False})
+        show_chart("timeline", services_version, lambda: tbi_timeline(tbi["timeline"]))
         
         with st.expander("📋 Timeline data"):
-            st.table(tbi_timeline)
+            show_table(tbi["timeline"], "tbi_timeline")
 
         # ═══════════════════════════════════════════════════════════════════════════
         # NOVA ANALIZA 2: TOP 10 ORGANIZATIONS
         # ═══════════════════════════════════════════════════════════════════════════
         
         st.subheader("🏆 Top 10 Organizations by TBI Mandays")
-        
-        top_tbi_orgs = tbi_summary.nlargest(10, 'total_mandays').sort_values('total_mandays', ascending=True)
-        
-        fig_top_orgs = px.bar(
-            top_tbi_orgs,
-            x='total_mandays',
-            y='Customer',
-            orientation='h',
-            color='total_mandays',
-            color_continuous_scale=EDIH_CONTINUOUS_SCALE,
-            title='Top 10 Organizations by TBI Mandays',
-            labels={'total_mandays': 'Total Mandays', 'Customer': 'Organization'},
-            text='total_mandays',
-            height=500
-        )
-        fig_top_orgs.update_traces(texttemplate='%{text:.1f}', textposition='outside')
-        fig_top_orgs.update_layout(showlegend=False)
-        
-        st.plotly_chart(fig_top_orgs, config={'displayModeBar': True, 'displaylogo': False})
+        top_tbi_orgs = tbi["top_organizations"]
+        show_chart("top_organizations", services_version, lambda: tbi_top_organizations(top_tbi_orgs))
         
         with st.expander("📋 Top 10 data"):
-            st.table(top_tbi_orgs[['Customer', 'total_mandays', 'total_price']])
+            show_table(top_tbi_orgs[['Customer', 'total_mandays', 'total_price']], "tbi_top")
 
         # ═══════════════════════════════════════════════════════════════════════════
         # NOVA ANALIZA 3: TBI → DAP/FCO CONVERSION
@@ -1173,13 +1116,11 @@ with col1:
         
         st.subheader("🔄 TBI to DAP/FCO Conversion Analysis")
         
-        # Filter DAP/FCO data
-        dap_data = data[data['Service category delivered'] == "Support to find investment"].copy()
-        
-        # Get unique customers
-        tbi_customers = set(tbi_data['Customer'].dropna().unique())
-        dap_customers = set(dap_data['Customer'].dropna().unique())
-        conversion_customers = tbi_customers.intersection(dap_customers)
+        # TBI → DAP/FCO lijevak iz zajedničkog agregatora (isti kao u API-ju)
+        conversion = tbi_funnel(data)
+        conversion_customers = conversion["converted"]
+        total_tbi_customers = conversion["tbi_customers"]
+        conversion_rate = f"{conversion['conversion_rate']:.1f}%"
         
         # Conversion metrics
         col_conv1, col_conv2, col_conv3 = st.columns(3)
@@ -1187,7 +1128,7 @@ with col1:
         with col_conv1:
             st.metric(
                 "Total TBI Customers",
-                value=len(tbi_customers),
+                value=total_tbi_customers,
                 help="Organizations that received TBI services"
             )
         
@@ -1195,69 +1136,66 @@ with col1:
             st.metric(
                 "Converted to DAP/FCO",
                 value=len(conversion_customers),
-                delta=f"{len(conversion_customers)/len(tbi_customers)*100:.1f}%" if len(tbi_customers) > 0 else "0%",
+                delta=conversion_rate,
                 help="Organizations that proceeded from TBI to DAP/FCO"
             )
         
         with col_conv3:
             st.metric(
                 "Conversion Rate",
-                value=f"{len(conversion_customers)/len(tbi_customers)*100:.1f}%" if len(tbi_customers) > 0 else "0%",
+                value=conversion_rate,
                 help="Percentage of TBI customers that moved to DAP/FCO"
             )
         
         # Conversion funnel visualization
-        funnel_data = pd.DataFrame({
-            'Stage': ['TBI Started', 'TBI Completed', 'Moved to DAP/FCO'],
-            'Count': [
-                len(tbi_customers),
-                len(tbi_summary[tbi_summary['Status'] == 'Completed']['Customer'].unique()),
-                len(conversion_customers)
-            ]
-        })
-        
-        fig_funnel = go.Figure(go.Funnel(
-            y=funnel_data['Stage'],
-            x=funnel_data['Count'],
-            textinfo="value+percent initial",
-            marker=dict(color=["#4CAF50", "#FFA726", "#2196F3"])
-        ))
-        
-        fig_funnel.update_layout(
-            title='TBI to DAP/FCO Conversion Funnel',
-            height=400
-        )
-        
-        st.plotly_chart(fig_funnel, config={'displayModeBar': True, 'displaylogo': False})
+        show_chart("conversion", services_version, lambda: conversion_funnel(conversion["funnel"]))
         
         # List of converted organizations
         if conversion_customers:
             with st.expander("📋 Organizations that converted from TBI to DAP/FCO"):
                 converted_list = pd.DataFrame({
-                    'Organization': sorted(list(conversion_customers))
+                    'Organization': conversion_customers
                 })
-                st.table(converted_list)
+                show_table(converted_list, "tbi_converted")
 
         # ═══════════════════════════════════════════════════════════════════════════
-        # POSTOJEĆE ANALIZE 
+        # NOVA ANALIZA 4: PUT KORISNIKA (DMA → BOOTCAMP → TBI → DAP/FCO → DMA T1/T2)
         # ═══════════════════════════════════════════════════════════════════════════
 
-        # Optional: reset index (groupby with as_index=False already did that)
-        # tbi_summary = tbi_summary.reset_index(drop=True)
+        st.subheader("🧭 Customer Journey")
+        journey_controls = st.columns([3, 1, 1])
+        journey_stages = journey_controls[0].multiselect("Stages:", JOURNEY_STAGES, default=list(JOURNEY_STAGES), key="journey_stages")
+        journey_segment = journey_controls[1].selectbox("Customers:", ["All", "SME", "PSO"], key="journey_segment")
+        journey = get_journey(loaded_frames, journey_versions, tuple(s for s in JOURNEY_STAGES if s in journey_stages))
+        journey_region = journey_controls[2].selectbox("Region:", ["All"] + journey.regions(), key="journey_region")
+
+        if journey.stages:
+            # Razdoblje iz sidebara odnosi se na ulazak u prvu fazu
+            journey_mask = journey.mask(
+                None if journey_segment == "All" else journey_segment,
+                None if journey_region == "All" else journey_region,
+                period_start, period_end,
+            )
+            journey_filters = {"stages": journey.stages, "segment": journey_segment, "region": journey_region,
+                               "period": [period_start, period_end]}
+            st.caption(f"{int(journey_mask.sum())} customers entered at '{journey.stages[0]}' in the selected period")
+            show_chart("journey_funnel", journey_versions, lambda: journey_funnel(journey.funnel(journey_mask)),
+                       filters=journey_filters)
+            if len(journey.stages) > 1:
+                show_chart("journey_durations", journey_versions,
+                           lambda: stage_durations(journey.durations(journey_mask)), filters=journey_filters)
+                show_table(journey.duration_summary(journey_mask), "journey_durations")
+            with st.expander("📉 Drop-off by entry quarter (last stage reached)"):
+                show_table(journey.cohorts(journey_mask), "journey_cohorts")
+        else:
+            st.info("Select at least one stage.")
 
-        # Pie Chart for Work Done by Status
-        fig_pie = px.pie(
-                tbi_summary,
-                names="Status",
-                values="total_price",
-                color="Status",
-                color_discrete_sequence=px.colors.qualitative.Vivid,  # Koristi diskretnu paletu
-                title="Work Completion Percentage by Status",
-                labels={"total_price": "Total Service Value (€)"},
-                hole=0.4
-        )
-        st.plotly_chart(fig_pie, config={'displayModeBar': True, 'displaylogo': False})
+        # ═══════════════════════════════════════════════════════════════════════════
+        # POSTOJEĆE ANALIZE 
+        # ═══════════════════════════════════════════════════════════════════════════
 
+        # Pie Chart for Work Done by Status
+        show_chart("status", services_version, lambda: tbi_status_pie(tbi_summary))
 
         # ═══════════════════════════════════════════════════════════════════════════
         # GRAF 1: Service Price by Customer and Status (HORIZONTALNI)
@@ -1267,161 +1205,22 @@ with col1:
 
         # Sortiraj po total_price za bolji prikaz
         tbi_summary_sorted = tbi_summary.sort_values('total_price', ascending=True)
-
-        fig_tbi_price = px.bar(
-            tbi_summary_sorted,
-            y="Customer",  # ✅ Prebačeno na Y-osu
-            x="total_price",  # ✅ Prebačeno na X-osu
-            color="Status",
-            orientation='h',  # ✅ Horizontalna orijentacija
-            title="Test Before Invest - Service Value by Customer and Status",
-            labels={
-                "total_price": "Total Service Value (€)", 
-                "Customer": "Organization"
-            },
-            barmode="stack",  # ✅ Stack umjesto group za bolju preglednost
-            height=max(400, len(tbi_summary_sorted) * 25),  # ✅ Dinamička visina
-            color_discrete_sequence=px.colors.qualitative.Vivid,
-            text_auto='.0f'  # ✅ Prikaži vrijednosti
-        )
-
-        fig_tbi_price.update_layout(
-            xaxis_title="Service Value (€)",
-            yaxis_title="",
-            showlegend=True,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            margin=dict(l=200, r=40, t=80, b=60)  # ✅ Više mjesta za nazive
-        )
-
-        st.plotly_chart(fig_tbi_price, config={'displayModeBar': True, 'displaylogo': False}, use_container_width=True)
+        show_chart("value", services_version, lambda: tbi_value_by_customer(tbi_summary_sorted), use_container_width=True)
 
         with st.expander("📋 Service value data"):
-            st.table(tbi_summary_sorted[['Customer', 'Status', 'total_price', 'total_mandays']])
+            show_table(tbi_summary_sorted[['Customer', 'Status', 'total_price', 'total_mandays']], "tbi_value")
 
         # ═══════════════════════════════════════════════════════════════════════════
-        # GRAF 2: TBI Support Types (AGREGIRAN PO TIPU)
+        # GRAF 2: TBI Support Types (SUNBURST - hijerarhijski prikaz)
         # ═══════════════════════════════════════════════════════════════════════════
 
         st.subheader("🔧 TBI Support Type Distribution")
-
-        tbi_keywords = [
-            "TBI support - new products and services", 
-            "TBI support - digital transformation", 
-            "Test before invest - digital innovation", 
-            "Test before invest"
-        ]
-
-        tbi_filtered = data[data['Short description of the service'].str.contains(
-            '|'.join(tbi_keywords), case=False, na=False
-        )].copy()
-
-        tbi_filtered['TBI Type'] = tbi_filtered['Short description of the service'].apply(
-            lambda x: next((keyword for keyword in tbi_keywords if keyword.lower() in x.lower()), None)
-        )
-
-        # Calculate mandays with cutoff logic
-        tbi_filtered['Start Date'] = pd.to_datetime(tbi_filtered['Start Date'], dayfirst=True)
-        cutoff = pd.Timestamp("2025-02-01")
-        tbi_filtered.loc[tbi_filtered['Start Date'] < cutoff, 'Mandays'] = tbi_filtered['Service price, €'] / 1000
-        tbi_filtered.loc[tbi_filtered['Start Date'] >= cutoff, 'Mandays'] = tbi_filtered['Service price, €'] / 1250
-
-        # ✅ OPCIJA 1: Agregirano po TBI tipu (jednostavniji prikaz)
-        tbi_type_aggregated = tbi_filtered.groupby("TBI Type").agg(
-            total_customers=("Customer", "nunique"),
-            total_mandays=("Mandays", "sum"),
-            total_price=("Service price, €", "sum")
-        ).reset_index().sort_values('total_mandays', ascending=True)
-
-        # Skraćeni nazivi za bolji prikaz
-        tbi_type_aggregated['TBI Type Short'] = tbi_type_aggregated['TBI Type'].apply(
-            lambda x: x.replace('TBI support - ', '').replace('Test before invest - ', '').title()
-        )
-
-        # Agregacija podataka
-        tbi_type_summary = tbi_filtered.groupby(["TBI Type", "Customer"]).agg(
-            total_price=("Service price, €", "sum"),
-            total_mandays=("Mandays", "sum")
-        ).reset_index()
-
-        # Skraćeni nazivi TBI tipova za bolji prikaz
-        tbi_type_summary['TBI Type Short'] = tbi_type_summary['TBI Type'].apply(
-            lambda x: x.replace('TBI support - ', '').replace('Test before invest - ', '').title()
-)
-
-        # ═══════════════════════════════════════════════════════════════════════════
-        # SUNBURST DIJAGRAM - Hijerarhijski prikaz
-        # ═══════════════════════════════════════════════════════════════════════════
-
-        fig_sunburst = px.sunburst(
-            tbi_type_summary,
-            path=['TBI Type Short', 'Customer'],
-            values='total_mandays',
-            color='total_mandays',
-            color_continuous_scale=EDIH_CONTINUOUS_SCALE,
-            title='TBI Types and Customers - Interactive Hierarchy',
-            hover_data={
-                'total_mandays': ':.1f',
-                'total_price': ':.0f'
-            },
-            height=700
-        )
-
-        fig_sunburst.update_traces(
-            textinfo="label+percent parent",
-            hovertemplate='<b>%{label}</b><br>Mandays: %{value:.1f}<br>Percent: %{percentParent}<extra></extra>'
-        )
-
-        fig_sunburst.update_layout(
-            margin=dict(t=80, l=0, r=0, b=0)
-        )
-
-        st.plotly_chart(fig_sunburst, config={'displayModeBar': True, 'displaylogo': False}, use_container_width=True)
+        show_chart("types", services_version, lambda: tbi_type_sunburst(tbi["by_type"]), use_container_width=True)
 
         st.info("💡 **Tip:** Klikni na segment za zoom in, klikni u centar za zoom out")
 
-
-
-         
         # Count Customers per Technology Type
-        tbi_tech_summary = tbi_filtered.groupby("Technology type used").agg(
-            total_customers=("Customer", "nunique")
-        ).reset_index().sort_values(by="total_customers", ascending=True)
-
-        # st.subheader("TBI Customers by Technology Type")
-        # st.dataframe(tbi_tech_summary, width=True)
-
-        fig_tbi_tech = px.bar(
-            tbi_tech_summary,
-            x="total_customers",
-            y="Technology type used",
-            color="total_customers",  # Gradient po broju korisnika
-            color_continuous_scale=EDIH_CONTINUOUS_SCALE,
-            title="TBI Customers by Technology Type",
-            labels={"total_customers": "Total Customers", "Technology type used": "Technology Type"},
-            height=600
-        )
-        st.plotly_chart(fig_tbi_tech, config={'displayModeBar': True, 'displaylogo': False})
-
-        # TBI timeline po godinama
-        tbi_timeline = tbi_data.groupby('Start Year').agg(
-            total_services=('Customer', 'count'),
-            total_mandays=('Mandays', 'sum')
-        ).reset_index()
-
-        fig_timeline = px.line(
-            tbi_timeline,
-            x='Start Year',
-            y='total_mandays',
-            markers=True,
-            title='TBI Mandays Trend Over Time',
-            labels={'total_mandays': 'Total Mandays', 'Start Year': 'Year'}
-)
+        show_chart("technology", services_version, lambda: customers_by_technology(tbi["technology"], "TBI Customers by Technology Type"))
 
         # ═══════════════════════════════════════════════════════════════════════════
         # INTEGRACIJA TBI IZVJEŠTAJA (kao DMA)
@@ -1438,7 +1237,7 @@ with col1:
             st.warning(f"⚠️ TBI folder does not exist: {tbi_pdf_folder}")
         else:
             # Get list of organizations from TBI data
-            tbi_organizations = sorted(tbi_data['Customer'].dropna().unique())
+            tbi_organizations = sorted(tbi_summary['Customer'].dropna().unique())
             
             if len(tbi_organizations) == 0:
                 st.info("No TBI organizations found in the data.")
@@ -1528,15 +1327,12 @@ with col1:
                         if st.button("🧠 AI Summary of Report", key="ai_tbi_summary"):
                             with st.spinner(f"AI is analyzing {selected_pdf.name}..."):
                                 try:
-                                    # Extract text from PDF
-                                    text = extract_text_intelligent(str(selected_pdf))
+                                    # Extract text from PDF and summarize (cache sažetaka i budžet u ai_ledger.py)
+                                    summary = summarize_document(str(selected_pdf), selected_tbi_org, min_chars=50)
                                     
-                                    if not text or len(text.strip()) < 50:
+                                    if summary is None:
                                         st.warning("⚠️ Could not extract enough text from PDF")
                                     else:
-                                        # Generate summary
-                                        summary = summarize_text(text)
-                                        
                                         st.subheader("📝 AI Summary")
                                         st.write(summary)
                                         
@@ -1550,173 +1346,31 @@ with col1:
         st.subheader("DAP & FCO Analysis")
         with st.expander("Explanation of Results"):
             st.write("ENT and STEP RI, in collaboration with all partners, developed the MS6 – DAP & FCO Assessment Formats document, which defines DAP and FCO content and methodology. The open call for investment support has been published and promoted. As of September 2024, two users (one SME and one PI) have contracted the development of DAPs and FCOs. The DAP & FCO process follows TBI and bootcamp activities, so users must complete TBI or bootcamp before starting DAP or FCO creation. As a result, fewer DAPs and FCOs have been completed to date, but a higher number is expected as more TBI activities are finalized")
-        # Filter for Test Before Invest category
-        dap_data = data[data['Service category delivered'] == "Support to find investment"].copy()
-        # st.write(tbi_data)
-
-        # Calculate mandays (Service Price / 1000)
-        dap_data["Mandays"] = dap_data["Service price, €"] / 1000
-
-        # Aggregate by Customer and Status
-        dap_summary = dap_data.groupby(["Customer", "Status"]).agg(
-            total_price=("Service price, €", "sum"),
-            total_mandays=("Mandays", "sum")
-        ).reset_index()
-
-        # Display summary table
-        # st.write("DAP & FCO Summary Table")
-        # st.dataframe(dap_summary, width=True)
+        dap = dap_tables(data, get_service_enrichment(data, dataset_versions["services"]))
+        dap_summary = dap["summary"]
 
         # Bar Chart for Service Price by Customer and Status
-        fig_dap_price = px.bar(
-            dap_summary,
-            x="Customer",
-            y="total_price",
-            color="Status",
-            title="DAP & FCO - Service value by Customer and Status",
-            labels={"total_price": "Total Service Price (€)", "Customer": "Customer"},
-            barmode="group",
-            height=600
-        )
-        st.plotly_chart(fig_dap_price, config={'displayModeBar': True, 'displaylogo': False})
+        show_chart("value", dataset_versions["services"], lambda: dap_value_by_customer(dap_summary))
         with st.expander("Tabular data"):    
-            # st.dataframe(dap_summary, width=True)
-            st.table(dap_summary)
-       
-         # Additional Graph for Specific TBI Support Types
-        tbi_keywords = [
-            "DAP - digitalisation action plan", 
-            "FCO assessment", 
-            "Digital transformation project" 
-        ]
-
-        tbi_filtered = data[data['Short description of the service'].str.contains(
-            '|'.join(tbi_keywords), case=False, na=False
-        )].copy()
-
-        tbi_filtered['DAP&FCO Type'] = tbi_filtered['Short description of the service'].apply(
-            lambda x: next((keyword for keyword in tbi_keywords if keyword.lower() in x.lower()), None)
-        )
-        # Calculate mandays (Service Price / 1000)
-        tbi_filtered["Mandays"] = tbi_filtered["Service price, €"] / 1000        
+            show_table(dap_summary, "dap_summary")
 
-        tbi_type_summary = tbi_filtered.groupby(["DAP&FCO Type", "Customer"]).agg(
-            total_price=("Service price, €", "sum"),
-            total_mandays=("Mandays", "sum")
-        ).reset_index()
-
-        # Display TBI Type Summary Table
-        # st.write("TBI Support Type Summary")
-        # st.dataframe(tbi_type_summary, width=True)
-
-        # Bar Chart for TBI Support Types by Customer
-        fig_tbi_types = px.bar(
-            tbi_type_summary,
-            x="Customer",
-            y="total_mandays",
-            color="DAP&FCO Type",
-            title="DAP&FCO Support Analysis by Customer",
-            labels={"total_mandays": "Total Mandays", "Customer": "Customer", "DAP&FCO Type": "DAP&FCO Support Type"},
-            barmode="group",
-            height=600
-        )
-        st.plotly_chart(fig_tbi_types, config={'displayModeBar': True, 'displaylogo': False})
+        # Additional Graph for Specific DAP&FCO Support Types
+        show_chart("types", dataset_versions["services"], lambda: dap_types_by_customer(dap["by_type"]))
          
         # Count Customers per Technology Type
-        tbi_tech_summary = tbi_filtered.groupby("Technology type used").agg(
-            total_customers=("Customer", "nunique")
-        ).reset_index().sort_values(by="total_customers", ascending=True)
-
-        # st.subheader("TBI Customers by Technology Type")
-        # st.dataframe(tbi_tech_summary, width=True)
-
-        fig_tbi_tech = px.bar(
-            tbi_tech_summary,
-            x="total_customers",
-            y="Technology type used",
-            title="DAP&FCO Customers by Technology Type",
-            labels={"total_customers": "Total Customers", "Technology type used": "Technology Type"},
-            height=600
-        )
-        st.plotly_chart(fig_tbi_tech, config={'displayModeBar': True, 'displaylogo': False})
+        show_chart("technology", dataset_versions["services"],
+                   lambda: customers_by_technology(dap["technology"], "DAP&FCO Customers by Technology Type", colored=False))
 
     elif analysis_type == "State Aid - Summary":
-        # Podaci iz Teams tablica!
-        # Convert numeric columns to proper format
-        numeric_columns_ps = ["Vrijednost usluge"]
-        numeric_columns_sme = ["Vrijednost usluge", "Iznos potpore"]
-
-        for col in numeric_columns_ps:
-            ps_data[col] = pd.to_numeric(ps_data[col], errors='coerce')
-
-        for col in numeric_columns_sme:
-            sme_data[col] = pd.to_numeric(sme_data[col], errors='coerce')
-
-        # Public Sector Analysis
-        ps_summary = ps_data.groupby(['Vrsta usluge', 'Započeto je pružanje usluge (DA/NE)']).agg(
-            total_value=('Vrijednost usluge', 'sum')
-        ).reset_index()
+        # Podaci iz Teams tablica (javni sektor, poduzeća) i EU Site
+        state_aid = state_aid_tables(data, ps_data, sme_data)
+        state_aid_version = (dataset_versions["services"], dataset_versions["zahtjevi_ps"], dataset_versions["zahtjevi_sme"])
         
         st.subheader("State Aid Summary")
-        # st.dataframe(ps_summary, width=True)
-        
-        fig_ps = px.bar(
-            ps_summary,
-            x='Vrsta usluge',
-            y='total_value',
-            color='Započeto je pružanje usluge (DA/NE)',
-            title='State Aid Summary for Public Sector',
-            labels={'total_value': 'Total Value (€)', 'Vrsta usluge': 'Service Type'},
-            barmode='group'
-        )
-        st.plotly_chart(fig_ps, config={'displayModeBar': True, 'displaylogo': False})
-        with st.expander("Tabular data"):    
-            # st.dataframe(ps_summary, width=True)
-            st.table(ps_summary)
-        
-        # SME Analysis
-        sme_summary = sme_data.groupby(['Vrsta usluge', 'Započeto je pružanje usluge (DA/NE)']).agg(
-            total_value=('Vrijednost usluge', 'sum'),
-            total_support=('Iznos potpore', 'sum')
-        ).reset_index()
-        
-        # st.subheader("SME - State Aid Summary")
-        # st.dataframe(sme_summary, width=True)
-
-        fig_sme = px.bar(
-            sme_summary,
-            x='Vrsta usluge',
-            y=['total_value', 'total_support'],
-            color='Započeto je pružanje usluge (DA/NE)',
-            title='State Aid Summary for SMEs',
-            labels={'value': 'Total (€)', 'Vrsta usluge': 'Service Type'},
-            barmode='group'
-        )
-        st.plotly_chart(fig_sme, config={'displayModeBar': True, 'displaylogo': False})
-        with st.expander("Tabular data"):    
-            # st.dataframe(sme_summary, width=True)
-            st.table(sme_summary)      
-
-        # Podaci iz EU Site
-        state_aid_summary = data.groupby('Specific information on State Aid').agg(
-            total_services=('Content ID', 'count'),
-            total_aid=('Amount of the service price to be reported as Aid of national or regional public nature, €', 'sum')
-        ).reset_index().sort_values(by='total_aid', ascending=False)
-        # st.subheader("State Aid Summary")
-        # st.write(state_aid_summary)
-        fig = px.bar(
-            state_aid_summary,
-            x='Specific information on State Aid',
-            y='total_services',
-            title='State Aid Summary',
-            labels={'total_services': 'Number of Services', 'Specific information on State Aid': 'State Aid'},
-            text='total_services'
-        )
-        fig.update_traces(textposition='outside')
-        st.plotly_chart(fig, config={'displayModeBar': True, 'displaylogo': False})
-        with st.expander("Tabular data"):    
-            # st.dataframe(state_aid_summary, width=True)
-            st.table(state_aid_summary)  
+        for table_key, build_figure in (("public_sector", state_aid_public_sector), ("sme", state_aid_sme), ("eu", state_aid_eu)):
+            show_chart(table_key, state_aid_version, lambda key=table_key, build=build_figure: build(state_aid[key]))
+            with st.expander("Tabular data"):    
+                show_table(state_aid[table_key], f"state_aid_{table_key}")
 
 
     elif analysis_type == "ESG - Summary":
@@ -1725,38 +1379,33 @@ with col1:
         dataset_type = st.radio("Select Dataset:", ("SMEs", "Public Organizations"))
         
         if dataset_type == "SMEs":
-            selected_data = data_smea
-            org_column = "SME name"
-            env_col = "Green Digitalisation"
-            soc_cols = ["Digital Business Strategy", "Digital Readiness", "Human-Centric Digitalisation"]
-            gov_cols = ["Data Governance", "Automation & Artificial Intelligence"]
+            esg_dataset, selected_data = "sme_dma", data_smea
         else:
-            selected_data = data_psoa
-            org_column = "PSO name"
-            env_col = "Green Digitalisation"
-            soc_cols = ["Digital Strategy and Investments", "Digital Readiness", "Human-Centric Digitalisation"]
-            gov_cols = ["Data Management and Security", "Interoperability"]
+            esg_dataset, selected_data = "pso_dma", data_psoa
 
-        if org_column in selected_data.columns:
-            selected_data["Environment"] = selected_data[env_col]
-            selected_data["Society"] = selected_data[soc_cols].mean(axis=1)
-            selected_data["Governance"] = selected_data[gov_cols].mean(axis=1)
-
-            esg_summary = selected_data[[org_column, "Environment", "Society", "Governance"]].dropna()
-            esg_summary.set_index(org_column, inplace=True)
-
-            fig_esg_heatmap = px.imshow(
-                esg_summary,
-                labels=dict(x="ESG Category", y="Organisation", color="Score"),
-                x=["Environment", "Society", "Governance"],
-                y=esg_summary.index,
-                color_continuous_scale=px.colors.sequential.Blues,
-                title="ESG Score Heatmap",
-                height=900,
-                width=900,
-                aspect="auto"
-            )
-            st.plotly_chart(fig_esg_heatmap, config={'displayModeBar': True, 'displaylogo': False})
+        esg_scores = get_esg_scores(selected_data, dataset_versions[esg_dataset], esg_dataset)
+
+        if not esg_scores.empty:
+            with st.expander("⚖️ Pillar weights"):
+                weight_cols = st.columns(len(ESG_PILLARS))
+                pillar_weights = {
+                    pillar: weight_col.slider(pillar, 0.0, 1.0, float(PILLAR_WEIGHTS[pillar]), 0.05, key=f"esg_w_{pillar}")
+                    for weight_col, pillar in zip(weight_cols, ESG_PILLARS)
+                }
+            if pillar_weights != PILLAR_WEIGHTS:
+                esg_scores = esg_scores.assign(ESG=composite_score(esg_scores, pillar_weights))
+
+            esg_stage = st.radio("DMA stage:", ("Latest", "T0", "T1", "T2"), horizontal=True)
+            esg_summary = esg_matrix(esg_scores, stage=None if esg_stage == "Latest" else esg_stage)
+
+            show_chart("heatmap", dataset_versions[esg_dataset], lambda: esg_heatmap(esg_summary, ESG_PILLARS),
+                       filters={"stage": esg_stage, "weights": pillar_weights})
+
+            with st.expander("📋 ESG by DMA stage (cohort averages)"):
+                show_table(cohort_scores(esg_scores).reset_index(), "esg_cohorts")
+
+            esg_org = st.selectbox("Odaberi organizaciju:", sorted(esg_scores["Organization"].unique()), key="esg_org")
+            show_table(esg_scores[esg_scores["Organization"] == esg_org][["DMA Timing", *ESG_PILLARS, "ESG"]].round(1), "esg_organization")
 
 
     elif analysis_type == "DMA - Summary":
@@ -1769,6 +1418,7 @@ with col1:
         
         if dataset_type == "SMEs":
             selected_data = data_smea
+            dma_dataset = "sme_dma"
             
             org_column = "SME name"
             pdf_folder = app_folder + "/DMA/SME"
@@ -1786,6 +1436,7 @@ with col1:
                     st.metric("Green Digitalisation (%):", value=int(selected_data["Green Digitalisation"].mean()), delta=100, border=True)
         else:
             selected_data = data_psoa
+            dma_dataset = "pso_dma"
 
             org_column = "PSO name"
             pdf_folder = app_folder + "/DMA/PSO"
@@ -1803,8 +1454,8 @@ with col1:
                     st.metric("Green Digitalisation (%):", value=int(selected_data["Green Digitalisation"].mean()), delta=100, border=True)
 
         # Clean column names
-        selected_data.columns = selected_data.columns.str.replace('"', '').str.strip()
-        full_data = selected_data.copy()  # čuva sve kolone
+        selected_data = selected_data.rename(columns=lambda col: str(col).replace('"', '').strip())
+        full_data = selected_data  # čuva sve kolone (copy-on-write, bez kopije)
 
         # Extract dimensions for the radar chart (between DMA Score and EDIH name)
         dma_start_col = selected_data.columns.get_loc("DMA Score")
@@ -1817,51 +1468,45 @@ with col1:
         if org_column in selected_data.columns:
             organization_names = selected_data[org_column].dropna().unique()
             
-            # --- 1️⃣ DMA Heatmap ---
-            heatmap_data = selected_data.set_index(org_column)[dma_columns]
-            heatmap_data = heatmap_data.dropna()
-
-            fig_heatmap = go.Figure()
-
-            fig_heatmap.add_trace(go.Heatmap(
-                z=heatmap_data.values,  # Data values
-                x=heatmap_data.columns,  # X-axis labels (Organizations)
-                y=heatmap_data.index,  # Y-axis labels (Dimensions)
-                colorscale="RdBu",
-                colorbar=dict(title="Rating")
-            ))
-
-            annotations = []
-            for i, col in enumerate(heatmap_data.columns):
-                annotations.append(
-                    dict(
-                        x=i, 
-                        y=len(heatmap_data.index) + 4,  # Position slightly above the heatmap
-                        text=col, 
-                        showarrow=False,
-                        font=dict(size=12, color="lightgray"),
-                        textangle=45
-                    )
-                )
+            # --- 1️⃣ DMA Heatmap (trake po DMA fazi / rasponu rezultata, organizacije na zahtjev) ---
+            heatmap_data = selected_data.dropna(subset=list(dma_columns)).assign(**{
+                "Organisation": lambda df: df[org_column].astype(str) + (" · " + df["DMA Timing"].astype(str) if "DMA Timing" in df.columns else ""),
+                "Score band": lambda df: score_band(df["DMA Score"]),
+            })
+            group_columns = [c for c in ("DMA Timing", "Score band") if c in heatmap_data.columns]
+            show_heatmap(f"{dma_dataset}_heatmap", dataset_versions[dma_dataset], heatmap_data, "Organisation",
+                         list(dma_columns), group_columns, "DMA Score Heatmap", colorscale="RdBu")
 
-            fig_heatmap.update_layout(
-                title="DMA Score Heatmap",
-                height=1200,
-                width=900,
-                xaxis=dict(
-                    title="Organisation",
-                    side="bottom",
-                    tickmode="array",
-                    tickvals=list(range(len(heatmap_data.columns))),
-                    ticktext=heatmap_data.columns
-                ),
-                yaxis=dict(title="Dimensions"),
-                annotations=annotations
-            )
+        # --- 2️⃣ DMA progresija za sve organizacije (T0 → T1 → T2) ---
+        dma_progression = get_dma_progression(selected_data, dataset_versions[dma_dataset], org_column)
+
+        if dma_progression.organizations:
+            st.subheader("📈 DMA Progression T0 → T1 → T2")
 
-            st.plotly_chart(fig_heatmap, config={'displayModeBar': True, 'displaylogo': False})
+            stage_stats, complete_orgs = dma_progression.stage_completion()
+            stage_cols = st.columns(len(stage_stats) + 1)
+            for stage_col, (_, stage_row) in zip(stage_cols, stage_stats.iterrows()):
+                stage_col.metric(f"{stage_row['Stage']} assessments", value=int(stage_row["Organizations"]),
+                                 delta=f"{stage_row['Share (%)']}%", border=True)
+            stage_cols[-1].metric("All stages completed", value=complete_orgs, border=True)
+
+            progression_step = st.radio("Progression:", ("T0 → T1", "T0 → T2", "T1 → T2"), horizontal=True)
+            from_stage, to_stage = [part.strip() for part in progression_step.split("→")]
+            most_improved = dma_progression.most_improved(from_stage, to_stage, n=10)
+
+            if most_improved.empty:
+                st.info(f"Nema organizacija s procjenama {from_stage} i {to_stage}.")
+            else:
+                show_chart(f"{dma_dataset}_most_improved", dataset_versions[dma_dataset],
+                           lambda: most_improved_bar(most_improved, progression_step), filters={"step": progression_step})
+
+            with st.expander("📋 Cohort averages by stage"):
+                show_table(pd.DataFrame(
+                    dma_progression.cohort_averages().round(1),
+                    index=list(dma_progression.stages),
+                    columns=dma_progression.dimensions
+                ).dropna(how="all").reset_index(names="Stage"), "dma_cohorts")
 
-     
         # st.subheader("📁 DMA dokumenti po organizaciji (T0 / T1 / T2)")
 
         # --- 1️⃣ Funkcija za pregled PDF-ova po organizaciji ---
@@ -1939,7 +1584,7 @@ with col1:
             with st.expander("### 📋 Pregled DMA dokumenata"):
             # st.markdown("### 📋 Pregled DMA dokumenata")
             # st.dataframe(dma_overview_df, width=stretch, hide_index=True)
-                st.table(dma_overview_df)
+                show_table(dma_overview_df, "dma_overview")
         else:
             st.warning("⚠️ Nema pronađenih PDF-ova u zadanim folderima.")
 
@@ -1975,41 +1620,16 @@ with col1:
                 if "DMA Timing" not in org_records.columns:
                     st.error("Kolona 'DMA Timing' nije pronađena u datasetu.")
                 else:
-                    # Prepoznaj sve numeričke metrike osim identificirajućih kolona
-                    skip_cols = [org_column, "DMA Timing", "EDIH Name", "DMA Score", "SME ID", "PSO ID"]
-                    metric_cols = [
-                        c for c in org_records.columns
-                        if c not in skip_cols and org_records[c].dtype in [int, float]
-                    ]
-
-                    fig_radar = go.Figure()
-
-                    # Faze DMA (T0, T1, T2)
-                    available_timings = org_records["DMA Timing"].dropna().unique()
-
-                    for stage in ["T0", "T1", "T2"]:
-                        if stage in available_timings:
-                            stage_row = org_records[org_records["DMA Timing"] == stage].iloc[0]
-                            values = [stage_row[c] for c in metric_cols]
-                            fig_radar.add_trace(go.Scatterpolar(
-                                r=values,
-                                theta=metric_cols,
-                                fill='toself',
-                                name=stage
-                            ))
-
-                    fig_radar.update_layout(
-                        title=f"Digital Maturity Progression – {organization_name}",
-                        polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
-                        showlegend=True,
-                        template="plotly_white"
-                    )
-
-                    st.plotly_chart(fig_radar, config={'displayModeBar': True, 'displaylogo': False})
+                    # Faze DMA (T0, T1, T2) iz zajedničkog progression polja
+                    show_chart(f"{dma_dataset}_radar", dataset_versions[dma_dataset], lambda: dma_radar(
+                        dma_progression.organization_frame(organization_name),
+                        dma_progression.dimensions,
+                        organization_name
+                    ), filters={"organization": organization_name})
 
                     # Opcionalno: prikaži sirove podatke
                     with st.expander("📋 Pogledaj tablične rezultate"):
-                        st.dataframe(org_records, use_container_width=True)
+                        show_table(org_records, "dma_org_records")
 
 
             # ---- Add PDF Display Logic ----
@@ -2058,302 +1678,93 @@ with col1:
 
 
 # Right sidebar section
-with col2:
+with col2, span("kpis"):
     st.subheader("Progress Toward Target")
-    # Add Gauge for Targets
-    if analysis_type == "EDIH ADRIA Service Overview":
-        # st.subheader("Service Summary with Target")
-
-        # Example: Total Revenue Target
-        total_revenue = data['Service price, €'].sum()
-        target_revenue = 2_645_000  # € target
-
-        fig_gauge = go.Figure(go.Indicator(
-            mode="gauge+number+delta",
-            value=total_revenue,
-            delta={'reference': target_revenue, 'position': "top"},
-            gauge={
-                'axis': {'range': [0, target_revenue]},
-                'bar': {'color': "orange"},
-                'steps': [
-                    {'range': [0, target_revenue * 0.5], 'color': "lightgray"},
-                    {'range': [target_revenue * 0.5, target_revenue], 'color': "yellow"},
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': target_revenue *0.9
-                }
-            },
-            title={'text': "Total Revenue (€)"}
-        ))
-
-        st.plotly_chart(fig_gauge, config={'displayModeBar': True, 'displaylogo': False})
-        st.metric("Total partner cost - midterm (€):", value=1128186.17, delta=2645000, border=True) 
-    
-    elif analysis_type == "EU EDIH Comparison":
-        
-        # Filter for the 4 specific EDIHs
-        selected_edihs = ["EDIH Adria", "CROBOHUBplusplus", "AI and Gaming EDIH", "AI4HEALTH.Cro"]
-        filtered_ranking = ranking_summary [ranking_summary ["EDIH Name"].isin(selected_edihs)]
-        # st.dataframe(filtered_ranking, width=True)
-        for index, row in filtered_ranking.iterrows():
-            st.metric(label=row["EDIH Name"], value=row["DMA"] + row["TBI"] + row["EDUC"] + row["FCO"] + row["NETWORK"], border=True)
-                
-        # st.metric("Number of organisations with completed DMA:", value=total_customers, delta=target_customers, border=True)     
-    
-    elif analysis_type == "Bootcamp - Summary":
-        # bootcamp_data['Customer'] = bootcamp_data['Customer'].astype(str).str.strip().str.lower()        
-        total_customers = len(bootcamp_data)
-        target_customers = 85
-        
-        # Calculate percentage of the target achieved
-        percentage_achieved = (total_customers / target_customers) * 100
-
-        fig_bootcamp_gauge = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=percentage_achieved,
-            delta={'reference': target_customers, 'position': "top"},
-            gauge={
-                'axis': {'range': [0, 100],'tickcolor': "lightgray"},
-                'bar': {'color': "red"},
-                'steps': [
-                    {'range': [0, 50], 'color': "lightgray"},
-                    {'range': [50, 75], 'color': "yellow"},
-                    {'range': [75, 100], 'color': "orange"},
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 80
-                }
-            },
-            title={'text': "Target achieved in %"}
-        ))
-        fig_bootcamp_gauge.update_layout(font = {'family': "Arial"}, height=300)
-        st.plotly_chart(fig_bootcamp_gauge, config={'displayModeBar': True, 'displaylogo': False})
-        st.metric("Number of organisations with completed bootcamp:", value=total_customers, delta=target_customers, border=True)
- 
-    elif analysis_type == "DAP&FCO - Summary":
-        # bootcamp_data['Customer'] = bootcamp_data['Customer'].astype(str).str.strip().str.lower()        
-        total_customers = len(dap_data)
-        target_customers = 50
-        
-        # Calculate percentage of the target achieved
-        percentage_achieved = (total_customers / target_customers) * 100
-
-        fig_bootcamp_gauge = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=percentage_achieved,
-            delta={'reference': target_customers, 'position': "top"},
-            gauge={
-                'axis': {'range': [0, 100],'tickcolor': "lightgray"},
-                'bar': {'color': "red"},
-                'steps': [
-                    {'range': [0, 50], 'color': "lightgray"},
-                    {'range': [50, 75], 'color': "yellow"},
-                    {'range': [75, 100], 'color': "orange"},
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 80
-                }
-            },
-            title={'text': "Target achieved in %"}
-        ))
-        fig_bootcamp_gauge.update_layout(font = {'family': "Arial"}, height=300)
-        st.plotly_chart(fig_bootcamp_gauge, config={'displayModeBar': True, 'displaylogo': False})
-        st.metric("Number of organisations with DAP&FCO:", value=total_customers, delta=target_customers, border=True) 
-
-
-    elif analysis_type == "DMA - Summary":
-        
-        if apply_reporting_filter:        
-            total_customers = 83
-            target_customers = 120
-        else:
-            total_customers = data_smea['SME name'].nunique() + data_psoa['PSO name'].nunique()
-            target_customers = 120   
-
-        
-        # Calculate percentage of the target achieved
-        percentage_achieved = (total_customers / target_customers) * 100
-
-        fig_bootcamp_gauge = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=percentage_achieved,
-            delta={'reference': target_customers, 'position': "top"},
-            gauge={
-                'axis': {'range': [0, 100],'tickcolor': "lightgray"},
-                'bar': {'color': "red"},
-                'steps': [
-                    {'range': [0, 50], 'color': "lightgray"},
-                    {'range': [50, 75], 'color': "yellow"},
-                    {'range': [75, 100], 'color': "orange"},
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 80
-                }
-            },
-            title={'text': "DMA target achieved in %"}
-        ))
-        fig_bootcamp_gauge.update_layout(font = {'family': "Arial"}, height=300)
-        st.plotly_chart(fig_bootcamp_gauge, config={'displayModeBar': True, 'displaylogo': False})
-        st.metric("Number of organisations with completed DMA:", value=total_customers, delta=target_customers, border=True)     
-    
-    elif analysis_type == "TBI - Summary":
-        
-        if apply_reporting_filter:        
-            total_mandays = 895
-            target_mandays = 1400
-            total_organisations = len(tbi_summary["total_mandays"])
-        else:
-            total_mandays = int(tbi_summary["total_mandays"].sum())
-            target_mandays = 1400
-            total_organisations = len(tbi_summary["total_mandays"])
-
-        # Calculate percentage of the target achieved
-        percentage_achieved = (total_mandays / target_mandays) * 100
-
-        fig_bootcamp_gauge = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=percentage_achieved,
-            delta={'reference': target_mandays, 'position': "top"},
-            gauge={
-                'axis': {'range': [0, 100],'tickcolor': "lightgray"},
-                'bar': {'color': "red"},
-                'steps': [
-                    {'range': [0, 50], 'color': "lightgray"},
-                    {'range': [50, 75], 'color': "yellow"},
-                    {'range': [75, 100], 'color': "orange"},
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 80
-                }
-            },
-            title={'text': "TBI target achieved in %"}
-        ))
-        fig_bootcamp_gauge.update_layout(font = {'family': "Arial"}, height=300)
-        st.plotly_chart(fig_bootcamp_gauge, config={'displayModeBar': True, 'displaylogo': False})
-        st.metric("Number contracted TBI days:", value=total_mandays, delta=target_mandays, border=True)
-        st.metric("Number of organisations:", value=total_organisations, delta=70, border=True)
+    # Svi KPI-jevi iz kpi_definitions.json, neovisno o tome koja je stranica izvršena
+    kpi_frames = {
+        "services": data,
+        "services_derived": get_service_enrichment(data, dataset_versions["services"]),
+        "sme_dma": data_smea,
+        "pso_dma": data_psoa,
+        "zahtjevi_ps": ps_data,
+        "zahtjevi_sme": sme_data,
+    }
+    kpi_versions = tuple(sorted(dataset_versions.items())) + (file_version(KPI_FILE),)
+    kpi_results = get_kpi_results(kpi_frames, kpi_versions, reporting_period)
 
-    elif analysis_type == "State Aid - Summary":
+    if analysis_type == "EU EDIH Comparison":
         
-        if apply_reporting_filter:        
-            total_budget= 881300
-            target_budget = 1322500
-        else:
-            total_budget = int(state_aid_summary["total_aid"].sum())
-            target_budget = 1322500 
-
-        # Calculate percentage of the target achieved
-        percentage_achieved = (total_budget / target_budget) * 100
-
-        fig_bootcamp_gauge = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=percentage_achieved,
-            delta={'reference': target_budget, 'position': "top"},
-            gauge={
-                'axis': {'range': [0, 100],'tickcolor': "lightgray"},
-                'bar': {'color': "red"},
-                'steps': [
-                    {'range': [0, 50], 'color': "lightgray"},
-                    {'range': [50, 75], 'color': "yellow"},
-                    {'range': [75, 100], 'color': "orange"},
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 80
-                }
-            },
-            title={'text': "TBI target achieved in %"}
-        ))
-        fig_bootcamp_gauge.update_layout(font = {'family': "Arial"}, height=300)
-
-        st.plotly_chart(fig_bootcamp_gauge, config={'displayModeBar': True, 'displaylogo': False})
-        st.metric("State aid (€):", value=total_budget, delta=target_budget, border=True)
-        st.metric("Issued decisions:", value=73, delta=100, border=True)
-        st.metric("Issued statements:", value=250, delta=500, border=True)
-        
-    elif analysis_type == "Education - Summary":
-        # 1.kategorija - Workforce downstream trainings        
-        
-        if apply_reporting_filter:        
-            total_workforce = 2503
-            target_workforce = 2000
-        else:
-            workforce_train1 = edu_summary[edu_summary["Education Type"] == "Workforce downstream trainings"]
-            workforce_train2 = edu_summary[edu_summary["Education Type"] == "Downstream employee training"]
-            total_workforce = int(workforce_train1["total_attendees"].sum()) + int(workforce_train2["total_attendees"].sum())
-            target_workforce = 3000 
-        
-        # 2.kategorija - Digital Workforce learning factory 
-        workforce_learning = edu_summary[edu_summary["Education Type"] == "Digital workforce learning factory"]
-        total_factroy= int(workforce_learning["total_attendees"].sum())
-        target_factroy = 250
+        # Fokusni EDIH iz rang tablice (odabir na stranici)
+        focus = edih_rankings.loc[edih_rankings["EDIH Name"] == focus_edih].iloc[0]
+        st.metric(label=f"{focus_edih} - composite score", value=float(focus["Composite"]), border=True)
+        st.metric(label="EU rank", value=f"{focus['EU rank']} / {len(edih_rankings)}", border=True)
+        st.metric(label=f"Rank in {focus['Country']}", value=f"{focus['Country rank']} / {focus['Country EDIHs']}",
+                  delta=float(focus["vs country avg"]) if pd.notna(focus["vs country avg"]) else None, border=True)
+        st.metric(label=f"Peer rank (size {focus['Size band']})", value=f"{focus['Peer rank']} / {focus['Peer EDIHs']}",
+                  delta=float(focus["vs peer avg"]) if pd.notna(focus["vs peer avg"]) else None, border=True)
+        # st.metric("Number of organisations with completed DMA:", value=total_customers, delta=target_customers, border=True)
 
-        
-        # 3. kategorija - Digital experts upstream training
-        workforce_downstream = edu_summary[edu_summary["Education Type"] == "Digital experts upstream training"]
-        total_downstream= int(workforce_downstream["total_attendees"].sum())
-        target_downstream = 330
-
-
-        # Calculate percentage of the target achieved
-        total_edu = total_workforce + total_factroy + total_downstream
-        target_edu=  target_workforce + target_factroy + target_downstream
-        percentage_achieved = (total_edu / target_edu) * 100
-
-        fig_bootcamp_gauge = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=percentage_achieved,
-            delta={'reference': target_edu, 'position': "top"},
-            gauge={
-                'axis': {'range': [0, 100],'tickcolor': "lightgray"},
-                'bar': {'color': "red"},
-                'steps': [
-                    {'range': [0, 50], 'color': "lightgray"},
-                    {'range': [50, 75], 'color': "yellow"},
-                    {'range': [75, 100], 'color': "orange"},
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 80
-                }
-            },
-            title={'text': "EDU target achieved in %"}
-        ))
-        fig_bootcamp_gauge.update_layout(font = {'family': "Arial"}, height=300)
-        st.plotly_chart(fig_bootcamp_gauge, config={'displayModeBar': True, 'displaylogo': False})
-        st.metric("Workforce downstream trainings:", value=total_workforce, delta=target_workforce, border=True)   
-        st.metric("Digital Workforce learning factory:", value=total_factroy, delta=target_factroy, border=True)
-        st.metric("Digital experts upstream training:", value=total_downstream, delta=target_downstream, border=True)
-        st.metric("The average satisfaction:", value=4.63, delta=5, border=True)
-        st.metric("Participants recommending the trainings to others:", value=4.68, delta=5, border=True)
-        
-        edu_sme = edu_filtered[edu_filtered['Customer type'] == "SME"]
-        total_edu_sme= edu_sme["Customer"].nunique()
-        #st.write("Columns in edu_sme:", edu_sme.columns.tolist())
-        # total_edu_sme = edu_sme.groupby("Customer")["Customer"].nunique().count()        
-        st.metric("SME organisations participating:", value=total_edu_sme, delta=100, border=True)
-
-        edu_pso = edu_filtered[edu_filtered['Customer type'] == "PSO"]
-        total_edu_pso= edu_pso["Customer"].nunique()
-        #total_edu_pso = edu_pso.groupby("Customer")["Customer"].nunique().count()          
-        st.metric("PSO organisations participating:", value=total_edu_pso, delta=100, border=True)
-        
+    for _, kpi in kpis_for_page(kpi_results, analysis_type).iterrows():
+        if kpi["gauge"]:
+            show_chart(f"kpi_{kpi['id']}", kpi_versions, lambda: kpi_gauge(kpi), filters={"period": reporting_period})
+        if kpi["show_metric"]:
+            kpi_value = int(kpi["value"]) if float(kpi["value"]).is_integer() else round(kpi["value"], 2)
+            st.metric(kpi["label"], value=kpi_value, delta=kpi["target"], border=True)
 
 
 # Footer
+figure_stats = get_figure_cache().stats()
+st.sidebar.caption(
+    f"🗃️ Cache grafova: {figure_stats['hits']} pogodaka / {figure_stats['misses']} promašaja "
+    f"({figure_stats['hit_rate']:.0f}%), {figure_stats['entries']} grafova, "
+    f"{figure_stats['bytes'] / 1024 / 1024:.1f} / {figure_stats['max_bytes'] / 1024 / 1024:.0f} MB"
+)
+if geocode_worker is not None and geocode_worker.pending():
+    st.sidebar.caption(f"📍 Geokodiranje u tijeku: {geocode_worker.pending()} adresa u redu")
 # st.sidebar.info("EDIH ADRIA KPI Dashboard - KPIs will be continuously monitored to track progress, identify, and solve issues and adjust accordingly")
 st.sidebar.info("EDIH EU Data sync: 15.10.2025")
 # st.sidebar.warning("AI RAG Engine by Syntagent - UNIRI spin-off")
 # st.sidebar.image(app_folder + "/Slike/SyntAgent-red.png", width=250)
+
+# Kraj reruna; skriveni perf panel (?perf=1) samo uz admin lozinku iz secrets.toml
+perf.recorder.end_rerun(page=analysis_type)
+metrics.telemetry.session_seen(st.session_state["perf_session"], metrics.session_bytes(st.session_state.to_dict()))
+if st.query_params.get("perf") == "1" and st.secrets.get("admin_password"):
+    with st.expander("⏱️ Performance", expanded=True):
+        admin_password = st.text_input("Admin password", type="password", key="perf_admin_password")
+        if admin_password and hmac.compare_digest(admin_password, st.secrets["admin_password"]):
+            st.markdown("**Spans (p50 / p95, ms)**")
+            st.dataframe(perf.recorder.stats(), hide_index=True, use_container_width=True)
+            st.markdown("**Figure cache**")
+            st.dataframe(pd.DataFrame([figure_stats]).round(1), hide_index=True, use_container_width=True)
+            st.markdown("**Slowest reruns**")
+            st.dataframe(perf.recorder.slowest_reruns(), hide_index=True, use_container_width=True)
+            st.caption(f"JSON log: {settings.LOG_FILE}")
+
+            # Potrošnja OpenAI-ja iz knjige (ai_ledger.py) i unaprijed pripremljeni sažeci
+            ledger = get_ai_ledger()
+            st.markdown("**AI spend (USD)**")
+            budget = ledger.budget_status()
+            st.caption(f"Today: ${budget['spent_today']:.4f}"
+                       + (f" / ${budget['daily_budget']:.2f}" if budget["daily_budget"] else " (no daily budget)")
+                       + f" · per-user budget: {'$%.2f' % budget['user_budget'] if budget['user_budget'] else 'none'}"
+                       + f" · when exceeded: {budget['action']}")
+            spend_tabs = st.tabs(["By day", "By report", "By organisation", "By user"])
+            for tab, table in zip(spend_tabs, (ledger.cost_by_day(), ledger.cost_by_report(),
+                                               ledger.cost_by_organization(), ledger.cost_by_user())):
+                tab.dataframe(table, hide_index=True, use_container_width=True)
+            candidates = ledger.presummarize_candidates(SUMMARY_MODEL)
+            st.markdown("**Pre-summarize candidates** (queued first, then most requested / most expensive)")
+            st.dataframe(candidates, hide_index=True, use_container_width=True)
+            if len(candidates) and st.button("🧠 Pre-summarize candidates", key="presummarize"):
+                with st.spinner("Summarizing queued and frequently requested reports..."):
+                    done = 0
+                    for candidate in candidates.itertuples():
+                        if not candidate.document or not os.path.exists(candidate.document):
+                            continue
+                        if ledger.over_budget():
+                            st.warning("⛔ Daily AI budget reached - remaining reports stay queued.")
+                            break
+                        summarize_document(candidate.document, candidate.organization, user="presummarize")
+                        done += 1
+                st.success(f"✅ {done} report(s) summarized")
@@ -0,0 +1,243 @@
+# EDIH ADRIA analitika - agregati koje dijele dashboard i API
+# Funkcije primaju Services frame i njegove izvedene kolone (enrich.enrich_services)
+# i vraćaju gotove tablice, bez Streamlit i Plotly ovisnosti.
+
+import pandas as pd
+
+from enrich import DAP_CATEGORY, TBI_CATEGORY
+from identity import KEY_COLUMN
+from ranking import RANKING_COLUMNS, rank_edihs
+from spatial import hex_bins
+
+MAX_TECHNOLOGY_SEGMENTS = 7
+
+
+def numeric_view(data, derived):
+    """Services s numeričkim cijenama, brojem polaznika i dopunjenom regijom iz izvedenog framea."""
+    columns = [c for c in ('Service price, €', 'Number of attendees', 'Customer  region') if c in derived.columns]
+    return data.assign(**{c: derived[c] for c in columns})
+
+
+def _summary(data, by, extra=None, sort_by='total_revenue', ascending=False):
+    aggregations = dict(
+        total_services=('Content ID', 'count'),
+        total_revenue=('Service price, €', 'sum'),
+        **(extra or {})
+    )
+    return data.groupby(by).agg(**aggregations).reset_index().sort_values(by=sort_by, ascending=ascending)
+
+
+def technology_summary(services):
+    """Usluge po tehnologiji; manje zastupljene spojene u 'Other'."""
+    summary = _summary(services, 'Technology type used', dict(total_attendees=('Number of attendees', 'sum')))
+    if len(summary) > MAX_TECHNOLOGY_SEGMENTS:
+        top = summary.nlargest(MAX_TECHNOLOGY_SEGMENTS, "total_services")
+        others = summary.drop(top.index)
+        other_row = pd.DataFrame({
+            "Technology type used": ["Other"],
+            "total_services": [others["total_services"].sum()],
+            "total_revenue": [others["total_revenue"].sum()],
+            "total_attendees": [others["total_attendees"].sum()]
+        })
+        summary = pd.concat([top, other_row], ignore_index=True)
+    return summary
+
+
+def yearly_summary(services):
+    summary = _summary(services, 'Start Year', sort_by='Start Year', ascending=True)
+    summary["Start Year"] = summary["Start Year"].round().astype(int).astype(str)
+    return summary
+
+
+def service_overview(data, derived):
+    """Sve tablice stranice 'EDIH ADRIA Service Overview'."""
+    services = numeric_view(data, derived)
+    return {
+        "region": _summary(services, 'Customer  region'),
+        "category": _summary(services, 'Service category delivered'),
+        "technology": technology_summary(services),
+        "staff_size": _summary(services, 'Customer staff size'),
+        "yearly": yearly_summary(services),
+    }
+
+
+def _customers(data):
+    """Identitet korisnika: 'Customer key' (identity.py) ako ga frame ima, inače naziv."""
+    return data[KEY_COLUMN] if KEY_COLUMN in data.columns else data['Customer']
+
+
+def user_map_bins(data, coords, radius):
+    """Korisnici na karti u heksagonima radijusa `radius` (m).
+
+    `coords` (latitude/longitude) mogu biti za cijeli export; poravnavaju se s redovima `data`,
+    koji je za izvještajno razdoblje samo podskup.
+    """
+    coords = coords.reindex(data.index)
+    return hex_bins(
+        coords["latitude"], coords["longitude"], radius,
+        sums={"total_revenue": pd.to_numeric(data["Service price, €"], errors="coerce")},
+        unique={"customers": data["Customer"]},
+    ).round({"total_revenue": 0})
+
+
+def tbi_funnel(data):
+    """TBI → DAP/FCO lijevak: započeti TBI, završeni TBI, prelazak na DAP/FCO."""
+    category = data['Service category delivered']
+    customer = _customers(data)
+    is_tbi = category == TBI_CATEGORY
+
+    tbi_customers = pd.Index(customer[is_tbi].dropna().unique())
+    converted = tbi_customers.intersection(customer[category == DAP_CATEGORY].dropna().unique())
+    completed = customer[is_tbi & (data['Status'] == 'Completed')].nunique()
+    # Naziv za prikaz: prvi TBI red svakog korisnika koji je prešao na DAP/FCO
+    is_converted = is_tbi & customer.isin(converted)
+    converted_names = data.loc[is_converted, 'Customer'][~customer[is_converted].duplicated().to_numpy()]
+
+    funnel = pd.DataFrame({
+        'Stage': ['TBI Started', 'TBI Completed', 'Moved to DAP/FCO'],
+        'Count': [len(tbi_customers), completed, len(converted)],
+    })
+    return {
+        "funnel": funnel,
+        "tbi_customers": len(tbi_customers),
+        "converted": sorted(converted_names),
+        "conversion_rate": len(converted) / len(tbi_customers) * 100 if len(tbi_customers) else 0.0,
+    }
+
+
+def dap_funnel(data):
+    """DAP/FCO lijevak: korisnici DAP/FCO, završeni, s prethodnim TBI-jem."""
+    category = data['Service category delivered']
+    customer = _customers(data)
+    is_dap = category == DAP_CATEGORY
+    dap_customers = pd.Index(customer[is_dap].dropna().unique())
+    with_tbi = dap_customers.intersection(customer[category == TBI_CATEGORY].dropna().unique())
+    completed = customer[is_dap & (data['Status'] == 'Completed')].nunique()
+    return {
+        "funnel": pd.DataFrame({
+            'Stage': ['DAP/FCO Started', 'DAP/FCO Completed', 'With prior TBI'],
+            'Count': [len(dap_customers), completed, len(with_tbi)],
+        }),
+    }
+
+
+def education_tables(data, derived):
+    """Edukacije: polaznici po godini i tipu te po tečaju i tipu korisnika."""
+    services = numeric_view(data, derived).assign(**{'Education Type': derived['Education Type']})
+    education = services[services['Education Type'].notna()]
+
+    by_year = education.groupby(['Start Year', 'Education Type']).agg(
+        total_attendees=('Number of attendees', 'sum')
+    ).reset_index().rename(columns={'Education Type': 'Keyword'})
+    by_year['Start Year'] = by_year['Start Year'].astype(str)
+
+    by_course = education.groupby(["Education Type", "Customer type", "Short description of the service"]).agg(
+        num_customers=("Customer", "nunique"),
+        total_attendees=("Number of attendees", "sum"),
+        total_price=("Service price, €", "sum")
+    ).reset_index().sort_values(by="total_attendees", ascending=True)
+    return {"by_year": by_year, "by_course": by_course}
+
+
+def bootcamp_summary(data, derived):
+    services = numeric_view(data, derived)
+    summary = services[derived['Is Bootcamp']].groupby(['Start Year', 'Customer']).agg(
+        total_attendees=('Number of attendees', 'sum')
+    ).reset_index()
+    summary['Start Year'] = summary['Start Year'].astype(str)
+    return summary
+
+
+def _short_tbi_type(tbi_type):
+    return tbi_type.str.replace('TBI support - ', '', regex=False).str.replace('Test before invest - ', '', regex=False).str.title()
+
+
+def tbi_tables(data, derived):
+    """Tablice stranice 'TBI - Summary' (čovjek-dani iz enrich.enrich_services)."""
+    services = numeric_view(data, derived).assign(Mandays=derived['Mandays'], **{'TBI Type': derived['TBI Type']})
+    tbi = services[services['Service category delivered'] == TBI_CATEGORY]
+
+    summary = tbi.groupby(['Customer', 'Status'], as_index=False).agg(
+        total_price=('Service price, €', 'sum'),
+        total_mandays=('Mandays', 'sum')
+    )
+
+    start_year = pd.to_datetime(tbi['Start Date'], errors='coerce').dt.year
+    timeline = tbi.groupby(start_year.rename('Start Year')).agg(
+        total_services=('Customer', 'count'),
+        total_mandays=('Mandays', 'sum'),
+        unique_customers=('Customer', 'nunique')
+    ).reset_index()
+    timeline['Start Year'] = timeline['Start Year'].astype(int).astype(str)
+
+    typed = services[services['TBI Type'].notna()]
+    by_type = typed.groupby(["TBI Type", "Customer"]).agg(
+        total_price=("Service price, €", "sum"),
+        total_mandays=("Mandays", "sum")
+    ).reset_index()
+    by_type['TBI Type Short'] = _short_tbi_type(by_type['TBI Type'])
+
+    technology = typed.groupby("Technology type used").agg(
+        total_customers=("Customer", "nunique")
+    ).reset_index().sort_values(by="total_customers", ascending=True)
+
+    return {
+        "summary": summary,
+        "timeline": timeline,
+        "top_organizations": summary.nlargest(10, 'total_mandays').sort_values('total_mandays', ascending=True),
+        "by_type": by_type,
+        "technology": technology,
+    }
+
+
+def dap_tables(data, derived):
+    """Tablice stranice 'DAP&FCO - Summary'."""
+    services = numeric_view(data, derived).assign(Mandays=derived['Mandays'], **{'DAP&FCO Type': derived['DAP&FCO Type']})
+    dap = services[services['Service category delivered'] == DAP_CATEGORY]
+
+    summary = dap.groupby(["Customer", "Status"]).agg(
+        total_price=("Service price, €", "sum"),
+        total_mandays=("Mandays", "sum")
+    ).reset_index()
+
+    typed = services[services['DAP&FCO Type'].notna()]
+    by_type = typed.groupby(["DAP&FCO Type", "Customer"]).agg(
+        total_price=("Service price, €", "sum"),
+        total_mandays=("Mandays", "sum")
+    ).reset_index()
+    technology = typed.groupby("Technology type used").agg(
+        total_customers=("Customer", "nunique")
+    ).reset_index().sort_values(by="total_customers", ascending=True)
+    return {"summary": summary, "by_type": by_type, "technology": technology}
+
+
+STATE_AID_COLUMN = 'Amount of the service price to be reported as Aid of national or regional public nature, €'
+
+
+def state_aid_tables(data, ps_data, sme_data):
+    """Državne potpore: zahtjevi javnog sektora i poduzeća (Teams) te EU export."""
+    status = 'Započeto je pružanje usluge (DA/NE)'
+    ps = ps_data.assign(**{'Vrijednost usluge': pd.to_numeric(ps_data['Vrijednost usluge'], errors='coerce')})
+    sme = sme_data.assign(**{c: pd.to_numeric(sme_data[c], errors='coerce') for c in ('Vrijednost usluge', 'Iznos potpore')})
+
+    return {
+        "public_sector": ps.groupby(['Vrsta usluge', status]).agg(
+            total_value=('Vrijednost usluge', 'sum')
+        ).reset_index(),
+        "sme": sme.groupby(['Vrsta usluge', status]).agg(
+            total_value=('Vrijednost usluge', 'sum'),
+            total_support=('Iznos potpore', 'sum')
+        ).reset_index(),
+        "eu": data.groupby('Specific information on State Aid').agg(
+            total_services=('Content ID', 'count'),
+            total_aid=(STATE_AID_COLUMN, 'sum')
+        ).reset_index().sort_values(by='total_aid', ascending=False),
+    }
+
+
+def edih_ranking(edih_data, weights=None):
+    """EU EDIH-ovi po ključnim metrikama, najbolji (složeni rezultat, ranking.rank_edihs) prvi.
+
+    Svi EDIH-ovi s liste (i bez koordinata), isti skup i redoslijed kao rank_edihs s istim težinama.
+    """
+    return rank_edihs(edih_data, weights)[["EDIH Name", "Country"] + RANKING_COLUMNS]
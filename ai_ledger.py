@@ -0,0 +1,277 @@
+# EDIH ADRIA analitika - knjiga potrošnje OpenAI poziva (SQLite)
+# Svaki OCR i sažetak: model, tokeni, cijena, latencija, broj ponavljanja, hash dokumenta i
+# stranica, organizacija i korisnik. Iz knjige se računaju troškovi po izvještaju, organizaciji
+# i danu, provjeravaju dnevni budžeti i biraju dokumenti za unaprijed pripremljene sažetke.
+#
+#   python ai_ledger.py            # troškovi po danu, izvještaju i organizaciji
+
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from ingest import content_hash
+from settings import APP_FOLDER
+
+LEDGER_DB = os.environ.get("EDIH_LEDGER_DB", os.path.join(APP_FOLDER, "ai_ledger.sqlite"))
+# USD po milijun tokena (ulaz, izlaz); EDIH_AI_PRICES='{"model": [ulaz, izlaz]}' nadjačava
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "deepseek-chat": (0.27, 1.10),
+}
+MODEL_PRICES.update({model: tuple(price) for model, price in json.loads(os.environ.get("EDIH_AI_PRICES", "{}")).items()})
+# Dnevni budžeti u USD (0 = bez ograničenja); "stop" odbija posao, "queue" ga sprema za kasnije
+DAILY_BUDGET = float(os.environ.get("EDIH_AI_DAILY_BUDGET", "0"))
+USER_DAILY_BUDGET = float(os.environ.get("EDIH_AI_USER_BUDGET", "0"))
+BUDGET_ACTION = os.environ.get("EDIH_AI_BUDGET_ACTION", "stop")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    id INTEGER PRIMARY KEY,
+    ts TEXT NOT NULL,
+    day TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    model TEXT,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    cost REAL NOT NULL DEFAULT 0,
+    latency_ms REAL,
+    retries INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    doc_hash TEXT,
+    document TEXT,
+    page INTEGER,
+    organization TEXT,
+    user TEXT
+);
+CREATE INDEX IF NOT EXISTS calls_day ON calls (day, user);
+CREATE INDEX IF NOT EXISTS calls_doc ON calls (doc_hash);
+CREATE TABLE IF NOT EXISTS summaries (
+    doc_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    document TEXT,
+    organization TEXT,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (doc_hash, model)
+);
+CREATE TABLE IF NOT EXISTS deferred (
+    doc_hash TEXT PRIMARY KEY,
+    document TEXT,
+    organization TEXT,
+    user TEXT,
+    reason TEXT,
+    requested_at TEXT NOT NULL
+);
+"""
+
+_context = contextvars.ContextVar("edih_ai_context", default={})
+
+
+class BudgetExceeded(RuntimeError):
+    """Dnevni (ukupni ili korisnikov) budžet je potrošen."""
+
+
+def model_price(model):
+    """(ulaz, izlaz) USD po milijun tokena; API vraća i verziju (gpt-4o-mini-2024-07-18) pa vrijedi najduži prefiks."""
+    matches = [name for name in MODEL_PRICES if model and model.startswith(name)]
+    return MODEL_PRICES[max(matches, key=len)] if matches else (0.0, 0.0)
+
+
+def cost(model, prompt_tokens, completion_tokens):
+    """Cijena poziva u USD; nepoznat model = 0 (vidi se u knjizi kao model bez cijene)."""
+    input_price, output_price = model_price(model)
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def document_hash(source):
+    """Hash dokumenta: sadržaj datoteke za putanju, inače sam tekst."""
+    if isinstance(source, str) and os.path.isfile(source):
+        return content_hash(source)
+    return hashlib.sha1(str(source).encode("utf-8")).hexdigest()
+
+
+@contextmanager
+def ai_context(**fields):
+    """Dokument, organizacija i korisnik za sve pozive unutar bloka (document, doc_hash, organization, user)."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def current_context():
+    return dict(_context.get())
+
+
+def _today():
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+class AiLedger:
+    """Knjiga poziva, trajni cache sažetaka i red odgođenih poslova u jednoj SQLite bazi."""
+
+    def __init__(self, path=LEDGER_DB, daily_budget=DAILY_BUDGET, user_budget=USER_DAILY_BUDGET, action=BUDGET_ACTION):
+        self.path = path
+        self.daily_budget = daily_budget
+        self.user_budget = user_budget
+        self.action = action
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _query(self, sql, params=()):
+        with self._connect() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    # ── Zapis ─────────────────────────────────────────────────────────────
+    def record(self, operation, model, response=None, latency_ms=None, retries=0, status="ok", page=None):
+        """Jedan logički poziv (sa svim ponavljanjima); dokument i korisnik iz ai_context."""
+        usage = getattr(response, "usage", None)
+        prompt = getattr(usage, "prompt_tokens", None) or 0
+        completion = getattr(usage, "completion_tokens", None) or 0
+        model = getattr(response, "model", None) or model
+        context = current_context()
+        now = datetime.now(timezone.utc)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO calls (ts, day, operation, model, prompt_tokens, completion_tokens, cost, latency_ms, retries,"
+                " status, doc_hash, document, page, organization, user) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (now.isoformat(timespec="seconds"), now.date().isoformat(), operation, model, prompt, completion,
+                 cost(model, prompt, completion), latency_ms, retries, status, context.get("doc_hash"),
+                 context.get("document"), page, context.get("organization"), context.get("user")),
+            )
+
+    # ── Budžeti ───────────────────────────────────────────────────────────
+    def spent(self, day=None, user=None):
+        """Potrošnja (USD) za dan, ukupno ili jednog korisnika."""
+        sql, params = "SELECT COALESCE(SUM(cost), 0) FROM calls WHERE day = ?", [day or _today()]
+        if user is not None:
+            sql += " AND user = ?"
+            params.append(user)
+        with self._connect() as conn:
+            return conn.execute(sql, params).fetchone()[0]
+
+    def over_budget(self, user=None):
+        """Razlog ako je dnevni budžet (ukupni ili korisnikov) potrošen, inače None."""
+        if self.daily_budget and self.spent() >= self.daily_budget:
+            return f"daily AI budget of ${self.daily_budget:.2f} reached"
+        if self.user_budget and user is not None and self.spent(user=user) >= self.user_budget:
+            return f"your daily AI budget of ${self.user_budget:.2f} reached"
+        return None
+
+    def check(self, user=None):
+        """Podigni BudgetExceeded ako novi poziv nije dopušten."""
+        reason = self.over_budget(user if user is not None else current_context().get("user"))
+        if reason:
+            raise BudgetExceeded(reason)
+
+    def budget_status(self, user=None):
+        return {"spent_today": self.spent(), "daily_budget": self.daily_budget,
+                "user_spent_today": self.spent(user=user) if user else None, "user_budget": self.user_budget,
+                "action": self.action}
+
+    # ── Odgođeni poslovi (BUDGET_ACTION = "queue") ────────────────────────
+    def defer(self, reason):
+        """Zapamti dokument iz ai_contexta za obradu kad se budžet obnovi."""
+        context = current_context()
+        if not context.get("doc_hash"):
+            return
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO deferred VALUES (?, ?, ?, ?, ?, ?)",
+                (context["doc_hash"], context.get("document"), context.get("organization"), context.get("user"),
+                 reason, datetime.now(timezone.utc).isoformat(timespec="seconds")),
+            )
+
+    def deferred(self):
+        return self._query("SELECT * FROM deferred ORDER BY requested_at")
+
+    # ── Cache sažetaka ────────────────────────────────────────────────────
+    def cached_summary(self, doc_hash, model):
+        with self._connect() as conn:
+            row = conn.execute("SELECT summary FROM summaries WHERE doc_hash = ? AND model = ?", (doc_hash, model)).fetchone()
+        return row[0] if row else None
+
+    def store_summary(self, doc_hash, model, summary):
+        context = current_context()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?, ?)",
+                (doc_hash, model, summary, context.get("document"), context.get("organization"),
+                 datetime.now(timezone.utc).isoformat(timespec="seconds")),
+            )
+            conn.execute("DELETE FROM deferred WHERE doc_hash = ?", (doc_hash,))
+
+    # ── Pregledi ──────────────────────────────────────────────────────────
+    def _grouped(self, key, since=None):
+        where, params = ("WHERE day >= ?", [since]) if since else ("", [])
+        return self._query(
+            f"SELECT {key}, COUNT(*) AS calls, SUM(prompt_tokens) AS prompt_tokens,"
+            " SUM(completion_tokens) AS completion_tokens, ROUND(SUM(cost), 6) AS cost,"
+            " ROUND(AVG(latency_ms)) AS avg_latency_ms, SUM(retries) AS retries,"
+            " SUM(status != 'ok') AS failed"
+            f" FROM calls {where} GROUP BY {key} ORDER BY cost DESC",
+            params,
+        )
+
+    def cost_by_report(self, since=None):
+        return self._grouped("document, doc_hash", since)
+
+    def cost_by_organization(self, since=None):
+        return self._grouped("organization", since)
+
+    def cost_by_day(self, since=None):
+        return self._grouped("day", since).sort_values("day", ascending=False, ignore_index=True)
+
+    def cost_by_user(self, since=None):
+        return self._grouped("user", since)
+
+    def presummarize_candidates(self, model, limit=10):
+        """Dokumenti za unaprijed pripremljen sažetak: odgođeni i već obrađeni bez sažetka za `model`.
+
+        Poredak: odgođeni prvo, zatim po broju zahtjeva i dosadašnjem trošku dokumenta
+        (najtraženiji i najskuplji dokumenti najviše štede).
+        """
+        return self._query(
+            """
+            SELECT doc_hash, MAX(document) AS document, MAX(organization) AS organization,
+                   SUM(requests) AS requests, ROUND(SUM(cost), 6) AS cost, MAX(deferred) AS deferred
+            FROM (
+                SELECT doc_hash, document, organization, SUM(operation = 'summary') AS requests, SUM(cost) AS cost, 0 AS deferred
+                FROM calls WHERE doc_hash IS NOT NULL GROUP BY doc_hash
+                UNION ALL
+                SELECT doc_hash, document, organization, 0, 0, 1 FROM deferred
+            )
+            WHERE doc_hash NOT IN (SELECT doc_hash FROM summaries WHERE model = ?)
+            GROUP BY doc_hash ORDER BY MAX(deferred) DESC, SUM(requests) DESC, SUM(cost) DESC LIMIT ?
+            """,
+            (model, limit),
+        )
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Troškovi OpenAI poziva iz knjige (ai_ledger.sqlite).")
+    parser.add_argument("--since", help="od dana (YYYY-MM-DD)")
+    parser.add_argument("--db", default=LEDGER_DB)
+    args = parser.parse_args()
+
+    ledger = AiLedger(args.db)
+    with pd.option_context("display.max_rows", 50, "display.width", 160):
+        for title, table in (("Po danu", ledger.cost_by_day(args.since)),
+                             ("Po izvještaju", ledger.cost_by_report(args.since)),
+                             ("Po organizaciji", ledger.cost_by_organization(args.since))):
+            print(f"\n{title}\n{table.to_string(index=False) if len(table) else '-'}")
+        print(f"\nDanas: ${ledger.spent():.4f}" + (f" / ${ledger.daily_budget:.2f}" if ledger.daily_budget else ""))
@@ -0,0 +1,205 @@
+# EDIH ADRIA analitika - lagani JSON API uz dashboard
+# Pokretanje:  python api.py  (zadano http://127.0.0.1:8502)
+#
+#   GET /api/version?period=...           verzije skupova podataka i snapshotova (bez učitavanja)
+#   GET /api/kpis?period=...              svi KPI-jevi
+#   GET /api/overview?period=...          agregati stranice Service Overview
+#   GET /api/funnels?period=...           TBI → DAP/FCO i DAP/FCO lijevci
+#   GET /api/dma?dataset=sme_dma|pso_dma  DMA progresija
+#
+# Svaki odgovor ima ETag izveden iz verzija skupova podataka (najnoviji exporti, svi
+# exporti u Data/ i manifest snapshotova); uz If-None-Match
+# klijent dobiva 304 bez ikakvog računanja.
+
+import hashlib
+import json
+import sys
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from aggregates import dap_funnel, service_overview, tbi_funnel
+from datasets import current_versions, exports_version, load_current, slice_frames
+from dma_progression import build_progression
+from enrich import enrich_services
+from identity import CustomerIndex
+from kpis import KPI_FILE, evaluate_kpis, load_definitions
+from ingest import file_version
+from projection import required_columns
+from reporting import DATE_COLUMNS, REPORTING_PERIODS, period_bounds
+from settings import API_HOST, API_PORT, DATA_FOLDER, SNAPSHOT_FOLDER
+from snapshots import SnapshotStore
+
+store = SnapshotStore(SNAPSHOT_FOLDER)
+customers = CustomerIndex()
+ROUTES = {"/api/version", "/api/kpis", "/api/overview", "/api/funnels", "/api/dma"}
+DMA_ORG_COLUMNS = {"sme_dma": "SME name", "pso_dma": "PSO name"}
+# Stranice čije kolone ruta čita (projection.py); KPI kolone čitaju se uvijek
+ROUTE_PAGES = {
+    "/api/kpis": (),
+    "/api/overview": ("EDIH ADRIA Service Overview",),
+    "/api/funnels": ("TBI - Summary", "DAP&FCO - Summary"),
+    "/api/dma": ("DMA - Summary",),
+}
+
+
+def _records(df):
+    return json.loads(df.to_json(orient="records", date_format="iso", force_ascii=False))
+
+
+def _columns(route):
+    return required_columns(ROUTE_PAGES[route], load_definitions())
+
+
+@lru_cache(maxsize=1)
+def _sync_snapshots(exports):
+    """Stariji exporti postaju snapshotovi (store.as_of za ranija razdoblja); jednom po verziji Data/."""
+    return store.ingest_folder(DATA_FOLDER)
+
+
+@lru_cache(maxsize=8)
+def _base_frames(versions_key, route, kpi_version):
+    """Najnoviji skupovi podataka s kolonama rute; cache po verzijama (novi export = novi ključ)."""
+    return load_current(DATA_FOLDER, store, _columns(route), customers)
+
+
+@lru_cache(maxsize=32)
+def _period_frames(versions_key, period, route, kpi_version):
+    frames = _base_frames(versions_key, route, kpi_version)
+    start, end = period_bounds(period)
+    frames, _, unfiltered = slice_frames(frames, dict(versions_key), start, end, store,
+                                         columns=_columns(route), customer_index=customers)
+    frames["services_derived"] = enrich_services(frames["services"])
+    return frames, unfiltered
+
+
+@lru_cache(maxsize=64)
+def _payload(route, versions_key, period, dataset, kpi_version):
+    """Izračun odgovora; poziva se samo kad ETag ne odgovara."""
+    if route == "/api/version":
+        # Samo verzije iz stat() i manifesta snapshotova - bez čitanja i rezanja frameova
+        _, end = period_bounds(period)
+        snapshots = {name: store.version_as_of(name, end) for name in DATE_COLUMNS} if end is not None else {}
+        return {
+            "period": period,
+            "versions": dict(versions_key),
+            "snapshots_as_of": {name: version for name, version in snapshots.items() if version},
+            "periods": list(REPORTING_PERIODS),
+        }
+
+    frames, unfiltered = _period_frames(versions_key, period, route, kpi_version)
+    # Skupovi bez kolone s datumom nisu izrezani na razdoblje - klijent to vidi u odgovoru
+    meta = {"period": period, "unfiltered_datasets": unfiltered}
+
+    if route == "/api/kpis":
+        results = evaluate_kpis(frames, load_definitions(), period)
+        return {**meta, "kpis": _records(results.drop(columns=["thresholds"]))}
+
+    if route == "/api/overview":
+        overview = service_overview(frames["services"], frames["services_derived"])
+        return {**meta, **{name: _records(table) for name, table in overview.items()}}
+
+    if route == "/api/funnels":
+        tbi = tbi_funnel(frames["services"])
+        return {
+            **meta,
+            "tbi": {**tbi, "funnel": _records(tbi["funnel"])},
+            "dap_fco": {"funnel": _records(dap_funnel(frames["services"])["funnel"])},
+        }
+
+    if route == "/api/dma":
+        progression = build_progression(frames[dataset], DMA_ORG_COLUMNS[dataset])
+        stages, complete = progression.stage_completion()
+        cohort = progression.cohort_averages()
+        return {
+            "dataset": dataset,
+            **meta,
+            "organizations": len(progression.organizations),
+            "stage_completion": _records(stages),
+            "all_stages_completed": complete,
+            "cohort_averages": {
+                stage: dict(zip(progression.dimensions, [None if v != v else round(v, 2) for v in row]))
+                for stage, row in zip(progression.stages, cohort.tolist())
+            },
+            "most_improved": {
+                step: _records(progression.most_improved(*step.split("-"), n=10))
+                for step in ("T0-T1", "T0-T2", "T1-T2")
+            },
+        }
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "EDIHAnalitikaAPI/1.0"
+
+    def _send(self, status, body=None, etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if body is not None:
+            raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+        else:
+            self.end_headers()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        period = query.get("period", ["Full project"])[0]
+        # dataset bira samo DMA skup; ostale rute ga ignoriraju (i ne ulazi u njihov ETag)
+        dataset = query.get("dataset", ["sme_dma"])[0] if url.path == "/api/dma" else None
+
+        if url.path not in ROUTES:
+            return self._send(404, {"error": f"Unknown endpoint: {url.path}"})
+        if period not in REPORTING_PERIODS:
+            return self._send(400, {"error": f"Unknown period: {period}", "periods": list(REPORTING_PERIODS)})
+        if url.path == "/api/dma" and dataset not in DMA_ORG_COLUMNS:
+            return self._send(400, {"error": f"Unknown dataset: {dataset}", "datasets": list(DMA_ORG_COLUMNS)})
+
+        versions = current_versions(DATA_FOLDER)
+        exports = exports_version(DATA_FOLDER)
+        try:
+            _sync_snapshots(exports)
+        except OSError as e:
+            return self._send(500, {"error": f"Snapshotovi nisu ažurirani: {e}"})
+        # Ručna pravila korisnika mijenjaju ključeve u frameovima, a stariji exporti i snapshotovi
+        # (store.as_of u slice_frames) podatke razdoblja prije najnovijeg exporta - sve je dio verzije
+        versions_key = tuple(sorted({
+            **versions,
+            "customers": customers.version(),
+            "exports": exports,
+            "snapshots": store.version(),
+        }.items()))
+        kpi_version = file_version(KPI_FILE)
+        tag_source = json.dumps([url.path, versions_key, period, dataset, kpi_version])
+        etag = '"' + hashlib.sha1(tag_source.encode("utf-8")).hexdigest()[:20] + '"'
+
+        if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+            return self._send(304, etag=etag)
+
+        try:
+            body = _payload(url.path, versions_key, period, dataset, kpi_version)
+        except Exception as e:
+            return self._send(500, {"error": str(e)})
+        return self._send(200, body, etag=etag)
+
+    def log_message(self, format, *args):
+        sys.stderr.write("[api] " + format % args + "\n")
+
+
+def main(host=API_HOST, port=API_PORT):
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    print(f"EDIH Analitika API: http://{host}:{port}/api/kpis")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+# EDIH ADRIA analitika - benchmark učitavanja, izvedenih kolona, agregata stranica i KPI-jeva
+# Na sintetičkim exportima (synthetic.py) zadanih veličina mjeri svaki korak pipelinea
+# kroz koji prolazi rerun dashboarda; rezultati idu u JSON i uspoređuju se s baselineom.
+#
+#   python benchmark.py                                  # 1k, 100k i 1M redova Services exporta
+#   python benchmark.py --rows 1000 100000 --save-baseline
+#   python benchmark.py --baseline Benchmarks/baseline.json
+#   python benchmark.py --in-memory                      # bez Excela (brzo, bez koraka ingest:excel)
+#
+# Exporti se generiraju jednom po (redovi, seed) i ponovno koriste; zapis 1M redova u Excel traje minutama.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import synthetic
+from aggregates import (
+    bootcamp_summary, dap_funnel, dap_tables, education_tables, edih_ranking, service_overview, state_aid_tables,
+    tbi_funnel, tbi_tables,
+)
+from datasets import enable_copy_on_write, latest_paths, load_current
+from dma_progression import build_progression
+from enrich import enrich_services
+from esg import cohort_scores, compute_esg_scores, esg_matrix
+from heatmaps import band_matrix, score_band
+from ingest import clean_headers, clean_headers_strict, parse_service_dates, read_dataset, read_datasets
+from kpis import evaluate_kpis, load_definitions
+from projection import required_columns
+from ranking import RANKING_COLUMNS, country_rankings, rank_edihs
+from settings import APP_FOLDER
+from snapshots import SnapshotStore
+
+BENCH_FOLDER = os.environ.get("EDIH_BENCH_FOLDER", os.path.join(APP_FOLDER, "Benchmarks"))
+BASELINE_FILE = os.path.join(BENCH_FOLDER, "baseline.json")
+DEFAULT_ROWS = [1_000, 100_000, 1_000_000]
+# Sporije od baselinea za više od 20 % (i barem 5 ms) = regresija
+REGRESSION_RATIO = 1.2
+REGRESSION_MIN_MS = 5.0
+WARM_UP_ROWS = 200
+
+DMA_DATASETS = {"sme_dma": "SME name", "pso_dma": "PSO name"}
+
+
+def _dma_page(frames):
+    for dataset, org_column in DMA_DATASETS.items():
+        data = frames[dataset].rename(columns=lambda c: c.replace('"', '').strip())
+        progression = build_progression(data, org_column)
+        dimensions = list(progression.dimensions)
+        heatmap_data = data.dropna(subset=dimensions).assign(**{"Score band": lambda df: score_band(df["DMA Score"])})
+        for group_column in ("DMA Timing", "Score band"):
+            band_matrix(heatmap_data, group_column, dimensions)
+        progression.stage_completion()
+        for from_stage, to_stage in (("T0", "T1"), ("T0", "T2"), ("T1", "T2")):
+            progression.most_improved(from_stage, to_stage, n=10)
+        progression.cohort_averages()
+
+
+def _esg_page(frames):
+    for dataset in DMA_DATASETS:
+        scores = compute_esg_scores(frames[dataset], dataset)
+        esg_matrix(scores)
+        cohort_scores(scores)
+
+
+def _eu_page(frames):
+    band_matrix(edih_ranking(frames["edih_list"]), "Country", RANKING_COLUMNS)
+    country_rankings(rank_edihs(frames["edih_list"]))
+
+
+# Agregati koje stranica računa u jednom rerunu (bez crtanja grafova - vidi figure:* spanove u perf.py)
+PAGES = {
+    "EDIH ADRIA Service Overview": lambda f: service_overview(f["services"], f["services_derived"]),
+    "EU EDIH Comparison": _eu_page,
+    "Education - Summary": lambda f: education_tables(f["services"], f["services_derived"]),
+    "Bootcamp - Summary": lambda f: bootcamp_summary(f["services"], f["services_derived"]),
+    "TBI - Summary": lambda f: (tbi_tables(f["services"], f["services_derived"]), tbi_funnel(f["services"])),
+    "DAP&FCO - Summary": lambda f: (dap_tables(f["services"], f["services_derived"]), dap_funnel(f["services"])),
+    "State Aid - Summary": lambda f: state_aid_tables(f["services"], f["zahtjevi_ps"], f["zahtjevi_sme"]),
+    "DMA - Summary": _dma_page,
+    "ESG - Summary": _esg_page,
+}
+
+
+def timed(fn, repeat=1):
+    """(rezultat, najbolje vrijeme u ms) - minimum ponavljanja je najmanje osjetljiv na šum."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return result, best
+
+
+def data_folder(rows, seed):
+    """Mapa sa sintetičkim exportima za (redovi, seed); generira se samo prvi put."""
+    folder = os.path.join(BENCH_FOLDER, "data", f"{rows}-{seed}", "Data")
+    if not all(latest_paths(folder).values()):
+        print(f"  generiram exporte ({rows} redova) u {folder} …", flush=True)
+        synthetic.write_exports(folder, synthetic.generate_frames(rows, seed))
+    return folder
+
+
+def ingest_in_memory(rows, seed):
+    """Frameovi kakve vraća ingest.read_dataset, bez zapisa i čitanja Excela."""
+    frames = {}
+    for name, raw in synthetic.generate_frames(rows, seed).items():
+        raw = raw.copy()
+        frames[name] = parse_service_dates(clean_headers(raw)) if name == "services" else clean_headers_strict(raw)
+    return frames
+
+
+def run_size(rows, seed=0, repeat=3, in_memory=False):
+    """Trajanja (ms) po koraku za jednu veličinu Services exporta."""
+    timings = {}
+    if in_memory:
+        frames = ingest_in_memory(rows, seed)
+    else:
+        folder = data_folder(rows, seed)
+        frames = {}
+        for name, path in latest_paths(folder).items():
+            frames[name], timings[f"ingest:excel:{name}"] = timed(lambda: read_dataset(name, path))
+        # Isti exporti u process poolu (kao dashboard pri hladnom startu); EDIH_INGEST_WORKERS
+        _, timings["ingest:excel-parallel"] = timed(lambda: read_datasets(latest_paths(folder)))
+        # Drugo i svako sljedeće pokretanje čita Parquet snapshotove umjesto Excela
+        with tempfile.TemporaryDirectory() as snapshot_folder:
+            store = SnapshotStore(snapshot_folder)
+            _, timings["ingest:snapshot-build"] = timed(lambda: store.ingest_folder(folder))
+            frames, timings["ingest:snapshot"] = timed(lambda: load_current(folder, store), repeat)
+            # Samo kolone koje stranica deklarira (projection.py)
+            definitions = load_definitions()
+            for page in PAGES:
+                columns = required_columns([page], definitions)
+                _, timings[f"ingest:snapshot:{page}"] = timed(lambda: load_current(folder, store, columns), repeat)
+
+    frames["services_derived"], timings["enrich:services"] = timed(lambda: enrich_services(frames["services"]), repeat)
+    for page, aggregate in PAGES.items():
+        _, timings[f"page:{page}"] = timed(lambda: aggregate(frames), repeat)
+    definitions = load_definitions()
+    _, timings["kpis"] = timed(lambda: evaluate_kpis(frames, definitions), repeat)
+    return {name: round(ms, 3) for name, ms in timings.items()}
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"commit": commit or None, "python": platform.python_version(), "pandas": pd.__version__,
+            "numpy": np.__version__, "machine": platform.machine(), "cpus": os.cpu_count()}
+
+
+def compare(results, baseline, ratio=REGRESSION_RATIO, min_ms=REGRESSION_MIN_MS):
+    """Tablica korak × veličina: trajanje, baseline i omjer; regresije označene."""
+    rows = []
+    for size, timings in results["sizes"].items():
+        base = baseline.get("sizes", {}).get(size, {})
+        for step, ms in timings.items():
+            before = base.get(step)
+            change = ms / before if before else np.nan
+            rows.append({"rows": int(size), "step": step, "ms": ms, "baseline ms": before, "ratio": round(change, 2),
+                         "regression": bool(before and change > ratio and ms - before > min_ms)})
+    return pd.DataFrame(rows, columns=["rows", "step", "ms", "baseline ms", "ratio", "regression"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark EDIH pipelinea na sintetičkim exportima.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="veličine Services exporta")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="ponavljanja po koraku (uzima se najbolje)")
+    parser.add_argument("--in-memory", action="store_true", help="preskoči Excel; frameovi se generiraju u memoriji")
+    parser.add_argument("--baseline", help="JSON s rezultatima za usporedbu (zadano Benchmarks/baseline.json ako postoji)")
+    parser.add_argument("--save-baseline", action="store_true", help="spremi rezultate i kao novi baseline")
+    args = parser.parse_args()
+
+    enable_copy_on_write()
+    # Zagrijavanje: lijeni importi i prvi pozivi ne smiju ući u mjerenje prve veličine
+    run_size(WARM_UP_ROWS, args.seed, repeat=1, in_memory=True)
+    results = {"created": datetime.now().isoformat(timespec="seconds"), "in_memory": args.in_memory,
+               "environment": environment(), "sizes": {}}
+    for rows in args.rows:
+        print(f"{rows} redova …", flush=True)
+        results["sizes"][str(rows)] = run_size(rows, args.seed, args.repeat, args.in_memory)
+
+    os.makedirs(os.path.join(BENCH_FOLDER, "results"), exist_ok=True)
+    out = os.path.join(BENCH_FOLDER, "results", f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(results, fh, indent=2, ensure_ascii=False)
+    print(f"Rezultati: {out}")
+
+    baseline_file = args.baseline or (BASELINE_FILE if os.path.exists(BASELINE_FILE) else None)
+    baseline = {}
+    if baseline_file:
+        with open(baseline_file, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    table = compare(results, baseline)
+    with pd.option_context("display.max_rows", None, "display.width", 160):
+        print(table.pivot(index="step", columns="rows", values="ms"))
+        if table["baseline ms"].notna().any():
+            print("\nOmjer prema baselineu:")
+            print(table.pivot(index="step", columns="rows", values="ratio"))
+    if args.save_baseline:
+        with open(BASELINE_FILE, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2, ensure_ascii=False)
+        print(f"Baseline: {BASELINE_FILE}")
+
+    regressions = table[table["regression"]]
+    if len(regressions):
+        print("\nRegresije u odnosu na baseline:")
+        print(regressions.to_string(index=False))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
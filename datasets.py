@@ -0,0 +1,105 @@
+# EDIH ADRIA analitika - trenutni skupovi podataka izvan Streamlita
+# Najnoviji export svakog skupa podataka čita se preko snapshot storea (Parquet),
+# pa API i skripte dijele isti cache na disku kao i dashboard.
+
+import hashlib
+
+import pandas as pd
+
+from identity import NAME_COLUMNS, with_customer_keys
+from ingest import DATASETS, file_version, find_files, latest_file, read_dataset
+from reporting import DATE_COLUMNS, DateIndex, find_date_column, slice_period
+
+
+def session_view(df):
+    """Pogled jedne sesije na dijeljeni frame iz cachea.
+
+    Uz copy-on-write (pandas >= 3 uvijek, 2.x preko enable_copy_on_write) plitka kopija
+    dijeli podatke s originalom; kopira se tek stupac koji sesija promijeni.
+    """
+    return df.copy(deep=False) if df is not None else None
+
+
+def enable_copy_on_write():
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+
+
+def latest_paths(data_folder):
+    """Najnovija datoteka po skupu podataka (None ako ne postoji)."""
+    return {name: latest_file(data_folder, prefix) for name, (prefix, _) in DATASETS.items()}
+
+
+def current_versions(data_folder):
+    """Verzije najnovijih exporta - samo stat(), bez čitanja sadržaja."""
+    return {name: file_version(path) for name, path in latest_paths(data_folder).items()}
+
+
+def exports_version(data_folder):
+    """Otisak svih (i starijih) exporta u data_folderu - samo stat(); mijenja se s novim exportom
+    bilo kojeg razdoblja, pa pokriva i snapshotove koje slice_frames čita preko store.as_of."""
+    versions = [file_version(path) for prefix, _ in DATASETS.values() for path in find_files(data_folder, prefix)]
+    return hashlib.sha1(" ".join(versions).encode("utf-8")).hexdigest()[:12]
+
+
+def load_current(data_folder, store=None, columns=None, customer_index=None):
+    """Najnoviji skupovi podataka; uz store se Excel parsira samo prvi put (zatim Parquet).
+
+    `columns` je projekcija {naziv: (obavezne, neobavezne) | None} (projection.required_columns):
+    iz snapshota se čitaju samo te kolone, a Excel bez snapshota s usecols. Uz `customer_index`
+    (identity.CustomerIndex) skupovi s korisnicima dobivaju kolonu 'Customer key'.
+    """
+    frames = {}
+    for name, path in latest_paths(data_folder).items():
+        projection = (columns or {}).get(name) or (None, ())
+        if not path:
+            frames[name] = pd.DataFrame()
+            continue
+        entry = store.ingest(name, path) if store is not None else None
+        if entry is not None:
+            frames[name] = store.read(entry, *projection)
+        else:
+            frames[name] = read_dataset(name, path, *projection)
+        if customer_index is not None:
+            frames[name] = with_customer_keys(frames[name], name, customer_index)
+    return frames
+
+
+def slice_frames(frames, versions, start, end, store=None, index_for=None, columns=None, customer_index=None):
+    """Primijeni izvještajno razdoblje na sve skupove s datumom; vraća (frames, versions, unfiltered).
+
+    `unfiltered` su skupovi bez kolone s datumom (reporting.DATE_COLUMNS) - prikazuju se
+    u cijelosti, pa ih sučelje treba navesti uz odabrano razdoblje.
+
+    Ako razdoblje završava prije najnovijeg exporta, koristi se snapshot valjan na kraju
+    razdoblja (uz istu projekciju `columns` i `customer_index` kao load_current).
+    `index_for(frame, version, column)` omogućuje vanjski cache DateIndexa.
+    """
+    frames, versions, unfiltered = dict(frames), dict(versions), []
+    index_for = index_for or (lambda frame, version, column: DateIndex(frame[column]))
+
+    if end is not None and store is not None:
+        for name in DATE_COLUMNS:
+            snapshot_version = store.version_as_of(name, end)
+            if snapshot_version and snapshot_version != store.latest_version(name):
+                frames[name] = store.as_of(name, end, *((columns or {}).get(name) or (None, ())))
+                versions[name] = snapshot_version
+                if customer_index is not None:
+                    frames[name] = with_customer_keys(frames[name], name, customer_index)
+                    # Kao u dashboardu: ručna pravila korisnika su dio verzije skupova s korisnicima
+                    if name in NAME_COLUMNS:
+                        versions[name] = f"{snapshot_version}:{customer_index.version()}"
+
+    if start is not None or end is not None:
+        for name in DATE_COLUMNS:
+            frame = frames.get(name)
+            if frame is None or frame.empty:
+                continue
+            date_column = find_date_column(frame, DATE_COLUMNS[name])
+            if date_column is None:
+                unfiltered.append(name)
+                continue
+            frames[name] = slice_period(frame, index_for(frame, versions[name], date_column), start, end)
+            versions[name] = f"{versions[name]}@{start}:{end}"
+
+    return frames, versions, unfiltered
@@ -0,0 +1,126 @@
+# EDIH ADRIA analitika - DMA progresija T0 → T1 → T2
+# DMA rezultati (SME ili PSO) pivotiraju se jednom u numpy polje
+# (organizacija × faza × dimenzija); sve statistike računaju se vektorski iz njega.
+
+import numpy as np
+import pandas as pd
+
+STAGES = ("T0", "T1", "T2")
+ID_COLUMNS = ["DMA Timing", "EDIH Name", "DMA Score", "SME ID", "PSO ID", "SME name", "PSO name", "Customer key"]
+
+
+def dimension_columns(df):
+    """DMA dimenzije: numeričke kolone između 'DMA Score' i 'EDIH Name' (kao na heatmapi)."""
+    columns = list(df.columns)
+    if "DMA Score" in columns and "EDIH Name" in columns:
+        start, end = columns.index("DMA Score"), columns.index("EDIH Name")
+        candidates = columns[start + 1:end]
+    else:
+        candidates = [c for c in columns if c not in ID_COLUMNS]
+    numeric = df[candidates].apply(pd.to_numeric, errors="coerce")
+    return [c for c in candidates if numeric[c].notna().any()]
+
+
+class DmaProgression:
+    """Vrijednosti DMA dimenzija u polju oblika (organizacija, faza, dimenzija); NaN = nema procjene."""
+
+    def __init__(self, organizations, dimensions, values, scores):
+        self.organizations = organizations
+        self.stages = STAGES
+        self.dimensions = dimensions
+        self.values = values
+        self.scores = scores
+        self._org_index = {org: i for i, org in enumerate(organizations)}
+
+    # ── Pomoćne ───────────────────────────────────────────────────────────
+    def _stage(self, stage):
+        return self.stages.index(stage)
+
+    def has_stage(self):
+        """Bool polje (organizacija, faza): postoji li procjena u toj fazi."""
+        return ~np.isnan(self.values).all(axis=2)
+
+    # ── Statistike ────────────────────────────────────────────────────────
+    def deltas(self, from_stage="T0", to_stage="T1"):
+        """Promjena po dimenziji (organizacija × dimenzija); NaN ako neka faza nedostaje."""
+        return self.values[:, self._stage(to_stage)] - self.values[:, self._stage(from_stage)]
+
+    def improvement_rates(self, from_stage="T0", to_stage="T1"):
+        """Relativna promjena po dimenziji u odnosu na početnu fazu."""
+        base = self.values[:, self._stage(from_stage)]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rates = self.deltas(from_stage, to_stage) / base
+        rates[~np.isfinite(rates)] = np.nan
+        return rates
+
+    def cohort_averages(self):
+        """Prosjek kohorte po fazi i dimenziji (faza × dimenzija)."""
+        counts = (~np.isnan(self.values)).sum(axis=0)
+        sums = np.nansum(self.values, axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    def stage_completion(self):
+        """Broj organizacija s procjenom po fazi i udio organizacija koje su prošle sve faze."""
+        present = self.has_stage()
+        counts = present.sum(axis=0)
+        stats = pd.DataFrame({"Stage": list(self.stages), "Organizations": counts})
+        stats["Share (%)"] = (counts / max(len(self.organizations), 1) * 100).round(1)
+        complete = int(present.all(axis=1).sum())
+        return stats, complete
+
+    def most_improved(self, from_stage="T0", to_stage="T1", n=10):
+        """Rang organizacija prema prosječnom porastu dimenzija između dvije faze."""
+        deltas = self.deltas(from_stage, to_stage)
+        valid = ~np.isnan(deltas).all(axis=1)
+        if not valid.any():
+            return pd.DataFrame(columns=["Organization", "Average delta", "Improved dimensions", "DMA Score delta"])
+
+        deltas = deltas[valid]
+        score_delta = (self.scores[:, self._stage(to_stage)] - self.scores[:, self._stage(from_stage)])[valid]
+        ranking = pd.DataFrame({
+            "Organization": np.asarray(self.organizations, dtype=object)[valid],
+            "Average delta": np.nanmean(deltas, axis=1).round(1),
+            "Improved dimensions": (deltas > 0).sum(axis=1),
+            "DMA Score delta": score_delta.round(1),
+        })
+        return ranking.sort_values("Average delta", ascending=False).head(n).reset_index(drop=True)
+
+    def organization_frame(self, organization):
+        """Faze × dimenzije za jednu organizaciju (samo faze s procjenom)."""
+        idx = self._org_index.get(organization)
+        if idx is None:
+            return pd.DataFrame(columns=self.dimensions)
+        frame = pd.DataFrame(self.values[idx], index=list(self.stages), columns=self.dimensions)
+        return frame.dropna(how="all")
+
+
+def build_progression(df, org_column, dimensions=None):
+    """Pivotira DMA rezultate u DmaProgression (jedan prolaz, bez petlji po organizacijama)."""
+    dimensions = list(dimensions) if dimensions is not None else dimension_columns(df)
+    empty = DmaProgression([], dimensions, np.empty((0, len(STAGES), len(dimensions))), np.empty((0, len(STAGES))))
+    if org_column not in df.columns or "DMA Timing" not in df.columns:
+        return empty
+
+    timing = df["DMA Timing"].astype(str).str.strip().str.upper()
+    stage_codes = timing.map({stage: i for i, stage in enumerate(STAGES)})
+    mask = stage_codes.notna() & df[org_column].notna()
+    if not mask.any():
+        return empty
+
+    # Više zapisa iste organizacije u istoj fazi: ostaje prvi (kao .iloc[0] u staroj verziji)
+    rows = df.loc[mask].assign(**{"DMA Timing": stage_codes[mask].to_numpy(dtype=np.intp)})
+    rows = rows.drop_duplicates([org_column, "DMA Timing"], keep="first")
+
+    org_codes, organizations = pd.factorize(rows[org_column], sort=True)
+    stage_codes = rows["DMA Timing"].to_numpy()
+    matrix = rows[dimensions].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    score = pd.to_numeric(rows["DMA Score"], errors="coerce").to_numpy(dtype=float) \
+        if "DMA Score" in rows.columns else np.full(len(org_codes), np.nan)
+
+    values = np.full((len(organizations), len(STAGES), len(dimensions)), np.nan)
+    scores = np.full((len(organizations), len(STAGES)), np.nan)
+    values[org_codes, stage_codes] = matrix
+    scores[org_codes, stage_codes] = score
+
+    return DmaProgression(list(organizations), dimensions, values, scores)
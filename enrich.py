@@ -0,0 +1,78 @@
+# EDIH ADRIA analitika - izvedene kolone za Services export
+# Izvedene kolone vraćaju se kao zaseban frame (isti indeks) da se dijeljeni
+# frame iz cachea nikad ne mijenja.
+
+import numpy as np
+import pandas as pd
+
+from gazetteer import REGION_COLUMN, fill_regions
+from geocoding import address_column, coordinate_columns
+
+TBI_CATEGORY = "Test before invest"
+DAP_CATEGORY = "Support to find investment"
+TRAINING_CATEGORY = "Training and skills development"
+
+# Od 1.2.2025. čovjek-dan TBI usluge vrijedi 1250 € umjesto 1000 €
+MANDAY_CUTOFF = pd.Timestamp("2025-02-01")
+MANDAY_PRICE = 1000
+MANDAY_PRICE_AFTER_CUTOFF = 1250
+
+EDUCATION_KEYWORDS = [
+    "Downstream employee training",
+    "Digital workforce learning factory",
+    "Workforce downstream trainings",
+    "Digital experts upstream training",
+]
+
+TBI_KEYWORDS = [
+    "TBI support - new products and services",
+    "TBI support - digital transformation",
+    "Test before invest - digital innovation",
+    "Test before invest",
+]
+
+DAP_KEYWORDS = [
+    "DAP - digitalisation action plan",
+    "FCO assessment",
+    "Digital transformation project",
+]
+
+NUMERIC_COLUMNS = ['Content ID', 'Service price, €', 'Number of attendees']
+
+
+def first_keyword(text, keywords):
+    """Prvi ključni pojam (redoslijed liste) sadržan u tekstu - vektorski, bez apply po retku."""
+    lowered = text.fillna("").astype(str).str.lower()
+    conditions = [lowered.str.contains(k.lower(), regex=False) for k in keywords]
+    if not conditions:
+        return pd.Series(None, index=text.index, dtype=object)
+    labels = np.select(conditions, keywords, default="")
+    return pd.Series(labels, index=text.index).replace("", None)
+
+
+def enrich_services(data):
+    """Izvedene kolone Services exporta: numeričke vrijednosti, čovjek-dani i tipovi usluga."""
+    derived = pd.DataFrame(index=data.index)
+    for col in NUMERIC_COLUMNS:
+        if col in data.columns:
+            derived[col] = pd.to_numeric(data[col], errors='coerce')
+
+    category = data.get('Service category delivered', pd.Series(None, index=data.index))
+    description = data.get('Short description of the service', pd.Series(None, index=data.index))
+    start = pd.to_datetime(data.get('Start Date', pd.Series(pd.NaT, index=data.index)), errors='coerce')
+    price = derived.get('Service price, €', pd.Series(np.nan, index=data.index))
+
+    # TBI čovjek-dani ovise o datumu početka, ostale usluge po 1000 €
+    tbi_rate = np.where(start >= MANDAY_CUTOFF, MANDAY_PRICE_AFTER_CUTOFF, MANDAY_PRICE).astype(float)
+    tbi_rate[start.isna().to_numpy()] = np.nan
+    derived['Mandays'] = np.where(category == TBI_CATEGORY, price / tbi_rate, price / MANDAY_PRICE)
+
+    derived['Education Type'] = first_keyword(description, EDUCATION_KEYWORDS)
+    derived['TBI Type'] = first_keyword(description, TBI_KEYWORDS)
+    derived['DAP&FCO Type'] = first_keyword(description, DAP_KEYWORDS)
+    derived['Is Bootcamp'] = description.fillna("").astype(str).str.contains("bootcamp", case=False, regex=False)
+
+    # Prazna regija korisnika dopunjuje se iz offline gazetteera (naselje u adresi ili koordinate)
+    if REGION_COLUMN in data.columns and data[REGION_COLUMN].isna().any():
+        derived[REGION_COLUMN] = fill_regions(data, address_column(data), *coordinate_columns(data))
+    return derived
@@ -0,0 +1,97 @@
+# EDIH ADRIA analitika - ESG rezultati iz DMA dimenzija
+# ESG se računa kao zasebna izvedena tablica (ne dira DMA frameove iz cachea),
+# vektorski preko dimenzija, s težinama po dimenziji i po stupu.
+
+import numpy as np
+import pandas as pd
+
+PILLARS = ("Environment", "Society", "Governance")
+
+# Dimenzije po stupu s težinama (relativne težine unutar stupa)
+ESG_DIMENSIONS = {
+    "sme_dma": {
+        "org_column": "SME name",
+        "Environment": {"Green Digitalisation": 1.0},
+        "Society": {
+            "Digital Business Strategy": 1.0,
+            "Digital Readiness": 1.0,
+            "Human-Centric Digitalisation": 1.0,
+        },
+        "Governance": {
+            "Data Governance": 1.0,
+            "Automation & Artificial Intelligence": 1.0,
+        },
+    },
+    "pso_dma": {
+        "org_column": "PSO name",
+        "Environment": {"Green Digitalisation": 1.0},
+        "Society": {
+            "Digital Strategy and Investments": 1.0,
+            "Digital Readiness": 1.0,
+            "Human-Centric Digitalisation": 1.0,
+        },
+        "Governance": {
+            "Data Management and Security": 1.0,
+            "Interoperability": 1.0,
+        },
+    },
+}
+
+# Težine stupova za ukupni ESG rezultat
+PILLAR_WEIGHTS = {"Environment": 1.0, "Society": 1.0, "Governance": 1.0}
+
+
+def weighted_mean(values, weights):
+    """Težinski prosjek po retcima koji preskače NaN (težine nedostajućih vrijednosti se ne broje)."""
+    values = np.asarray(values, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    present = ~np.isnan(values)
+    total_weight = (present * weights).sum(axis=1)
+    weighted = (np.where(present, values, 0.0) * weights).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(total_weight > 0, weighted / total_weight, np.nan)
+
+
+def compute_esg_scores(df, dataset, dimensions=None, pillar_weights=None):
+    """Izvedena ESG tablica: organizacija, DMA faza, Environment/Society/Governance i ukupni ESG."""
+    config = dimensions or ESG_DIMENSIONS[dataset]
+    org_column = config["org_column"]
+    if org_column not in df.columns:
+        return pd.DataFrame(columns=["Organization", "DMA Timing", *PILLARS, "ESG"])
+
+    scores = pd.DataFrame({"Organization": df[org_column].to_numpy()})
+    scores["DMA Timing"] = df["DMA Timing"].to_numpy() if "DMA Timing" in df.columns else None
+
+    for pillar in PILLARS:
+        columns = [c for c in config[pillar] if c in df.columns]
+        if not columns:
+            scores[pillar] = np.nan
+            continue
+        values = df[columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        scores[pillar] = weighted_mean(values, [config[pillar][c] for c in columns])
+
+    scores["ESG"] = composite_score(scores, pillar_weights)
+    return scores.dropna(subset=["Organization"]).reset_index(drop=True)
+
+
+def composite_score(scores, pillar_weights=None):
+    """Ukupni ESG iz stupova s konfigurabilnim težinama (jeftino - koristi već izračunate stupove)."""
+    weights = pillar_weights or PILLAR_WEIGHTS
+    return weighted_mean(scores[list(PILLARS)].to_numpy(dtype=float), [weights[p] for p in PILLARS])
+
+
+def esg_matrix(scores, stage=None):
+    """Matrica (organizacija × stup) za heatmap; po organizaciji zadnja dostupna faza ili zadana faza."""
+    subset = scores
+    if stage is not None:
+        subset = subset[subset["DMA Timing"] == stage]
+    subset = subset.dropna(subset=list(PILLARS))
+    if "DMA Timing" in subset.columns:
+        subset = subset.sort_values("DMA Timing", na_position="first")
+    matrix = subset.drop_duplicates("Organization", keep="last").set_index("Organization")[list(PILLARS)]
+    return matrix.sort_index()
+
+
+def cohort_scores(scores, by="DMA Timing"):
+    """Prosječni ESG stupovi po kohorti (zadano po DMA fazi)."""
+    return scores.groupby(by)[[*PILLARS, "ESG"]].mean().round(1)
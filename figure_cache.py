@@ -0,0 +1,82 @@
+# EDIH ADRIA analitika - cache Plotly grafova
+# Graf se čuva kao serijalizirani JSON pod ključem (stranica, graf, verzija podataka, filteri),
+# pa se pri rerunu zbog nepovezanog widgeta ne gradi ponovno. LRU s ograničenjem u bajtovima.
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+FIGURE_CACHE_BYTES = int(os.environ.get("EDIH_FIGURE_CACHE_MB", "64")) * 1024 * 1024
+
+
+def figure_key(page, chart_id, version, filters=None):
+    """Ključ grafa; filteri (vrijednosti widgeta o kojima graf ovisi) kao sortirani JSON."""
+    return (page, chart_id, str(version), json.dumps(filters, sort_keys=True, default=str, ensure_ascii=False))
+
+
+class FigureCache:
+    """Dijeljeni (među sesijama) LRU cache serijaliziranih grafova."""
+
+    def __init__(self, max_bytes=FIGURE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            spec = self._entries.get(key)
+            if spec is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return spec
+
+    def put(self, key, spec):
+        nbytes = len(spec)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            self._entries[key] = spec
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def figure(self, key, build):
+        """Graf iz cachea ili build() kod promašaja; vraća go.Figure."""
+        spec = self.get(key)
+        if spec is None:
+            spec = pio.to_json(build(), validate=False)
+            self.put(key, spec)
+        # JSON je validiran pri izgradnji - ponovna validacija košta koliko i sama izgradnja
+        return go.Figure(json.loads(spec), _validate=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total * 100 if total else 0.0,
+            }
@@ -0,0 +1,506 @@
+# EDIH ADRIA analitika - Plotly grafovi
+# Builderi primaju gotove tablice (aggregates.py) i vraćaju go.Figure; bez Streamlita,
+# pa ih dijele dashboard i statički izvještaj (report.py).
+
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# 🌈 GLOBALNA PLOTLY TEMA (EDIH vizualni identitet)
+pio.templates["edih_theme"] = pio.templates["plotly_white"]
+
+# Podešavanje boja i fontova
+pio.templates["edih_theme"].layout.update(
+    font=dict(family="Arial, sans-serif", size=14, color="#333333"),
+    title=dict(font=dict(size=20, color="#222222"), x=0.02, xanchor="left"),
+    paper_bgcolor="white",
+    plot_bgcolor="white",
+    margin=dict(l=60, r=40, t=80, b=60),
+    coloraxis_colorbar=dict(title_font=dict(size=14)),
+    legend=dict(
+        orientation="h",
+        yanchor="bottom",
+        y=-0.25,
+        xanchor="center",
+        x=0.5,
+        font=dict(size=13)
+    )
+)
+
+# Zadana kvalitativna (kategorijska) paleta — harmonična i visoko kontrastna
+default_colors = px.colors.qualitative.Vivid  # alternativno: Plotly, Bold, Prism
+EDIH_CONTINUOUS_SCALE = "Tealgrn"  # ili "Agsunset", "Tealgrn", "Blues", "Viridis"
+
+# Aktiviraj EDIH temu globalno
+pio.templates.default = "edih_theme"
+
+
+def _shorten_label(label, max_length=25):
+    return label if len(label) <= max_length else label[:max_length] + "…"
+
+
+# --- EDIH ADRIA Service Overview ---
+
+def services_bar(summary, x, title, label, colored=True):
+    fig = px.bar(
+        summary,
+        x=x,
+        y='total_services',
+        title=title,
+        labels={'total_services': 'Number of Services', x: label},
+        text='total_services',
+        **(dict(color="total_services", color_continuous_scale=EDIH_CONTINUOUS_SCALE) if colored else {})
+    )
+    fig.update_traces(textposition='outside')
+    return fig
+
+
+def technology_pie(technology_summary):
+    summary = technology_summary.assign(**{"Short Label": technology_summary["Technology type used"].apply(_shorten_label)})
+    fig = px.pie(
+        summary,
+        names='Short Label',
+        values='total_services',
+        hover_name="Technology type used",  # puni naziv u tooltipu
+        title='Technologies applied in EDIH ADRIA Services',
+        color_discrete_sequence=px.colors.qualitative.Vivid,
+        hole=0.4
+    )
+    fig.update_traces(
+        textinfo="label+percent",
+        textposition="outside",
+        showlegend=False,
+        pull=[0.05]*len(summary),  # malo izvuci segmente radi preglednosti
+    )
+    fig.update_layout(
+        uniformtext_minsize=10,
+        uniformtext_mode="hide",
+        margin=dict(t=80, b=60, l=40, r=40),
+        height=600
+    )
+    return fig
+
+
+def yearly_bar(yearly_summary):
+    fig = px.bar(
+        yearly_summary,
+        x='Start Year',
+        y='total_services',
+        title='Delivered Services by Year',
+        color="total_services",
+        color_continuous_scale=EDIH_CONTINUOUS_SCALE,
+        labels={'total_services': 'Number of Services', 'Start Year': 'Year'},
+        text='total_services'
+    )
+    # Ručno postavi da je osa kategorička i da se prikazuje po redu godina
+    fig.update_xaxes(type="category", categoryorder="array",
+                     categoryarray=sorted(yearly_summary["Start Year"].unique()))
+    return fig
+
+
+OVERVIEW_CHARTS = {
+    "region": lambda t: services_bar(t, 'Customer  region', 'Delivered Services by Region', 'Region', colored=False),
+    "category": lambda t: services_bar(t, 'Service category delivered', 'Delivered Services by Category', 'Category'),
+    "technology": technology_pie,
+    "staff_size": lambda t: services_bar(t, 'Customer staff size', 'Delivered Services by Customer Staff Size', 'Staff Size'),
+    "yearly": yearly_bar,
+}
+
+
+def overview_figures(overview):
+    """Grafovi stranice Service Overview po ključu tablice iz aggregates.service_overview."""
+    return {key: build(overview[key]) for key, build in OVERVIEW_CHARTS.items()}
+
+
+# --- Heatmapovi (EU EDIH Comparison, DMA) ---
+
+def matrix_heatmap(matrix, title, colorscale="viridis", colorbar_title="Score", x_title=None, y_title=None):
+    """Heatmap matrice (redovi × stupci); visina ovisi o broju redova, bez teksta po ćeliji.
+
+    Očekuje već agregiranu ili izrezanu matricu (heatmaps.band_matrix / heatmaps.window).
+    """
+    fig = go.Figure(go.Heatmap(
+        z=matrix.to_numpy(dtype=float),
+        x=[str(c) for c in matrix.columns],
+        y=[str(i) for i in matrix.index],
+        colorscale=colorscale,
+        colorbar=dict(title=colorbar_title),
+        hovertemplate="%{y}<br>%{x}: %{z:.1f}<extra></extra>",
+        xgap=1,
+        ygap=1
+    ))
+    fig.update_layout(
+        title=title,
+        height=160 + 24 * len(matrix),
+        xaxis=dict(title=x_title, side="top", tickangle=-30),
+        yaxis=dict(title=y_title, autorange="reversed", automargin=True),
+        margin=dict(t=140)
+    )
+    return fig
+
+
+# --- Education / Bootcamp ---
+
+def education_by_year(education_summary):
+    return px.bar(
+        education_summary,
+        x='Start Year',
+        y='total_attendees',
+        color='Keyword',
+        title="Number of attendees by Delivered Education Type",
+        labels={'total_attendees': 'Number of Attendees', 'Start Year': 'Year', 'Keyword': 'Training Type'},
+    )
+
+
+def education_by_course(edu_summary):
+    return px.bar(
+        edu_summary,
+        x="total_attendees",
+        y="Short description of the service",
+        color="Education Type",
+        title="Delivered Education by Course",
+        labels={"total_attendees": "Total Attendees", "Short description of the service": "Service Type", "Education Type": "Education Type"},
+        barmode="group",
+        orientation='h',
+        height=800
+    )
+
+
+def bootcamp_by_year(bootcamp_summary):
+    return px.bar(
+        bootcamp_summary,
+        x='Start Year',
+        y='total_attendees',
+        title="Bootcamp Participants by Year",
+        labels={'total_attendees': 'Number of Attendees', 'Start Year': 'Year', 'Customer': 'Organization'},
+    )
+
+
+# --- TBI ---
+
+def tbi_timeline(timeline):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=timeline['Start Year'],
+        y=timeline['total_mandays'],
+        name='Total Mandays',
+        mode='lines+markers',
+        line=dict(color='#2E7D32', width=3),
+        marker=dict(size=10)
+    ))
+    fig.add_trace(go.Bar(
+        x=timeline['Start Year'],
+        y=timeline['total_services'],
+        name='Number of Services',
+        yaxis='y2',
+        marker_color='#FFA726',
+        opacity=0.6
+    ))
+    fig.update_layout(
+        title='TBI Trend Over Time',
+        xaxis=dict(title='Year', type='category'),
+        yaxis=dict(title='Total Mandays', side='left'),
+        yaxis2=dict(title='Number of Services', side='right', overlaying='y'),
+        hovermode='x unified',
+        height=500
+    )
+    return fig
+
+
+def tbi_top_organizations(top_tbi_orgs):
+    fig = px.bar(
+        top_tbi_orgs,
+        x='total_mandays',
+        y='Customer',
+        orientation='h',
+        color='total_mandays',
+        color_continuous_scale=EDIH_CONTINUOUS_SCALE,
+        title='Top 10 Organizations by TBI Mandays',
+        labels={'total_mandays': 'Total Mandays', 'Customer': 'Organization'},
+        text='total_mandays',
+        height=500
+    )
+    fig.update_traces(texttemplate='%{text:.1f}', textposition='outside')
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+def conversion_funnel(funnel_data, title='TBI to DAP/FCO Conversion Funnel'):
+    fig = go.Figure(go.Funnel(
+        y=funnel_data['Stage'],
+        x=funnel_data['Count'],
+        textinfo="value+percent initial",
+        marker=dict(color=["#4CAF50", "#FFA726", "#2196F3"])
+    ))
+    fig.update_layout(title=title, height=400)
+    return fig
+
+
+def journey_funnel(funnel_data, title='Customer Journey Funnel'):
+    """Lijevak puta korisnika (journey.Journey.funnel) - jedna boja po fazi."""
+    fig = go.Figure(go.Funnel(
+        y=funnel_data['Stage'],
+        x=funnel_data['Count'],
+        textinfo="value+percent initial+percent previous",
+        marker=dict(color=default_colors[:len(funnel_data)])
+    ))
+    fig.update_layout(title=title, height=450)
+    return fig
+
+
+def stage_durations(durations):
+    """Raspodjela dana između uzastopnih faza puta (journey.Journey.durations)."""
+    fig = px.box(durations, x="Days", y="Transition", color="Transition", points=False,
+                 color_discrete_sequence=default_colors, title="Days Between Journey Stages")
+    fig.update_layout(height=400, showlegend=False, yaxis_title=None)
+    return fig
+
+
+def tbi_status_pie(tbi_summary):
+    return px.pie(
+        tbi_summary,
+        names="Status",
+        values="total_price",
+        color="Status",
+        color_discrete_sequence=px.colors.qualitative.Vivid,  # Koristi diskretnu paletu
+        title="Work Completion Percentage by Status",
+        labels={"total_price": "Total Service Value (€)"},
+        hole=0.4
+    )
+
+
+def tbi_value_by_customer(tbi_summary_sorted):
+    fig = px.bar(
+        tbi_summary_sorted,
+        y="Customer",
+        x="total_price",
+        color="Status",
+        orientation='h',
+        title="Test Before Invest - Service Value by Customer and Status",
+        labels={
+            "total_price": "Total Service Value (€)",
+            "Customer": "Organization"
+        },
+        barmode="stack",
+        height=max(400, len(tbi_summary_sorted) * 25),  # Dinamička visina
+        color_discrete_sequence=px.colors.qualitative.Vivid,
+        text_auto='.0f'
+    )
+    fig.update_layout(
+        xaxis_title="Service Value (€)",
+        yaxis_title="",
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        margin=dict(l=200, r=40, t=80, b=60)  # Više mjesta za nazive
+    )
+    return fig
+
+
+def tbi_type_sunburst(tbi_type_summary):
+    fig = px.sunburst(
+        tbi_type_summary,
+        path=['TBI Type Short', 'Customer'],
+        values='total_mandays',
+        color='total_mandays',
+        color_continuous_scale=EDIH_CONTINUOUS_SCALE,
+        title='TBI Types and Customers - Interactive Hierarchy',
+        hover_data={
+            'total_mandays': ':.1f',
+            'total_price': ':.0f'
+        },
+        height=700
+    )
+    fig.update_traces(
+        textinfo="label+percent parent",
+        hovertemplate='<b>%{label}</b><br>Mandays: %{value:.1f}<br>Percent: %{percentParent}<extra></extra>'
+    )
+    fig.update_layout(margin=dict(t=80, l=0, r=0, b=0))
+    return fig
+
+
+def customers_by_technology(tech_summary, title, colored=True):
+    return px.bar(
+        tech_summary,
+        x="total_customers",
+        y="Technology type used",
+        title=title,
+        labels={"total_customers": "Total Customers", "Technology type used": "Technology Type"},
+        height=600,
+        **(dict(color="total_customers", color_continuous_scale=EDIH_CONTINUOUS_SCALE) if colored else {})
+    )
+
+
+# --- DAP & FCO ---
+
+def dap_value_by_customer(dap_summary):
+    return px.bar(
+        dap_summary,
+        x="Customer",
+        y="total_price",
+        color="Status",
+        title="DAP & FCO - Service value by Customer and Status",
+        labels={"total_price": "Total Service Price (€)", "Customer": "Customer"},
+        barmode="group",
+        height=600
+    )
+
+
+def dap_types_by_customer(dap_type_summary):
+    return px.bar(
+        dap_type_summary,
+        x="Customer",
+        y="total_mandays",
+        color="DAP&FCO Type",
+        title="DAP&FCO Support Analysis by Customer",
+        labels={"total_mandays": "Total Mandays", "Customer": "Customer", "DAP&FCO Type": "DAP&FCO Support Type"},
+        barmode="group",
+        height=600
+    )
+
+
+# --- State Aid ---
+
+def state_aid_public_sector(ps_summary):
+    return px.bar(
+        ps_summary,
+        x='Vrsta usluge',
+        y='total_value',
+        color='Započeto je pružanje usluge (DA/NE)',
+        title='State Aid Summary for Public Sector',
+        labels={'total_value': 'Total Value (€)', 'Vrsta usluge': 'Service Type'},
+        barmode='group'
+    )
+
+
+def state_aid_sme(sme_summary):
+    return px.bar(
+        sme_summary,
+        x='Vrsta usluge',
+        y=['total_value', 'total_support'],
+        color='Započeto je pružanje usluge (DA/NE)',
+        title='State Aid Summary for SMEs',
+        labels={'value': 'Total (€)', 'Vrsta usluge': 'Service Type'},
+        barmode='group'
+    )
+
+
+def state_aid_eu(state_aid_summary):
+    fig = px.bar(
+        state_aid_summary,
+        x='Specific information on State Aid',
+        y='total_services',
+        title='State Aid Summary',
+        labels={'total_services': 'Number of Services', 'Specific information on State Aid': 'State Aid'},
+        text='total_services'
+    )
+    fig.update_traces(textposition='outside')
+    return fig
+
+
+# --- ESG / DMA ---
+
+def esg_heatmap(esg_summary, pillars):
+    return px.imshow(
+        esg_summary,
+        labels=dict(x="ESG Category", y="Organisation", color="Score"),
+        x=list(pillars),
+        y=esg_summary.index,
+        color_continuous_scale=px.colors.sequential.Blues,
+        title="ESG Score Heatmap",
+        height=900,
+        width=900,
+        aspect="auto"
+    )
+
+
+def most_improved_bar(most_improved, progression_step):
+    fig = px.bar(
+        most_improved.sort_values("Average delta"),
+        x="Average delta",
+        y="Organization",
+        orientation="h",
+        color="Average delta",
+        color_continuous_scale=EDIH_CONTINUOUS_SCALE,
+        title=f"Most Improved Organisations ({progression_step})",
+        labels={"Average delta": "Average change per dimension"},
+        text="Average delta",
+        height=max(400, len(most_improved) * 40)
+    )
+    fig.update_traces(textposition="outside")
+    return fig
+
+
+def dma_radar(org_stages, dimensions, organization_name):
+    fig = go.Figure()
+    # Faze DMA (T0, T1, T2) iz zajedničkog progression polja
+    for stage, stage_values in org_stages.iterrows():
+        fig.add_trace(go.Scatterpolar(
+            r=stage_values.values,
+            theta=dimensions,
+            fill='toself',
+            name=stage
+        ))
+    fig.update_layout(
+        title=f"Digital Maturity Progression – {organization_name}",
+        polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
+        showlegend=True,
+        template="plotly_white"
+    )
+    return fig
+
+
+# --- KPI ---
+
+def kpi_gauge(kpi):
+    """Gauge za KPI: 'value' prikazuje apsolutnu vrijednost prema cilju, 'percent' postotak cilja."""
+    steps, line = kpi["thresholds"]["steps"], kpi["thresholds"]["line"]
+    if kpi["gauge"] == "value":
+        target = kpi["target"]
+        return go.Figure(go.Indicator(
+            mode="gauge+number+delta",
+            value=kpi["value"],
+            delta={'reference': target, 'position': "top"},
+            gauge={
+                'axis': {'range': [0, target]},
+                'bar': {'color': "orange"},
+                'steps': [
+                    {'range': [0, target * steps[0] / 100], 'color': "lightgray"},
+                    {'range': [target * steps[0] / 100, target], 'color': "yellow"},
+                ],
+                'threshold': {
+                    'line': {'color': "red", 'width': 4},
+                    'thickness': 0.75,
+                    'value': target * line / 100
+                }
+            },
+            title={'text': kpi["gauge_title"]}
+        ))
+
+    bands = [0] + list(steps) + [100]
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=kpi["percent"],
+        delta={'reference': kpi["target"], 'position': "top"},
+        gauge={
+            'axis': {'range': [0, 100], 'tickcolor': "lightgray"},
+            'bar': {'color': "red"},
+            'steps': [
+                {'range': [low, high], 'color': color}
+                for (low, high), color in zip(zip(bands, bands[1:]), ["lightgray", "yellow", "orange"])
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': line
+            }
+        },
+        title={'text': kpi["gauge_title"]}
+    ))
+    fig.update_layout(font={'family': "Arial"}, height=300)
+    return fig
@@ -0,0 +1,118 @@
+# EDIH ADRIA analitika - offline gazetteer hrvatskih naselja
+# Naselje → koordinate, županija, oznaka regije iz exporta ('Customer  region') i NUTS 2/3,
+# iz priložene tablice gazetteer_hr.csv, bez mreže. Prostorni indeks (spatial.GridIndex)
+# daje regiju za retke koji imaju samo koordinate.
+
+import os
+import re
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from geocoding import normalize_address
+from spatial import GridIndex
+
+GAZETTEER_FILE = os.environ.get(
+    "EDIH_GAZETTEER", os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer_hr.csv")
+)
+REGION_COLUMN = 'Customer  region'
+PLACE_COLUMNS = ["name", "county", "region", "nuts3", "nuts2", "lat", "lon"]
+# Točka dalje od najbližeg naselja ne dobiva regiju
+MAX_REGION_DISTANCE = 30_000
+
+_COUNTRY_WORDS = {"croatia", "hrvatska", "republika hrvatska", "hr"}
+
+
+def place_key(text):
+    """Ključ naselja: normalizirana adresa bez dijakritika i poštanskog broja."""
+    text = normalize_address(text).replace("đ", "d")
+    text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    text = re.sub(r"\b(hr-)?\d{5}\b", " ", text)
+    return re.sub(r"\s+", " ", text).strip(" ,.;-")
+
+
+def _key_candidates(text):
+    """Cijeli tekst, zatim dijelovi odvojeni zarezom od kraja (grad je obično pri kraju adrese)."""
+    key = place_key(text)
+    if not key:
+        return []
+    parts = [part.strip() for part in key.split(",")]
+    return [key, *(part for part in reversed(parts) if part and part not in _COUNTRY_WORDS)]
+
+
+class Gazetteer:
+    """Tablica naselja s indeksom po nazivu i prostornim indeksom po koordinatama."""
+
+    name = "gazetteer"
+    min_interval = 0.0
+
+    def __init__(self, places):
+        self.places = places.reset_index(drop=True)[PLACE_COLUMNS]
+        self._by_key = {}
+        for position, place in enumerate(self.places["name"]):
+            self._by_key.setdefault(place_key(place), position)
+        self.index = GridIndex(self.places["lat"], self.places["lon"])
+
+    @classmethod
+    def from_csv(cls, path=GAZETTEER_FILE):
+        return cls(pd.read_csv(path))
+
+    def find(self, text):
+        """Pozicija naselja u tablici ili -1."""
+        for key in _key_candidates(text):
+            position = self._by_key.get(key)
+            if position is not None:
+                return position
+        return -1
+
+    def _rows(self, positions, index):
+        rows = self.places.reindex(positions)
+        rows.index = index
+        return rows
+
+    def resolve(self, values):
+        """Naselje za svaku vrijednost (naziv ili adresa); NaN gdje nije pronađeno. Isti indeks."""
+        values = pd.Series(values)
+        codes, uniques = pd.factorize(values)
+        found = np.array([self.find(value) for value in uniques], dtype=np.int64)
+        positions = np.where(codes >= 0, found[codes] if len(found) else -1, -1)
+        return self._rows(positions, values.index)
+
+    def nearest(self, lat, lon, max_distance=MAX_REGION_DISTANCE):
+        """Najbliže naselje za koordinate (unutar max_distance metara) s kolonom 'distance'."""
+        lat = pd.Series(lat)
+        positions, distance = self.index.nearest(lat.to_numpy(dtype=float), pd.Series(lon).to_numpy(dtype=float),
+                                                 max_distance=max_distance)
+        return self._rows(positions, lat.index).assign(distance=distance)
+
+    def geocode(self, query):
+        """Sučelje geokodera (geocoding.GeocodeWorker): (lat, lon) središta naselja ili None."""
+        position = self.find(query)
+        if position < 0:
+            return None
+        place = self.places.iloc[position]
+        return float(place["lat"]), float(place["lon"])
+
+
+@lru_cache(maxsize=1)
+def load_gazetteer(path=GAZETTEER_FILE):
+    return Gazetteer.from_csv(path)
+
+
+def fill_regions(data, location_column=None, lat_column="latitude", lon_column="longitude", gazetteer=None):
+    """Regija iz exporta, a gdje nedostaje iz naselja u adresi ili najbližeg naselja po koordinatama."""
+    regions = data[REGION_COLUMN] if REGION_COLUMN in data.columns else pd.Series(np.nan, index=data.index, dtype=object)
+    regions = regions.where(regions.astype(str).str.strip().ne("") & regions.notna())
+    missing = regions.isna()
+    if not missing.any():
+        return regions
+    gazetteer = gazetteer or load_gazetteer()
+    if location_column is not None and location_column in data.columns:
+        regions = regions.fillna(gazetteer.resolve(data.loc[missing, location_column])["region"])
+        missing = regions.isna()
+    if missing.any() and lat_column in data.columns and lon_column in data.columns:
+        nearest = gazetteer.nearest(data.loc[missing, lat_column], data.loc[missing, lon_column])
+        regions = regions.fillna(nearest["region"])
+    return regions
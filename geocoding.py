@@ -0,0 +1,289 @@
+# EDIH ADRIA analitika - geokodiranje adresa s trajnim cacheom
+# Normalizirana adresa → lat/lon, izvor, vrijeme u SQLite tablici (pored, ne u izvornom Excelu).
+# Iste adrese traže se samo jednom; upiti idu kroz pozadinsku dretvu uz ograničenje
+# od 1 zahtjeva u sekundi (Nominatim usage policy), pa učitavanje stranice nikad ne čeka.
+
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from settings import APP_FOLDER
+
+GEOCODE_DB = os.environ.get("EDIH_GEOCODE_DB", os.path.join(APP_FOLDER, "geocode_cache.sqlite"))
+# "nominatim", "gazetteer" (offline), "off" ili "local:<putanja do CSV-a s kolonama address,lat,lon>"
+GEOCODER = os.environ.get("EDIH_GEOCODER", "nominatim")
+MIN_INTERVAL = 1.0  # sekundi između zahtjeva prema vanjskom servisu
+MAX_ATTEMPTS = 3
+
+# Kolone s adresom, prva postojeća se koristi
+ADDRESS_COLUMNS = ("Location", "Address", "Customer address")
+
+logger = logging.getLogger("edih.geocoding")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocodes (
+    address TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    lat REAL,
+    lon REAL,
+    source TEXT NOT NULL,
+    geocoded_at TEXT NOT NULL
+)
+"""
+
+
+def normalize_address(text):
+    """Ključ cachea: Unicode NFKC, mala slova, jedinstveni razmaci i zarezi."""
+    if text is None or (isinstance(text, float) and pd.isna(text)):
+        return ""
+    text = unicodedata.normalize("NFKC", str(text)).casefold()
+    text = re.sub(r"\s*,\s*", ", ", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip(" ,.;")
+
+
+class GeocodeCache:
+    """Trajni cache geokodiranih adresa; adrese bez rezultata spremaju se s lat/lon = NULL."""
+
+    def __init__(self, path=GEOCODE_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+
+    def _connect(self):
+        # Nova konekcija po pozivu - cache čitaju Streamlit dretve, a piše pozadinska dretva
+        return sqlite3.connect(self.path, timeout=30)
+
+    def lookup(self, addresses):
+        """DataFrame [address, lat, lon, source, geocoded_at] za poznate normalizirane adrese."""
+        keys = sorted({a for a in addresses if a})
+        columns = ["address", "lat", "lon", "source", "geocoded_at"]
+        if not keys:
+            return pd.DataFrame(columns=columns)
+        frames = []
+        with self._connect() as conn:
+            # SQLite ograničava broj parametara po upitu
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                frames.append(pd.read_sql_query(
+                    f"SELECT {', '.join(columns)} FROM geocodes WHERE address IN ({', '.join('?' * len(chunk))})",
+                    conn, params=chunk,
+                ))
+        return pd.concat(frames, ignore_index=True)
+
+    def missing(self, addresses):
+        """Normalizirane adrese koje još nisu u cacheu (bez duplikata)."""
+        keys = {a for a in addresses if a}
+        return sorted(keys - set(self.lookup(keys)["address"]))
+
+    def store(self, address, query, location, source):
+        lat, lon = location if location else (None, None)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO geocodes VALUES (?, ?, ?, ?, ?, ?)",
+                (address, query, lat, lon, source, datetime.now(timezone.utc).isoformat(timespec="seconds")),
+            )
+
+    def version(self):
+        """Mijenja se sa svakim novim zapisom - dio ključa cachea za karte."""
+        with self._connect() as conn:
+            count, last = conn.execute("SELECT COUNT(*), MAX(geocoded_at) FROM geocodes").fetchone()
+        return f"{count}:{last or ''}"
+
+
+class NominatimGeocoder:
+    """OpenStreetMap Nominatim preko geopy (uvoz tek kod prve upotrebe)."""
+
+    name = "nominatim"
+    min_interval = MIN_INTERVAL
+
+    def __init__(self, user_agent="edih_geocoder", timeout=10):
+        from geopy.geocoders import Nominatim
+
+        self._geolocator = Nominatim(user_agent=user_agent)
+        self.timeout = timeout
+
+    def geocode(self, query):
+        """(lat, lon) ili None ako adresa nije pronađena; mrežne greške se propagiraju."""
+        location = self._geolocator.geocode(query, timeout=self.timeout)
+        return (location.latitude, location.longitude) if location else None
+
+
+class LocalGeocoder:
+    """Lokalna zamjena za testiranje i rad bez mreže: {adresa: (lat, lon)} ili CSV address,lat,lon."""
+
+    name = "local"
+    min_interval = 0.0
+
+    def __init__(self, locations):
+        if isinstance(locations, str):
+            table = pd.read_csv(locations)
+            locations = dict(zip(table["address"], zip(table["lat"], table["lon"])))
+        self.locations = {normalize_address(k): v for k, v in locations.items()}
+
+    def geocode(self, query):
+        return self.locations.get(normalize_address(query))
+
+
+def make_geocoder(spec=GEOCODER):
+    """Geokoder prema postavci EDIH_GEOCODER; bez geopy-ja offline gazetteer, None ako je isključen."""
+    if not spec or spec == "off":
+        return None
+    if spec.startswith("local:"):
+        return LocalGeocoder(spec[len("local:"):])
+    if spec != "gazetteer":
+        try:
+            return NominatimGeocoder()
+        except ImportError:
+            pass
+    from gazetteer import load_gazetteer
+
+    return load_gazetteer()
+
+
+class GeocodeWorker:
+    """Pozadinska dretva koja geokodira adrese iz reda, jednu po jednu, uz ograničenje brzine."""
+
+    def __init__(self, cache, geocoder, min_interval=None, max_attempts=MAX_ATTEMPTS):
+        self.cache = cache
+        self.geocoder = geocoder
+        self.min_interval = geocoder.min_interval if min_interval is None else min_interval
+        self.max_attempts = max_attempts
+        self.done = 0
+        self.failed = 0
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._last_request = 0.0
+        self._thread = threading.Thread(target=self._run, name="geocode-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, addresses):
+        """Dodaj u red adrese koje nisu u cacheu ni u redu; vraća broj novih."""
+        queries = {}
+        for address in addresses:
+            key = normalize_address(address)
+            if key and key not in queries:
+                queries[key] = str(address).strip()
+        new = self.cache.missing(queries)
+        with self._lock:
+            new = [key for key in new if key not in self._pending]
+            self._pending.update(new)
+        for key in new:
+            self._queue.put((key, queries[key]))
+        return len(new)
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def status(self):
+        return {"pending": self.pending(), "done": self.done, "failed": self.failed, "source": self.geocoder.name}
+
+    def join(self, timeout=None):
+        """Čekaj dok se red ne isprazni (skripte i testovi)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending():
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _throttle(self):
+        wait = self._last_request + self.min_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self._last_request = time.monotonic()
+
+    def _run(self):
+        while True:
+            key, query = self._queue.get()
+            try:
+                for attempt in range(self.max_attempts):
+                    self._throttle()
+                    try:
+                        location = self.geocoder.geocode(query)
+                    except Exception:
+                        # Timeout ili nedostupan servis - ponovi s rastućom pauzom
+                        time.sleep(self.min_interval * 2 ** attempt)
+                        continue
+                    break
+                else:
+                    # Ne sprema se - adresa se ponovno pokušava pri sljedećem submit()
+                    self.failed += 1
+                    logger.warning("Geokodiranje nije uspjelo nakon %d pokušaja: %s", self.max_attempts, query)
+                    continue
+                try:
+                    self.cache.store(key, query, location, self.geocoder.name)
+                except Exception as e:
+                    # Npr. sqlite "database is locked" - dretva mora preživjeti, adresa se ponovno šalje
+                    self.failed += 1
+                    logger.warning("Rezultat geokodiranja nije spremljen za %s: %s", query, e)
+                else:
+                    self.done += 1
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+
+def address_column(df):
+    return next((col for col in ADDRESS_COLUMNS if col in df.columns), None)
+
+
+def coordinate_columns(df):
+    """Services export koristi latitude/longitude, EU lista EDIH-ova Latitude/Longitude."""
+    return ("Latitude", "Longitude") if "Latitude" in df.columns else ("latitude", "longitude")
+
+
+def attach_coordinates(df, cache, address_col, lat_column="latitude", lon_column="longitude"):
+    """Popuni prazne koordinate iz cachea; vraća novi frame, izvorni (iz cachea) se ne mijenja."""
+    keys = df[address_col].map(normalize_address)
+    known = cache.lookup(keys.unique()).set_index("address")
+    lat = keys.map(known["lat"]).astype(float)
+    lon = keys.map(known["lon"]).astype(float)
+    if lat_column in df.columns and lon_column in df.columns:
+        lat = pd.to_numeric(df[lat_column], errors="coerce").fillna(lat)
+        lon = pd.to_numeric(df[lon_column], errors="coerce").fillna(lon)
+    return df.assign(**{lat_column: lat, lon_column: lon})
+
+
+def missing_addresses(df, address_col, lat_column="latitude", lon_column="longitude"):
+    """Adrese redaka bez koordinata."""
+    if lat_column in df.columns and lon_column in df.columns:
+        df = df[df[lat_column].isna() | df[lon_column].isna()]
+    return df[address_col].dropna().unique()
+
+
+if __name__ == "__main__":
+    # Jednokratno geokodiranje svih adresa iz najnovijeg exporta (blokirajuće, uz isto ograničenje)
+    import argparse
+
+    from datasets import latest_paths
+    from ingest import read_dataset
+    from settings import DATA_FOLDER
+
+    parser = argparse.ArgumentParser(description="Geokodiraj adrese iz exporta u cache (bez mijenjanja Excela).")
+    parser.add_argument("--dataset", default="services")
+    parser.add_argument("--geocoder", default=GEOCODER)
+    args = parser.parse_args()
+
+    path = latest_paths(DATA_FOLDER)[args.dataset]
+    frame = read_dataset(args.dataset, path)
+    column = address_column(frame)
+    geocoder = make_geocoder(args.geocoder)
+    if column is None or geocoder is None:
+        raise SystemExit("Nema kolone s adresom ili je geokoder isključen.")
+    worker = GeocodeWorker(GeocodeCache(), geocoder)
+    print(f"{worker.submit(missing_addresses(frame, column, *coordinate_columns(frame)))} novih adresa ({geocoder.name})")
+    worker.join()
+    print(worker.status())
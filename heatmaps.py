@@ -0,0 +1,44 @@
+# EDIH ADRIA analitika - veliki heatmapovi
+# Zadano se prikazuju agregirane trake (prosjek po državi, DMA fazi, rasponu rezultata);
+# pojedinačni redovi samo na zahtjev i samo vidljivi prozor od MAX_HEATMAP_ROWS redova,
+# pa veličina grafa ne ovisi o broju EDIH-ova ili organizacija.
+
+import numpy as np
+import pandas as pd
+
+MAX_HEATMAP_ROWS = 40
+SCORE_BAND_EDGES = (0, 25, 50, 75, 100)
+
+
+def score_band(scores, edges=SCORE_BAND_EDGES):
+    """Raspon rezultata (npr. '50–75') kao kategorija za grupiranje."""
+    labels = [f"{low}–{high}" for low, high in zip(edges, edges[1:])]
+    return pd.cut(pd.to_numeric(scores, errors="coerce"), bins=list(edges), labels=labels, include_lowest=True)
+
+
+def sorted_rows(df, label_column, value_columns, sort_by=None):
+    """Matrica (oznaka × vrijednosti) sortirana silazno po stupcu ili po zbroju svih stupaca."""
+    matrix = df.set_index(label_column)[list(value_columns)].apply(pd.to_numeric, errors="coerce")
+    key = matrix[sort_by] if sort_by else matrix.sum(axis=1, min_count=1)
+    order = np.argsort(-key.fillna(-np.inf).to_numpy(), kind="stable")
+    return matrix.iloc[order]
+
+
+def band_matrix(df, group_column, value_columns):
+    """Prosjek po grupi; oznaka trake sadrži broj redova, trake sortirane po prosjeku."""
+    values = df[list(value_columns)].apply(pd.to_numeric, errors="coerce")
+    grouped = values.groupby(df[group_column], observed=True)
+    bands = grouped.mean()
+    counts = grouped.size()
+    bands.index = [f"{group} ({count})" for group, count in zip(bands.index, counts)]
+    return bands.iloc[np.argsort(-bands.mean(axis=1).fillna(-np.inf).to_numpy(), kind="stable")]
+
+
+def window_starts(n_rows, size=MAX_HEATMAP_ROWS):
+    """Početni redovi prozora (0, size, 2·size…)."""
+    return list(range(0, max(n_rows, 1), size))
+
+
+def window(matrix, start, size=MAX_HEATMAP_ROWS):
+    """Vidljivi prozor matrice (samo ti redovi idu u graf)."""
+    return matrix.iloc[start:start + size]
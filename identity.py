@@ -0,0 +1,240 @@
+# EDIH ADRIA analitika - indeks korisnika kroz sve skupove podataka
+# Ista organizacija je 'Customer' u Services exportu, 'SME name'/'PSO name' (uz 'SME ID'/'PSO ID')
+# u DMA rezultatima i naziv korisnika u evidenciji zahtjeva. Indeks svakoj organizaciji dodjeljuje
+# trajni cjelobrojni ključ (SQLite, ključevi se nikad ne mijenjaju ni ponovno koriste), a svaki
+# učitani frame dobiva kolonu 'Customer key' - spajanja među skupovima su hash join na int64.
+#
+# Pravila, redom:
+#   1. ručna pravila (CSV alias,customer): naziv 'alias' je ista organizacija kao 'customer'
+#   2. ID iz exporta ('SME ID', 'PSO ID', 'OIB') - preimenovanje organizacije ne mijenja ključ
+#   3. normalizirani naziv: bez dijakritika, mala slova, bez interpunkcije i pravnog oblika
+#      ("Poduzeće ABC d.o.o." = "PODUZECE ABC, d. o. o.")
+#
+#   python identity.py                  # broj korisnika po skupu podataka i zajednički korisnici
+
+import argparse
+import csv
+import os
+import re
+import sqlite3
+import unicodedata
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from settings import APP_FOLDER
+
+# Relativne putanje (kao u .env.example) računaju se od APP_FOLDER
+IDENTITY_DB = os.path.join(APP_FOLDER, os.environ.get("EDIH_IDENTITY_DB", "customers.sqlite"))
+OVERRIDES_FILE = os.path.join(APP_FOLDER, os.environ.get("EDIH_CUSTOMER_OVERRIDES", "customer_overrides.csv"))
+
+KEY_COLUMN = "Customer key"
+
+# Kolone s nazivom korisnika po skupu podataka, prva postojeća se koristi
+NAME_COLUMNS = {
+    "services": ("Customer",),
+    "sme": ("Customer",),
+    "pso": ("Customer",),
+    "sme_dma": ("SME name",),
+    "pso_dma": ("PSO name",),
+    "zahtjevi_ps": ("Naziv korisnika", "Naziv javnog tijela", "Korisnik"),
+    "zahtjevi_sme": ("Naziv poduzeća", "Naziv korisnika", "Korisnik"),
+}
+# Kolone s ID-jem organizacije: kolona → prostor ID-jeva (isti prostor = isti ID iste organizacije)
+ID_COLUMNS = {
+    "sme_dma": {"SME ID": "sme", "OIB": "oib"},
+    "pso_dma": {"PSO ID": "pso", "OIB": "oib"},
+    "zahtjevi_ps": {"OIB": "oib"},
+    "zahtjevi_sme": {"OIB": "oib"},
+}
+
+# Pravni oblik na kraju naziva (nakon uklanjanja interpunkcije)
+LEGAL_FORMS = re.compile(r"(?:\s+(?:j ?d ?o ?o|d ?o ?o|d ?d|k ?d|j ?t ?d|obrt|ltd|gmbh|llc|inc|s ?r ?l))+$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    customer_key INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS aliases (
+    alias TEXT PRIMARY KEY,
+    customer_key INTEGER NOT NULL REFERENCES customers(customer_key),
+    source TEXT NOT NULL
+);
+"""
+
+
+def normalize_name(text):
+    """Ključ naziva: NFKD bez dijakritika, mala slova, bez interpunkcije i pravnog oblika."""
+    if text is None or (isinstance(text, float) and pd.isna(text)):
+        return ""
+    text = unicodedata.normalize("NFKD", str(text).replace("đ", "dj").replace("Đ", "Dj"))
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    text = re.sub(r"[\W_]+", " ", text).strip()
+    return LEGAL_FORMS.sub("", f" {text}").strip()
+
+
+def _name_alias(name):
+    return f"name:{name}"
+
+
+def _id_alias(space, value):
+    # Excel ID-jeve često čita kao float (1234.0)
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return f"{space}:{str(value).strip()}"
+
+
+def load_overrides(path=OVERRIDES_FILE):
+    """{normalizirani alias: normalizirani naziv} iz CSV-a s kolonama alias,customer."""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = [(normalize_name(row.get("alias")), normalize_name(row.get("customer"))) for row in csv.DictReader(f)]
+    return {alias: customer for alias, customer in rows if alias and customer and alias != customer}
+
+
+def overrides_version(path=OVERRIDES_FILE):
+    """Mijenja se s datotekom ručnih pravila - dio verzije frameova s ključevima."""
+    if not path or not os.path.exists(path):
+        return "none"
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class CustomerIndex:
+    """Trajni indeks alias (naziv ili ID) → ključ korisnika."""
+
+    def __init__(self, path=IDENTITY_DB, overrides_file=OVERRIDES_FILE):
+        self.path = path
+        self.overrides_file = overrides_file
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        # Nova konekcija po pozivu - indeks dijele dashboard, API i skripte
+        return sqlite3.connect(self.path, timeout=30)
+
+    def version(self):
+        return overrides_version(self.overrides_file)
+
+    def _lookup(self, conn, aliases):
+        found = {}
+        aliases = list(aliases)
+        # SQLite ograničava broj parametara po upitu
+        for start in range(0, len(aliases), 500):
+            chunk = aliases[start:start + 500]
+            found.update(conn.execute(
+                f"SELECT alias, customer_key FROM aliases WHERE alias IN ({', '.join('?' * len(chunk))})", chunk,
+            ).fetchall())
+        return found
+
+    def _create(self, conn, display_name):
+        created_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        return conn.execute("INSERT INTO customers (name, created_at) VALUES (?, ?)",
+                            (display_name, created_at)).lastrowid
+
+    def resolve(self, names, ids=()):
+        """Ključevi za parove (naziv, [ID-jevi]); jedan ulaz po paru, novi korisnici se upisuju.
+
+        `names` su izvorni nazivi, `ids` lista aliasa ID-jeva po paru (npr. ['sme:17']).
+        """
+        ids = list(ids) or [[] for _ in names]
+        overrides = load_overrides(self.overrides_file)
+        normalized = [normalize_name(name) for name in names]
+        canonical = [overrides.get(name, name) for name in normalized]
+        keys = np.zeros(len(names), dtype=np.int64)
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            known = self._lookup(conn, {_name_alias(n) for n in canonical if n} | {a for row in ids for a in row})
+            new_aliases = {}
+            for i, (name, display, row_ids) in enumerate(zip(canonical, names, ids)):
+                name_alias = _name_alias(name) if name else None
+                # Ručno pravilo ima prednost, zatim ID, zatim naziv
+                if name != normalized[i] and name_alias in known:
+                    key = known[name_alias]
+                else:
+                    key = next((known[a] for a in row_ids if a in known), None)
+                    if key is None and name_alias:
+                        key = known.get(name_alias)
+                if key is None:
+                    if not name and not row_ids:
+                        continue
+                    key = self._create(conn, str(display) if name else row_ids[0])
+                for alias, source in [(name_alias, "name"), *((a, "id") for a in row_ids)]:
+                    if alias and alias not in known:
+                        known[alias] = key
+                        new_aliases[alias] = (key, source)
+                keys[i] = key
+            conn.executemany("INSERT OR IGNORE INTO aliases VALUES (?, ?, ?)",
+                             [(alias, key, source) for alias, (key, source) in new_aliases.items()])
+        return keys
+
+    def names(self):
+        """DataFrame [customer_key, name] - prvi viđeni naziv po ključu (za prikaz)."""
+        with self._connect() as conn:
+            return pd.read_sql_query("SELECT customer_key, name FROM customers", conn)
+
+
+def customer_keys(frame, dataset, index):
+    """Series 'Customer key' (Int64, <NA> bez naziva i ID-ja) za frame skupa podataka."""
+    name_column = next((c for c in NAME_COLUMNS.get(dataset, ()) if c in frame.columns), None)
+    id_columns = {c: space for c, space in ID_COLUMNS.get(dataset, {}).items() if c in frame.columns}
+    if name_column is None and not id_columns:
+        return pd.Series(pd.NA, index=frame.index, dtype="Int64", name=KEY_COLUMN)
+
+    # Ključ se traži jednom po različitoj kombinaciji naziva i ID-jeva, ne po redu
+    parts = [frame[name_column] if name_column else pd.Series(None, index=frame.index, dtype=object),
+             *(frame[c] for c in id_columns)]
+    pairs = pd.MultiIndex.from_arrays(parts)
+    codes, uniques = pd.factorize(pairs)
+    names, ids = [], []
+    for values in uniques:
+        name, *row_ids = values
+        names.append(name if pd.notna(name) else None)
+        ids.append([_id_alias(space, value) for space, value in zip(id_columns.values(), row_ids) if pd.notna(value)])
+    unique_keys = index.resolve(names, ids) if len(uniques) else np.zeros(0, dtype=np.int64)
+
+    keys = pd.array(unique_keys, dtype="Int64")
+    keys[unique_keys == 0] = pd.NA
+    return pd.Series(keys[codes], index=frame.index, name=KEY_COLUMN)
+
+
+def with_customer_keys(frame, dataset, index):
+    """Frame s kolonom 'Customer key' (skupovi bez korisnika vraćaju se nepromijenjeni)."""
+    if dataset not in NAME_COLUMNS or frame is None or frame.empty:
+        return frame
+    return frame.assign(**{KEY_COLUMN: customer_keys(frame, dataset, index)})
+
+
+def shared_customers(left, right):
+    """Ključevi korisnika koji su u oba framea (hash join na cijelim brojevima)."""
+    return np.intersect1d(left[KEY_COLUMN].dropna().to_numpy(np.int64), right[KEY_COLUMN].dropna().to_numpy(np.int64))
+
+
+def main():
+    from datasets import load_current
+    from settings import DATA_FOLDER, SNAPSHOT_FOLDER
+    from snapshots import SnapshotStore
+
+    parser = argparse.ArgumentParser(description="Ključevi korisnika za najnovije exporte.")
+    parser.add_argument("--data", default=DATA_FOLDER)
+    args = parser.parse_args()
+
+    frames = load_current(args.data, SnapshotStore(SNAPSHOT_FOLDER), customer_index=CustomerIndex())
+    keyed = {name: frame for name, frame in frames.items() if KEY_COLUMN in frame.columns}
+    for name, frame in keyed.items():
+        print(f"{name:14} {frame[KEY_COLUMN].nunique():7d} korisnika  {frame[KEY_COLUMN].isna().sum():6d} redova bez ključa")
+    if "services" in keyed:
+        for name, frame in keyed.items():
+            if name != "services":
+                print(f"services ∩ {name}: {len(shared_customers(keyed['services'], frame))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+# EDIH ADRIA analitika - učitavanje i čišćenje Excel exporta
+# Bez Streamlit ovisnosti: koriste ga dashboard, snapshot store i pomoćne skripte.
+
+import glob
+import hashlib
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from settings import INGEST_WORKERS
+
+# Naziv skupa podataka -> (prefiks datoteke, sheet)
+DATASETS = {
+    "services": ("EDIH_uploaded_services_", "Sheet1"),
+    "sme": ("export-sme-", "Reporting of EDIH services del"),
+    "pso": ("export-pso-", "Reporting of EDIH services del"),
+    "sme_dma": ("my-smes-dma-results-", "My SMEs DMA Results"),
+    "pso_dma": ("my-psos-dma-results-", "My PSOs DMA Results"),
+    "zahtjevi_ps": ("evidencija-zahtjeva-", "Korisnici - javni sektor"),
+    "zahtjevi_sme": ("evidencija-zahtjeva-", "Skupni podaci Zahtjeva-poduzeća"),
+    "edih_list": ("updated_edih_list_with_columns_", None),
+}
+
+PERIOD_PATTERN = re.compile(r"(\d{2})(\d{4})$")
+
+# Kolone koje read_services izvodi iz 'Dates' (nisu u Excelu)
+SERVICE_DATE_COLUMNS = ("Start Date", "End Date", "Start Year", "End Year")
+
+
+class MissingColumns(ValueError):
+    """Export nema kolonu koju stranica ili izvedena tablica deklarira (projection.py)."""
+
+    def __init__(self, dataset, source, missing):
+        self.dataset, self.source, self.missing = dataset, source, list(missing)
+        super().__init__(f"{os.path.basename(str(source))} ({dataset}) nema kolona: {', '.join(self.missing)}")
+
+
+def find_files(folder, prefix, extension="xlsx"):
+    """Sve datoteke s danim prefiksom, od najstarije prema najnovijoj (mtime)."""
+    files = glob.glob(os.path.join(folder, f"{prefix}*.{extension}"))
+    return sorted(files, key=os.path.getmtime)
+
+
+def latest_file(folder, prefix, extension="xlsx"):
+    """Najnovija datoteka za prefiks ili None."""
+    files = find_files(folder, prefix, extension)
+    return files[-1] if files else None
+
+
+def parse_period(path):
+    """Vraća razdoblje exporta kao pd.Period('YYYY-MM') iz MMYYYY sufiksa naziva."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    match = PERIOD_PATTERN.search(stem)
+    if not match:
+        return None
+    month, year = int(match.group(1)), int(match.group(2))
+    if not 1 <= month <= 12:
+        return None
+    return pd.Period(year=year, month=month, freq="M")
+
+
+def file_version(path):
+    """Kratki otisak datoteke (naziv, veličina, mtime) - mijenja se sa svakim novim exportom."""
+    if not path or not os.path.exists(path):
+        return "missing"
+    stat = os.stat(path)
+    raw = f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def content_hash(path, chunk_size=1 << 20):
+    """SHA1 sadržaja datoteke (za nepromjenjive snapshotove)."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def clean_headers(df):
+    """Ukloni skrivene razmake i NBSP iz naziva kolona (Services / generic loader)."""
+    df.columns = df.columns.str.strip().str.replace('\u00a0', ' ', regex=False)
+    return df
+
+
+def clean_header(name):
+    """clean_headers za jedan naziv (usecols se primjenjuje na nazive iz Excela)."""
+    return str(name).strip().replace('\u00a0', ' ')
+
+
+def clean_header_strict(name):
+    """clean_headers_strict za jedan naziv."""
+    return re.sub(r'\s+', ' ', str(name).replace('"', '').replace("'", "")).strip()
+
+
+def _usecols(columns, optional, clean):
+    """usecols za read_excel: zaglavlje se čisti kao nakon čitanja pa uspoređuje s projekcijom."""
+    if columns is None:
+        return None
+    wanted = set(columns) | set(optional)
+    return lambda header: clean(header) in wanted
+
+
+def check_columns(df, columns, dataset, source):
+    """MissingColumns ako u frameu nema neke od obaveznih kolona."""
+    missing = [c for c in (columns or ()) if c not in df.columns]
+    if missing:
+        raise MissingColumns(dataset, source, missing)
+    return df
+
+
+def clean_headers_strict(df):
+    """Agresivnije čišćenje naziva kolona (navodnici, višestruki razmaci)."""
+    df.columns = (
+        df.columns.astype(str)
+        .str.replace('"', '')
+        .str.replace("'", "")
+        .str.replace(r'\s+', ' ', regex=True)
+        .str.strip()
+    )
+    return df
+
+
+def read_workbook(path, sheet_name=None, columns=None, optional=()):
+    """Učitaj jedan sheet (ili prvi ako ih je više) i očisti nazive kolona.
+
+    Uz `columns` čitaju se samo te kolone (i `optional` ako postoje); nedostaje li neka od
+    `columns`, diže se MissingColumns.
+    """
+    if not path:
+        return pd.DataFrame()
+
+    df = pd.read_excel(path, sheet_name=sheet_name, usecols=_usecols(columns, optional, clean_header_strict))
+
+    # Ako read_excel vrati dict (više sheetova)
+    if isinstance(df, dict):
+        df = df[list(df.keys())[0]]
+
+    return check_columns(clean_headers_strict(df), columns, sheet_name or "Sheet1", path)
+
+
+def parse_service_dates(data):
+    """Iz tekstualne 'Dates' kolone izvodi Start/End Date i godine."""
+    if 'Dates' not in data.columns:
+        data['Start Date'] = pd.NaT
+        data['End Date'] = pd.NaT
+        data['Start Year'] = np.nan
+        data['End Year'] = np.nan
+        return data
+
+    # Normalize text and split cleanly
+    dates = data['Dates'].astype(str).str.strip()
+    dates = dates.str.replace(r'\s*/\s*', ' / ', regex=True)
+    data['Dates'] = dates
+
+    date_split = dates.str.split(' / ', expand=True)
+    date_split = date_split.reindex(columns=[0, 1]).fillna('')
+
+    data['Start Date'] = pd.to_datetime(
+        date_split[0].str.strip(), errors='coerce', format='%Y-%m-%d'
+    )
+    data['End Date'] = pd.to_datetime(
+        date_split[1].str.strip(), errors='coerce', format='%Y-%m-%d'
+    )
+
+    # 🧩 If End Date missing, fill with Start Date
+    data['End Date'] = data['End Date'].fillna(data['Start Date'])
+
+    data['Start Year'] = data['Start Date'].dt.year
+    data['End Year'] = data['End Date'].dt.year
+    return data
+
+
+def read_services(path, sheet_name="Sheet1", columns=None, optional=()):
+    """Učitaj EDIH uploaded services export s izvedenim datumskim kolonama."""
+    # Datumske kolone nastaju iz 'Dates', pa se uz projekciju čita ta kolona
+    source = None if columns is None else [c for c in columns if c not in SERVICE_DATE_COLUMNS]
+    if source is not None and len(source) < len(columns):
+        optional = (*optional, 'Dates')
+    data = pd.read_excel(path, sheet_name, usecols=_usecols(source, optional, clean_header))
+    data = check_columns(clean_headers(data), source, "services", path)
+    return parse_service_dates(data)
+
+
+def read_dataset(name, path, columns=None, optional=()):
+    """Učitaj skup podataka iz DATASETS prema njegovom nazivu (uz projekciju: samo te kolone)."""
+    _, sheet_name = DATASETS[name]
+    if name == "services":
+        return read_services(path, sheet_name, columns, optional)
+    try:
+        return read_workbook(path, sheet_name=sheet_name, columns=columns, optional=optional)
+    except MissingColumns as e:
+        raise MissingColumns(name, path, e.missing) from None
+
+
+# ── Paralelno učitavanje ──────────────────────────────────────────────────
+# openpyxl parsira u jednoj dretvi, pa se svaki (workbook, sheet) čita u zasebnom procesu.
+# Rezultat se vraća kao Arrow IPC stream (međuspremnici stupaca, bez pickla po vrijednosti).
+# Tekstualne object kolone (pandas 2.x čita sav tekst kao object) idu kao Arrow string i vraćaju
+# se kao object; picklom idu samo miješane object kolone koje Arrow ne bi vratio nepromijenjene.
+
+def _is_text(column):
+    """Object kolona samo s tekstom i NaN (kao iz read_excel); Arrow bi None vratio kao NaN."""
+    if column.dtype != object or pd.api.types.infer_dtype(column, skipna=True) not in ("string", "empty"):
+        return False
+    return not np.equal(column.to_numpy(), None).any()
+
+
+def frame_to_arrow(df):
+    """DataFrame → (Arrow IPC bajtovi, object kolone, pozicije object kolona, pozicije tekstualnih
+    object kolona u Arrowu, nazivi kolona, indeks)."""
+    is_object = [dtype == object for dtype in df.dtypes]
+    text_positions = [i for i, obj in enumerate(is_object) if obj and _is_text(df.iloc[:, i])]
+    arrow_positions = [i for i, obj in enumerate(is_object) if not obj]
+    object_positions = [i for i, obj in enumerate(is_object) if obj and i not in text_positions]
+    # Pozicijski nazivi: nazivi iz Excela mogu se ponavljati nakon čišćenja
+    arrow_part = df.iloc[:, arrow_positions].set_axis([str(i) for i in arrow_positions], axis=1)
+    table = pa.Table.from_pandas(arrow_part, preserve_index=False)
+    texts = [pa.array(df.iloc[:, i], type=pa.string(), from_pandas=True) for i in text_positions]
+    table = pa.Table.from_arrays(table.columns + texts, names=table.column_names + [str(i) for i in text_positions],
+                                 metadata=table.schema.metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return (sink.getvalue().to_pybytes(), df.iloc[:, object_positions], object_positions, text_positions,
+            df.columns, df.index)
+
+
+def frame_from_arrow(payload):
+    """Obrnuto od frame_to_arrow: isti stupci, redoslijed, dtypeovi i indeks."""
+    raw, objects, object_positions, text_positions, columns, index = payload
+    arrow_part = pa.ipc.open_stream(raw).read_all().to_pandas()
+    arrow_part.columns = [int(c) for c in arrow_part.columns]
+    # Nedostajući tekst je u Arrowu null; vraća se kao NaN kao iz read_excel (pandas 2.x bi dao None)
+    for i in text_positions:
+        arrow_part[i] = arrow_part[i].astype(object).where(arrow_part[i].notna(), np.nan)
+    objects = objects.set_axis(object_positions, axis=1).reset_index(drop=True)
+    parts = [part for part in (arrow_part, objects) if len(part.columns)] or [arrow_part]
+    df = pd.concat(parts, axis=1)[list(range(len(columns)))]
+    df.columns = columns
+    df.index = index
+    return df
+
+
+def _read_payload(name, path, columns, optional):
+    return frame_to_arrow(read_dataset(name, path, columns, optional))
+
+
+def _pool_context():
+    # Dashboard je višedretven, pa ne fork; forkserver jednom uveze ingest (pandas) za sve workere
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["ingest"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def read_datasets(paths, workers=None, columns=None):
+    """{naziv: putanja} → {naziv: DataFrame}, jedan proces po skupu podataka.
+
+    Isti frameovi kao read_dataset; s jednom jezgrom ili jednim skupom čita se u ovom procesu.
+    `columns` je projekcija {naziv: (obavezne, neobavezne) | None} (projection.required_columns).
+    """
+    jobs = {name: (path, *((columns or {}).get(name) or (None, ()))) for name, path in paths.items() if path}
+    workers = min(len(jobs), workers or INGEST_WORKERS or os.cpu_count() or 1)
+    if workers <= 1:
+        return {name: read_dataset(name, *job) for name, job in jobs.items()}
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+            futures = {name: pool.submit(_read_payload, name, *job) for name, job in jobs.items()}
+            return {name: frame_from_arrow(future.result()) for name, future in futures.items()}
+    except (BrokenProcessPool, OSError):
+        # Okruženje bez podprocesa (npr. ograničen kontejner) - redom u ovom procesu
+        return {name: read_dataset(name, *job) for name, job in jobs.items()}
@@ -0,0 +1,186 @@
+# EDIH ADRIA analitika - put korisnika kroz usluge: DMA T0 → Bootcamp → TBI → DAP/FCO → DMA T1/T2
+# Tablica događaja (jedan red po usluzi ili DMA procjeni): 'Customer key' (identity.py), faza,
+# početak, kraj, status. Dolazak u fazu je prvi događaj te faze na dan ili nakon dolaska u
+# prethodnu (merge_asof po korisniku), pa su lijevak, vremena između faza i kohorte odustajanja
+# groupby nad tablicom korisnika. Put se gradi jednom po verziji skupova podataka; filteri
+# (SME/PSO, regija, razdoblje ulaska u prvu fazu) su samo maske nad tim korisnicima.
+
+import numpy as np
+import pandas as pd
+
+from enrich import DAP_CATEGORY, TBI_CATEGORY
+from gazetteer import REGION_COLUMN
+from identity import KEY_COLUMN
+from reporting import DATE_COLUMNS, find_date_column
+
+STAGES = ("DMA T0", "Bootcamp", "TBI", "DAP/FCO", "DMA T1/T2")
+DMA_SEGMENTS = {"sme_dma": "SME", "pso_dma": "PSO"}
+EVENT_COLUMNS = [KEY_COLUMN, "Stage", "Start", "End", "Status"]
+DURATION_QUANTILES = (0.25, 0.5, 0.75, 0.9)
+
+
+def service_events(services, derived):
+    """Bootcamp, TBI i DAP/FCO usluge iz Services exporta (derived = enrich.enrich_services)."""
+    if services.empty or KEY_COLUMN not in services.columns:
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+    category = services['Service category delivered']
+    stage = np.select(
+        [derived['Is Bootcamp'].to_numpy(dtype=bool), (category == TBI_CATEGORY).to_numpy(), (category == DAP_CATEGORY).to_numpy()],
+        ["Bootcamp", "TBI", "DAP/FCO"], default="",
+    )
+    events = pd.DataFrame({
+        KEY_COLUMN: services[KEY_COLUMN],
+        "Stage": stage,
+        "Start": services['Start Date'],
+        "End": services['End Date'],
+        "Status": services['Status'] if 'Status' in services.columns else None,
+    })
+    return events[stage != ""]
+
+
+def dma_events(dma, dataset):
+    """DMA procjene: T0 je ulaz u put, T1/T2 ponovljena procjena na kraju."""
+    date_column = find_date_column(dma, DATE_COLUMNS[dataset])
+    if dma.empty or KEY_COLUMN not in dma.columns or "DMA Timing" not in dma.columns or date_column is None:
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+    timing = dma["DMA Timing"].astype(str).str.strip().str.upper()
+    stage = np.select([timing == "T0", timing.isin(["T1", "T2"])], ["DMA T0", "DMA T1/T2"], default="")
+    start = pd.to_datetime(dma[date_column], errors="coerce")
+    events = pd.DataFrame({KEY_COLUMN: dma[KEY_COLUMN], "Stage": stage, "Start": start, "End": start,
+                           "Status": "Completed"})
+    return events[stage != ""]
+
+
+def build_events(frames, derived):
+    """Svi događaji svih korisnika, sortirani po korisniku i početku (bez ključa ili datuma se izostavljaju)."""
+    parts = [service_events(frames.get("services", pd.DataFrame()), derived)]
+    parts += [dma_events(frames.get(dataset, pd.DataFrame()), dataset) for dataset in DMA_SEGMENTS]
+    parts = [part for part in parts if not part.empty]
+    events = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=EVENT_COLUMNS)
+    events = events.dropna(subset=[KEY_COLUMN, "Start"])
+    return events.astype({KEY_COLUMN: "int64", "Stage": pd.CategoricalDtype(STAGES, ordered=True),
+                          "Start": "datetime64[ns]", "End": "datetime64[ns]"}) \
+        .sort_values([KEY_COLUMN, "Start"], ignore_index=True)
+
+
+def customer_attributes(frames, derived):
+    """Segment (SME/PSO) i regija po ključu korisnika; prva poznata vrijednost."""
+    services = frames.get("services", pd.DataFrame())
+    parts = []
+    if KEY_COLUMN in services.columns:
+        region = derived[REGION_COLUMN] if REGION_COLUMN in derived.columns else services.get(REGION_COLUMN)
+        parts.append(pd.DataFrame({KEY_COLUMN: services[KEY_COLUMN], "Segment": services.get('Customer type'),
+                                   "Region": region}))
+    for dataset, segment in DMA_SEGMENTS.items():
+        dma = frames.get(dataset, pd.DataFrame())
+        if KEY_COLUMN in dma.columns:
+            parts.append(pd.DataFrame({KEY_COLUMN: dma[KEY_COLUMN], "Segment": segment, "Region": None}))
+    if not parts:
+        return pd.DataFrame(columns=["Segment", "Region"], index=pd.Index([], name=KEY_COLUMN, dtype="int64"))
+    table = pd.concat(parts, ignore_index=True).dropna(subset=[KEY_COLUMN])
+    return table.astype({KEY_COLUMN: "int64"}).groupby(KEY_COLUMN).agg(Segment=("Segment", "first"),
+                                                                        Region=("Region", "first"))
+
+
+class Journey:
+    """Datum dolaska svakog korisnika u svaku fazu puta (NaT = nije stigao), uz segment i regiju.
+
+    Korisnik je na putu od dolaska u prvu fazu; do faze k stiže samo preko faze k-1.
+    """
+
+    def __init__(self, stages, reached, customers):
+        self.stages = list(stages)
+        self.reached = reached
+        self.segment = customers["Segment"].reindex(reached.index)
+        self.region = customers["Region"].reindex(reached.index)
+
+    def __len__(self):
+        return len(self.reached)
+
+    def regions(self):
+        return sorted(self.region.dropna().unique().tolist())
+
+    def mask(self, segment=None, region=None, start=None, end=None):
+        """Korisnici po segmentu, regiji i datumu ulaska u prvu fazu (None = bez ograničenja)."""
+        entry = self.reached[self.stages[0]]
+        mask = entry.notna()
+        if segment is not None:
+            mask &= self.segment.eq(segment)
+        if region is not None:
+            mask &= self.region.eq(region)
+        if start is not None:
+            mask &= entry >= start
+        if end is not None:
+            mask &= entry <= end
+        return mask.to_numpy()
+
+    def _selected(self, mask):
+        return self.reached if mask is None else self.reached[mask]
+
+    def funnel(self, mask=None):
+        """Broj korisnika po fazi, udio od prve i od prethodne faze."""
+        counts = self._selected(mask).notna().sum().reindex(self.stages).to_numpy()
+        first = counts[0] if len(counts) else 0
+        previous = np.concatenate([[first], counts[:-1]]) if len(counts) else counts
+        return pd.DataFrame({
+            "Stage": self.stages,
+            "Count": counts,
+            "% of first": np.where(first > 0, counts / max(first, 1) * 100, 0.0).round(1),
+            "% of previous": np.where(previous > 0, counts / np.maximum(previous, 1) * 100, 0.0).round(1),
+        })
+
+    def durations(self, mask=None):
+        """Dani između uzastopnih faza: [Transition, Days] za korisnike koji su stigli u obje."""
+        reached = self._selected(mask)
+        frames = []
+        for before, after in zip(self.stages, self.stages[1:]):
+            days = (reached[after] - reached[before]).dt.days.dropna()
+            frames.append(pd.DataFrame({"Transition": f"{before} → {after}", "Days": days.to_numpy()}))
+        if not frames:
+            return pd.DataFrame(columns=["Transition", "Days"])
+        return pd.concat(frames, ignore_index=True)
+
+    def duration_summary(self, mask=None):
+        """Broj korisnika i kvantili dana po prijelazu."""
+        durations = self.durations(mask)
+        transitions = [f"{before} → {after}" for before, after in zip(self.stages, self.stages[1:])]
+        quantiles = {f"p{int(q * 100)} days": (lambda days, q=q: days.quantile(q)) for q in DURATION_QUANTILES}
+        summary = durations.astype({"Days": float}).groupby("Transition")["Days"].agg(Customers="size", **quantiles)
+        summary = summary.reindex(transitions).fillna({"Customers": 0}).astype({"Customers": int})
+        return summary.rename_axis("Transition").reset_index()
+
+    def cohorts(self, mask=None, freq="Q"):
+        """Kohorte po razdoblju ulaska (zadano kvartal) × zadnja dosegnuta faza (gdje su odustali)."""
+        reached = self._selected(mask)
+        if reached.empty:
+            return pd.DataFrame(columns=["Cohort", *self.stages, "Customers"])
+        last = pd.Categorical.from_codes(reached.notna().sum(axis=1).to_numpy() - 1, categories=self.stages)
+        cohort = reached[self.stages[0]].dt.to_period(freq).astype(str).to_numpy()
+        table = pd.crosstab(cohort, last, dropna=False).reindex(columns=self.stages, fill_value=0)
+        table.index.name, table.columns.name = "Cohort", None
+        return table.assign(Customers=table.sum(axis=1)).reset_index()
+
+
+def build_journey(frames, derived, stages=STAGES):
+    """Journey za zadane faze (podskup STAGES, redoslijed iz STAGES) iz neizrezanih skupova podataka."""
+    stages = [stage for stage in STAGES if stage in stages]
+    events = build_events(frames, derived)
+    customers = customer_attributes(frames, derived)
+    if not stages:
+        return Journey(stages, pd.DataFrame(index=pd.Index([], name=KEY_COLUMN, dtype="int64")), customers)
+
+    first = events[events["Stage"] == stages[0]].groupby(KEY_COLUMN)["Start"].min()
+    reached = {stages[0]: first}
+    current = first.rename("Reached").reset_index()
+    for stage in stages[1:]:
+        candidates = events.loc[events["Stage"] == stage, [KEY_COLUMN, "Start"]].sort_values("Start")
+        if current.empty or candidates.empty:
+            reached[stage] = pd.Series(pd.NaT, index=pd.Index([], name=KEY_COLUMN), dtype="datetime64[ns]")
+            current = current.iloc[:0]
+            continue
+        # Prvi događaj faze na dan ili nakon dolaska u prethodnu fazu, po korisniku
+        matched = pd.merge_asof(current.sort_values("Reached"), candidates, left_on="Reached", right_on="Start",
+                                by=KEY_COLUMN, direction="forward")
+        current = matched.dropna(subset=["Start"])[[KEY_COLUMN, "Start"]].rename(columns={"Start": "Reached"})
+        reached[stage] = current.set_index(KEY_COLUMN)["Reached"]
+    return Journey(stages, pd.DataFrame(reached).reindex(first.index), customers)
@@ -0,0 +1,120 @@
+# EDIH ADRIA analitika - deklarativni KPI engine
+# KPI definicije (izraz, cilj, pragovi, ciljevi po razdoblju) čitaju se iz
+# kpi_definitions.json; svi KPI-jevi računaju se zajedno u jednom prolazu.
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+KPI_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kpi_definitions.json")
+
+
+def load_definitions(path=KPI_FILE):
+    """KPI definicije s primijenjenim zadanim vrijednostima."""
+    with open(path, "r", encoding="utf-8") as fh:
+        config = json.load(fh)
+    defaults = config.get("defaults", {})
+    return [{**defaults, **kpi} for kpi in config["kpis"]]
+
+
+def _column(frames, dataset, column):
+    """Kolona iz skupa podataka ili iz njegovih izvedenih kolona (<dataset>_derived)."""
+    for name in (dataset, f"{dataset}_derived"):
+        frame = frames.get(name)
+        if frame is not None and column in frame.columns:
+            return frame[column]
+    return None
+
+
+def _mask(frames, dataset, spec, cache):
+    """Bool maska za filter; iste maske se dijele između KPI-jeva istog skupa podataka."""
+    key = (dataset, json.dumps(spec, sort_keys=True, ensure_ascii=False))
+    if key in cache:
+        return cache[key]
+
+    length = len(frames[dataset])
+    if not spec:
+        mask = np.ones(length, dtype=bool)
+    elif "all" in spec:
+        mask = np.logical_and.reduce([_mask(frames, dataset, s, cache) for s in spec["all"]] + [np.ones(length, dtype=bool)])
+    else:
+        values = _column(frames, dataset, spec["column"])
+        if values is None:
+            mask = np.zeros(length, dtype=bool)
+        elif "equals" in spec:
+            mask = (values == spec["equals"]).to_numpy(dtype=bool)
+        elif "in" in spec:
+            mask = values.isin(spec["in"]).to_numpy(dtype=bool)
+        elif "contains" in spec:
+            pattern = "|".join(spec["contains"])
+            mask = values.astype(str).str.contains(pattern, case=False, na=False).to_numpy(dtype=bool)
+        elif spec.get("notna"):
+            mask = values.notna().to_numpy(dtype=bool)
+        else:
+            raise ValueError(f"Nepoznat KPI filter: {spec}")
+
+    cache[key] = mask
+    return mask
+
+
+def _source_value(frames, source, mask_cache):
+    metric = source["metric"]
+    if metric == "static":
+        return float(source["value"])
+
+    frame = frames.get(source["dataset"])
+    if frame is None or frame.empty:
+        return 0.0
+    mask = _mask(frames, source["dataset"], source.get("filter"), mask_cache)
+    if metric == "count":
+        return float(mask.sum())
+
+    values = _column(frames, source["dataset"], source["column"])
+    if values is None:
+        return 0.0
+    if metric == "sum":
+        return float(np.nansum(pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)[mask]))
+    if metric == "nunique":
+        return float(values[mask].nunique())
+    raise ValueError(f"Nepoznata KPI metrika: {metric}")
+
+
+def evaluate_kpis(frames, definitions, period=None):
+    """Izračunaj sve KPI-jeve odjednom; vraća DataFrame (jedan red po KPI-ju)."""
+    mask_cache = {}
+    results = {}
+
+    # Prvo jednostavni KPI-jevi, zatim složeni (zbroj drugih KPI-jeva)
+    ordered = sorted(definitions, key=lambda kpi: any(s["metric"] == "kpis" for s in kpi["sources"]))
+    for kpi in ordered:
+        value, target = 0.0, kpi.get("targets", {}).get(period, kpi.get("target"))
+        for source in kpi["sources"]:
+            if source["metric"] == "kpis":
+                value += sum(results[k]["value"] for k in source["kpis"])
+                if kpi.get("target_from_kpis"):
+                    target = sum(results[k]["target"] for k in source["kpis"])
+            else:
+                value += _source_value(frames, source, mask_cache)
+
+        results[kpi["id"]] = {
+            "id": kpi["id"],
+            "label": kpi["label"],
+            "page": kpi["page"],
+            "value": value,
+            "target": target,
+            "percent": value / target * 100 if target else np.nan,
+            "gauge": kpi.get("gauge") or "",
+            "gauge_title": kpi.get("gauge_title", kpi["label"]),
+            "thresholds": kpi.get("thresholds"),
+            "show_metric": kpi.get("show_metric", True),
+        }
+
+    # Redoslijed kao u konfiguraciji
+    return pd.DataFrame([results[kpi["id"]] for kpi in definitions]).set_index("id", drop=False)
+
+
+def kpis_for_page(results, page):
+    """KPI-jevi jedne stranice u redoslijedu iz konfiguracije."""
+    return results[results["page"] == page]
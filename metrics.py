@@ -0,0 +1,324 @@
+# EDIH ADRIA analitika - metrike u Prometheus tekstualnom formatu
+# Brojači (OCR stranice, OpenAI pozivi, 429, retry, tokeni), histogram latencije OpenAI-ja i
+# vrijednosti koje se čitaju tek pri scrapeu (spanovi iz perf.py, cache grafova, sesije, RSS).
+# Server je pozadinska dretva u procesu dashboarda: GET http://127.0.0.1:9464/metrics
+# GET /ready: 503 dok warmup.py zagrijava cacheove, 200 kad je proces spreman za sesije.
+#
+#   scrape_configs:
+#     - job_name: edih
+#       static_configs: [{targets: ["localhost:9464"]}]
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+import perf
+from settings import METRICS_HOST, METRICS_PORT
+
+# Sesija bez reruna dulje od ovoga više se ne broji kao aktivna
+SESSION_TTL = 15 * 60
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Naziv → (tip, opis); redoslijed je redoslijed u izlazu
+METRICS = {
+    "edih_span_duration_seconds": ("summary", "Trajanje spanova (učitavanje, stranice, grafovi, AI) iz perf.py"),
+    "edih_cache_requests_total": ("counter", "Pozivi keširanih funkcija (load:*, figure:*) po ishodu"),
+    "edih_loader_rows": ("gauge", "Broj redova koje je loader zadnji put vratio"),
+    "edih_data_quality_rows": ("gauge", "Redovi koji ne prolaze pravilo kvalitete (quality.py) po skupu podataka"),
+    "edih_figure_cache_requests_total": ("counter", "Pogoci i promašaji cachea grafova"),
+    "edih_figure_cache_evictions_total": ("counter", "Grafovi izbačeni iz cachea (LRU)"),
+    "edih_figure_cache_bytes": ("gauge", "Zauzeće cachea grafova u bajtovima"),
+    "edih_figure_cache_entries": ("gauge", "Broj grafova u cacheu"),
+    "edih_active_sessions": ("gauge", f"Sesije s rerunom u zadnjih {SESSION_TTL // 60} min"),
+    "edih_session_memory_bytes": ("gauge", "Procjena memorije session_state po aktivnoj sesiji"),
+    "edih_process_resident_memory_bytes": ("gauge", "RSS procesa dashboarda"),
+    "edih_ocr_pages_total": ("counter", "PDF stranice po načinu obrade (text, ocr, failed)"),
+    "edih_openai_request_duration_seconds": ("histogram", "Latencija pojedinačnog OpenAI zahtjeva"),
+    "edih_openai_requests_total": ("counter", "OpenAI zahtjevi po ishodu (ok, rate_limited, error)"),
+    "edih_openai_retries_total": ("counter", "Ponovljeni OpenAI zahtjevi (call_openai_with_retry)"),
+    "edih_openai_tokens_total": ("counter", "Potrošeni tokeni po modelu i vrsti (prompt, completion)"),
+    "edih_ready": ("gauge", "1 kad je zagrijavanje završeno i proces prima sesije"),
+    "edih_warmup_stage_seconds": ("gauge", "Trajanje faze zagrijavanja (warmup.py) po ishodu"),
+}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _number(value):
+    if value != value:
+        return "NaN"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def process_memory():
+    """RSS u bajtovima (Linux /proc; drugdje najveći RSS iz getrusage)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def session_bytes(state):
+    """Procjena memorije sesije: frameovi po memory_usage, ostalo po getsizeof.
+
+    Pogledi na dijeljene frameove (datasets.session_view) broje se punom veličinom -
+    to je gornja granica, stvarno zauzeće je manje dok ih sesija ne mijenja.
+    """
+    total = 0
+    for value in state.values():
+        if isinstance(value, pd.DataFrame):
+            total += int(value.memory_usage(index=True).sum())
+        else:
+            total += sys.getsizeof(value)
+    return total
+
+
+class Telemetry:
+    """Brojači, gaugeovi i histogrami jednog procesa; ključ je (naziv, sortirane labele)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._values = defaultdict(int)
+        self._histograms = {}
+        self._sessions = {}  # id → (zadnji rerun, bajtovi)
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            self._values[name, tuple(sorted(labels.items()))] += value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._values[name, tuple(sorted(labels.items()))] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            counts, total = self._histograms.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-1] += 1
+            self._histograms[key] = (counts, total + value)
+
+    def session_seen(self, session, nbytes):
+        with self._lock:
+            self._sessions[session] = (time.monotonic(), nbytes)
+
+    def add_collector(self, collect):
+        """collect() → iterabla (naziv, labele dict, vrijednost); poziva se pri svakom scrapeu."""
+        with self._lock:
+            if collect not in self._collectors:
+                self._collectors.append(collect)
+
+    # ── Izlaz ─────────────────────────────────────────────────────────────
+    def _samples(self):
+        """{naziv: [(sufiks, labele, vrijednost)]} za sve metrike u trenutku scrapea."""
+        samples = defaultdict(list)
+        with self._lock:
+            values = dict(self._values)
+            histograms = {key: (list(counts), total) for key, (counts, total) in self._histograms.items()}
+            cutoff = time.monotonic() - SESSION_TTL
+            self._sessions = {sid: seen for sid, seen in self._sessions.items() if seen[0] >= cutoff}
+            sessions = dict(self._sessions)
+            collectors = list(self._collectors)
+
+        for (name, labels), value in values.items():
+            samples[name].append(("", labels, value))
+        for (name, labels), (counts, total) in histograms.items():
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                samples[name].append(("_bucket", (*labels, ("le", bound)), count))
+            samples[name].append(("_sum", labels, total))
+            samples[name].append(("_count", labels, counts[-1]))
+
+        samples["edih_active_sessions"].append(("", (), len(sessions)))
+        for sid, (_, nbytes) in sessions.items():
+            samples["edih_session_memory_bytes"].append(("", (("session", sid),), nbytes))
+        samples["edih_process_resident_memory_bytes"].append(("", (), process_memory()))
+        _span_samples(samples)
+        for collect in collectors:
+            for name, labels, value in collect():
+                samples[name].append(("", tuple(sorted(labels.items())), value))
+        return samples
+
+    def render(self):
+        """Prometheus text exposition format 0.0.4."""
+        samples = self._samples()
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            if not samples.get(name):
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples[name]:
+                lines.append(f"{name}{suffix}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _span_samples(samples):
+    """Spanovi iz perf.recorder: p50/p95 zadnjih trajanja, ukupni broj i zbroj, pogoci cachea."""
+    stats = perf.recorder.stats().set_index("span")
+    for name, (count, total_ms, misses) in perf.recorder.totals().items():
+        labels = (("span", name),)
+        if name in stats.index:
+            for quantile, column in ((0.5, "p50 ms"), (0.95, "p95 ms")):
+                samples["edih_span_duration_seconds"].append(
+                    ("", (*labels, ("quantile", quantile)), float(stats.at[name, column]) / 1000))
+        samples["edih_span_duration_seconds"].append(("_sum", labels, total_ms / 1000))
+        samples["edih_span_duration_seconds"].append(("_count", labels, count))
+        if misses is not None:
+            samples["edih_cache_requests_total"].append(("", (("cache", name), ("result", "miss")), misses))
+            samples["edih_cache_requests_total"].append(("", (("cache", name), ("result", "hit")), max(0, count - misses)))
+
+
+telemetry = Telemetry()
+
+
+def record_openai(operation, seconds, status, response=None):
+    """Jedan OpenAI zahtjev: latencija, ishod i potrošeni tokeni (response.usage)."""
+    telemetry.observe("edih_openai_request_duration_seconds", seconds, operation=operation)
+    telemetry.inc("edih_openai_requests_total", operation=operation, status=status)
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        model = getattr(response, "model", None) or "unknown"
+        for kind in ("prompt", "completion"):
+            tokens = getattr(usage, f"{kind}_tokens", None) or 0
+            telemetry.inc("edih_openai_tokens_total", tokens, model=model, type=kind)
+
+
+def figure_cache_collector(cache):
+    """Collector za figure_cache.FigureCache."""
+    def collect():
+        stats = cache.stats()
+        yield "edih_figure_cache_requests_total", {"result": "hit"}, stats["hits"]
+        yield "edih_figure_cache_requests_total", {"result": "miss"}, stats["misses"]
+        yield "edih_figure_cache_evictions_total", {}, stats["evictions"]
+        yield "edih_figure_cache_bytes", {}, stats["bytes"]
+        yield "edih_figure_cache_entries", {}, stats["entries"]
+    return collect
+
+
+class Readiness:
+    """Spremnost procesa za sesije. Bez warmup.py (obični streamlit run) proces je spreman odmah;
+    warmup.py poziva begin() prije prve faze i finish() kad Streamlit server prima zahtjeve."""
+
+    def __init__(self):
+        self.stages = {}  # faza → {"seconds", "status", ...}
+        self._warming = False
+        self._started = None
+        self._lock = threading.Lock()
+
+    def begin(self):
+        with self._lock:
+            self._warming = True
+            self._started = time.monotonic()
+            self.stages.clear()
+
+    @contextmanager
+    def stage(self, name, **details):
+        """Izmjeri fazu (span warmup:<faza>); greška se bilježi, a zagrijavanje nastavlja."""
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            with perf.span(f"warmup:{name}"):
+                yield details
+        except Exception as e:
+            status = "error"
+            details["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            record = {"seconds": round(time.perf_counter() - start, 3), "status": status, **details}
+            with self._lock:
+                self.stages[name] = record
+            perf.recorder.event("warmup", stage=name, **record)
+
+    def finish(self):
+        with self._lock:
+            self._warming = False
+            total = round(time.monotonic() - self._started, 3) if self._started else 0.0
+        perf.recorder.event("warmup", stage="total", seconds=total, status=self.status()["status"])
+
+    def is_ready(self):
+        return not self._warming
+
+    def status(self):
+        with self._lock:
+            stages = {name: dict(record) for name, record in self.stages.items()}
+        failed = any(record["status"] != "ok" for record in stages.values())
+        state = "warming" if self._warming else ("degraded" if failed else "ready")
+        return {"ready": not self._warming, "status": state, "stages": stages}
+
+    def collect(self):
+        yield "edih_ready", {}, int(self.is_ready())
+        with self._lock:
+            stages = {name: (record["seconds"], record["status"]) for name, record in self.stages.items()}
+        for name, (seconds, status) in stages.items():
+            yield "edih_warmup_stage_seconds", {"stage": name, "status": status}, seconds
+
+
+readiness = Readiness()
+telemetry.add_collector(readiness.collect)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    server_version = "EDIHAnalitikaMetrics/1.0"
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/metrics":
+            self._send(200, telemetry.render(), CONTENT_TYPE)
+        elif path == "/ready":
+            status = readiness.status()
+            self._send(200 if status["ready"] else 503, json.dumps(status), "application/json")
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+    def _send(self, code, body, content_type):
+        raw = body.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_server(host=METRICS_HOST, port=METRICS_PORT):
+    """Pokreni /metrics u pozadinskoj dretvi (jednom po procesu); None ako je isključen ili port zauzet."""
+    global _server
+    with _server_lock:
+        if _server is None and port:
+            try:
+                _server = ThreadingHTTPServer((host, port), MetricsHandler)
+            except OSError:
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        return _server
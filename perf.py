@@ -0,0 +1,188 @@
+# EDIH ADRIA analitika - mjerenje trajanja (spanovi) i strukturirani log
+# Span = imenovani blok koda (loader, stranica, graf, OCR stranica, AI sažetak). Trajanja idu
+# u memoriju (p50/p95 po spanu, najsporiji rerunovi) i kao JSON linije u LOG_FILE.
+# Zapis u datoteku radi pozadinska dretva (QueueListener), pa span košta nekoliko µs.
+
+import contextvars
+import heapq
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from settings import LOG_FILE, LOG_LEVEL
+
+PERF_ENABLED = os.environ.get("EDIH_PERF", "1") != "0"
+SPAN_HISTORY = 1000  # trajanja po spanu za percentile
+SLOWEST_RERUNS = 20
+
+_current_rerun = contextvars.ContextVar("edih_rerun", default=None)
+
+
+def _json_logger():
+    """Logger 'edih.perf' koji JSON linije piše u LOG_FILE iz pozadinske dretve."""
+    logger = logging.getLogger("edih.perf")
+    if logger.handlers:
+        return logger
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(LOG_FILE)), exist_ok=True)
+        target = logging.FileHandler(LOG_FILE, encoding="utf-8")
+    except OSError:
+        target = logging.NullHandler()
+    target.setFormatter(logging.Formatter("%(message)s"))
+    records = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    logging.handlers.QueueListener(records, target).start()
+    return logger
+
+
+class PerfRecorder:
+    """Spanovi i rerunovi jednog procesa (dijele ih sve sesije)."""
+
+    def __init__(self, history=SPAN_HISTORY, slowest=SLOWEST_RERUNS):
+        self._durations = defaultdict(lambda: deque(maxlen=history))
+        self._misses = defaultdict(int)
+        self._totals = defaultdict(lambda: [0, 0.0])  # [broj, ukupno ms] od pokretanja (metrics.py)
+        self._slowest = []  # min-heap (ms, rerun)
+        self._slowest_size = slowest
+        self._lock = threading.Lock()
+        self._log = _json_logger()
+
+    def _emit(self, record):
+        if self._log.isEnabledFor(logging.INFO):
+            self._log.info(json.dumps(record, default=str, ensure_ascii=False))
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Izmjeri blok; trajanje ide u statistiku, aktivni rerun i log."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            rerun = _current_rerun.get()
+            with self._lock:
+                self._durations[name].append(ms)
+                totals = self._totals[name]
+                totals[0] += 1
+                totals[1] += ms
+            if rerun is not None:
+                rerun["spans"].append((name, ms))
+            self._emit({
+                "ts": round(time.time(), 3), "type": "span", "span": name, "ms": round(ms, 3),
+                "rerun": rerun["id"] if rerun else None, **attrs,
+            })
+
+    def event(self, kind, **fields):
+        """Zasebna JSON linija u logu (npr. sažetak zagrijavanja iz warmup.py)."""
+        self._emit({"ts": round(time.time(), 3), "type": kind, **fields})
+
+    def miss(self, name):
+        """Cache promašaj za span `name` (poziva se iz tijela keširane funkcije)."""
+        with self._lock:
+            self._misses[name] += 1
+
+    def start_rerun(self, session=None):
+        _current_rerun.set({"id": uuid.uuid4().hex[:12], "session": session, "start": time.perf_counter(), "spans": []})
+
+    def end_rerun(self, page=None):
+        rerun = _current_rerun.get()
+        if rerun is None:
+            return
+        _current_rerun.set(None)
+        ms = (time.perf_counter() - rerun["start"]) * 1000
+        summary = {"id": rerun["id"], "session": rerun["session"], "page": page, "ms": round(ms, 1),
+                   "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                   "top_spans": sorted(rerun["spans"], key=lambda s: -s[1])[:5]}
+        with self._lock:
+            self._durations["rerun"].append(ms)
+            totals = self._totals["rerun"]
+            totals[0] += 1
+            totals[1] += ms
+            entry = (ms, summary["id"], summary)
+            if len(self._slowest) < self._slowest_size:
+                heapq.heappush(self._slowest, entry)
+            elif ms > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+        self._emit({"ts": round(time.time(), 3), "type": "rerun", "rerun": summary["id"], "session": summary["session"],
+                    "page": page, "ms": summary["ms"]})
+
+    def stats(self):
+        """p50/p95/max po spanu, uz stopu pogodaka cachea gdje se bilježe promašaji."""
+        with self._lock:
+            durations = {name: np.fromiter(values, float) for name, values in self._durations.items()}
+            misses = dict(self._misses)
+            counts = {name: totals[0] for name, totals in self._totals.items()}
+        rows = []
+        for name, values in durations.items():
+            if not len(values):
+                continue
+            row = {"span": name, "count": len(values),
+                   "p50 ms": np.percentile(values, 50), "p95 ms": np.percentile(values, 95),
+                   "max ms": values.max(), "total ms": values.sum()}
+            # Promašaji se broje od pokretanja, a `values` drži samo zadnjih N trajanja
+            if name in misses and counts.get(name):
+                row["cache hit %"] = max(0.0, 100 * (1 - misses[name] / counts[name]))
+            rows.append(row)
+        columns = ["span", "count", "p50 ms", "p95 ms", "max ms", "total ms", "cache hit %"]
+        return pd.DataFrame(rows, columns=columns).sort_values("total ms", ascending=False).round(2)
+
+    def totals(self):
+        """{span: (broj, ukupno ms, promašaji cachea ili None)} od pokretanja procesa."""
+        with self._lock:
+            return {name: (count, total, self._misses.get(name)) for name, (count, total) in self._totals.items()}
+
+    def slowest_reruns(self):
+        with self._lock:
+            entries = sorted(self._slowest, reverse=True)
+        return pd.DataFrame([
+            {"page": s["page"], "ms": s["ms"], "at": s["at"], "session": s["session"],
+             "top spans": ", ".join(f"{name} {ms:.0f}" for name, ms in s["top_spans"])}
+            for _, _, s in entries
+        ], columns=["page", "ms", "at", "session", "top spans"])
+
+
+class _Disabled:
+    """Zamjena kad je EDIH_PERF=0 - isto sučelje, bez mjerenja."""
+
+    @contextmanager
+    def span(self, name, **attrs):
+        yield
+
+    def event(self, kind, **fields):
+        pass
+
+    def miss(self, name):
+        pass
+
+    def start_rerun(self, session=None):
+        pass
+
+    def end_rerun(self, page=None):
+        pass
+
+    def stats(self):
+        return pd.DataFrame(columns=["span", "count", "p50 ms", "p95 ms", "max ms", "total ms", "cache hit %"])
+
+    def totals(self):
+        return {}
+
+    def slowest_reruns(self):
+        return pd.DataFrame(columns=["page", "ms", "at", "session", "top spans"])
+
+
+recorder = PerfRecorder() if PERF_ENABLED else _Disabled()
+span = recorder.span
+miss = recorder.miss
@@ -0,0 +1,144 @@
+# EDIH ADRIA analitika - kolone koje stranice i izvedene tablice čitaju
+# Exporti su široki, a stranica koristi 5-15 kolona. Deklaracije ovdje određuju projekciju pri
+# učitavanju: prvo parsiranje Excela ide s usecols, a snapshotovi se čitaju samo s tim kolonama
+# (Parquet je stupčani). Obavezna kolona koje nema u exportu daje ingest.MissingColumns.
+
+from aggregates import STATE_AID_COLUMN
+from enrich import NUMERIC_COLUMNS
+from esg import ESG_DIMENSIONS, PILLARS
+from gazetteer import REGION_COLUMN
+from identity import ID_COLUMNS as CUSTOMER_ID_COLUMNS, NAME_COLUMNS as CUSTOMER_NAME_COLUMNS
+from geocoding import ADDRESS_COLUMNS
+from ingest import DATASETS
+from ranking import RANKING_COLUMNS
+from reporting import DATE_COLUMNS
+
+ALL = None  # skup podataka se čita cijeli
+
+# Čitaju se ako postoje: datumske kolone za izvještajna razdoblja, adresa i koordinate za regiju i karte,
+# kolone iz kojih nastaje ključ korisnika
+OPTIONAL_COLUMNS = {
+    name: tuple(DATE_COLUMNS.get(name, ())) for name in DATASETS
+}
+OPTIONAL_COLUMNS["services"] += (REGION_COLUMN, *ADDRESS_COLUMNS, "latitude", "longitude")
+# Naziv i ID korisnika za 'Customer key' (identity.py)
+for name in CUSTOMER_NAME_COLUMNS:
+    OPTIONAL_COLUMNS[name] += (*CUSTOMER_NAME_COLUMNS[name], *CUSTOMER_ID_COLUMNS.get(name, ()))
+
+# Ulazne kolone izvedenih tablica (po izvornom skupu podataka)
+DERIVED_COLUMNS = {
+    "services_derived": {
+        "services": (*NUMERIC_COLUMNS, "Service category delivered", "Short description of the service", "Start Date"),
+    },
+}
+# Kolone koje postoje samo u izvedenim tablicama (KPI filteri ih traže u <dataset>_derived)
+DERIVED_OUTPUTS = {"services": {"Mandays", "Education Type", "TBI Type", "DAP&FCO Type", "Is Bootcamp"}}
+
+_TBI_FUNNEL = ("Service category delivered", "Customer", "Status")
+
+
+def _esg_columns(dataset):
+    config = ESG_DIMENSIONS[dataset]
+    return (config["org_column"], "DMA Timing", *(c for pillar in PILLARS for c in config[pillar]))
+
+
+# Stranica → {skup podataka: kolone | ALL}; stranice sa Services koriste i services_derived
+PAGE_COLUMNS = {
+    "EDIH ADRIA Service Overview": {
+        "services": ("Content ID", "Service price, €", "Number of attendees", REGION_COLUMN,
+                     "Service category delivered", "Technology type used", "Customer staff size", "Start Year"),
+    },
+    "EU EDIH Comparison": {
+        "edih_list": ("EDIH Name", "Country", "Latitude", "Longitude", *RANKING_COLUMNS),
+    },
+    # DMA dimenzije su sve kolone između 'DMA Score' i 'EDIH Name' (dma_progression.dimension_columns)
+    "DMA - Summary": {"sme_dma": ALL, "pso_dma": ALL},
+    "Bootcamp - Summary": {
+        "services": ("Start Year", "Customer", "Number of attendees"),
+    },
+    "TBI - Summary": {
+        "services": (*_TBI_FUNNEL, "Service price, €", "Start Date", "Short description of the service",
+                     "Technology type used"),
+    },
+    "DAP&FCO - Summary": {
+        "services": (*_TBI_FUNNEL, "Service price, €", "Short description of the service", "Technology type used"),
+    },
+    "Education - Summary": {
+        "services": ("Start Year", "Customer", "Customer type", "Short description of the service",
+                     "Number of attendees", "Service price, €"),
+    },
+    "State Aid - Summary": {
+        "services": ("Specific information on State Aid", "Content ID", STATE_AID_COLUMN),
+        "zahtjevi_ps": ("Vrsta usluge", "Vrijednost usluge", "Započeto je pružanje usluge (DA/NE)"),
+        "zahtjevi_sme": ("Vrsta usluge", "Vrijednost usluge", "Iznos potpore", "Započeto je pružanje usluge (DA/NE)"),
+    },
+    "ESG - Summary": {"sme_dma": _esg_columns("sme_dma"), "pso_dma": _esg_columns("pso_dma")},
+}
+
+
+def kpi_columns(definitions):
+    """Kolone iz KPI definicija (kolona izvora i kolone filtera) po skupu podataka."""
+    columns = {}
+
+    def add(dataset, column):
+        if column not in DERIVED_OUTPUTS.get(dataset, ()):
+            columns.setdefault(dataset, []).append(column)
+
+    def add_filter(dataset, spec):
+        if not spec:
+            return
+        for part in spec.get("all", [spec]):
+            if "all" in part:
+                add_filter(dataset, part)
+            elif "column" in part:
+                add(dataset, part["column"])
+
+    for kpi in definitions:
+        for source in kpi["sources"]:
+            if "dataset" not in source:
+                continue
+            if "column" in source:
+                add(source["dataset"], source["column"])
+            add_filter(source["dataset"], source.get("filter"))
+    return {dataset: tuple(dict.fromkeys(cols)) for dataset, cols in columns.items()}
+
+
+def merge_columns(*declarations):
+    """Unija deklaracija {skup: kolone | ALL}; ALL u bilo kojoj deklaraciji znači cijeli skup."""
+    merged = {}
+    for declaration in declarations:
+        for dataset, columns in declaration.items():
+            if columns is ALL or (dataset in merged and merged[dataset] is ALL):
+                merged[dataset] = ALL
+            else:
+                merged[dataset] = tuple(dict.fromkeys((*merged.get(dataset, ()), *columns)))
+    return merged
+
+
+def required_columns(pages=None, definitions=None):
+    """{skup: (obavezne, neobavezne) | ALL} za stranice (zadano sve) i KPI definicije.
+
+    Skup podataka koji nijedna stranica ni KPI ne koristi čita se samo s neobaveznim kolonama
+    (datumi za rezanje razdoblja), pa ključevi frameova ostaju isti.
+    """
+    pages = PAGE_COLUMNS if pages is None else pages
+    # services_derived (enrich_services) računa se uvijek uz Services
+    merged = merge_columns(*(PAGE_COLUMNS[page] for page in pages), kpi_columns(definitions or []),
+                           *DERIVED_COLUMNS.values())
+    return {
+        name: ALL if merged.get(name, ()) is ALL else (merged.get(name, ()), OPTIONAL_COLUMNS[name])
+        for name in DATASETS
+    }
+
+
+def missing_for_page(frames, page):
+    """{skup: [kolone]} deklarirane za stranicu, a kojih nema u učitanim frameovima."""
+    missing = {}
+    for dataset, columns in PAGE_COLUMNS[page].items():
+        frame = frames.get(dataset)
+        if columns is ALL or frame is None or frame.empty:
+            continue
+        absent = [c for c in columns if c not in frame.columns]
+        if absent:
+            missing[dataset] = absent
+    return missing
@@ -0,0 +1,123 @@
+# EDIH ADRIA analitika - provjera kvalitete podataka pri učitavanju
+# Pravila su vektorske maske nad cijelim stupcem (bez petlji po redovima), pa provjera raste
+# linearno s brojem redova. Izvještaj se računa jednom po verziji skupa podataka (dashboard ga
+# drži u cache_resource) i sadrži broj problematičnih redova i njihove brojeve redova u Excelu.
+#
+#   python quality.py                 # izvještaj za najnovije exporte u Data/
+#   python quality.py --out dq.csv    # uz popis redova po pravilu
+
+import argparse
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from dma_progression import STAGES
+from enrich import DAP_CATEGORY, TBI_CATEGORY, TRAINING_CATEGORY
+
+ECOSYSTEM_CATEGORY = "Ecosystem building"
+KNOWN_CATEGORIES = (TBI_CATEGORY, DAP_CATEGORY, TRAINING_CATEGORY, ECOSYSTEM_CATEGORY)
+EXCEL_HEADER_ROWS = 2  # prvi podatkovni red u Excelu je 2 (1 = zaglavlje)
+
+REPORT_COLUMNS = ["dataset", "rule", "severity", "description", "status", "checked", "count", "rows"]
+
+Rule = namedtuple("Rule", "name severity description columns check")
+
+
+def _numeric(values):
+    return pd.to_numeric(values, errors="coerce")
+
+
+def _normalized(values):
+    return values.astype(str).str.strip()
+
+
+RULES = {
+    "services": [
+        # 'Start/End Date' izvodi ingest.parse_service_dates; NaT = datum iz 'Dates' nije prepoznat
+        Rule("invalid_start_date", "warning", "Neispravan datum početka u 'Dates'", ("Dates", "Start Date"),
+             lambda df: df["Start Date"].isna()),
+        Rule("invalid_end_date", "warning", "Neispravan datum završetka u 'Dates'", ("Dates", "End Date"),
+             lambda df: df["End Date"].isna()),
+        Rule("missing_price", "error", "Nedostaje ili nije broj: 'Service price, €'", ("Service price, €",),
+             lambda df: _numeric(df["Service price, €"]).isna()),
+        Rule("negative_attendees", "error", "Negativan 'Number of attendees'", ("Number of attendees",),
+             lambda df: _numeric(df["Number of attendees"]) < 0),
+        Rule("unknown_category", "warning", "Nepoznata vrijednost 'Service category delivered'",
+             ("Service category delivered",),
+             lambda df: df["Service category delivered"].notna()
+             & ~_normalized(df["Service category delivered"]).isin(KNOWN_CATEGORIES)),
+        Rule("duplicate_content_id", "error", "'Content ID' se ponavlja", ("Content ID",),
+             lambda df: df["Content ID"].notna() & df["Content ID"].duplicated(keep=False)),
+    ],
+    "sme_dma": [
+        Rule("invalid_dma_timing", "error", f"'DMA Timing' nije {'/'.join(STAGES)}", ("DMA Timing",),
+             lambda df: ~_normalized(df["DMA Timing"]).str.upper().isin(STAGES)),
+    ],
+}
+RULES["pso_dma"] = RULES["sme_dma"]
+
+
+def excel_rows(positions):
+    """Pozicije u frameu → brojevi redova u Excelu (zaglavlje je red 1)."""
+    return np.asarray(positions, dtype=np.int64) + EXCEL_HEADER_ROWS
+
+
+def validate(df, dataset):
+    """Izvještaj kvalitete jednog skupa podataka: jedan red po pravilu iz RULES[dataset].
+
+    `rows` su brojevi redova u Excelu (numpy polje) koji pravilo ne zadovoljavaju; pravilo čije
+    kolone ne postoje ima status 'column missing' i ne broji redove.
+    """
+    records = []
+    if df is None or df.empty:
+        return pd.DataFrame(records, columns=REPORT_COLUMNS)
+    for rule in RULES.get(dataset, ()):
+        absent = [c for c in rule.columns if c not in df.columns]
+        if absent:
+            records.append((dataset, rule.name, rule.severity, rule.description,
+                            f"column missing: {', '.join(absent)}", 0, 0, excel_rows([])))
+            continue
+        mask = np.asarray(rule.check(df), dtype=bool)
+        positions = np.flatnonzero(mask)
+        records.append((dataset, rule.name, rule.severity, rule.description,
+                        "failed" if len(positions) else "ok", len(df), len(positions), excel_rows(positions)))
+    return pd.DataFrame(records, columns=REPORT_COLUMNS)
+
+
+def validate_all(frames):
+    """Izvještaj za sve skupove podataka koji imaju pravila."""
+    reports = [validate(frames.get(dataset), dataset) for dataset in RULES]
+    return pd.concat(reports, ignore_index=True) if reports else pd.DataFrame(columns=REPORT_COLUMNS)
+
+
+def issue_count(report):
+    """Broj pravila koja nisu prošla (uključujući kolone koje nedostaju)."""
+    return int((report["status"] != "ok").sum())
+
+
+def offending_rows(df, rows):
+    """Redovi frame-a za brojeve redova iz izvještaja, s kolonom 'Excel row'."""
+    positions = np.asarray(rows, dtype=np.int64) - EXCEL_HEADER_ROWS
+    return df.iloc[positions].assign(**{"Excel row": rows})
+
+
+def main():
+    from datasets import load_current
+    from settings import DATA_FOLDER, SNAPSHOT_FOLDER
+    from snapshots import SnapshotStore
+
+    parser = argparse.ArgumentParser(description="Provjera kvalitete najnovijih exporta.")
+    parser.add_argument("--data", default=DATA_FOLDER)
+    parser.add_argument("--out", help="CSV s izvještajem i brojevima redova")
+    args = parser.parse_args()
+
+    report = validate_all(load_current(args.data, SnapshotStore(SNAPSHOT_FOLDER)))
+    print(report.drop(columns="rows").to_string(index=False))
+    if args.out:
+        report.assign(rows=report["rows"].map(lambda rows: " ".join(map(str, rows)))).to_csv(args.out, index=False)
+    raise SystemExit(1 if (report["severity"].eq("error") & report["status"].ne("ok")).any() else 0)
+
+
+if __name__ == "__main__":
+    main()
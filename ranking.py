@@ -0,0 +1,78 @@
+# EDIH ADRIA analitika - rangiranje EU EDIH-ova i usporedba sa sličnima
+# Jedan vektorski prolaz nad cijelom EU listom: rang i percentil po metrici, složeni
+# rezultat s težinama, rang u državi i u skupini sličnih (ista država, slična veličina).
+
+import pandas as pd
+
+RANKING_COLUMNS = ["DMA", "EDUC", "TBI", "FCO", "NETWORK"]
+DEFAULT_WEIGHTS = {col: 1.0 for col in RANKING_COLUMNS}
+SIZE_BANDS = ["XS", "S", "M", "L", "XL"]
+MIN_PEERS = 3
+
+
+def size_band(total, bands=SIZE_BANDS):
+    """Kvantilni razred veličine (ukupna aktivnost) - XS … XL."""
+    n = min(len(bands), total.notna().sum())
+    if n == 0:
+        return pd.Series(pd.NA, index=total.index, dtype="object")
+    # Rang umjesto vrijednosti: qcut ne puca na jednakim rubovima
+    return pd.qcut(total.rank(method="first"), n, labels=bands[:n]) if n > 1 else pd.Series(bands[0], index=total.index)
+
+
+def rank_edihs(edih_data, weights=None):
+    """Tablica rangova za sve EDIH-ove, sortirana po složenom rezultatu (najbolji prvi).
+
+    Složeni rezultat je ponderirani prosjek percentila metrika (0–100), pa metrike
+    različitih skala doprinose razmjerno težinama.
+    """
+    weights = pd.Series({**DEFAULT_WEIGHTS, **(weights or {})})[RANKING_COLUMNS].astype(float)
+    scores = edih_data[RANKING_COLUMNS].apply(pd.to_numeric, errors="coerce")
+    percentiles = scores.rank(pct=True) * 100
+    ranks = scores.rank(ascending=False, method="min")
+
+    table = edih_data[["EDIH Name", "Country"]].copy()
+    table[RANKING_COLUMNS] = scores
+    table["Total"] = scores.sum(axis=1, min_count=1)
+    for col in RANKING_COLUMNS:
+        table[f"{col} rank"] = ranks[col].astype("Int64")
+        table[f"{col} pct"] = percentiles[col].round(1)
+    total_weight = weights.sum() or 1.0
+    table["Composite"] = (percentiles.fillna(0) * weights).sum(axis=1).div(total_weight).round(2)
+    table["EU rank"] = table["Composite"].rank(ascending=False, method="min").astype("Int64")
+
+    by_country = table.groupby("Country")["Composite"]
+    table["Country rank"] = by_country.rank(ascending=False, method="min").astype("Int64")
+    table["Country EDIHs"] = by_country.transform("size").astype("Int64")
+    table["vs country avg"] = (table["Composite"] - by_country.transform("mean")).round(2)
+
+    table["Size band"] = size_band(table["Total"])
+    by_peers = table.groupby(["Country", "Size band"], observed=True)["Composite"]
+    table["Peer rank"] = by_peers.rank(ascending=False, method="min").astype("Int64")
+    table["Peer EDIHs"] = by_peers.transform("size").astype("Int64")
+    table["vs peer avg"] = (table["Composite"] - by_peers.transform("mean")).round(2)
+    return table.sort_values(["Composite", "Total"], ascending=False, kind="stable")
+
+
+def peer_set(ranking, name, min_peers=MIN_PEERS):
+    """EDIH-ovi usporedivi s `name`: ista država i razred veličine; premalo → isti razred u EU."""
+    focus = ranking.loc[ranking["EDIH Name"] == name]
+    if focus.empty:
+        return ranking.iloc[0:0]
+    country, band = focus.iloc[0]["Country"], focus.iloc[0]["Size band"]
+    same_band = ranking["Size band"] == band
+    peers = ranking[same_band & (ranking["Country"] == country)]
+    if len(peers) < min_peers:
+        peers = ranking[same_band]
+    return peers
+
+
+def country_rankings(ranking):
+    """Države po prosječnom složenom rezultatu svojih EDIH-ova."""
+    countries = ranking.groupby("Country").agg(
+        EDIHs=("EDIH Name", "count"),
+        avg_composite=("Composite", "mean"),
+        best_composite=("Composite", "max"),
+        **{f"avg_{col}": (col, "mean") for col in RANKING_COLUMNS},
+    ).round(2)
+    countries["Rank"] = countries["avg_composite"].rank(ascending=False, method="min").astype("Int64")
+    return countries.sort_values("avg_composite", ascending=False).reset_index()
@@ -0,0 +1,486 @@
+# EDIH ADRIA analitika - statički izvještaj svih stranica (HTML + PNG), bez preglednika
+# Pokretanje:  python report.py --period "Midterm (30.09.2024)" [--workers 4] [--force]
+#
+# Svaka stranica renderira se u zasebnom procesu u Reports/<razdoblje>/<stranica>/:
+# index.html (interaktivni Plotly grafovi + tablice), <graf>.png (matplotlib) i <tablica>.csv.
+# Stranica se ponovno renderira samo ako su se promijenile verzije njenih skupova
+# podataka ili kod koji oblikuje izvještaj (ključ u .version).
+
+import argparse
+import ast
+import hashlib
+import html
+import json
+import os
+import re
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+import figures
+from aggregates import (
+    RANKING_COLUMNS, bootcamp_summary, dap_tables, edih_ranking, education_tables,
+    service_overview, state_aid_tables, tbi_funnel, tbi_tables,
+)
+from datasets import current_versions, load_current, slice_frames
+from dma_progression import build_progression
+from enrich import enrich_services
+from heatmaps import band_matrix, score_band, sorted_rows, window
+from identity import CustomerIndex
+from esg import PILLARS, compute_esg_scores, cohort_scores, esg_matrix
+from ingest import file_version
+from kpis import KPI_FILE, evaluate_kpis, kpis_for_page, load_definitions
+from projection import required_columns
+from reporting import DATE_COLUMNS, REPORTING_PERIODS, period_bounds
+from settings import APP_FOLDER, DATA_FOLDER, SNAPSHOT_FOLDER
+from snapshots import SnapshotStore
+
+REPORT_FOLDER = os.environ.get("EDIH_REPORT_FOLDER", os.path.join(APP_FOLDER, "Reports"))
+
+# Stranice dashboarda (redoslijed izbornika) i skupovi podataka o kojima ovise
+PAGE_DATASETS = {
+    "EDIH ADRIA Service Overview": ("services",),
+    "EU EDIH Comparison": ("edih_list",),
+    "DMA - Summary": ("sme_dma", "pso_dma"),
+    "Bootcamp - Summary": ("services",),
+    "TBI - Summary": ("services",),
+    "DAP&FCO - Summary": ("services",),
+    "Education - Summary": ("services",),
+    "State Aid - Summary": ("services", "zahtjevi_ps", "zahtjevi_sme"),
+    "ESG - Summary": ("sme_dma", "pso_dma"),
+}
+DMA_DATASETS = {"sme_dma": ("SMEs", "SME name"), "pso_dma": ("Public Organizations", "PSO name")}
+
+Section = namedtuple("Section", "key title figure table")
+
+
+def slugify(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def code_files():
+    """report.py i svi moduli ovog foldera koje uvozi, izravno ili preko drugih modula (i unutar funkcija)."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    found, pending = set(), [os.path.abspath(__file__)]
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.add(path)
+        with open(path, encoding="utf-8") as fh:
+            tree = ast.parse(fh.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module = os.path.join(here, name.split(".")[0] + ".py")
+                if os.path.exists(module):
+                    pending.append(module)
+    return sorted(found)
+
+
+def code_version():
+    """Verzija koda koji oblikuje izvještaj - promjena bilo kojeg modula poništava sve stranice."""
+    return "".join(file_version(path) for path in code_files()) + file_version(KPI_FILE)
+
+
+def page_key(page, period, versions, code, customers_version):
+    datasets = set(PAGE_DATASETS[page])
+    for kpi in load_definitions():
+        if kpi["page"] == page:
+            datasets.update(s["dataset"] for s in kpi["sources"] if "dataset" in s)
+    # Ručna pravila korisnika (CustomerIndex.version) mijenjaju 'Customer key' i bez novog exporta
+    payload = [page, period, code, customers_version, {name: versions.get(name) for name in sorted(datasets)}]
+    return hashlib.sha1(json.dumps(payload).encode("utf-8")).hexdigest()[:16]
+
+
+# --- Sadržaj stranica (isti builderi kao u dashboardu) ---
+
+def _dma_sections(frames):
+    sections = []
+    for dataset, (label, org_column) in DMA_DATASETS.items():
+        data = frames[dataset]
+        if data.empty or org_column not in data.columns:
+            continue
+        data = data.rename(columns=lambda c: c.replace('"', '').strip())
+        progression = build_progression(data, org_column)
+        dimensions = list(progression.dimensions)
+
+        heatmap_data = data.dropna(subset=dimensions).assign(**{"Score band": lambda df: score_band(df["DMA Score"])})
+        for group_column in ("DMA Timing", "Score band"):
+            bands = band_matrix(heatmap_data, group_column, dimensions)
+            title = f"DMA Score Heatmap – {label} – average by {group_column}"
+            sections.append(Section(f"{dataset}-heatmap-{slugify(group_column)}", title,
+                                    figures.matrix_heatmap(bands, title, colorscale="RdBu"), bands.round(1).reset_index(names=group_column)))
+
+        stage_stats, _ = progression.stage_completion()
+        sections.append(Section(f"{dataset}-stages", f"DMA stages – {label}", None, stage_stats))
+        for from_stage, to_stage in (("T0", "T1"), ("T0", "T2"), ("T1", "T2")):
+            most_improved = progression.most_improved(from_stage, to_stage, n=10)
+            if not most_improved.empty:
+                step = f"{from_stage} → {to_stage}"
+                sections.append(Section(f"{dataset}-improved-{from_stage}-{to_stage}", f"Most improved – {label} ({step})",
+                                        figures.most_improved_bar(most_improved, step), most_improved))
+        cohort = pd.DataFrame(progression.cohort_averages().round(1), index=list(progression.stages), columns=dimensions)
+        sections.append(Section(f"{dataset}-cohorts", f"Cohort averages by stage – {label}", None, cohort.dropna(how="all")))
+    return sections
+
+
+def _esg_sections(frames):
+    sections = []
+    for dataset, (label, _) in DMA_DATASETS.items():
+        scores = compute_esg_scores(frames[dataset], dataset)
+        if scores.empty:
+            continue
+        sections.append(Section(f"{dataset}-esg", f"ESG Score Heatmap – {label}",
+                                figures.esg_heatmap(esg_matrix(scores), PILLARS), cohort_scores(scores)))
+    return sections
+
+
+def page_sections(page, frames):
+    """Grafovi i tablice jedne stranice; varijante widgeta (SME/PSO, T0→T1…) renderiraju se sve."""
+    data, derived = frames["services"], frames["services_derived"]
+
+    if page == "EDIH ADRIA Service Overview":
+        overview = service_overview(data, derived)
+        charts = figures.overview_figures(overview)
+        return [Section(key, charts[key].layout.title.text, charts[key], table) for key, table in overview.items()]
+
+    if page == "EU EDIH Comparison":
+        ranking = edih_ranking(frames["edih_list"])
+        bands = band_matrix(ranking, "Country", RANKING_COLUMNS)
+        top = window(sorted_rows(ranking, "EDIH Name", RANKING_COLUMNS), 0)
+        return [
+            Section("ranking-countries", "EDIH Rankings – average by Country",
+                    figures.matrix_heatmap(bands, "EDIH Rankings – average by Country"), bands.round(1).reset_index(names="Country")),
+            Section("ranking-top", f"EDIH Rankings – top {len(top)}",
+                    figures.matrix_heatmap(top, f"EDIH Rankings – top {len(top)}"), ranking),
+        ]
+
+    if page == "Education - Summary":
+        education = education_tables(data, derived)
+        sections = [Section("by-year", "Attendees by Education Type", figures.education_by_year(education["by_year"]), education["by_year"])]
+        for customer_type in ("SME", "PSO"):
+            courses = education["by_course"][education["by_course"]["Customer type"] == customer_type]
+            sections.append(Section(f"by-course-{customer_type.lower()}", f"Delivered Education by Course – {customer_type}",
+                                    figures.education_by_course(courses), courses))
+        return sections
+
+    if page == "Bootcamp - Summary":
+        summary = bootcamp_summary(data, derived)
+        return [Section("by-year", "Bootcamp Participants by Year", figures.bootcamp_by_year(summary), summary)]
+
+    if page == "TBI - Summary":
+        tbi = tbi_tables(data, derived)
+        conversion = tbi_funnel(data)
+        by_value = tbi["summary"].sort_values('total_price', ascending=True)
+        return [
+            Section("timeline", "TBI Trend Over Time", figures.tbi_timeline(tbi["timeline"]), tbi["timeline"]),
+            Section("top-organizations", "Top 10 Organizations by TBI Mandays",
+                    figures.tbi_top_organizations(tbi["top_organizations"]), tbi["top_organizations"][['Customer', 'total_mandays', 'total_price']]),
+            Section("conversion", f"TBI to DAP/FCO Conversion ({conversion['conversion_rate']:.1f}%)",
+                    figures.conversion_funnel(conversion["funnel"]), pd.DataFrame({'Organization': conversion["converted"]})),
+            Section("status", "Work Completion Percentage by Status", figures.tbi_status_pie(tbi["summary"]), None),
+            Section("value", "TBI Service Value by Customer", figures.tbi_value_by_customer(by_value),
+                    by_value[['Customer', 'Status', 'total_price', 'total_mandays']]),
+            Section("types", "TBI Support Type Distribution", figures.tbi_type_sunburst(tbi["by_type"]), tbi["by_type"]),
+            Section("technology", "TBI Customers by Technology Type",
+                    figures.customers_by_technology(tbi["technology"], "TBI Customers by Technology Type"), tbi["technology"]),
+        ]
+
+    if page == "DAP&FCO - Summary":
+        dap = dap_tables(data, derived)
+        return [
+            Section("value", "DAP & FCO - Service value", figures.dap_value_by_customer(dap["summary"]), dap["summary"]),
+            Section("types", "DAP&FCO Support Analysis", figures.dap_types_by_customer(dap["by_type"]), dap["by_type"]),
+            Section("technology", "DAP&FCO Customers by Technology Type",
+                    figures.customers_by_technology(dap["technology"], "DAP&FCO Customers by Technology Type", colored=False), dap["technology"]),
+        ]
+
+    if page == "State Aid - Summary":
+        state_aid = state_aid_tables(data, frames["zahtjevi_ps"], frames["zahtjevi_sme"])
+        return [
+            Section("public-sector", "State Aid Summary for Public Sector", figures.state_aid_public_sector(state_aid["public_sector"]), state_aid["public_sector"]),
+            Section("sme", "State Aid Summary for SMEs", figures.state_aid_sme(state_aid["sme"]), state_aid["sme"]),
+            Section("eu", "State Aid Summary", figures.state_aid_eu(state_aid["eu"]), state_aid["eu"]),
+        ]
+
+    if page == "DMA - Summary":
+        return _dma_sections(frames)
+
+    if page == "ESG - Summary":
+        return _esg_sections(frames)
+
+    raise ValueError(f"Nepoznata stranica: {page}")
+
+
+def kpi_sections(kpi_results, page):
+    sections = []
+    for kpi_id, kpi in kpis_for_page(kpi_results, page).iterrows():
+        if kpi["gauge"]:
+            sections.append(Section(f"kpi-{kpi_id}", kpi["label"], figures.kpi_gauge(kpi), None))
+    table = kpis_for_page(kpi_results, page)[["label", "value", "target", "percent"]]
+    if not table.empty:
+        sections.append(Section("kpi-progress", "Progress Toward Target", None, table.round(2)))
+    return sections
+
+
+# --- Statičke slike (matplotlib) ---
+
+def _values(values):
+    return [] if values is None else list(values)
+
+
+def figure_png(fig, path):
+    """PNG grafa preko matplotliba (bez preglednika/kaleida). Vraća False za nepodržane tipove."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    traces = list(fig.data)
+    if not traces or any(t.type not in ("bar", "pie", "funnel", "scatter", "heatmap", "indicator", "sunburst") for t in traces):
+        return False
+
+    height = min(max((fig.layout.height or 500) / 100, 4), 30)
+    plot, ax = plt.subplots(figsize=(11, height))
+    bars = [t for t in traces if t.type == "bar"]
+
+    if bars:
+        horizontal = bars[0].orientation == "h"
+        categories = list(dict.fromkeys(str(c) for t in bars for c in _values(t.y if horizontal else t.x)))
+        positions = {c: i for i, c in enumerate(categories)}
+        stacked = fig.layout.barmode in ("stack", "relative") or (fig.layout.barmode is None and len(bars) > 1 and horizontal)
+        width = 0.8 if stacked else 0.8 / len(bars)
+        base = np.zeros(len(categories))
+        for i, trace in enumerate(bars):
+            keys, values = (trace.y, trace.x) if horizontal else (trace.x, trace.y)
+            idx = np.array([positions[str(k)] for k in _values(keys)], dtype=int)
+            vals = np.zeros(len(categories))
+            np.add.at(vals, idx, pd.to_numeric(pd.Series(_values(values)), errors="coerce").fillna(0).to_numpy())
+            offset = np.arange(len(categories)) + (0 if stacked else (i - (len(bars) - 1) / 2) * width)
+            draw = ax.barh if horizontal else ax.bar
+            draw(offset, vals, width, base if stacked else 0, label=trace.name or None)
+            if stacked:
+                base += vals
+        (ax.set_yticks if horizontal else ax.set_xticks)(range(len(categories)))
+        (ax.set_yticklabels if horizontal else ax.set_xticklabels)(categories, fontsize=8, **({} if horizontal else {"rotation": 45, "ha": "right"}))
+
+    for trace in traces:
+        if trace.type == "scatter":
+            target = ax.twinx() if bars else ax
+            target.plot([str(x) for x in _values(trace.x)], _values(trace.y), marker="o", color="#2E7D32", label=trace.name)
+        elif trace.type == "pie":
+            ax.pie(_values(trace.values), labels=_values(trace.labels), autopct="%1.0f%%", textprops={"fontsize": 8})
+        elif trace.type == "sunburst":
+            # Samo prva razina hijerarhije (korijenski segmenti)
+            roots = [(label, value) for label, parent, value in zip(trace.labels, trace.parents, trace.values) if not parent]
+            ax.pie([v for _, v in roots], labels=[label for label, _ in roots], autopct="%1.0f%%", textprops={"fontsize": 8})
+        elif trace.type == "funnel":
+            labels, counts = _values(trace.y)[::-1], _values(trace.x)[::-1]
+            ax.barh(range(len(counts)), counts, color="#2196F3")
+            ax.set_yticks(range(len(labels)))
+            ax.set_yticklabels(labels)
+        elif trace.type == "heatmap":
+            z = np.asarray(trace.z, dtype=float)
+            image = ax.imshow(z, aspect="auto", cmap="viridis", interpolation="nearest", origin="lower")
+            x, y = _values(trace.x), _values(trace.y)
+            if x:
+                ax.set_xticks(range(len(x)))
+                ax.set_xticklabels([str(v) for v in x], rotation=45, ha="right", fontsize=8)
+            if y and len(y) <= 200:
+                ax.set_yticks(range(len(y)))
+                ax.set_yticklabels([str(v) for v in y], fontsize=6)
+            plot.colorbar(image, ax=ax)
+        elif trace.type == "indicator":
+            axis_range = trace.gauge.axis.range or (0, 100)
+            ax.barh([0], [trace.value or 0], color="orange")
+            ax.set_xlim(*axis_range)
+            ax.set_yticks([])
+            if trace.gauge.threshold.value is not None:
+                ax.axvline(trace.gauge.threshold.value, color="red", linewidth=3)
+            ax.text(0.5, 0.5, f"{trace.value:,.1f}", transform=ax.transAxes, ha="center", va="center", fontsize=20)
+            plot.set_size_inches(8, 2.5)
+
+    title = fig.layout.title.text or (traces[0].title.text if traces[0].type == "indicator" else "")
+    ax.set_title(title or "", loc="left")
+    if len(bars) > 1 or any(t.type == "scatter" for t in traces):
+        ax.legend(fontsize=8)
+    plot.tight_layout()
+    plot.savefig(path, dpi=100)
+    plt.close(plot)
+    return True
+
+
+# --- Renderiranje (u procesima) ---
+
+_worker_frames = None
+
+
+def load_period(period, pages=None):
+    """Skupovi podataka razdoblja + izvedene kolone i KPI rezultati; vraća (frames, versions, kpis, unfiltered).
+
+    Čitaju se samo kolone koje `pages` (zadano sve stranice) i KPI-jevi deklariraju (projection.py).
+    """
+    store = SnapshotStore(SNAPSHOT_FOLDER)
+    definitions = load_definitions()
+    columns = required_columns(pages, definitions)
+    customers = CustomerIndex()
+    frames = load_current(DATA_FOLDER, store, columns, customers)
+    start, end = period_bounds(period)
+    frames, versions, unfiltered = slice_frames(frames, current_versions(DATA_FOLDER), start, end, store,
+                                                columns=columns, customer_index=customers)
+    frames["services_derived"] = enrich_services(frames["services"])
+    return frames, versions, evaluate_kpis(frames, definitions, period), unfiltered
+
+
+def period_versions(period, store):
+    """Verzije skupova podataka razdoblja samo iz stat() i manifesta snapshotova, bez učitavanja.
+
+    Kao slice_frames: ako razdoblje završava prije najnovijeg exporta, vrijedi snapshot s kraja razdoblja.
+    """
+    versions = current_versions(DATA_FOLDER)
+    _, end = period_bounds(period)
+    if end is not None:
+        for name in DATE_COLUMNS:
+            snapshot_version = store.version_as_of(name, end)
+            if snapshot_version and snapshot_version != store.latest_version(name):
+                versions[name] = snapshot_version
+    return versions
+
+
+def _init_worker(period, pages):
+    global _worker_frames
+    _worker_frames = load_period(period, pages)
+
+
+def render_page(page, period, key, folder):
+    """Renderira jednu stranicu u `folder`; poziva se u procesu iz poola."""
+    started = time.perf_counter()
+    frames, versions, kpi_results, unfiltered = _worker_frames
+    os.makedirs(folder, exist_ok=True)
+    # Stari grafovi/tablice (npr. preimenovane sekcije) ne smiju ostati u novom izvještaju
+    for name in os.listdir(folder):
+        if os.path.isfile(os.path.join(folder, name)):
+            os.remove(os.path.join(folder, name))
+
+    parts = []
+    for section in page_sections(page, frames) + kpi_sections(kpi_results, page):
+        parts.append(f"<section><h2>{html.escape(section.title)}</h2>")
+        if section.figure is not None:
+            parts.append(section.figure.to_html(full_html=False, include_plotlyjs=False))
+            if figure_png(section.figure, os.path.join(folder, f"{section.key}.png")):
+                parts.append(f'<p><a href="{section.key}.png">PNG</a></p>')
+        if section.table is not None and not section.table.empty:
+            section.table.to_csv(os.path.join(folder, f"{section.key}.csv"), index=section.key == "kpi-progress")
+            parts.append(f'<details><summary>Tabular data (<a href="{section.key}.csv">CSV</a>)</summary>')
+            parts.append(section.table.to_html(index=False, na_rep="", float_format=lambda v: f"{v:,.2f}"))
+            parts.append("</details>")
+        parts.append("</section>")
+
+    used = {name: versions.get(name) for name in PAGE_DATASETS[page]}
+    unfiltered = [name for name in unfiltered if name in used]
+    with open(os.path.join(folder, "index.html"), "w", encoding="utf-8") as fh:
+        fh.write(_html_page(f"{page} – {period}", "".join(parts), "../../plotly.min.js", used, unfiltered))
+    # .version se piše zadnji - prekinuti render se ponavlja
+    with open(os.path.join(folder, ".version"), "w", encoding="utf-8") as fh:
+        fh.write(key)
+    return page, time.perf_counter() - started
+
+
+def _html_page(title, body, plotly_src=None, versions=None, unfiltered=None):
+    script = f'<script src="{plotly_src}"></script>' if plotly_src else ""
+    meta = "".join(f"<code>{html.escape(k)}: {html.escape(str(v))}</code> " for k, v in (versions or {}).items())
+    if unfiltered:
+        meta += f"<br>Not filtered by period (no date column): {html.escape(', '.join(unfiltered))}"
+    return (
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(title)}</title>{script}'
+        '<style>body{font-family:Arial,sans-serif;margin:2em;color:#333}section{margin-bottom:2em}'
+        'table{border-collapse:collapse;font-size:13px}td,th{border:1px solid #ddd;padding:3px 8px}</style>'
+        f'</head><body><h1>{html.escape(title)}</h1><p>{meta}</p>{body}</body></html>'
+    )
+
+
+def _current_key(folder):
+    try:
+        with open(os.path.join(folder, ".version"), encoding="utf-8") as fh:
+            return fh.read().strip()
+    except OSError:
+        return None
+
+
+def export_report(period, out_folder=REPORT_FOLDER, pages=None, workers=None, force=False):
+    """Izvoz svih stranica za razdoblje; vraća {stranica: 'rendered'|'reused'}."""
+    started = time.perf_counter()
+    pages = list(pages or PAGE_DATASETS)
+    # Ingest novih exporta u snapshot store prije paralelnog renderiranja (procesi samo čitaju);
+    # ključevi stranica su samo iz stat() i manifesta - frameove učitavaju tek procesi koji renderiraju
+    store = SnapshotStore(SNAPSHOT_FOLDER)
+    store.ingest_folder(DATA_FOLDER)
+    versions = period_versions(period, store)
+    code = code_version()
+    customers_version = CustomerIndex().version()
+
+    period_folder = os.path.join(out_folder, slugify(period))
+    os.makedirs(period_folder, exist_ok=True)
+    plotly_js = os.path.join(out_folder, "plotly.min.js")
+    if not os.path.exists(plotly_js):
+        with open(plotly_js, "w", encoding="utf-8") as fh:
+            fh.write(get_plotlyjs())
+
+    jobs, status = {}, {}
+    for page in pages:
+        key = page_key(page, period, versions, code, customers_version)
+        folder = os.path.join(period_folder, slugify(page))
+        if not force and _current_key(folder) == key:
+            status[page] = "reused"
+        else:
+            jobs[page] = (key, folder)
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers or min(len(jobs), os.cpu_count() or 1),
+                                 initializer=_init_worker, initargs=(period, list(jobs))) as pool:
+            futures = {pool.submit(render_page, page, period, key, folder): page for page, (key, folder) in jobs.items()}
+            for future in as_completed(futures):
+                page = futures[future]
+                try:
+                    _, seconds = future.result()
+                except Exception as e:
+                    status[page] = f"failed: {e}"
+                    print(f"  {page}: ⚠️ {e}")
+                else:
+                    status[page] = "rendered"
+                    print(f"  {page}: {seconds:.1f}s")
+
+    links = "".join(
+        f'<li><a href="{slugify(page)}/index.html">{html.escape(page)}</a> ({status[page]})</li>' for page in pages
+    )
+    with open(os.path.join(period_folder, "index.html"), "w", encoding="utf-8") as fh:
+        fh.write(_html_page(f"EDIH ADRIA – {period}", f"<ul>{links}</ul>", versions=versions))
+
+    rendered = sum(state == "rendered" for state in status.values())
+    print(f"{period}: {rendered} rendered, {len(pages) - len(jobs)} reused, {len(jobs) - rendered} failed "
+          f"in {time.perf_counter() - started:.1f}s → {period_folder}")
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Statički izvještaj svih stranica EDIH dashboarda.")
+    parser.add_argument("--period", default="Full project", choices=list(REPORTING_PERIODS))
+    parser.add_argument("--out", default=REPORT_FOLDER)
+    parser.add_argument("--page", action="append", choices=list(PAGE_DATASETS), help="samo odabrane stranice")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="renderiraj i nepromijenjene stranice")
+    args = parser.parse_args()
+    export_report(args.period, args.out, args.page, args.workers, args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# EDIH ADRIA analitika - izvještajna razdoblja
+# Svaki skup podataka dobiva indeks sortiran po datumu; odabir razdoblja je
+# O(log n) searchsorted umjesto punog skeniranja frame-a.
+
+import numpy as np
+import pandas as pd
+
+MIDTERM = "Midterm (30.09.2024)"
+
+# Imenovana izvještajna razdoblja: naziv -> (početak, kraj); None = otvoreno
+REPORTING_PERIODS = {
+    "Full project": (None, None),
+    MIDTERM: (None, "2024-09-30"),
+    "Year 2023": ("2023-01-01", "2023-12-31"),
+    "Year 2024": ("2024-01-01", "2024-12-31"),
+    "Year 2025": ("2025-01-01", "2025-12-31"),
+}
+
+# Kandidati za datumsku kolonu po skupu podataka (prvi postojeći se koristi). Osim 'Start Date'
+# (izvodi ga read_services) nazivi nisu potvrđeni na stvarnim exportima - skup bez ijednog od
+# njih ne reže se po razdoblju i slice_frames ga vraća kao neizrezanog.
+DATE_COLUMNS = {
+    "services": ["Start Date"],
+    "sme_dma": ["DMA Date", "Date of DMA", "Assessment Date", "Date", "Created", "Submitted"],
+    "pso_dma": ["DMA Date", "Date of DMA", "Assessment Date", "Date", "Created", "Submitted"],
+    "zahtjevi_ps": ["Datum zahtjeva", "Datum podnošenja zahtjeva", "Datum zaprimanja", "Datum"],
+    "zahtjevi_sme": ["Datum zahtjeva", "Datum podnošenja zahtjeva", "Datum zaprimanja", "Datum"],
+}
+
+
+def find_date_column(df, candidates):
+    """Prva postojeća kolona iz kandidata, inače None (bez pogađanja po tipu kolone)."""
+    return next((col for col in candidates if col in df.columns), None)
+
+
+def period_bounds(name, custom_range=None):
+    """(start, end) kao pd.Timestamp ili None za imenovano ili prilagođeno razdoblje."""
+    start, end = custom_range if custom_range is not None else REPORTING_PERIODS[name]
+    start = pd.Timestamp(start) if start is not None else None
+    # Kraj razdoblja uključuje cijeli zadnji dan
+    end = pd.Timestamp(end) + pd.Timedelta(days=1) - pd.Timedelta(1, "ns") if end is not None else None
+    return start, end
+
+
+class DateIndex:
+    """Pozicije redaka sortirane po datumu; NaT redovi su izvan svakog ograničenog razdoblja."""
+
+    def __init__(self, dates):
+        values = pd.to_datetime(pd.Series(dates), errors="coerce").to_numpy(dtype="datetime64[ns]")
+        valid = ~np.isnat(values)
+        positions = np.flatnonzero(valid)
+        order = np.argsort(values[valid], kind="stable")
+        self.positions = positions[order]
+        self.sorted_dates = values[valid][order]
+        self.size = len(values)
+
+    def select(self, start=None, end=None):
+        """Pozicije redaka (u izvornom redoslijedu) s datumom u [start, end]."""
+        lo = 0 if start is None else np.searchsorted(self.sorted_dates, np.datetime64(start, "ns"), side="left")
+        hi = len(self.sorted_dates) if end is None else np.searchsorted(self.sorted_dates, np.datetime64(end, "ns"), side="right")
+        return np.sort(self.positions[lo:hi])
+
+
+def slice_period(df, index, start=None, end=None):
+    """Redovi frame-a u razdoblju; bez granica vraća frame nepromijenjen (uključujući redove bez datuma)."""
+    if index is None or (start is None and end is None):
+        return df
+    return df.iloc[index.select(start, end)]
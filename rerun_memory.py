@@ -0,0 +1,78 @@
+# EDIH ADRIA analitika - memorija po rerunu: cache_data kopije vs. dijeljeni frameovi
+# st.cache_data čuva pickle i pri svakom čitanju vraća novu kopiju frame-a; dijeljeni
+# frame (cache_resource) + copy-on-write pogled sesije ne kopira podatke.
+# Mjeri bajtove alocirane (tracemalloc, uključuje numpy) za jedan rerun u oba modela.
+#
+#   python rerun_memory.py                 # najnoviji exporti iz EDIH_DATA_FOLDER
+#   python rerun_memory.py --scale 100     # services × 100
+
+import argparse
+import pickle
+import tracemalloc
+
+import pandas as pd
+
+from datasets import enable_copy_on_write, latest_paths, session_view
+from enrich import enrich_services
+from ingest import read_dataset
+from settings import DATA_FOLDER
+
+# Koliko puta jedan rerun čita izvedene kolone Services exporta (stranice + KPI)
+ENRICHMENT_READS = 2
+
+
+def _measure(rerun):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    rerun()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def load_frames(scale=1):
+    frames = {name: read_dataset(name, path) for name, path in latest_paths(DATA_FOLDER).items() if path}
+    if scale > 1 and "services" in frames:
+        frames["services"] = pd.concat([frames["services"]] * scale, ignore_index=True)
+    return frames
+
+
+def rerun_cost(frames):
+    """(bajtovi prije, bajtovi poslije) za jedan rerun."""
+    derived = enrich_services(frames["services"]) if "services" in frames else None
+    # Ono što cache_data drži u memoriji: pickle svakog rezultata
+    pickled = {name: pickle.dumps(frame) for name, frame in frames.items()}
+    pickled_derived = pickle.dumps(derived)
+
+    def cache_data_rerun():
+        views = [pickle.loads(blob) for blob in pickled.values()]
+        views += [pickle.loads(pickled_derived) for _ in range(ENRICHMENT_READS)]
+        return views
+
+    def shared_rerun():
+        views = [session_view(frame) for frame in frames.values()]
+        views += [derived for _ in range(ENRICHMENT_READS)]
+        return views
+
+    return _measure(cache_data_rerun), _measure(shared_rerun)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bajtovi alocirani po rerunu: cache_data vs. dijeljeni frameovi.")
+    parser.add_argument("--scale", type=int, default=1, help="umnožak redova Services exporta")
+    args = parser.parse_args()
+
+    enable_copy_on_write()
+    frames = load_frames(args.scale)
+    resident = sum(frame.memory_usage(deep=True).sum() for frame in frames.values())
+    before, after = rerun_cost(frames)
+    rows = len(frames.get("services", []))
+    print(f"Services redova: {rows}, dijeljeni frameovi: {resident / 1024 / 1024:.1f} MB")
+    print(f"cache_data (prije):           {before / 1024 / 1024:10.2f} MB po rerunu")
+    print(f"cache_resource + CoW (sada):  {after / 1024:10.1f} KB po rerunu")
+    if after:
+        print(f"omjer: {before / after:.0f}×")
+
+
+if __name__ == "__main__":
+    main()
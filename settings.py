@@ -0,0 +1,25 @@
+# EDIH ADRIA analitika - putanje i postavke
+# Zajedničke za dashboard, API i pomoćne skripte; mogu se nadjačati varijablama okruženja.
+
+import os
+from pathlib import Path
+
+APP_FOLDER = os.environ.get("EDIH_APP_FOLDER", str(Path.home() / "EDIH"))
+DATA_FOLDER = os.environ.get("EDIH_DATA_FOLDER", os.path.join(APP_FOLDER, "Data"))
+DMA_FOLDER = os.path.join(APP_FOLDER, "DMA")
+SLIKE_FOLDER = os.path.join(APP_FOLDER, "Slike")
+SNAPSHOT_FOLDER = os.environ.get("SNAPSHOT_FOLDER", os.path.join(APP_FOLDER, "Snapshots"))
+
+API_HOST = os.environ.get("EDIH_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("EDIH_API_PORT", "8502"))
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# Relativna putanja (kao u .env.example) računa se od APP_FOLDER
+LOG_FILE = os.path.join(APP_FOLDER, os.environ.get("LOG_FILE", os.path.join("logs", "edih_app.log")))
+
+# Prometheus /metrics (metrics.py); port 0 isključuje server
+METRICS_HOST = os.environ.get("EDIH_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("EDIH_METRICS_PORT", "9464"))
+
+# Paralelno parsiranje exporta (ingest.read_datasets); 0 = broj jezgri, 1 = bez procesa
+INGEST_WORKERS = int(os.environ.get("EDIH_INGEST_WORKERS", "0"))
@@ -0,0 +1,257 @@
+# EDIH ADRIA analitika - povijesni snapshotovi exporta
+# Svaki učitani export sprema se jednom kao nepromjenjiv, komprimiran Parquet
+# snapshot označen razdobljem iz MMYYYY sufiksa (npr. 062025 -> 2025-06).
+# Upiti "as of" i "between" čitaju samo Parquet, bez ponovnog parsiranja Excela.
+
+import json
+import os
+import stat
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import pandas as pd
+
+from ingest import DATASETS, MissingColumns, content_hash, find_files, parse_period, read_dataset
+
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = "manifest.lock"
+
+# flock štiti od drugih procesa (dashboard, API, report.py), ali ne i od dretvi istog procesa
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+# infer_dtype vrste koje Parquet zapisuje bez pretvorbe
+ARROW_NATIVE_KINDS = {
+    "string", "empty", "integer", "floating", "mixed-integer-float", "decimal",
+    "boolean", "datetime", "datetime64", "date",
+}
+
+
+def _to_period(value):
+    """Prihvaća pd.Period, 'YYYY-MM', 'MMYYYY' ili datum i vraća mjesečni pd.Period."""
+    if value is None or isinstance(value, pd.Period):
+        return value
+    text = str(value).strip()
+    if len(text) == 6 and text.isdigit():
+        return pd.Period(year=int(text[2:]), month=int(text[:2]), freq="M")
+    return pd.Period(pd.Timestamp(text), freq="M")
+
+
+def _arrow_safe(df):
+    """Miješane object kolone (npr. broj i tekst) pretvori u tekst da ih Parquet prihvati."""
+    df = df.copy()
+    for col in df.select_dtypes(include=["object"]).columns:
+        kind = pd.api.types.infer_dtype(df[col], skipna=True)
+        if kind not in ARROW_NATIVE_KINDS:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    df.columns = [str(c) for c in df.columns]
+    return df
+
+
+class SnapshotStore:
+    """Nepromjenjivi Parquet snapshotovi po (skup podataka, razdoblje)."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.manifest_path = os.path.join(folder, MANIFEST_NAME)
+
+    # ── Manifest ──────────────────────────────────────────────────────────
+    @contextmanager
+    def _locked(self):
+        """Ekskluzivni pristup folderu snapshotova (dretve ovog procesa i drugi procesi)."""
+        os.makedirs(self.folder, exist_ok=True)
+        with _thread_locks_guard:
+            thread_lock = _thread_locks.setdefault(os.path.abspath(self.folder), threading.Lock())
+        with thread_lock, open(os.path.join(self.folder, LOCK_NAME), "a+b") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            else:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+                else:
+                    fh.seek(0)
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return []
+        with open(self.manifest_path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+
+    def _write_manifest(self, entries):
+        os.makedirs(self.folder, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(entries, fh, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+
+    def version(self):
+        """Otisak manifesta (veličina, mtime) - mijenja se sa svakim novim snapshotom."""
+        if not os.path.exists(self.manifest_path):
+            return "empty"
+        info = os.stat(self.manifest_path)
+        return f"{info.st_size}:{info.st_mtime_ns}"
+
+    def entries(self, dataset=None):
+        """Svi snapshotovi (ili samo za jedan skup podataka), sortirani po razdoblju."""
+        entries = self._read_manifest()
+        if dataset:
+            entries = [e for e in entries if e["dataset"] == dataset]
+        return sorted(entries, key=lambda e: (e["period"], e["ingested_at"]))
+
+    # ── Ingest ────────────────────────────────────────────────────────────
+    def _find(self, entries, dataset, digest):
+        return next((e for e in entries if e["dataset"] == dataset and e["sha1"] == digest), None)
+
+    def ingest(self, dataset, path, frame=None):
+        """Spremi export kao snapshot (ako već ne postoji isti sadržaj) i vrati zapis iz manifesta.
+
+        Cijeli upis ide pod lockom foldera: drugi pisac istog exporta nakon čekanja nađe zapis.
+        `frame` je već učitan cijeli export (read_dataset bez projekcije) - tada se Excel ne čita ponovno.
+        """
+        period = parse_period(path)
+        if period is None:
+            return None
+
+        digest = content_hash(path)
+        existing = self._find(self._read_manifest(), dataset, digest)
+        if existing is not None:
+            return existing
+
+        with self._locked():
+            # Ponovna provjera: isti export je mogao upisati drugi proces ili dretva dok smo čekali
+            existing = self._find(self._read_manifest(), dataset, digest)
+            if existing is not None:
+                return existing
+            return self._write_snapshot(dataset, path, period, digest, frame)
+
+    def _write_snapshot(self, dataset, path, period, digest, frame=None):
+        df = _arrow_safe(read_dataset(dataset, path) if frame is None else frame)
+        file_name = f"{dataset}__{period.strftime('%Y-%m')}__{digest[:10]}.parquet"
+        target = os.path.join(self.folder, file_name)
+
+        # Privremena datoteka + os.replace: prekinut upis ne ostavlja polovičan snapshot
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, index=False, compression="zstd")
+        # Snapshot je nepromjenjiv - samo za čitanje
+        os.chmod(tmp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        os.replace(tmp_path, target)
+
+        entry = {
+            "dataset": dataset,
+            "period": str(period),
+            "source": os.path.basename(path),
+            "sha1": digest,
+            "file": file_name,
+            "rows": int(len(df)),
+            "columns": list(df.columns),
+            "ingested_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        entries = self._read_manifest()
+        entries.append(entry)
+        self._write_manifest(entries)
+        return entry
+
+    def ingest_folder(self, data_folder, datasets=None):
+        """Ingestiraj sve (i starije) exporte iz data_foldera; vraća broj novih snapshotova."""
+        before = len(self._read_manifest())
+        for dataset in datasets or DATASETS:
+            prefix, _ = DATASETS[dataset]
+            for path in find_files(data_folder, prefix):
+                self.ingest(dataset, path)
+        return len(self._read_manifest()) - before
+
+    # ── Upiti ─────────────────────────────────────────────────────────────
+    def periods(self, dataset):
+        """Dostupna razdoblja za skup podataka (pd.Period, uzlazno)."""
+        return sorted({pd.Period(e["period"], freq="M") for e in self.entries(dataset)})
+
+    def _read(self, entry, columns=None):
+        df = pd.read_parquet(os.path.join(self.folder, entry["file"]), columns=columns)
+        return df
+
+    def read(self, entry, columns=None, optional=()):
+        """Snapshot s projekcijom: obavezne kolone (MissingColumns ako ih nema) i neobavezne ako postoje.
+
+        Kolone snapshota su u manifestu, pa se provjera radi bez otvaranja Parquet datoteke.
+        """
+        if columns is None:
+            return self._read(entry)
+        available = entry["columns"]
+        missing = [c for c in columns if c not in available]
+        if missing:
+            raise MissingColumns(entry["dataset"], entry["source"], missing)
+        wanted = set(columns) | set(optional)
+        return self._read(entry, columns=[c for c in available if c in wanted])
+
+    def _entry_as_of(self, dataset, period):
+        period = _to_period(period)
+        candidates = [
+            e for e in self.entries(dataset)
+            if pd.Period(e["period"], freq="M") <= period
+        ]
+        return candidates[-1] if candidates else None
+
+    def as_of(self, dataset, period, columns=None, optional=()):
+        """Stanje skupa podataka u zadanom razdoblju (zadnji snapshot <= period) ili None."""
+        entry = self._entry_as_of(dataset, period)
+        if entry is None:
+            return None
+        return self.read(entry, columns, optional)
+
+    def version_as_of(self, dataset, period):
+        """Otisak snapshota koji vrijedi u zadanom razdoblju (za ključeve cachea) ili None."""
+        entry = self._entry_as_of(dataset, period)
+        return entry["sha1"][:12] if entry else None
+
+    def latest_version(self, dataset):
+        """Otisak najnovijeg snapshota skupa podataka ili None."""
+        entries = self.entries(dataset)
+        return entries[-1]["sha1"][:12] if entries else None
+
+    def between(self, dataset, start, end, columns=None):
+        """Svi snapshotovi u [start, end] spojeni u jedan DataFrame s kolonom 'Snapshot Period'."""
+        start, end = _to_period(start), _to_period(end)
+        latest = {}
+        for entry in self.entries(dataset):
+            period = pd.Period(entry["period"], freq="M")
+            if start <= period <= end:
+                latest[period] = entry  # noviji ingest istog razdoblja prepisuje stariji
+
+        frames = []
+        for period, entry in sorted(latest.items()):
+            df = self._read(entry, columns=columns)
+            df.insert(0, "Snapshot Period", str(period))
+            frames.append(df)
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def changes(self, dataset, start, end, key, column):
+        """Redovi kojima se vrijednost `column` promijenila između dva razdoblja (npr. Status usluge)."""
+        old = self.as_of(dataset, start, columns=[key, column])
+        new = self.as_of(dataset, end, columns=[key, column])
+        if old is None or new is None:
+            return pd.DataFrame(columns=[key, f"{column} ({start})", f"{column} ({end})"])
+
+        merged = old.drop_duplicates(key).merge(
+            new.drop_duplicates(key), on=key, how="outer", suffixes=(" (old)", " (new)")
+        )
+        old_col, new_col = f"{column} (old)", f"{column} (new)"
+        changed = merged[old_col].fillna("∅").astype(str) != merged[new_col].fillna("∅").astype(str)
+        return merged.loc[changed].rename(columns={
+            old_col: f"{column} ({start})",
+            new_col: f"{column} ({end})",
+        }).reset_index(drop=True)
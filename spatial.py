@@ -0,0 +1,235 @@
+# EDIH ADRIA analitika - prostorno grupiranje za karte (numpy)
+# Točke se grupiraju u heksagonalnu mrežu na serveru, za svaku razinu zuma posebno;
+# karta dobiva samo centre ćelija i potrebne kolone, zaokružene (st.pydeck_chart šalje JSON,
+# pa kraći zapis broja = manje bajtova; float32 bi se ispisao s 17 znamenki).
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS = 6_371_000
+
+# Razina zuma (pydeck) → radijus heksagona u metrima
+ZOOM_LEVELS = {3: 80_000, 4: 40_000, 5: 20_000, 6: 10_000, 7: 5_000, 8: 2_500, 9: 1_250}
+
+COORDINATE_DECIMALS = 5
+
+
+def _project(lat, lon, lat0):
+    """Ekvidistantna projekcija oko lat0 (metri) - dovoljno točna na razini regije/EU."""
+    x = EARTH_RADIUS * np.radians(lon) * np.cos(np.radians(lat0))
+    y = EARTH_RADIUS * np.radians(lat)
+    return x, y
+
+
+def _unproject(x, y, lat0):
+    lat = np.degrees(y / EARTH_RADIUS)
+    lon = np.degrees(x / (EARTH_RADIUS * np.cos(np.radians(lat0))))
+    return lat, lon
+
+
+def hex_cells(x, y, radius):
+    """Aksijalne koordinate (q, r) heksagona s vrhom prema gore, s kubnim zaokruživanjem."""
+    q = (np.sqrt(3) / 3 * x - y / 3) / radius
+    r = (2 / 3 * y) / radius
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    return rq.astype(np.int64), rr.astype(np.int64)
+
+
+def hex_centers(q, r, radius):
+    x = radius * np.sqrt(3) * (q + r / 2)
+    y = radius * 1.5 * r
+    return x, y
+
+
+def hex_bins(lat, lon, radius, sums=None, means=None, unique=None):
+    """Grupiraj točke u heksagone radijusa `radius` (m).
+
+    sums/means: {kolona: vrijednosti} zbrajaju se / usrednjavaju po ćeliji;
+    unique: {kolona: ključevi} broje se različite vrijednosti po ćeliji (npr. korisnici).
+    Vraća DataFrame [lat, lon, count, ...] s jednim retkom po nepraznoj ćeliji.
+    """
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    valid = np.isfinite(lat) & np.isfinite(lon)
+    lat, lon = lat[valid], lon[valid]
+    if not len(lat):
+        return pd.DataFrame(columns=["lat", "lon", "count", *(sums or {}), *(means or {}), *(unique or {})])
+
+    lat0 = float(np.mean(lat))
+    q, r = hex_cells(*_project(lat, lon, lat0), radius)
+    # (q, r) spojeni u jedan int64 ključ - np.unique nad 1D je puno brži od axis=0
+    q0, r0 = q.min(), r.min()
+    span = int(r.max() - r0) + 1
+    cells, cell_index = np.unique((q - q0) * span + (r - r0), return_inverse=True)
+    cell_index = cell_index.ravel()
+    n_cells = len(cells)
+    cell_q, cell_r = cells // span + q0, cells % span + r0
+
+    center_lat, center_lon = _unproject(*hex_centers(cell_q, cell_r, radius), lat0)
+    counts = np.bincount(cell_index, minlength=n_cells)
+    result = {
+        "lat": np.round(center_lat, COORDINATE_DECIMALS),
+        "lon": np.round(center_lon, COORDINATE_DECIMALS),
+        "count": counts.astype(np.int32),
+    }
+    for name, values in (sums or {}).items():
+        values = np.nan_to_num(np.asarray(values, dtype=float)[valid])
+        result[name] = np.bincount(cell_index, weights=values, minlength=n_cells)
+    for name, values in (means or {}).items():
+        values = np.asarray(values, dtype=float)[valid]
+        present = np.isfinite(values)
+        totals = np.bincount(cell_index[present], weights=values[present], minlength=n_cells)
+        n = np.bincount(cell_index[present], minlength=n_cells)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result[name] = np.round(totals / n, 1)
+    for name, keys in (unique or {}).items():
+        codes, uniques = pd.factorize(pd.Series(keys)[valid])
+        known = codes >= 0
+        pairs = np.unique(cell_index[known].astype(np.int64) * max(len(uniques), 1) + codes[known])
+        result[name] = np.bincount(pairs // max(len(uniques), 1), minlength=n_cells).astype(np.int32)
+    return pd.DataFrame(result)
+
+
+def compact_points(df, columns, lat_column, lon_column):
+    """Samo potrebne kolone i redovi s koordinatama; koordinate zaokružene."""
+    points = df.dropna(subset=[lat_column, lon_column])[list(columns)]
+    return points.assign(**{
+        col: pd.to_numeric(points[col], errors="coerce").round(COORDINATE_DECIMALS) for col in (lat_column, lon_column)
+    }).reset_index(drop=True)
+
+
+METERS_PER_DEGREE = np.pi * EARTH_RADIUS / 180
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Udaljenost u metrima (numpy broadcasting)."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class GridIndex:
+    """Prostorni indeks nad pravilnom mrežom ćelija (cell_deg × cell_deg stupnjeva).
+
+    Točke su sortirane po ključu ćelije, pa je sadržaj ćelije jedan isječak niza
+    (searchsorted). Upiti: najbliža točka za niz koordinata i sve točke unutar radijusa.
+    """
+
+    _COL_OFFSET = 1 << 20
+
+    def __init__(self, lat, lon, cell_deg=0.25):
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        self.cell_deg = cell_deg
+        valid = np.flatnonzero(np.isfinite(self.lat) & np.isfinite(self.lon))
+        rows, cols = self._cells(self.lat[valid], self.lon[valid])
+        keys = self._key(rows, cols)
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._points = valid[order]
+        self._bounds = (rows.min(), rows.max(), cols.min(), cols.max()) if len(valid) else None
+
+    def __len__(self):
+        return len(self._points)
+
+    def _cells(self, lat, lon):
+        return (np.floor(np.asarray(lat) / self.cell_deg).astype(np.int64),
+                np.floor(np.asarray(lon) / self.cell_deg).astype(np.int64))
+
+    def _key(self, rows, cols):
+        return rows * (2 * self._COL_OFFSET) + (cols + self._COL_OFFSET)
+
+    def _members(self, row_range, col_range):
+        """Indeksi točaka u pravokutniku ćelija (uključivo)."""
+        rows = np.arange(row_range[0], row_range[1] + 1)
+        # Ćelije jednog retka su susjedni ključevi - jedan searchsorted po retku
+        starts = np.searchsorted(self._keys, self._key(rows, col_range[0]), side="left")
+        ends = np.searchsorted(self._keys, self._key(rows, col_range[1]), side="right")
+        parts = [self._points[s:e] for s, e in zip(starts, ends) if e > s]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def _ring_extent(self, row, ring):
+        """Najmanja udaljenost (m) od ćelije do ruba prstena `ring` ćelija oko nje."""
+        max_lat = min((abs(row) + ring + 1) * self.cell_deg, 89.0)
+        return ring * self.cell_deg * METERS_PER_DEGREE * np.cos(np.radians(max_lat))
+
+    def nearest(self, lat, lon, max_distance=None, block=4):
+        """(indeksi, udaljenosti u m) najbliže točke za svaku upitnu točku; -1/NaN ako nema.
+
+        Upiti se grupiraju u blokove od block × block ćelija koji dijele kandidate,
+        a iste koordinate računaju se samo jednom.
+        """
+        lat = np.atleast_1d(np.asarray(lat, dtype=float))
+        lon = np.atleast_1d(np.asarray(lon, dtype=float))
+        index = np.full(len(lat), -1, dtype=np.int64)
+        distance = np.full(len(lat), np.nan)
+        valid = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+        if not len(self) or not len(valid):
+            return index, distance
+
+        # lat + i·lon kao 1D ključ - np.unique nad 1D je puno brži od axis=0
+        coords, inverse = np.unique(lat[valid] + 1j * lon[valid], return_inverse=True)
+        q_lat, q_lon = coords.real, coords.imag
+        rows, cols = self._cells(q_lat, q_lon)
+        rows, cols = rows // block, cols // block
+        blocks, group = np.unique(self._key(rows, cols), return_inverse=True)
+        group = group.ravel()
+        order = np.argsort(group, kind="stable")
+        splits = np.searchsorted(group[order], np.arange(1, len(blocks)))
+        r_min, r_max, c_min, c_max = self._bounds
+        found = np.full(len(coords), -1, dtype=np.int64)
+        found_distance = np.full(len(coords), np.nan)
+
+        # Kandidati se šire u prstenovima ćelija oko bloka dok se ne nađe točka, zatim još
+        # onoliko koliko treba da nijedna točka izvan prstena ne može biti bliža
+        for q in np.split(order, splits):
+            row_lo, col_lo = rows[q[0]] * block, cols[q[0]] * block
+            row_hi, col_hi = row_lo + block - 1, col_lo + block - 1
+            max_ring = max(row_lo - r_min, r_max - row_hi, col_lo - c_min, c_max - col_hi, 0)
+            ring = 0
+            while True:
+                candidates = self._members((row_lo - ring, row_hi + ring), (col_lo - ring, col_hi + ring))
+                if len(candidates) or ring >= max_ring:
+                    break
+                ring += 1
+            if not len(candidates):
+                continue
+            d = haversine(q_lat[q, None], q_lon[q, None], self.lat[candidates][None, :], self.lon[candidates][None, :])
+            worst = d.min(axis=1).max()
+            needed = ring
+            edge_row = max(abs(row_lo), abs(row_hi))
+            while needed < max_ring and self._ring_extent(edge_row, needed) < worst:
+                needed += 1
+            if needed > ring:
+                candidates = self._members((row_lo - needed, row_hi + needed), (col_lo - needed, col_hi + needed))
+                d = haversine(q_lat[q, None], q_lon[q, None], self.lat[candidates][None, :], self.lon[candidates][None, :])
+            best = d.argmin(axis=1)
+            found[q] = candidates[best]
+            found_distance[q] = d[np.arange(len(q)), best]
+
+        index[valid] = found[inverse.ravel()]
+        distance[valid] = found_distance[inverse.ravel()]
+        if max_distance is not None:
+            too_far = distance > max_distance
+            index[too_far] = -1
+            distance[too_far] = np.nan
+        return index, distance
+
+    def within(self, lat, lon, radius):
+        """(indeksi, udaljenosti u m) točaka unutar radijusa od (lat, lon), najbliže prve."""
+        if not len(self) or not (np.isfinite(lat) and np.isfinite(lon)):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        dlat = radius / METERS_PER_DEGREE
+        dlon = dlat / max(np.cos(np.radians(min(abs(lat) + dlat, 89.0))), 1e-6)
+        row_range = self._cells(np.array([lat - dlat, lat + dlat]), np.array([lon - dlon, lon + dlon]))
+        candidates = self._members(tuple(row_range[0]), tuple(row_range[1]))
+        d = haversine(lat, lon, self.lat[candidates], self.lon[candidates])
+        keep = np.flatnonzero(d <= radius)
+        order = keep[np.argsort(d[keep], kind="stable")]
+        return candidates[order], d[order]
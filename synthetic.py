@@ -0,0 +1,251 @@
+# EDIH ADRIA analitika - sintetički exporti za razvoj i mjerenje performansi
+# Generira sve exporte koje dashboard učitava (prefiksi datoteka, sheetovi i zaglavlja iz
+# ingest.DATASETS) s izmišljenim organizacijama, uz zadani broj redova Services exporta.
+# Ostali skupovi rastu razmjerno (DMA, zahtjevi); EU lista ima realan broj EDIH-ova.
+#
+#   python synthetic.py --rows 100000 --out /tmp/edih_synth/Data
+#   EDIH_DATA_FOLDER=/tmp/edih_synth/Data streamlit run EDIH-Analitika.py
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from enrich import (
+    DAP_CATEGORY, DAP_KEYWORDS, EDUCATION_KEYWORDS, MANDAY_CUTOFF, MANDAY_PRICE, MANDAY_PRICE_AFTER_CUTOFF,
+    TBI_CATEGORY, TBI_KEYWORDS, TRAINING_CATEGORY,
+)
+from esg import ESG_DIMENSIONS
+from gazetteer import GAZETTEER_FILE
+from ingest import DATASETS
+from ranking import RANKING_COLUMNS
+
+DEFAULT_PERIOD = "102025"  # MMYYYY sufiks kao u pravim exportima
+DEFAULT_EDIHS = 230
+FIRST_DATE = pd.Timestamp("2023-01-01")
+LAST_DATE = pd.Timestamp("2025-12-31")
+
+STATE_AID_COLUMN = 'Amount of the service price to be reported as Aid of national or regional public nature, €'
+SERVICE_COLUMNS = [
+    'Content ID', 'Customer', 'Status', 'Dates', 'Service category delivered', 'Short description of the service',
+    'Service price, €', 'Customer  region', 'Location', 'latitude', 'longitude', 'Technology type used',
+    'Customer staff size', 'Number of attendees', 'Customer type', 'Specific information on State Aid',
+    STATE_AID_COLUMN,
+]
+# SME/PSO exporti s EU portala - podskup kolona Services exporta za jedan tip korisnika
+EXPORT_COLUMNS = ['Content ID', 'Customer', 'Status', 'Dates', 'Service category delivered', 'Service price, €',
+                  'Customer  region', 'Technology type used', 'Customer staff size']
+ZAHTJEVI_COLUMNS = ['Naziv korisnika', 'Vrsta usluge', 'Započeto je pružanje usluge (DA/NE)', 'Vrijednost usluge', 'Iznos potpore', 'Datum']
+
+CATEGORIES = {
+    TBI_CATEGORY: 0.30,
+    DAP_CATEGORY: 0.15,
+    TRAINING_CATEGORY: 0.40,
+    "Ecosystem building": 0.15,
+}
+ECOSYSTEM_DESCRIPTIONS = ["Networking event", "Matchmaking", "Info day", "Partner workshop"]
+TECHNOLOGIES = ["Artificial Intelligence", "Cybersecurity", "High Performance Computing", "Internet of Things",
+                "Cloud computing", "Big data", "Robotics", "Digital twins"]
+STAFF_SIZES = ["1-9", "10-49", "50-249", "250+"]
+STATE_AID = {"De minimis": 0.6, "GBER": 0.3, None: 0.1}
+COUNTRIES = ["HR", "SI", "AT", "IT", "DE", "FR", "ES", "PL", "CZ", "HU", "RO", "BG", "GR", "PT", "NL", "BE", "SE", "FI"]
+
+
+def _choice(rng, options, size, p=None):
+    return np.asarray(options, dtype=object)[rng.choice(len(options), size=size, p=p)]
+
+
+def _dates(rng, size, first=FIRST_DATE, last=LAST_DATE):
+    days = rng.integers(0, (last - first).days + 1, size)
+    return first + pd.to_timedelta(days, unit="D")
+
+
+def _organisations(count, customer_type):
+    prefix = "Poduzeće" if customer_type == "SME" else "Grad"
+    suffix = " d.o.o." if customer_type == "SME" else ""
+    return np.array([f"{prefix} {i:05d}{suffix}" for i in range(count)], dtype=object)
+
+
+def services_frame(rows, rng):
+    """Services export (Sheet1): kategorije, opisi i cijene usklađeni s enrich.py i KPI definicijama."""
+    places = pd.read_csv(GAZETTEER_FILE)
+    customer_type = _choice(rng, ["SME", "PSO"], rows, p=[0.8, 0.2])
+    organisations = max(20, rows // 10)
+    sme, pso = _organisations(organisations, "SME"), _organisations(max(5, organisations // 4), "PSO")
+    customer = np.where(customer_type == "SME", sme[rng.integers(0, len(sme), rows)], pso[rng.integers(0, len(pso), rows)])
+
+    category = _choice(rng, list(CATEGORIES), rows, p=list(CATEGORIES.values()))
+    description = np.select(
+        [category == TBI_CATEGORY, category == DAP_CATEGORY, category == TRAINING_CATEGORY],
+        [_choice(rng, TBI_KEYWORDS, rows), _choice(rng, DAP_KEYWORDS, rows), _choice(rng, EDUCATION_KEYWORDS, rows)],
+        default=_choice(rng, ECOSYSTEM_DESCRIPTIONS, rows),
+    ).astype(object)
+    bootcamp = (category == TRAINING_CATEGORY) & (rng.random(rows) < 0.15)
+    description = np.where(bootcamp, description + " - bootcamp", description)
+
+    start = _dates(rng, rows)
+    end = start + pd.to_timedelta(rng.integers(0, 180, rows), unit="D")
+    # Dio usluga ima samo datum početka (jednodnevne)
+    dates = pd.Series(start.strftime("%Y-%m-%d"))
+    with_end = rng.random(rows) < 0.8
+    dates[with_end] = dates[with_end] + " / " + pd.Series(end.strftime("%Y-%m-%d"))[with_end]
+
+    # TBI se naplaćuje po čovjek-danu (cijena ovisi o datumu početka), ostalo slobodno
+    manday = np.where(start >= MANDAY_CUTOFF, MANDAY_PRICE_AFTER_CUTOFF, MANDAY_PRICE)
+    price = np.where(category == TBI_CATEGORY, manday * rng.integers(1, 16, rows),
+                     np.round(rng.lognormal(8, 0.8, rows), -1)).astype(np.int64)
+    attendees = np.where(category == TRAINING_CATEGORY, rng.integers(3, 40, rows), 1)
+
+    place = rng.integers(0, len(places), rows)
+    lat = places["lat"].to_numpy()[place] + rng.normal(0, 0.02, rows)
+    lon = places["lon"].to_numpy()[place] + rng.normal(0, 0.02, rows)
+    region = places["region"].to_numpy(dtype=object)[place]
+    # Prazne regije i koordinate kao u pravim exportima (dopunjuje ih gazetteer / geokoder)
+    region = np.where(rng.random(rows) < 0.05, None, region)
+    no_coordinates = rng.random(rows) < 0.1
+    lat[no_coordinates] = np.nan
+    lon[no_coordinates] = np.nan
+
+    state_aid = _choice(rng, list(STATE_AID), rows, p=list(STATE_AID.values()))
+    aid = np.where(pd.isna(state_aid), np.nan, np.round(price * rng.uniform(0.3, 1.0, rows)))
+
+    return pd.DataFrame({
+        'Content ID': np.arange(1, rows + 1),
+        'Customer': customer,
+        'Status': _choice(rng, ["Completed", "Ongoing"], rows, p=[0.7, 0.3]),
+        'Dates': dates.to_numpy(),
+        'Service category delivered': category,
+        'Short description of the service': description,
+        'Service price, €': price,
+        'Customer  region': region,
+        'Location': places["name"].to_numpy(dtype=object)[place] + ", Hrvatska",
+        'latitude': lat.round(5),
+        'longitude': lon.round(5),
+        'Technology type used': _choice(rng, TECHNOLOGIES, rows),
+        'Customer staff size': _choice(rng, STAFF_SIZES, rows),
+        'Number of attendees': attendees,
+        'Customer type': customer_type,
+        'Specific information on State Aid': state_aid,
+        STATE_AID_COLUMN: aid,
+    }, columns=SERVICE_COLUMNS)
+
+
+def portal_export(services, customer_type):
+    """export-sme-/export-pso-: usluge jednog tipa korisnika."""
+    return services.loc[services['Customer type'] == customer_type, EXPORT_COLUMNS].reset_index(drop=True)
+
+
+def dma_frame(dataset, organisations, rng, edih_name="EDIH ADRIA"):
+    """DMA rezultati (T0 za sve, T1/T2 za dio organizacija) s dimenzijama iz esg.ESG_DIMENSIONS."""
+    config = ESG_DIMENSIONS[dataset]
+    org_column = config["org_column"]
+    dimensions = [dim for pillar in ("Society", "Governance", "Environment") for dim in config[pillar]]
+    customer_type = "SME" if dataset == "sme_dma" else "PSO"
+    names = _organisations(organisations, customer_type)
+
+    # Organizacija ima T0, dio i T1, manji dio i T2
+    stages = [(stage, names[rng.random(organisations) < share]) for stage, share in (("T0", 1.0), ("T1", 0.6), ("T2", 0.3))]
+    ids = {name: i for i, name in enumerate(names)}
+    base = rng.uniform(20, 70, (organisations, len(dimensions)))
+    frames = []
+    for step, (stage, orgs) in enumerate(stages):
+        rows = np.array([ids[org] for org in orgs], dtype=np.int64)
+        values = np.clip(base[rows] + step * rng.uniform(0, 12, (len(rows), len(dimensions))), 0, 100).round(2)
+        frame = pd.DataFrame(values, columns=dimensions)
+        frame.insert(0, "DMA Score", values.mean(axis=1).round(2))
+        # Naziv kolone s datumom nije potvrđen na stvarnom DMA exportu (kandidat iz reporting.DATE_COLUMNS)
+        frame.insert(0, "Date", (_dates(rng, len(rows)) + pd.DateOffset(months=6 * step)).strftime("%Y-%m-%d"))
+        frame.insert(0, "DMA Timing", stage)
+        frame.insert(0, org_column, orgs)
+        frame.insert(0, f"{customer_type} ID", rows)
+        frame["EDIH Name"] = edih_name
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def zahtjevi_frame(rows, rng, customers):
+    """Evidencija zahtjeva (jedan sheet): korisnik, vrsta usluge, je li započeta, vrijednost i potpora."""
+    value = np.round(rng.lognormal(8.5, 0.7, rows), -1)
+    return pd.DataFrame({
+        'Naziv korisnika': _choice(rng, customers, rows),
+        'Vrsta usluge': _choice(rng, ["TBI", "DAP", "FCO", "Edukacija"], rows),
+        'Započeto je pružanje usluge (DA/NE)': _choice(rng, ["DA", "NE"], rows, p=[0.7, 0.3]),
+        'Vrijednost usluge': value,
+        'Iznos potpore': np.round(value * rng.uniform(0.5, 1.0, rows)),
+        'Datum': _dates(rng, rows).strftime("%Y-%m-%d"),
+    }, columns=ZAHTJEVI_COLUMNS)
+
+
+def edih_list_frame(edihs, rng):
+    """EU lista EDIH-ova s brojem usluga po vrsti."""
+    frame = pd.DataFrame({
+        'EDIH Name': [f"EDIH {i:04d}" for i in range(edihs)],
+        'Country': _choice(rng, COUNTRIES, edihs),
+        'URL': [f"https://european-digital-innovation-hubs.ec.europa.eu/edih-{i}" for i in range(edihs)],
+        'Latitude': rng.uniform(36, 65, edihs).round(5),
+        'Longitude': rng.uniform(-9, 30, edihs).round(5),
+    })
+    for column in RANKING_COLUMNS:
+        frame[column] = rng.poisson(rng.uniform(5, 80), edihs)
+    frame.loc[0, 'EDIH Name'] = "EDIH ADRIA"
+    frame.loc[0, 'Country'] = "HR"
+    return frame
+
+
+def generate_frames(rows, seed=0, edihs=DEFAULT_EDIHS):
+    """Sirovi exporti (kako stoje u Excelu) po skupu podataka iz ingest.DATASETS."""
+    rng = np.random.default_rng(seed)
+    services = services_frame(rows, rng)
+    dma_organisations = max(10, rows // 50)
+
+    def customers(customer_type):
+        # Zahtjeve podnose korisnici iz Services exporta (pa ih identity.py povezuje)
+        return services.loc[services['Customer type'] == customer_type, 'Customer'].unique()
+
+    return {
+        "services": services,
+        "sme": portal_export(services, "SME"),
+        "pso": portal_export(services, "PSO"),
+        "sme_dma": dma_frame("sme_dma", dma_organisations, rng),
+        "pso_dma": dma_frame("pso_dma", max(5, dma_organisations // 4), rng),
+        "zahtjevi_ps": zahtjevi_frame(max(10, rows // 100), rng, customers("PSO")),
+        "zahtjevi_sme": zahtjevi_frame(max(20, rows // 20), rng, customers("SME")),
+        "edih_list": edih_list_frame(edihs, rng),
+    }
+
+
+def write_exports(folder, frames, period=DEFAULT_PERIOD):
+    """Zapiši exporte pod nazivima koje dashboard traži; skupovi s istim prefiksom idu u jedan workbook."""
+    os.makedirs(folder, exist_ok=True)
+    workbooks = {}
+    for name, frame in frames.items():
+        prefix, sheet_name = DATASETS[name]
+        workbooks.setdefault(prefix, []).append((sheet_name or "Sheet1", frame))
+    paths = []
+    for prefix, sheets in workbooks.items():
+        path = os.path.join(folder, f"{prefix}{period}.xlsx")
+        with pd.ExcelWriter(path, engine="openpyxl") as writer:
+            for sheet_name, frame in sheets:
+                frame.to_excel(writer, sheet_name=sheet_name, index=False)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sintetički EDIH exporti (Excel) za razvoj i benchmark.")
+    parser.add_argument("--rows", type=int, default=1000, help="broj redova Services exporta")
+    parser.add_argument("--out", default=os.path.join("synthetic", "Data"), help="mapa za exporte")
+    parser.add_argument("--period", default=DEFAULT_PERIOD, help="MMYYYY sufiks naziva datoteka")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--edihs", type=int, default=DEFAULT_EDIHS, help="broj EDIH-ova u EU listi")
+    args = parser.parse_args()
+
+    frames = generate_frames(args.rows, args.seed, args.edihs)
+    for path in write_exports(args.out, frames, args.period):
+        print(path)
+    print(", ".join(f"{name}: {len(frame)}" for name, frame in frames.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# EDIH ADRIA analitika - tablice s paginacijom na serveru
+# Filtriranje i sortiranje rade nad pozicijama redaka; u preglednik (Arrow, st.dataframe)
+# ide samo vidljiva stranica, pa i velika tablica košta nekoliko KB po prikazu.
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from snapshots import ARROW_NATIVE_KINDS
+
+PAGE_SIZE = 25
+
+
+def arrow_safe(df):
+    """Miješane object kolone pretvori u tekst; brojčane i kategorijske ostaju kakve jesu.
+
+    Frame se ne kopira ako nije potrebno - mijenjaju se samo problematične kolone.
+    """
+    fixes = {}
+    for col in df.select_dtypes(include=["object"]).columns:
+        values = df[col]
+        if pd.api.types.infer_dtype(values, skipna=True) not in ARROW_NATIVE_KINDS:
+            fixes[col] = values.where(values.isna(), values.astype(str))
+    if not fixes and all(isinstance(c, str) for c in df.columns):
+        return df
+    safe = df.assign(**fixes) if fixes else df
+    if not all(isinstance(c, str) for c in safe.columns):
+        safe = safe.set_axis([str(c) for c in safe.columns], axis=1)
+    return safe
+
+
+def text_columns(df):
+    return [c for c in df.columns if df[c].dtype == object or isinstance(df[c].dtype, (pd.CategoricalDtype, pd.StringDtype))]
+
+
+def row_positions(df, query="", sort_by=None, ascending=True):
+    """Pozicije redaka nakon filtra (tekst u bilo kojoj tekstualnoj koloni) i sortiranja."""
+    positions = np.arange(len(df))
+    query = (query or "").strip()
+    if query:
+        mask = np.zeros(len(df), dtype=bool)
+        for col in text_columns(df):
+            mask |= df[col].astype(str).str.contains(query, case=False, regex=False, na=False).to_numpy()
+        positions = np.flatnonzero(mask)
+
+    if sort_by is not None and sort_by in df.columns:
+        keys = df[sort_by].iloc[positions].reset_index(drop=True)
+        order = keys.sort_values(ascending=ascending, na_position="last", kind="stable").index.to_numpy()
+        positions = positions[order]
+    return positions
+
+
+def page_count(n_rows, page_size=PAGE_SIZE):
+    return max(math.ceil(n_rows / page_size), 1)
+
+
+def page_view(df, positions, page=1, page_size=PAGE_SIZE):
+    """Jedna stranica (1-indeksirano) kao Arrow-sigurni frame."""
+    start = (page - 1) * page_size
+    return arrow_safe(df.iloc[positions[start:start + page_size]])
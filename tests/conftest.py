@@ -0,0 +1,7 @@
+# EDIH ADRIA analitika - zajedničko za testove
+# Moduli su u korijenu repozitorija (bez paketa), pa se korijen dodaje na sys.path.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,24 @@
+import pandas as pd
+
+from aggregates import user_map_bins
+from reporting import DateIndex, period_bounds, slice_period
+
+
+def test_user_map_bins_with_period_slice():
+    # Regresija: koordinate se računaju za cijeli Services frame, a podaci se režu po razdoblju
+    data = pd.DataFrame({
+        "Start Date": pd.to_datetime(["2023-05-01", "2024-02-01", "2024-06-01", "2025-01-01"]),
+        "Service price, €": [100, 200, "300", None],
+        "Customer": ["A", "B", "B", "C"],
+    }, index=[5, 6, 7, 8])
+    coords = pd.DataFrame({"latitude": [45.0, 45.33, 45.33, 43.5], "longitude": [14.4, 14.45, 14.45, 16.4]},
+                          index=data.index)
+    start, end = period_bounds("Year 2024")
+    sliced = slice_period(data, DateIndex(data["Start Date"]), start, end)
+
+    bins = user_map_bins(sliced, coords, 5_000)
+
+    assert bins["count"].tolist() == [2]
+    assert bins["total_revenue"].tolist() == [500]
+    assert bins["customers"].tolist() == [1]
+    assert len(user_map_bins(data, coords, 5_000)) == 3
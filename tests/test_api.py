@@ -0,0 +1,103 @@
+import json
+import threading
+from http.client import HTTPConnection
+from http.server import ThreadingHTTPServer
+from urllib.parse import quote
+
+import pandas as pd
+import pytest
+
+import api
+from reporting import MIDTERM
+from snapshots import SnapshotStore
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    data = tmp_path / "Data"
+    data.mkdir()
+    monkeypatch.setattr(api, "DATA_FOLDER", str(data))
+    monkeypatch.setattr(api, "store", SnapshotStore(str(tmp_path / "Snapshots")))
+    for cached in (api._base_frames, api._sync_snapshots, api._period_frames, api._payload):
+        cached.cache_clear()
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), api.ApiHandler)
+    httpd.RequestHandlerClass.log_message = lambda *args: None
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield data, httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _get(port, path, etag=None):
+    connection = HTTPConnection("127.0.0.1", port, timeout=10)
+    connection.request("GET", path, headers={"If-None-Match": etag} if etag else {})
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response.status, response.getheader("ETag"), json.loads(body) if body else None
+
+
+def test_etag_and_not_modified(server):
+    data, port = server
+    status, etag, body = _get(port, "/api/version")
+    assert status == 200 and etag
+    assert "versions" in body
+
+    status, same_etag, body = _get(port, "/api/version", etag)
+    assert (status, same_etag, body) == (304, etag, None)
+
+    # Novi (i stariji) export mijenja verziju pa i ETag
+    pd.DataFrame({"Content ID": ["A"]}).to_excel(
+        data / "export-sme-012024.xlsx", sheet_name="Reporting of EDIH services del", index=False)
+    status, new_etag, _ = _get(port, "/api/version", etag)
+    assert status == 200 and new_etag != etag
+
+
+def test_etag_depends_on_period(server):
+    _, port = server
+    _, full, _ = _get(port, "/api/version")
+    status, midterm, _ = _get(port, "/api/version?period=" + quote(MIDTERM))
+    assert status == 200 and midterm != full
+
+
+def test_unknown_endpoint_and_period(server):
+    _, port = server
+    assert _get(port, "/api/nope")[0] == 404
+    status, _, body = _get(port, "/api/kpis?period=Someday")
+    assert status == 400 and "Full project" in body["periods"]
+
+
+def test_datasets_without_dates_are_listed(server):
+    data, port = server
+    pd.DataFrame({"SME name": ["Alfa"], "DMA Timing": ["T0"], "DMA Score": [40], "EDIH Name": ["EDIH ADRIA"]}).to_excel(
+        data / "my-smes-dma-results-012024.xlsx", sheet_name="My SMEs DMA Results", index=False)
+
+    status, _, body = _get(port, "/api/dma?dataset=sme_dma&period=" + quote("Year 2024"))
+    assert status == 200
+    assert body["unfiltered_datasets"] == ["sme_dma"] and body["organizations"] == 1
+    assert _get(port, "/api/dma?dataset=sme_dma")[2]["unfiltered_datasets"] == []
+
+
+def test_version_does_not_load_frames(server, monkeypatch):
+    _, port = server
+
+    def fail(*args, **kwargs):
+        raise AssertionError("/api/version ne smije učitavati frameove")
+
+    monkeypatch.setattr(api, "load_current", fail)
+    status, _, body = _get(port, "/api/version?period=" + quote(MIDTERM))
+    assert status == 200
+    assert body["period"] == MIDTERM and "exports" in body["versions"]
+
+
+def test_dataset_parameter_only_for_dma(server):
+    _, port = server
+    status, etag, _ = _get(port, "/api/kpis?dataset=other")
+    assert status == 200
+    assert etag == _get(port, "/api/kpis")[1]
+
+    status, _, body = _get(port, "/api/dma?dataset=other")
+    assert status == 400 and body["datasets"] == ["sme_dma", "pso_dma"]
+    assert _get(port, "/api/dma?dataset=pso_dma")[1] != _get(port, "/api/dma")[1]
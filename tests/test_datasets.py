@@ -0,0 +1,56 @@
+import pandas as pd
+
+from datasets import slice_frames
+from identity import KEY_COLUMN, CustomerIndex
+from reporting import period_bounds
+from snapshots import SnapshotStore
+
+
+def _dma_export(folder, period, names):
+    path = folder / f"my-smes-dma-results-{period}.xlsx"
+    frame = pd.DataFrame({"SME name": names, "DMA Timing": "T0",
+                          "DMA Date": pd.Timestamp("2024-01-15")})
+    frame.to_excel(path, sheet_name="My SMEs DMA Results", index=False)
+
+
+def test_snapshot_version_keeps_customers_version(tmp_path):
+    data = tmp_path / "Data"
+    data.mkdir()
+    _dma_export(data, "012024", ["Alfa"])
+    _dma_export(data, "062024", ["Alfa", "Beta"])
+    store = SnapshotStore(str(tmp_path / "Snapshots"))
+    store.ingest_folder(str(data), ["sme_dma"])
+    overrides = tmp_path / "overrides.csv"
+    customers = CustomerIndex(str(tmp_path / "customers.sqlite"), str(overrides))
+
+    def versions_for(period):
+        start, end = period_bounds(None, period)
+        frames, versions, _ = slice_frames({"sme_dma": pd.DataFrame()}, {"sme_dma": "latest"}, start, end, store,
+                                        customer_index=customers)
+        return frames["sme_dma"], versions["sme_dma"]
+
+    frame, before = versions_for(("2024-01-01", "2024-03-31"))
+    # Snapshot iz siječnja, s ključevima korisnika i verzijom ručnih pravila
+    assert frame["SME name"].tolist() == ["Alfa"] and KEY_COLUMN in frame.columns
+    assert before.startswith(store.version_as_of("sme_dma", "2024-03") + ":")
+
+    overrides.write_text("alias,customer\nAlfa,Alfa Grupa\n", encoding="utf-8")
+    _, after = versions_for(("2024-01-01", "2024-03-31"))
+    assert after != before
+
+
+def test_datasets_without_date_column_are_reported():
+    frames = {
+        "services": pd.DataFrame({"Start Date": pd.to_datetime(["2023-05-01", "2024-03-01"])}),
+        # Datetime kolona koja nije među kandidatima ne koristi se kao datum razdoblja
+        "sme_dma": pd.DataFrame({"Imported": pd.to_datetime(["2023-05-01", "2024-03-01"])}),
+        "pso_dma": pd.DataFrame(),
+    }
+    versions = {name: "v" for name in frames}
+
+    sliced, sliced_versions, unfiltered = slice_frames(frames, versions, *period_bounds("Year 2024"))
+    assert unfiltered == ["sme_dma"]
+    assert len(sliced["services"]) == 1 and len(sliced["sme_dma"]) == 2
+    assert sliced_versions["services"] != "v" and sliced_versions["sme_dma"] == "v"
+
+    assert slice_frames(frames, versions, *period_bounds("Full project"))[2] == []
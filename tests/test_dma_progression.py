@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from dma_progression import build_progression, dimension_columns
+
+
+def _dma_frame():
+    # Redoslijed kolona kao u exportu: dimenzije između 'DMA Score' i 'EDIH Name'
+    return pd.DataFrame({
+        "SME name": ["Alfa", "Alfa", "Beta", "Beta", "Beta", "Gama"],
+        "DMA Timing": ["T0", "T1", "T0", "t1 ", "T2", "T0"],
+        "DMA Score": [40, 55, 30, 36, 50, 20],
+        "Digital Strategy": [40, 60, 30, 30, 50, 20],
+        "Data Management": [40, 50, 30, 42, 50, 20],
+        "EDIH Name": ["EDIH ADRIA"] * 6,
+    })
+
+
+def test_dimension_columns_between_score_and_edih():
+    assert dimension_columns(_dma_frame()) == ["Digital Strategy", "Data Management"]
+
+
+def test_deltas_and_rates():
+    progression = build_progression(_dma_frame(), "SME name")
+    assert progression.organizations == ["Alfa", "Beta", "Gama"]
+
+    deltas = progression.deltas("T0", "T1")
+    np.testing.assert_array_equal(deltas[:2], [[20, 10], [0, 12]])
+    assert np.isnan(deltas[2]).all()
+    np.testing.assert_allclose(progression.improvement_rates()[0], [0.5, 0.25])
+
+
+def test_completion_and_ranking():
+    progression = build_progression(_dma_frame(), "SME name")
+    stats, complete = progression.stage_completion()
+    assert stats["Organizations"].tolist() == [3, 2, 1]
+    assert complete == 1
+
+    ranking = progression.most_improved()
+    assert ranking["Organization"].tolist() == ["Alfa", "Beta"]
+    assert ranking["DMA Score delta"].tolist() == [15, 6]
+    assert list(progression.organization_frame("Gama").index) == ["T0"]
+
+
+def test_duplicate_stage_keeps_first_record():
+    df = _dma_frame()
+    # Ista faza drugačije zapisana, s istom oznakom retka
+    duplicate = df.iloc[[0]].assign(**{"DMA Timing": " t0", "DMA Score": 99, "Digital Strategy": 99,
+                                       "Data Management": 99})
+    progression = build_progression(pd.concat([df, duplicate]), "SME name")
+
+    assert progression.values[0, 0].tolist() == [40, 40]
+    assert progression.scores[0, 0] == 40
+
+
+def test_missing_columns_give_empty_progression():
+    progression = build_progression(pd.DataFrame({"SME name": ["Alfa"]}), "SME name")
+    assert progression.values.shape[0] == 0
+    assert progression.most_improved().empty
@@ -0,0 +1,46 @@
+import plotly.graph_objects as go
+
+from figure_cache import FigureCache, figure_key
+
+
+def test_figure_key_ignores_filter_order():
+    assert figure_key("Overview", "bar", "v1", {"a": 1, "b": [2]}) == figure_key("Overview", "bar", "v1", {"b": [2], "a": 1})
+    assert figure_key("Overview", "bar", "v1", {"a": 1}) != figure_key("Overview", "bar", "v2", {"a": 1})
+
+
+def test_figure_is_built_once_per_key():
+    cache = FigureCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return go.Figure(go.Bar(x=["a", "b"], y=[1, 2]), layout={"title": {"text": "Usluge"}})
+
+    key = figure_key("Overview", "bar", "v1")
+    first = cache.figure(key, build)
+    second = cache.figure(key, build)
+
+    assert len(builds) == 1
+    assert second.layout.title.text == "Usluge"
+    assert list(second.data[0].y) == list(first.data[0].y) == [1, 2]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_by_bytes():
+    cache = FigureCache(max_bytes=10)
+    cache.put("a", "xxxx")
+    cache.put("b", "yyyy")
+    assert cache.get("a") == "xxxx"  # "a" postaje najnoviji
+    cache.put("c", "zzzz")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "xxxx" and cache.get("c") == "zzzz"
+    assert cache.stats()["bytes"] == 8 and cache.stats()["evictions"] == 1
+
+    cache.put("huge", "x" * 11)  # veće od cijelog cachea se ne sprema
+    assert cache.get("huge") is None and cache.size == 8
+
+    cache.put("a", "xx")
+    assert cache.size == 6
+    cache.clear()
+    assert cache.stats()["entries"] == 0 and cache.size == 0
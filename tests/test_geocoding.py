@@ -0,0 +1,86 @@
+import sqlite3
+
+import pandas as pd
+
+from geocoding import GeocodeCache, GeocodeWorker, LocalGeocoder, attach_coordinates, normalize_address
+
+
+class FlakyGeocoder(LocalGeocoder):
+    """Lokalni geokoder koji za zadane adrese uvijek baca iznimku (nedostupan servis)."""
+
+    def __init__(self, locations, broken):
+        super().__init__(locations)
+        self.broken = {normalize_address(a) for a in broken}
+        self.calls = 0
+
+    def geocode(self, query):
+        self.calls += 1
+        if normalize_address(query) in self.broken:
+            raise TimeoutError(query)
+        return super().geocode(query)
+
+
+def test_normalize_address():
+    assert normalize_address("  Ulica  Grada Vukovara 1 ,Zagreb. ") == "ulica grada vukovara 1, zagreb"
+    assert normalize_address(None) == normalize_address(float("nan")) == ""
+
+
+def test_worker_geocodes_each_address_once(tmp_path):
+    cache = GeocodeCache(str(tmp_path / "geocode.sqlite"))
+    geocoder = FlakyGeocoder({"Rijeka": (45.33, 14.44), "Split": (43.51, 16.44)}, broken=["Osijek"])
+    worker = GeocodeWorker(cache, geocoder, max_attempts=2)
+
+    assert worker.submit(["Rijeka", " rijeka", "Split", "Nepoznato", "Osijek", None]) == 4
+    assert worker.join(timeout=10)
+    assert worker.status() == {"pending": 0, "done": 3, "failed": 1, "source": "local"}
+    assert geocoder.calls == 5  # Osijek dva pokušaja
+
+    # Pronađene i nepronađene adrese su u cacheu, neuspjele nisu pa se ponovno šalju
+    assert cache.missing(["rijeka", "split", "nepoznato", "osijek"]) == ["osijek"]
+    assert worker.submit(["Rijeka", "Split"]) == 0
+    assert worker.submit(["Osijek"]) == 1
+    assert worker.join(timeout=10) and worker.failed == 2
+
+
+class LockedCache(GeocodeCache):
+    """Cache čiji prvi upis ne uspije kao kod zaključane SQLite baze."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.locked = True
+
+    def store(self, address, query, location, source):
+        if self.locked:
+            self.locked = False
+            raise sqlite3.OperationalError("database is locked")
+        super().store(address, query, location, source)
+
+
+def test_worker_survives_cache_write_errors(tmp_path, caplog):
+    cache = LockedCache(str(tmp_path / "geocode.sqlite"))
+    worker = GeocodeWorker(cache, LocalGeocoder({"Rijeka": (45.33, 14.44), "Split": (43.51, 16.44)}))
+
+    with caplog.at_level("WARNING", logger="edih.geocoding"):
+        assert worker.submit(["Rijeka"]) == 1
+        assert worker.join(timeout=10)
+    assert (worker.done, worker.failed) == (0, 1)
+    assert "database is locked" in caplog.text
+
+    # Dretva i dalje radi; neuspjela adresa se ponovno šalje
+    assert worker.submit(["Rijeka", "Split"]) == 2
+    assert worker.join(timeout=10)
+    assert (worker.done, worker.failed) == (2, 1)
+    assert cache.missing(["rijeka", "split"]) == []
+
+
+def test_attach_coordinates_keeps_existing_values(tmp_path):
+    cache = GeocodeCache(str(tmp_path / "geocode.sqlite"))
+    cache.store("rijeka", "Rijeka", (45.33, 14.44), "local")
+    cache.store("nepoznato", "Nepoznato", None, "local")
+    df = pd.DataFrame({"Location": ["Rijeka", "Nepoznato", "Split"], "latitude": [None, None, 43.5],
+                       "longitude": [None, None, 16.4]})
+
+    result = attach_coordinates(df, cache, "Location")
+    assert result["latitude"].tolist()[::2] == [45.33, 43.5]
+    assert pd.isna(result.loc[1, "latitude"])
+    assert df["latitude"].isna().sum() == 2  # izvorni frame se ne mijenja
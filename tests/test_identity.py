@@ -0,0 +1,73 @@
+import pandas as pd
+
+from identity import KEY_COLUMN, CustomerIndex, normalize_name, shared_customers, with_customer_keys
+
+
+def _index(tmp_path, overrides=None):
+    overrides_file = tmp_path / "overrides.csv"
+    if overrides:
+        overrides_file.write_text("alias,customer\n" + "".join(f"{a},{c}\n" for a, c in overrides), encoding="utf-8")
+    return CustomerIndex(str(tmp_path / "customers.sqlite"), str(overrides_file))
+
+
+def test_normalize_name():
+    assert normalize_name("Poduzeće ABC d.o.o.") == normalize_name("PODUZECE ABC, d. o. o.") == "poduzece abc"
+    assert normalize_name("Đakovo DOO") == "djakovo"
+    assert normalize_name(None) == normalize_name(float("nan")) == ""
+
+
+def test_keys_are_stable_across_calls(tmp_path):
+    index = _index(tmp_path)
+    first = index.resolve(["Alfa d.o.o.", "Beta j.d.o.o.", "ALFA DOO"])
+    assert first[0] == first[2] != first[1]
+    # Novi objekt nad istom bazom vraća iste ključeve
+    again = _index(tmp_path).resolve(["Beta", "Alfa"])
+    assert again.tolist() == [first[1], first[0]]
+
+
+def test_id_has_precedence_over_name(tmp_path):
+    index = _index(tmp_path)
+    original, other = index.resolve(["Alfa", "Beta"], [["sme:1"], []])
+    # Preimenovana organizacija s istim ID-jem zadržava ključ, iako naziv pripada drugome
+    renamed, unknown_id = index.resolve(["Beta", "Alfa"], [["sme:1"], ["sme:2"]])
+    assert renamed == original
+    # Nepoznat ID: ključ po nazivu, a ID se pamti za idući put
+    assert unknown_id == original
+    assert index.resolve(["Gama"], [["sme:2"]]).tolist() == [original]
+    assert other != original
+
+
+def test_override_has_precedence_over_id(tmp_path):
+    index = _index(tmp_path, overrides=[("Alfa Split", "Alfa")])
+    alfa, split = index.resolve(["Alfa", "Alfa Split"], [[], ["sme:9"]])
+    assert split == alfa
+    # I kad je ID već vezan uz drugi ključ, ručno pravilo ima prednost
+    other = index.resolve(["Delta"], [["oib:5"]])[0]
+    assert index.resolve(["Alfa Split"], [["oib:5"]]).tolist() == [alfa]
+    assert other != alfa
+
+
+def test_rows_without_name_or_id_have_no_key(tmp_path):
+    index = _index(tmp_path)
+    assert index.resolve([None, ""], [[], []]).tolist() == [0, 0]
+
+
+def test_with_customer_keys_across_datasets(tmp_path):
+    index = _index(tmp_path)
+    services = pd.DataFrame({"Customer": ["Alfa d.o.o.", "Beta", None, "Alfa d.o.o."]})
+    dma = pd.DataFrame({"SME name": ["ALFA DOO", "Gama"], "SME ID": [17.0, 18.0]})
+
+    services = with_customer_keys(services, "services", index)
+    dma = with_customer_keys(dma, "sme_dma", index)
+
+    assert str(services[KEY_COLUMN].dtype) == "Int64"
+    assert services[KEY_COLUMN].isna().tolist() == [False, False, True, False]
+    assert services[KEY_COLUMN].iloc[0] == services[KEY_COLUMN].iloc[3] == dma[KEY_COLUMN].iloc[0]
+    assert shared_customers(services, dma).tolist() == [services[KEY_COLUMN].iloc[0]]
+    # Excel float ID (17.0) i cijeli broj su isti alias
+    assert index.resolve(["Nešto drugo"], [["sme:17"]]).tolist() == [dma[KEY_COLUMN].iloc[0]]
+
+
+def test_datasets_without_customers_are_unchanged(tmp_path):
+    edih_list = pd.DataFrame({"EDIH Name": ["X"]})
+    assert with_customer_keys(edih_list, "edih_list", _index(tmp_path)) is edih_list
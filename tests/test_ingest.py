@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ingest import frame_from_arrow, frame_to_arrow
+
+
+def _round_trip(df):
+    return frame_from_arrow(frame_to_arrow(df))
+
+
+@pytest.fixture
+def frame():
+    df = pd.DataFrame({
+        "number": [1, 2, 3],
+        "text": pd.Series(["a", np.nan, "c"], dtype=object),
+        "mixed": pd.Series([1, "x", None], dtype=object),
+        "with none": pd.Series(["a", None, "c"], dtype=object),
+        "empty": pd.Series([np.nan] * 3, dtype=object),
+        "date": pd.to_datetime(["2024-01-01", None, "2024-02-01"]),
+        "nullable": pd.array([1, None, 3], dtype="Int64"),
+        "price": [1.5, np.nan, 2.0],
+    }).set_axis([10, 11, 12])
+    # Nazivi iz Excela mogu se ponavljati
+    df.columns = ["number", "text", "mixed", "with none", "empty", "date", "nullable", "number"]
+    return df
+
+
+def test_round_trip_keeps_columns_dtypes_and_index(frame):
+    pd.testing.assert_frame_equal(_round_trip(frame), frame)
+
+
+def test_only_mixed_object_columns_are_pickled(frame):
+    _, objects, object_positions, text_positions, _, _ = frame_to_arrow(frame)
+    assert text_positions == [1, 4]
+    assert object_positions == [2, 3]
+    assert list(objects.columns) == ["mixed", "with none"]
+
+
+def test_round_trip_edge_cases(frame):
+    for df in (frame[["text"]], frame.iloc[:0], pd.DataFrame(index=[1, 2])):
+        pd.testing.assert_frame_equal(_round_trip(df), df)
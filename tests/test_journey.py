@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+from identity import KEY_COLUMN
+from journey import STAGES, build_journey
+
+
+@pytest.fixture
+def frames():
+    services = pd.DataFrame({
+        KEY_COLUMN: pd.array([1, 1, 1, 2, 2, 3, None], dtype="Int64"),
+        "Service category delivered": ["Training", "Test before invest", "Support to find investment",
+                                       "Training", "Test before invest", "Test before invest", "Test before invest"],
+        "Start Date": pd.to_datetime(["2024-02-01", "2024-03-01", "2024-05-01",
+                                      "2024-04-01", "2024-01-15", "2024-02-01", "2024-02-01"]),
+        "End Date": pd.to_datetime(["2024-02-02", "2024-04-01", "2024-06-01",
+                                    "2024-04-02", "2024-02-01", "2024-03-01", "2024-03-01"]),
+        "Status": "Completed",
+        "Customer type": ["SME", "SME", "SME", "PSO", "PSO", "SME", "SME"],
+    })
+    derived = pd.DataFrame({"Is Bootcamp": [True, False, False, True, False, False, False]})
+    sme_dma = pd.DataFrame({
+        KEY_COLUMN: pd.array([1, 1, 2, 3], dtype="Int64"),
+        "DMA Timing": ["T0", "T1", "t0", "T0"],
+        "DMA Date": pd.to_datetime(["2024-01-10", "2024-07-01", "2024-03-01", "2024-01-05"]),
+    })
+    return {"services": services, "sme_dma": sme_dma}, derived
+
+
+def test_funnel_counts_customers_per_stage(frames):
+    journey = build_journey(*frames)
+    funnel = journey.funnel()
+
+    assert funnel["Stage"].tolist() == list(STAGES)
+    assert funnel["Count"].tolist() == [3, 2, 1, 1, 1]
+    assert funnel["% of first"].tolist() == [100.0, 66.7, 33.3, 33.3, 33.3]
+    assert funnel["% of previous"].tolist() == [100.0, 66.7, 50.0, 100.0, 100.0]
+
+
+def test_stage_reached_only_after_previous_stage(frames):
+    journey = build_journey(*frames)
+    reached = journey.reached
+    # Korisnik 2: TBI prije Bootcampa se ne računa
+    assert reached.loc[2, "Bootcamp"] == pd.Timestamp("2024-04-01")
+    assert pd.isna(reached.loc[2, "TBI"])
+    assert reached.loc[1, "DMA T1/T2"] == pd.Timestamp("2024-07-01")
+
+
+def test_stage_subset_and_filters(frames):
+    journey = build_journey(*frames, stages=("TBI", "DMA T0"))
+    # Redoslijed faza uvijek prema STAGES
+    assert journey.stages == ["DMA T0", "TBI"]
+    assert journey.funnel()["Count"].tolist() == [3, 2]
+
+    assert journey.funnel(journey.mask(segment="PSO"))["Count"].tolist() == [1, 0]
+    mask = journey.mask(start=pd.Timestamp("2024-01-08"))
+    assert journey.funnel(mask)["Count"].tolist() == [2, 1]
+
+
+def test_durations_and_cohorts(frames):
+    journey = build_journey(*frames, stages=("DMA T0", "TBI"))
+    summary = journey.duration_summary()
+    assert summary["Transition"].tolist() == ["DMA T0 → TBI"]
+    assert summary["Customers"].tolist() == [2]
+    assert summary["p50 days"].tolist() == [pytest.approx((51 + 27) / 2)]
+
+    cohorts = journey.cohorts()
+    assert cohorts["Cohort"].tolist() == ["2024Q1"]
+    assert cohorts[["DMA T0", "TBI", "Customers"]].iloc[0].tolist() == [1, 2, 3]
+
+
+def test_empty_inputs():
+    journey = build_journey({}, pd.DataFrame())
+    assert len(journey) == 0
+    assert journey.funnel()["Count"].sum() == 0
+    assert journey.duration_summary()["Customers"].sum() == 0
+    assert journey.cohorts().empty
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from kpis import evaluate_kpis, kpis_for_page, load_definitions
+
+DEFINITIONS = [
+    {"id": "revenue", "label": "Revenue", "page": "Overview", "target": 100,
+     "sources": [{"dataset": "services", "metric": "sum", "column": "Service price, €"}]},
+    {"id": "tbi", "label": "TBI", "page": "TBI", "target": 4, "targets": {"Year 2024": 2},
+     "sources": [{"dataset": "services", "metric": "count",
+                  "filter": {"column": "Service category delivered", "equals": "Test before invest"}}]},
+    {"id": "bootcamps", "label": "Bootcamps", "page": "Bootcamp", "target": 0,
+     "sources": [{"dataset": "services", "metric": "count", "filter": {"column": "Is Bootcamp", "equals": True}}]},
+    {"id": "dma", "label": "DMA", "page": "DMA", "target": 5,
+     "sources": [{"dataset": "sme_dma", "metric": "nunique", "column": "SME name"},
+                 {"dataset": "pso_dma", "metric": "nunique", "column": "PSO name"}]},
+    {"id": "combined", "label": "Combined", "page": "Overview", "target_from_kpis": True,
+     "sources": [{"metric": "kpis", "kpis": ["tbi", "dma"]}, {"metric": "static", "value": 1}]},
+]
+
+
+@pytest.fixture
+def frames():
+    services = pd.DataFrame({
+        "Service price, €": ["10", "20.5", None, "x"],
+        "Service category delivered": ["Test before invest", "Test before invest", "Training", None],
+    })
+    return {
+        "services": services,
+        "services_derived": pd.DataFrame({"Is Bootcamp": [False, True, True, False]}),
+        "sme_dma": pd.DataFrame({"SME name": ["A", "A", "B"]}),
+        "pso_dma": pd.DataFrame({"PSO name": ["C"]}),
+    }
+
+
+def test_evaluate_kpis(frames):
+    results = evaluate_kpis(frames, DEFINITIONS)
+
+    assert results.index.tolist() == ["revenue", "tbi", "bootcamps", "dma", "combined"]
+    assert results.at["revenue", "value"] == pytest.approx(30.5)
+    assert results.at["revenue", "percent"] == pytest.approx(30.5)
+    assert results.at["tbi", "value"] == 2
+    assert results.at["bootcamps", "value"] == 2  # kolona iz services_derived
+    assert np.isnan(results.at["bootcamps", "percent"])  # cilj 0
+    assert results.at["dma", "value"] == 3
+    # Složeni KPI: zbroj drugih KPI-jeva, cilj zbroj njihovih ciljeva
+    assert results.at["combined", "value"] == 6
+    assert results.at["combined", "target"] == 9
+
+
+def test_period_targets_and_missing_datasets(frames):
+    results = evaluate_kpis({"services": frames["services"]}, DEFINITIONS, period="Year 2024")
+    assert results.at["tbi", "target"] == 2
+    assert results.at["tbi", "percent"] == 100
+    assert results.at["dma", "value"] == 0
+    assert results.at["bootcamps", "value"] == 0  # kolona ne postoji → prazna maska
+
+
+def test_unknown_filter_raises(frames):
+    definitions = [{"id": "bad", "label": "Bad", "page": "X", "target": 1,
+                    "sources": [{"dataset": "services", "metric": "count",
+                                 "filter": {"column": "Service category delivered", "like": "x"}}]}]
+    with pytest.raises(ValueError):
+        evaluate_kpis(frames, definitions)
+
+
+def test_shipped_definitions_evaluate_on_empty_frames():
+    definitions = load_definitions()
+    results = evaluate_kpis({}, definitions)
+    assert len(results) == len(definitions)
+    assert not kpis_for_page(results, "EDIH ADRIA Service Overview").empty
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from quality import issue_count, offending_rows, validate, validate_all
+
+
+def _services():
+    return pd.DataFrame({
+        "Dates": ["01.02.2024", "x", "01.03.2024", "01.04.2024"],
+        "Start Date": pd.to_datetime(["2024-02-01", None, "2024-03-01", "2024-04-01"]),
+        "End Date": pd.to_datetime(["2024-02-01", None, None, "2024-04-01"]),
+        "Service price, €": ["100", None, "abc", 50],
+        "Number of attendees": [3, -1, 0, None],
+        "Service category delivered": ["Test before invest", "Training and skills development", "Nešto", None],
+        "Content ID": ["A", "B", "A", None],
+    })
+
+
+def test_validate_reports_each_rule_with_excel_rows():
+    report = validate(_services(), "services").set_index("rule")
+
+    assert report.loc["invalid_start_date", "rows"].tolist() == [3]
+    assert report.loc["invalid_end_date", "rows"].tolist() == [3, 4]
+    assert report.loc["missing_price", "rows"].tolist() == [3, 4]
+    assert report.loc["negative_attendees", "rows"].tolist() == [3]
+    assert report.loc["unknown_category", "rows"].tolist() == [4]
+    assert report.loc["duplicate_content_id", "rows"].tolist() == [2, 4]
+    assert (report["status"] == "failed").all()
+    assert (report["checked"] == 4).all()
+    assert report["count"].tolist() == [len(rows) for rows in report["rows"]]
+
+
+def test_missing_columns_and_clean_data():
+    services = _services().iloc[[0]].drop(columns=["Content ID"])
+    report = validate(services, "services").set_index("rule")
+    assert report.loc["duplicate_content_id", "status"] == "column missing: Content ID"
+    assert report.drop(index="duplicate_content_id")["status"].eq("ok").all()
+    assert issue_count(report) == 1
+
+
+def test_dma_timing_and_unknown_datasets():
+    dma = pd.DataFrame({"DMA Timing": ["T0", " t1 ", "T3", None]})
+    report = validate(dma, "sme_dma")
+    assert report["rows"].iloc[0].tolist() == [4, 5]
+    assert validate(dma, "edih_list").empty
+    assert validate(pd.DataFrame(), "services").empty
+
+
+def test_validate_all_and_offending_rows():
+    services = _services()
+    report = validate_all({"services": services, "pso_dma": pd.DataFrame({"DMA Timing": ["T2"]})})
+    assert set(report["dataset"]) == {"services", "pso_dma"}
+    assert issue_count(report) == 6
+
+    rows = report.set_index("rule").loc["duplicate_content_id", "rows"]
+    offending = offending_rows(services, rows)
+    assert offending["Content ID"].tolist() == ["A", "A"]
+    assert np.array_equal(offending["Excel row"], [2, 4])
@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+
+from aggregates import edih_ranking
+from ranking import RANKING_COLUMNS, rank_edihs
+
+
+def test_edih_ranking_matches_weighted_rankings():
+    edih_data = pd.DataFrame({
+        "EDIH Name": list("abcd"), "Country": ["HR", "HR", "SI", "SI"],
+        "Latitude": [45.0, np.nan, 46.0, 46.1], "Longitude": [15.0, np.nan, 14.5, 14.6],
+        "DMA": [1, 5, 3, 2], "EDUC": [4, 1, 2, 3], "TBI": [0, 1, 2, 3], "FCO": [1, 1, 1, 1], "NETWORK": [3, 2, 1, 0],
+    })
+    weights = {"DMA": 5.0}
+    ranking = edih_ranking(edih_data, weights)
+    assert list(ranking.columns) == ["EDIH Name", "Country", *RANKING_COLUMNS]
+    assert ranking["EDIH Name"].tolist() == rank_edihs(edih_data, weights)["EDIH Name"].tolist()
+    assert len(ranking) == len(edih_data)
@@ -0,0 +1,49 @@
+import os
+
+import pandas as pd
+
+import report
+from reporting import MIDTERM
+from snapshots import SnapshotStore
+
+
+def test_code_version_covers_imported_modules():
+    files = {os.path.basename(path) for path in report.code_files()}
+    # Sve što oblikuje izlaz: grafovi, agregati, KPI-jevi, razdoblja, rang EDIH-ova
+    assert {"report.py", "figures.py", "aggregates.py", "kpis.py", "reporting.py", "heatmaps.py",
+            "ranking.py", "esg.py", "dma_progression.py"} <= files
+    assert "EDIH-Analitika.py" not in files
+
+
+def test_period_versions_use_snapshot_manifest(tmp_path, monkeypatch):
+    data = tmp_path / "Data"
+    data.mkdir()
+    for period, rows in (("012024", 1), ("122024", 2)):
+        pd.DataFrame({"Start Date": ["2024-01-01"] * rows}).to_excel(
+            data / f"my-smes-dma-results-{period}.xlsx", sheet_name="My SMEs DMA Results", index=False)
+    os.utime(data / "my-smes-dma-results-012024.xlsx", (1, 1))
+    store = SnapshotStore(str(tmp_path / "Snapshots"))
+    store.ingest_folder(str(data))
+    monkeypatch.setattr(report, "DATA_FOLDER", str(data))
+
+    full = report.period_versions("Full project", store)
+    midterm = report.period_versions(MIDTERM, store)
+    assert full["sme_dma"] != midterm["sme_dma"] == store.version_as_of("sme_dma", "2024-09")
+
+
+def test_reused_pages_do_not_load_frames(tmp_path, monkeypatch):
+    data = tmp_path / "Data"
+    data.mkdir()
+    monkeypatch.setattr(report, "DATA_FOLDER", str(data))
+    monkeypatch.setattr(report, "SNAPSHOT_FOLDER", str(tmp_path / "Snapshots"))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("frameove učitavaju samo procesi koji renderiraju")
+
+    monkeypatch.setattr(report, "load_period", fail)
+    monkeypatch.setattr(report, "load_current", fail)
+    monkeypatch.setattr(report, "page_key", lambda *args: "key")
+    monkeypatch.setattr(report, "_current_key", lambda folder: "key")
+
+    status = report.export_report("Full project", str(tmp_path / "Reports"), pages=["ESG - Summary"])
+    assert status == {"ESG - Summary": "reused"}
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from reporting import DateIndex, period_bounds, slice_period
+
+
+def _frame():
+    return pd.DataFrame({
+        "Start Date": pd.to_datetime(["2024-03-01", None, "2023-06-15", "2024-09-30", "2025-01-02"]),
+        "value": [1, 2, 3, 4, 5],
+    }, index=[10, 11, 12, 13, 14])
+
+
+def test_select_keeps_original_order_and_skips_missing_dates():
+    index = DateIndex(_frame()["Start Date"])
+    assert index.select().tolist() == [0, 2, 3, 4]
+    assert index.select("2024-01-01", None).tolist() == [0, 3, 4]
+    assert index.select(None, "2024-03-01").tolist() == [0, 2]
+
+
+def test_period_end_includes_whole_last_day():
+    df = _frame().assign(**{"Start Date": pd.to_datetime(["2024-09-30 17:45", None, "2023-06-15 00:00",
+                                                          "2024-10-01 00:00", "2025-01-02 00:00"])})
+    start, end = period_bounds("Midterm (30.09.2024)")
+    assert start is None
+    sliced = slice_period(df, DateIndex(df["Start Date"]), start, end)
+    assert sliced["value"].tolist() == [1, 3]
+
+
+def test_slice_period_without_bounds_returns_frame_unchanged():
+    df = _frame()
+    assert slice_period(df, DateIndex(df["Start Date"])) is df
+
+
+def test_slice_period_keeps_index_labels():
+    df = _frame()
+    start, end = period_bounds("Year 2024")
+    sliced = slice_period(df, DateIndex(df["Start Date"]), start, end)
+    assert sliced.index.tolist() == [10, 13]
+
+
+def test_custom_range():
+    start, end = period_bounds(None, ("2024-01-01", "2024-01-31"))
+    assert start == pd.Timestamp("2024-01-01")
+    assert end == pd.Timestamp("2024-01-31 23:59:59.999999999")
+    assert np.datetime64(end, "ns") < np.datetime64("2024-02-01", "ns")
@@ -0,0 +1,116 @@
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from snapshots import SnapshotStore
+
+SHEET = "Reporting of EDIH services del"
+
+
+def _export(folder, period, rows):
+    """export-sme-MMYYYY.xlsx s kolonama Content ID i Status."""
+    path = os.path.join(folder, f"export-sme-{period}.xlsx")
+    pd.DataFrame(rows, columns=["Content ID", "Status"]).to_excel(path, sheet_name=SHEET, index=False)
+    return path
+
+
+@pytest.fixture
+def exports(tmp_path):
+    data = tmp_path / "Data"
+    data.mkdir()
+    january = _export(data, "012024", [("A", "Open"), ("B", "Open")])
+    june = _export(data, "062024", [("A", "Closed"), ("B", "Open"), ("C", "Open")])
+    return str(data), january, june
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(str(tmp_path / "Snapshots"))
+
+
+def test_ingest_is_idempotent(exports, store):
+    data, january, _ = exports
+    assert store.ingest_folder(data, ["sme"]) == 2
+    assert store.ingest_folder(data, ["sme"]) == 0
+
+    entry = store.ingest("sme", january)
+    assert entry["period"] == "2024-01" and entry["rows"] == 2
+    assert len(store.entries("sme")) == 2
+    # Snapshot je nepromjenjiv
+    assert not os.access(os.path.join(store.folder, entry["file"]), os.W_OK) or os.geteuid() == 0
+
+
+def test_export_without_period_is_not_stored(tmp_path, store):
+    path = _export(tmp_path, "latest", [("A", "Open")])
+    assert store.ingest("sme", path) is None
+    assert store.entries() == []
+
+
+def test_time_travel(exports, store):
+    data, january, june = exports
+    store.ingest_folder(data, ["sme"])
+
+    assert store.periods("sme") == [pd.Period("2024-01", "M"), pd.Period("2024-06", "M")]
+    assert store.as_of("sme", "2023-12") is None
+    assert store.as_of("sme", "2024-05-31")["Status"].tolist() == ["Open", "Open"]
+    assert store.as_of("sme", "062024")["Content ID"].tolist() == ["A", "B", "C"]
+    assert store.as_of("sme", pd.Period("2025-01", "M"), columns=["Status"]).columns.tolist() == ["Status"]
+
+
+def test_version_as_of_follows_snapshot(exports, store):
+    data, _, _ = exports
+    store.ingest_folder(data, ["sme"])
+
+    assert store.version_as_of("sme", "2023-12") is None
+    january = store.version_as_of("sme", "2024-01")
+    assert store.version_as_of("sme", "2024-05") == january
+    assert store.version_as_of("sme", "2024-07") == store.version_as_of("sme", "2024-06") != january
+
+
+def test_between_and_changes(exports, store):
+    data, _, _ = exports
+    store.ingest_folder(data, ["sme"])
+
+    history = store.between("sme", "2024-01", "2024-12")
+    assert history.groupby("Snapshot Period").size().to_dict() == {"2024-01": 2, "2024-06": 3}
+    assert store.between("sme", "2020-01", "2020-12").empty
+
+    changes = store.changes("sme", "2024-01", "2024-06", "Content ID", "Status")
+    assert changes["Content ID"].tolist() == ["A", "C"]
+    assert changes.loc[0, ["Status (2024-01)", "Status (2024-06)"]].tolist() == ["Open", "Closed"]
+
+
+def test_ingest_with_loaded_frame_does_not_reread_excel(exports, store, monkeypatch):
+    _, january, _ = exports
+    frame = pd.DataFrame({"Content ID": ["A", "B"], "Status": ["Open", "Open"]})
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Excel se ne smije ponovno čitati")
+
+    monkeypatch.setattr("snapshots.read_dataset", fail)
+    entry = store.ingest("sme", january, frame=frame)
+    assert entry["rows"] == 2
+    pd.testing.assert_frame_equal(store.as_of("sme", "2024-01"), frame, check_dtype=False)
+
+
+def test_concurrent_ingest_writes_one_snapshot(exports, store):
+    _, january, _ = exports
+    errors = []
+
+    def ingest():
+        try:
+            store.ingest("sme", january)
+        except Exception as e:  # pragma: no cover - greška se provjerava ispod
+            errors.append(e)
+
+    threads = [threading.Thread(target=ingest) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(store.entries("sme")) == 1
+    assert len([f for f in os.listdir(store.folder) if f.endswith(".parquet")]) == 1
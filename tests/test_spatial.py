@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from spatial import GridIndex, haversine, hex_bins
+
+
+def _points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(42.0, 46.5, n), rng.uniform(13.0, 19.5, n)
+
+
+def test_nearest_matches_brute_force():
+    lat, lon = _points(500)
+    index = GridIndex(lat, lon, cell_deg=0.25)
+    q_lat, q_lon = _points(200, seed=1)
+
+    found, distance = index.nearest(q_lat, q_lon)
+
+    brute = haversine(q_lat[:, None], q_lon[:, None], lat[None, :], lon[None, :])
+    np.testing.assert_allclose(distance, brute.min(axis=1))
+    np.testing.assert_array_equal(found, brute.argmin(axis=1))
+
+
+def test_nearest_skips_missing_points_and_respects_max_distance():
+    lat = np.array([45.0, np.nan, 45.5])
+    lon = np.array([15.0, 15.0, 15.0])
+    index = GridIndex(lat, lon)
+
+    found, distance = index.nearest([45.01, np.nan, 45.49], [15.0, 15.0, 15.0], max_distance=5_000)
+
+    assert found.tolist() == [0, -1, 2]
+    assert np.isnan(distance[1])
+    assert len(index) == 2
+
+    found, distance = index.nearest([44.0], [15.0], max_distance=5_000)
+    assert found.tolist() == [-1] and np.isnan(distance[0])
+
+
+def test_within_returns_points_in_radius_nearest_first():
+    lat, lon = _points(400, seed=2)
+    index = GridIndex(lat, lon)
+    center = (45.0, 16.0)
+
+    positions, distances = index.within(*center, 50_000)
+
+    brute = haversine(center[0], center[1], lat, lon)
+    assert set(positions.tolist()) == set(np.flatnonzero(brute <= 50_000).tolist())
+    assert np.all(np.diff(distances) >= 0)
+    np.testing.assert_allclose(distances, brute[positions])
+
+
+def test_within_empty_index():
+    positions, distances = GridIndex([np.nan], [np.nan]).within(45.0, 15.0, 1_000)
+    assert len(positions) == 0 and len(distances) == 0
+
+
+def test_hex_bins_totals_and_unique_counts():
+    lat = np.array([45.0, 45.0001, 45.0002, 46.0, np.nan])
+    lon = np.array([15.0, 15.0001, 15.0002, 16.0, 15.0])
+    bins = hex_bins(lat, lon, 5_000,
+                    sums={"revenue": [10.0, 20.0, np.nan, 5.0, 100.0]},
+                    means={"score": [1.0, 3.0, np.nan, 4.0, 9.0]},
+                    unique={"customers": ["a", "a", "b", "c", "d"]})
+
+    assert len(bins) == 2
+    assert bins["count"].sum() == 4  # točka bez koordinata se ne broji
+    bins = bins.sort_values("count", ascending=False).reset_index(drop=True)
+    assert bins.loc[0, "count"] == 3
+    assert bins.loc[0, "revenue"] == 30.0
+    assert bins.loc[0, "score"] == 2.0
+    assert bins.loc[0, "customers"] == 2
+    assert bins.loc[1, ["count", "revenue", "customers"]].tolist() == [1, 5.0, 1]
+
+
+def test_hex_bins_without_points():
+    bins = hex_bins([np.nan], [np.nan], 5_000, sums={"revenue": [1.0]})
+    assert bins.empty
+    assert list(bins.columns) == ["lat", "lon", "count", "revenue"]
+
+
+def test_hex_bins_accepts_series_with_any_index():
+    lat = pd.Series([45.0, 45.0], index=[10, 20])
+    lon = pd.Series([15.0, 15.0], index=[10, 20])
+    bins = hex_bins(lat, lon, 5_000, unique={"customers": pd.Series(["a", "b"], index=[10, 20])})
+    assert bins["count"].tolist() == [2]
+    assert bins["customers"].tolist() == [2]
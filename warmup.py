@@ -0,0 +1,139 @@
+# EDIH ADRIA analitika - zagrijavanje cacheova prije prve sesije i signal spremnosti
+# Ulazna točka kontejnera umjesto `streamlit run`: u istom procesu redom
+#   1. snapshots      - novi exporti iz Data/ u Parquet snapshotove
+#   2. datasets       - zadana stranica bez grafova: učitavanje, izvedene kolone, agregati, KPI-jevi
+#   3. aggregates     - ostale stranice (EDIH_WARMUP_PAGES), bez grafova
+#   4. report index   - ostala izvještajna razdoblja: indeksi po datumu i izrezani frameovi
+#   5. figures        - grafovi zadane stranice u cache grafova (EDIH_WARMUP_FIGURES=0 preskače)
+# pa pokreće Streamlit server. Faze izvršavaju pravu skriptu dashboarda (streamlit AppTest), pa
+# pune iste st.cache_* i cache grafova koje zatim koriste sesije. GET :9464/ready vraća 503 dok
+# zagrijavanje traje, a 200 kad Streamlit prima zahtjeve; trajanje svake faze ide u LOG_FILE.
+#
+#   python warmup.py                             # zagrijavanje + server (argumenti idu u streamlit run)
+#   python warmup.py --server.port 8501
+#   python warmup.py --check                     # samo zagrijavanje; izlazni kod 1 ako faza nije uspjela
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+import urllib.request
+
+import metrics
+import perf
+from report import PAGE_DATASETS
+from reporting import REPORTING_PERIODS
+from settings import DATA_FOLDER, SNAPSHOT_FOLDER
+from snapshots import SnapshotStore
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "EDIH-Analitika.py")
+WARMUP_FIGURES = os.environ.get("EDIH_WARMUP_FIGURES", "1") != "0"
+# "all", "" (samo zadana stranica) ili nazivi stranica odvojeni zarezom
+WARMUP_PAGES = os.environ.get("EDIH_WARMUP_PAGES", "all")
+WARMUP_TIMEOUT = float(os.environ.get("EDIH_WARMUP_TIMEOUT", "900"))  # sekundi po izvedbi skripte
+HEALTH_POLL = 0.5
+
+# Spanovi iz perf.py po dijelu reruna (za raspodjelu trajanja faze u logu)
+SPAN_GROUPS = {"load": "load:", "derived": "enrich:", "figures": "figure:", "kpis": "kpis", "page": "page:"}
+
+
+def warm_pages():
+    pages = list(PAGE_DATASETS)[1:]
+    if WARMUP_PAGES.strip().lower() == "all":
+        return pages
+    wanted = {name.strip() for name in WARMUP_PAGES.split(",") if name.strip()}
+    return [page for page in pages if page in wanted]
+
+
+def _span_totals():
+    totals = perf.recorder.totals()
+    return {group: sum(total for name, (_, total, _) in totals.items() if name.startswith(prefix))
+            for group, prefix in SPAN_GROUPS.items()}
+
+
+def run_script(page, period, figures):
+    """Jedna izvedba dashboarda kao prijavljena sesija; vraća ms po dijelu reruna."""
+    from streamlit.testing.v1 import AppTest
+
+    before = _span_totals()
+    app = AppTest.from_file(APP_SCRIPT, default_timeout=WARMUP_TIMEOUT)
+    app.session_state["password_correct"] = True
+    app.session_state["perf_session"] = "warmup"
+    app.session_state["warmup_skip_figures"] = not figures
+    app.session_state["analysis_type"] = page
+    app.session_state["reporting_period"] = period
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    after = _span_totals()
+    return {group: round(after[group] - before[group], 1) for group in SPAN_GROUPS}
+
+
+def warm_up(readiness=metrics.readiness):
+    """Sve faze redom; greška u fazi se bilježi, sljedeće faze se i dalje izvode."""
+    default_page, default_period = next(iter(PAGE_DATASETS)), next(iter(REPORTING_PERIODS))
+    # AppTest postavlja session_state izvan skripte; Streamlit to prijavljuje za svaki ključ
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+
+    with readiness.stage("snapshots") as details:
+        details["new"] = SnapshotStore(SNAPSHOT_FOLDER).ingest_folder(DATA_FOLDER)
+    with readiness.stage("datasets", page=default_page) as details:
+        details["ms"] = run_script(default_page, default_period, figures=False)
+    for page in warm_pages():
+        with readiness.stage(f"aggregates:{page}") as details:
+            details["ms"] = run_script(page, default_period, figures=False)
+    for period in list(REPORTING_PERIODS)[1:]:
+        with readiness.stage(f"report index:{period}") as details:
+            details["ms"] = run_script(default_page, period, figures=False)
+    if WARMUP_FIGURES:
+        with readiness.stage("figures", page=default_page) as details:
+            details["ms"] = run_script(default_page, default_period, figures=True)
+    return readiness.status()
+
+
+def _ready_when_serving(readiness):
+    """Spremno tek kad Streamlit odgovara na /_stcore/health (port iz učitane konfiguracije)."""
+    from streamlit import config
+
+    while True:
+        time.sleep(HEALTH_POLL)
+        url = f"http://127.0.0.1:{config.get_option('server.port')}/_stcore/health"
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                if response.status == 200:
+                    break
+        except OSError:
+            continue
+    readiness.finish()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Zagrij cacheove dashboarda pa pokreni Streamlit (ostali argumenti idu u streamlit run).")
+    parser.add_argument("--check", action="store_true", help="samo zagrijavanje, bez servera")
+    args, streamlit_args = parser.parse_known_args()
+
+    readiness = metrics.readiness
+    readiness.begin()
+    metrics.start_server()
+    status = warm_up(readiness)
+    for name, stage in status["stages"].items():
+        print(f"{stage['status']:>5}  {stage['seconds']:8.2f} s  {name}  {stage.get('error', '')}", flush=True)
+
+    if args.check:
+        readiness.finish()
+        state = readiness.status()["status"]
+        print(state)
+        sys.exit(0 if state == "ready" else 1)
+
+    from streamlit.web import cli as stcli
+
+    threading.Thread(target=_ready_when_serving, args=(readiness,), name="warmup-ready", daemon=True).start()
+    sys.argv = ["streamlit", "run", APP_SCRIPT, *streamlit_args]
+    sys.exit(stcli.main())
+
+
+if __name__ == "__main__":
+    main()